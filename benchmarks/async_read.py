@@ -0,0 +1,109 @@
+"""
+Benchmark many concurrent small reads with Jp2kr.aread against the same
+reads made one after another.
+
+A tiled test image is written to a temporary directory unless an existing
+image is given.  Windows of one tile each are read at random positions, all
+of them gathered at once, for several values of the async.max_workers
+option.  While the reads run, a ticker task measures how late the event loop
+wakes it up, which shows whether the loop stays responsive.
+
+    python benchmarks/async_read.py [--image PATH] [--reads 500]
+"""
+# standard library imports
+import argparse
+import asyncio
+import pathlib
+import random
+import tempfile
+import time
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+
+
+def make_image(path, reps):
+    data = np.tile(skimage.data.astronaut(), (reps, reps, 1))
+    glymur.Jp2k(path, data=data, tilesize=(256, 256))
+
+
+def random_areas(jp2, n, size, seed=0):
+    rng = random.Random(seed)
+    nrows, ncols = jp2.shape[:2]
+    areas = []
+    for _ in range(n):
+        r = rng.randrange(0, nrows - size)
+        c = rng.randrange(0, ncols - size)
+        areas.append((r, c, r + size, c + size))
+    return areas
+
+
+async def ticker(stop, interval=0.005):
+    """Return the worst delay of the event loop in waking this task."""
+    worst = 0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - t0 - interval)
+    return worst
+
+
+async def gather_reads(jp2, areas):
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(stop))
+    t0 = time.perf_counter()
+    await asyncio.gather(*[jp2.aread(area=area) for area in areas])
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    return elapsed, await tick
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--image', type=pathlib.Path)
+    parser.add_argument('--reps', type=int, default=4,
+                        help='size of generated image, in 512x512 units')
+    parser.add_argument('--reads', type=int, default=500)
+    parser.add_argument('--size', type=int, default=128,
+                        help='height and width of each window')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tdir:
+        path = args.image
+        if path is None:
+            path = pathlib.Path(tdir) / 'bench.jp2'
+            make_image(path, args.reps)
+
+        jp2 = glymur.Jp2kr(path)
+        areas = random_areas(jp2, args.reads, args.size)
+        print(f'image:  {path}, shape {jp2.shape}, {args.reads} reads')
+
+        t0 = time.perf_counter()
+        for area in areas:
+            jp2.read(area=area)
+        baseline = time.perf_counter() - t0
+        rate = args.reads / baseline
+        print(f'{"sequential read":>20s}:  {baseline:8.3f}s  {rate:8.1f}/s')
+
+        for workers in args.workers:
+            glymur.set_option('async.max_workers', workers)
+            elapsed, lag = asyncio.run(gather_reads(jp2, areas))
+            label = f'aread, {workers} workers'
+            print(
+                f'{label:>20s}:  {elapsed:8.3f}s  '
+                f'{args.reads / elapsed:8.1f}/s  '
+                f'({baseline / elapsed:.2f}x, '
+                f'worst loop lag {lag * 1000:.1f}ms)'
+            )
+
+        glymur.reset_option('async.max_workers')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark the time to the first image of iter_layers against a full quality
+read.
+
+A test image with several quality layers is written to a temporary directory
+unless an existing image is given.  Each configuration is timed several
+times and the best time is reported.
+
+    python benchmarks/iter_layers.py [--image PATH] [--cratios 200 50 10 1]
+"""
+# standard library imports
+import argparse
+import pathlib
+import tempfile
+import time
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def make_image(path, reps, cratios):
+    data = np.tile(skimage.data.astronaut(), (reps, reps, 1))
+    glymur.Jp2k(path, data=data, cratios=cratios)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--image', type=pathlib.Path)
+    parser.add_argument('--reps', type=int, default=4,
+                        help='size of generated image, in 512x512 units')
+    parser.add_argument('--cratios', type=int, nargs='+',
+                        default=[200, 50, 10, 1])
+    parser.add_argument('--rlevel', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tdir:
+        path = args.image
+        if path is None:
+            path = pathlib.Path(tdir) / 'bench.jp2'
+            make_image(path, args.reps, args.cratios)
+
+        jp2 = glymur.Jp2kr(path)
+        print(f'image:  {path}, shape {jp2.shape}')
+
+        t = best_time(lambda: jp2.read(rlevel=args.rlevel), args.repeat)
+        print(f'{"full quality read":>24s}:  {t:8.3f}s')
+        baseline = t
+
+        def first():
+            next(jp2.iter_layers(rlevel=args.rlevel))
+
+        t = best_time(first, args.repeat)
+        print(f'{"first layer":>24s}:  {t:8.3f}s  ({baseline / t:.2f}x)')
+
+        times = []
+        t0 = time.perf_counter()
+        for layers, _ in jp2.iter_layers(rlevel=args.rlevel):
+            times.append((layers, time.perf_counter() - t0))
+        for layers, t in times:
+            label = f'{layers} layers done at'
+            print(f'{label:>24s}:  {t:8.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark the latency of opening a file and reading its codestream header,
+with and without the metadata cache.
+
+A test image with a large XML box is written to a temporary directory,
+unless an existing image is given.  The entries on disk are kept in a
+temporary configuration directory.  The memory cache is emptied before each
+open when timing the disk cache, so that the entry is read from disk.  Each
+configuration is timed over many opens and the median latency is reported.
+
+    python benchmarks/open_latency.py [--image PATH] [--opens 200]
+"""
+# standard library imports
+import argparse
+import os
+import pathlib
+import statistics
+import tempfile
+import time
+
+# 3rd party library imports
+from lxml import etree as ET
+import skimage.data
+
+# local imports
+import glymur
+
+
+def make_image(path, metadata_size):
+    glymur.Jp2k(path, data=skimage.data.astronaut(), tilesize=(64, 64))
+
+    xml = ET.Element('metadata')
+    for k in range(metadata_size // 32):
+        ET.SubElement(xml, 'item', name=f'item{k}').text = 'x' * 8
+    jp2 = glymur.Jp2k(path)
+    jp2.append(glymur.jp2box.XMLBox(xml=ET.ElementTree(xml)))
+
+
+def latency(path, opens, before=None):
+    """Median time in seconds to open the file and get its codestream."""
+    times = []
+    for _ in range(opens):
+        if before is not None:
+            before()
+        t0 = time.perf_counter()
+        glymur.Jp2kr(path).codestream
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--image', type=pathlib.Path)
+    parser.add_argument('--metadata-size', type=int, default=2**20,
+                        help='approximate size of the XML box in bytes')
+    parser.add_argument('--opens', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tdir:
+        os.environ['XDG_CONFIG_HOME'] = tdir
+
+        path = args.image
+        if path is None:
+            path = pathlib.Path(tdir) / 'bench.jp2'
+            make_image(path, args.metadata_size)
+        print(f'image:  {path}, {path.stat().st_size} bytes')
+
+        for mode, before in [
+            (None, None),
+            ('memory', None),
+            ('disk', glymur.metadata_cache_clear),
+        ]:
+            with glymur.option_context({'cache.metadata': mode}):
+                # Prime the cache.
+                glymur.Jp2kr(path).codestream
+                t = latency(path, args.opens, before=before)
+            print(f'cache.metadata={str(mode):6s}  {t * 1e3:8.3f} ms')
+
+        glymur.metadata_cache_clear(disk=True)
+
+
+if __name__ == '__main__':
+    main()
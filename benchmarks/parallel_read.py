@@ -0,0 +1,90 @@
+"""
+Benchmark tile-parallel reads against the single-codec path.
+
+A large tiled test image is written to a temporary directory unless an
+existing image is given.  Each configuration is timed several times and the
+best time is reported.
+
+    python benchmarks/parallel_read.py [--image PATH] [--workers 1 2 4 8]
+"""
+# standard library imports
+import argparse
+import concurrent.futures
+import os
+import pathlib
+import tempfile
+import time
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def make_image(path, reps, tilesize):
+    data = np.tile(skimage.data.astronaut(), (reps, reps, 1))
+    glymur.Jp2k(path, data=data, tilesize=(tilesize, tilesize))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--image', type=pathlib.Path)
+    parser.add_argument('--reps', type=int, default=8,
+                        help='size of generated image, in 512x512 units')
+    parser.add_argument('--tilesize', type=int, default=512)
+    parser.add_argument('--rlevel', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=[2, 4, os.cpu_count()])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tdir:
+        path = args.image
+        if path is None:
+            path = pathlib.Path(tdir) / 'bench.jp2'
+            make_image(path, args.reps, args.tilesize)
+
+        jp2 = glymur.Jp2kr(path)
+        print(f'image:  {path}, shape {jp2.shape}, tiles {jp2.tilesize}')
+        print(f'lib.num_threads:  {glymur.get_option("lib.num_threads")}')
+
+        out = np.empty_like(jp2.read(rlevel=args.rlevel))
+
+        t = best_time(lambda: jp2.read(rlevel=args.rlevel, out=out),
+                      args.repeat)
+        print(f'{"single codec":>24s}:  {t:8.3f}s')
+        baseline = t
+
+        for n in sorted(set(args.workers)):
+            t = best_time(
+                lambda: jp2.read(rlevel=args.rlevel, out=out, workers=n),
+                args.repeat
+            )
+            label = f'{n} threads'
+            print(f'{label:>24s}:  {t:8.3f}s  ({baseline / t:.2f}x)')
+
+        for n in sorted(set(args.workers)):
+            with concurrent.futures.ProcessPoolExecutor(n) as executor:
+                t = best_time(
+                    lambda: jp2.read(
+                        rlevel=args.rlevel, out=out, workers=executor
+                    ),
+                    args.repeat
+                )
+            label = f'{n} processes'
+            print(f'{label:>24s}:  {t:8.3f}s  ({baseline / t:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark fully parsing a large tiled codestream, lazily and eagerly.
+
+A synthetic image with many small tiles and PLT segments is written to a
+temporary directory, unless an existing image is given.  Each parse runs in
+a fresh process, so that its peak resident set size can be reported along
+with the best time over several parses and the memory still held by the
+parsed codestream.
+
+    python benchmarks/parse_codestream.py [--image PATH] [--size 4096]
+"""
+# standard library imports
+import argparse
+import concurrent.futures
+import multiprocessing
+import pathlib
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur.codestream import Codestream
+
+
+def make_image(path, size, tile):
+    reps = -(-size // 512)
+    data = np.tile(skimage.data.moon(), (reps, reps))[:size, :size]
+    glymur.Jp2k(
+        path, data=data, tilesize=(tile, tile), numres=3, plt=True,
+    )
+
+
+def codestream_offset(path):
+    """Offset and length of the codestream in the file."""
+    jp2 = glymur.Jp2kr(path)
+    if not jp2.box:
+        return 0, path.stat().st_size
+    jp2c = next(box for box in jp2.box if box.box_id == 'jp2c')
+    offset = jp2c.main_header_offset
+    return offset, jp2c.offset + jp2c.length - offset
+
+
+def parse(path, lazy, repeat):
+    """Parse the codestream in this process.
+
+    Returns the best time, the number of segments, the memory held by the
+    codestream, and the peak resident set size in MiB.
+    """
+    offset, length = codestream_offset(path)
+
+    def once():
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            return Codestream(f, length, header_only=False, lazy=lazy)
+
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        codestream = once()
+        times.append(time.perf_counter() - t0)
+        del codestream
+
+    tracemalloc.start()
+    codestream = once()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    maxrss /= 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+
+    return min(times), len(codestream.segment), held / 2 ** 20, maxrss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--image', type=pathlib.Path)
+    parser.add_argument('--size', type=int, default=4096)
+    parser.add_argument('--tile', type=int, default=32)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tdir:
+        path = args.image
+        if path is None:
+            path = pathlib.Path(tdir) / 'bench.j2k'
+            make_image(path, args.size, args.tile)
+        print(f'image:  {path}, {path.stat().st_size / 2 ** 20:.1f} MiB')
+
+        results = {}
+        context = multiprocessing.get_context('spawn')
+        for lazy in (False, True):
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=1, mp_context=context
+            ) as executor:
+                future = executor.submit(parse, path, lazy, args.repeat)
+                results[lazy] = future.result()
+
+        print(
+            f'{"parser":>8s}  {"segments":>9s}  {"time":>9s}  '
+            f'{"held":>10s}  {"peak RSS":>10s}'
+        )
+        for lazy, (t, nsegments, held, maxrss) in results.items():
+            name = 'lazy' if lazy else 'eager'
+            print(
+                f'{name:>8s}  {nsegments:9d}  {t:8.3f}s  '
+                f'{held:6.1f} MiB  {maxrss:6.1f} MiB'
+            )
+        speedup = results[False][0] / results[True][0]
+        print(f'speedup:  {speedup:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
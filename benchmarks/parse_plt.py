@@ -0,0 +1,110 @@
+"""
+Benchmark parsing a codestream full of PLT segments.
+
+A synthetic image with many small tiles is written with PLT markers to a
+temporary directory, unless an existing image is given.  The full
+codestream is parsed several times and the best time is reported, along
+with the time spent decoding just the packet lengths, both vectorized and
+with the per-byte loop that was used before.
+
+    python benchmarks/parse_plt.py [--image PATH] [--size 2048 --tile 32]
+"""
+# standard library imports
+import argparse
+import pathlib
+import tempfile
+import time
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur.codestream import _parse_packet_lengths
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def make_image(path, size, tile):
+    reps = -(-size // 512)
+    data = np.tile(skimage.data.moon(), (reps, reps))[:size, :size]
+    glymur.Jp2k(
+        path, data=data, tilesize=(tile, tile), numres=3, plt=True,
+    )
+
+
+def per_byte_loop(read_buffer):
+    """Decode packet lengths one byte at a time."""
+    packet_len = []
+    plen = 0
+    for byte in read_buffer:
+        plen |= byte & 0x7F
+        if byte & 0x80:
+            plen <<= 7
+        else:
+            packet_len.append(plen)
+            plen = 0
+    return packet_len
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--image', type=pathlib.Path)
+    parser.add_argument('--size', type=int, default=2048)
+    parser.add_argument('--tile', type=int, default=32)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tdir:
+        path = args.image
+        if path is None:
+            path = pathlib.Path(tdir) / 'bench.j2k'
+            make_image(path, args.size, args.tile)
+
+        jp2 = glymur.Jp2kr(path)
+        codestream = jp2.get_codestream(header_only=False)
+        plts = [s for s in codestream.segment if s.marker_id == 'PLT']
+        npackets = sum(s.iplt.size for s in plts)
+        print(
+            f'image:  {path}, {len(codestream.segment)} segments, '
+            f'{len(plts)} PLT segments, {npackets} packets'
+        )
+
+        t = best_time(
+            lambda: jp2.get_codestream(header_only=False), args.repeat
+        )
+        print(f'{"full codestream parse":>24s}:  {t:8.3f}s')
+
+        # Segment offsets are from the start of the file.  The Iplt
+        # parameters follow the marker, the length, and Zplt.
+        data = path.read_bytes()
+        payloads = [
+            data[s.offset + 5:s.offset + 2 + s.length] for s in plts
+        ]
+
+        def vectorized():
+            for payload in payloads:
+                _parse_packet_lengths(payload)
+
+        def loop():
+            for payload in payloads:
+                per_byte_loop(payload)
+
+        t_loop = best_time(loop, args.repeat)
+        print(f'{"Iplt, per-byte loop":>24s}:  {t_loop:8.3f}s')
+        t = best_time(vectorized, args.repeat)
+        print(
+            f'{"Iplt, vectorized":>24s}:  {t:8.3f}s  ({t_loop / t:.2f}x)'
+        )
+
+
+if __name__ == '__main__':
+    main()
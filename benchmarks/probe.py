@@ -0,0 +1,89 @@
+"""
+Benchmark probing many files against opening them with Jp2kr.
+
+Copies of a test image with XML and UUID metadata boxes after the codestream
+are written to a temporary directory, unless a directory of existing images
+is given.  Each method is timed several times over all of the files and the
+best throughput in files per second is reported.
+
+    python benchmarks/probe.py [--directory DIR] [--files 200]
+"""
+# standard library imports
+import argparse
+import pathlib
+import tempfile
+import time
+import uuid
+
+# 3rd party library imports
+from lxml import etree as ET
+import skimage.data
+
+# local imports
+import glymur
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def make_images(directory, n, metadata_size):
+    """Write n copies of an image, each followed by metadata boxes."""
+    path = directory / 'image.jp2'
+    glymur.Jp2k(path, data=skimage.data.astronaut(), tilesize=(128, 128))
+
+    xml = ET.Element('metadata')
+    for k in range(metadata_size // 32):
+        ET.SubElement(xml, 'item', name=f'item{k}').text = 'x' * 8
+    jp2 = glymur.Jp2k(path)
+    boxes = jp2.box + [
+        glymur.jp2box.XMLBox(xml=ET.ElementTree(xml)),
+        glymur.jp2box.UUIDBox(the_uuid=uuid.uuid4(), raw_data=b'\x00' * 256),
+    ]
+    jp2.wrap(directory / 'template.jp2', boxes=boxes)
+
+    data = (directory / 'template.jp2').read_bytes()
+    paths = []
+    for k in range(n):
+        paths.append(directory / f'image{k:05d}.jp2')
+        paths[-1].write_bytes(data)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--directory', type=pathlib.Path)
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--metadata-size', type=int, default=65536,
+                        help='approximate size of the XML box in bytes')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tdir:
+        if args.directory is None:
+            paths = make_images(
+                pathlib.Path(tdir), args.files, args.metadata_size
+            )
+        else:
+            paths = sorted(
+                p for p in args.directory.rglob('*')
+                if p.suffix.lower() in ('.jp2', '.jpx', '.j2k', '.j2c')
+            )
+        print(f'files:  {len(paths)}')
+
+        for label, func in [
+            ('Jp2kr', glymur.Jp2kr),
+            ('Jp2kr + shape/dtype', lambda p: glymur.Jp2kr(p).dtype),
+            ('probe', glymur.probe),
+        ]:
+            t = best_time(lambda: [func(p) for p in paths], args.repeat)
+            print(f'{label:20s}  {len(paths) / t:10.1f} files/sec')
+
+
+if __name__ == '__main__':
+    main()
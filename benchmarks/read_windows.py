@@ -0,0 +1,109 @@
+"""
+Benchmark reading many small windows against slicing one window at a time.
+
+A tiled test image is written to a temporary directory unless an existing
+image is given.  Chips are laid out on a regular grid with the given stride,
+so that neighbouring chips overlap when the stride is smaller than the chip
+size, and a random subset of them is requested.  Each configuration is timed
+several times and the best time is reported.
+
+    python benchmarks/read_windows.py [--image PATH] [--chips 500]
+"""
+# standard library imports
+import argparse
+import os
+import pathlib
+import tempfile
+import time
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def make_image(path, reps, tilesize):
+    data = np.tile(skimage.data.astronaut(), (reps, reps, 1))
+    glymur.Jp2k(path, data=data, tilesize=(tilesize, tilesize))
+
+
+def make_areas(shape, size, stride, n, seed):
+    nrows, ncols = shape[:2]
+    areas = [
+        (r, c, r + size, c + size)
+        for r in range(0, nrows - size + 1, stride)
+        for c in range(0, ncols - size + 1, stride)
+    ]
+    rng = np.random.default_rng(seed)
+    idx = rng.choice(len(areas), size=min(n, len(areas)), replace=False)
+    return [areas[i] for i in idx]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--image', type=pathlib.Path)
+    parser.add_argument('--reps', type=int, default=4,
+                        help='size of generated image, in 512x512 units')
+    parser.add_argument('--tilesize', type=int, default=512)
+    parser.add_argument('--chips', type=int, default=500)
+    parser.add_argument('--size', type=int, default=64)
+    parser.add_argument('--stride', type=int, default=48)
+    parser.add_argument('--rlevel', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=[2, 4, os.cpu_count()])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tdir:
+        path = args.image
+        if path is None:
+            path = pathlib.Path(tdir) / 'bench.jp2'
+            make_image(path, args.reps, args.tilesize)
+
+        jp2 = glymur.Jp2kr(path)
+        areas = make_areas(
+            jp2.shape, args.size, args.stride, args.chips, args.seed
+        )
+        print(f'image:  {path}, shape {jp2.shape}, tiles {jp2.tilesize}')
+        print(f'chips:  {len(areas)} of {args.size}x{args.size}, '
+              f'stride {args.stride}')
+
+        def naive():
+            for area in areas:
+                jp2.read(rlevel=args.rlevel, area=area)
+
+        t = best_time(naive, args.repeat)
+        print(f'{"one window at a time":>24s}:  {t:8.3f}s')
+        baseline = t
+
+        t = best_time(
+            lambda: jp2.read_windows(areas, rlevel=args.rlevel),
+            args.repeat
+        )
+        print(f'{"read_windows":>24s}:  {t:8.3f}s  ({baseline / t:.2f}x)')
+
+        for n in sorted(set(args.workers)):
+            t = best_time(
+                lambda: jp2.read_windows(
+                    areas, rlevel=args.rlevel, workers=n
+                ),
+                args.repeat
+            )
+            label = f'{n} threads'
+            print(f'{label:>24s}:  {t:8.3f}s  ({baseline / t:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Load test the tile server.
+
+A tiled test image is written to a temporary directory unless an existing
+image is given.  The server is started on a free local port and a number of
+client threads request random XYZ tiles over HTTP, first with cold caches
+and then again with the same tiles, now warm.  Throughput in tiles per
+second and the median and 99th percentile latencies are reported.
+
+    python benchmarks/tileserver_load.py [--image PATH] [--requests 2000]
+"""
+# standard library imports
+import argparse
+import concurrent.futures
+import pathlib
+import tempfile
+import threading
+import time
+import urllib.request
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur.tileserver import TileServer
+
+
+def make_image(path, reps, tilesize):
+    data = np.tile(skimage.data.astronaut(), (reps, reps, 1))
+    glymur.Jp2k(path, data=data, tilesize=(tilesize, tilesize))
+
+
+def make_tiles(source, n, seed):
+    rng = np.random.default_rng(seed)
+    tiles = []
+    for _ in range(n):
+        z = int(rng.integers(0, source.max_zoom + 1))
+        ncols, nrows = source.grid(z)
+        tiles.append(
+            (z, int(rng.integers(0, ncols)), int(rng.integers(0, nrows)))
+        )
+    return tiles
+
+
+def run(base, tiles, clients):
+    """Request the tiles, returning the elapsed time and the latencies."""
+
+    def fetch(tile):
+        z, x, y = tile
+        t0 = time.perf_counter()
+        with urllib.request.urlopen(f'{base}/{z}/{x}/{y}.png') as r:
+            r.read()
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(clients) as executor:
+        latencies = list(executor.map(fetch, tiles))
+    return time.perf_counter() - t0, np.array(latencies)
+
+
+def report(label, elapsed, latencies):
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(
+        f'{label:>8s}:  {len(latencies) / elapsed:8.1f} tiles/s  '
+        f'p50 {p50:7.1f} ms  p99 {p99:7.1f} ms'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--image', type=pathlib.Path)
+    parser.add_argument('--reps', type=int, default=8,
+                        help='size of generated image, in 512x512 units')
+    parser.add_argument('--tilesize', type=int, default=512)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tdir:
+        path = args.image
+        if path is None:
+            path = pathlib.Path(tdir) / 'bench.jp2'
+            make_image(path, args.reps, args.tilesize)
+
+        server = TileServer({'bench': path}, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        source = server.sources['bench']
+        tiles = make_tiles(source, args.requests, args.seed)
+        print(f'image:  {path}, shape {source.jp2.shape}, '
+              f'zoom levels 0-{source.max_zoom}')
+        print(f'{len(tiles)} requests from {args.clients} clients, '
+              f'{len(set(tiles))} distinct tiles')
+
+        base = f'http://127.0.0.1:{server.server_port}/bench'
+        try:
+            report('cold', *run(base, tiles, args.clients))
+            report('warm', *run(base, tiles, args.clients))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    main()
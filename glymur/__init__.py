@@ -2,19 +2,26 @@
 
 __all__ = [
     'data',
-    'get_option', 'set_option', 'reset_option',
+    'cache_info', 'cache_clear', 'thread_info',
+    'metadata_cache_info', 'metadata_cache_clear',
+    'get_option', 'set_option', 'reset_option', 'option_context',
     'get_printoptions', 'set_printoptions',
     'get_parseoptions', 'set_parseoptions',
+    'aopen', 'encode', 'probe', 'ProbeResult',
     'Jp2k', 'Jp2kr', 'JPEG2JP2', 'Tiff2Jp2k',
 ]
 
 # Local imports
 from glymur import version
-from .options import (get_option, set_option, reset_option,
+from .options import (get_option, set_option, reset_option, option_context,
                       get_printoptions, set_printoptions,
                       get_parseoptions, set_parseoptions)
+from .tilecache import cache_info, cache_clear
+from .metadatacache import metadata_cache_info, metadata_cache_clear
+from .threads import thread_info
 from .jpeg import JPEG2JP2
-from .jp2k import Jp2k, Jp2kr
+from .jp2k import aopen, encode, Jp2k, Jp2kr
+from ._probe import probe, ProbeResult
 from .tiff import Tiff2Jp2k
 from . import data
 
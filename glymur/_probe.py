@@ -0,0 +1,293 @@
+"""Quickly probe a JPEG 2000 file for the basic properties of its image.
+
+Only the box headers up to the first codestream are read, along with the
+image header, colour specification, and palette boxes inside the JP2 header
+box, and the main header of the codestream up to its COD segment.  No box or
+segment objects are built, and nothing after the start of the codestream's
+main header is looked at, so trailing XML, UUID, and other metadata boxes
+cost nothing.
+"""
+
+# Standard library imports
+import collections
+import math
+import struct
+
+# Third party library imports
+import numpy as np
+
+# Local imports
+from .codestream import _PROGRESSION_ORDER_DISPLAY
+from .core import _COLORSPACE_MAP_DISPLAY, ENUMERATED_COLORSPACE
+from .jp2box import _COLORSPACE_METHODS, InvalidJp2kError
+from . import _stream
+
+
+ProbeResult = collections.namedtuple(
+    "ProbeResult",
+    [
+        "codec", "shape", "dtype", "num_res", "tile_size", "tile_grid",
+        "progression", "layers", "colourspace",
+    ],
+)
+ProbeResult.__doc__ = """Basic properties of a JPEG 2000 image.
+
+Attributes
+----------
+codec : str
+    Either 'jp2' for files with a JP2 or JPX jacket, or 'j2k' for raw
+    codestreams.
+shape : tuple
+    Shape of the image as read by Jp2kr.
+dtype : type
+    Datatype of the image as read by Jp2kr, or None if the components
+    differ in bitdepth or sign.
+num_res : int
+    Number of decomposition levels, as in the COD segment.
+tile_size : tuple
+    Nominal height and width of the tiles.
+tile_grid : tuple
+    Number of tile rows and columns.
+progression : str
+    Progression order, e.g. 'LRCP'.
+layers : int
+    Number of quality layers.
+colourspace : str or None
+    The enumerated colourspace, e.g. 'sRGB', or the method of colour
+    specification if it is not enumerated.  None for raw codestreams or if
+    there is no colour specification box.
+"""
+
+_SOC = 0xFF4F
+_SIZ = 0xFF51
+_COD = 0xFF52
+_SOT = 0xFF90
+
+
+def probe(source):
+    """Read the basic properties of a JPEG 2000 image without parsing the
+    whole file.
+
+    This is much faster than constructing a Jp2kr object when only the
+    shape, datatype, or coding parameters are wanted, e.g. for cataloguing
+    large numbers of files.  Nothing is validated beyond what is needed to
+    find these properties.
+
+    Parameters
+    ----------
+    source : path, bytes, bytearray, memoryview, mmap, or file object
+        The JPEG 2000 data.  File objects must be binary and seekable.
+
+    Returns
+    -------
+    ProbeResult
+        Immutable record of the image's properties.
+
+    Raises
+    ------
+    InvalidJp2kError
+        If the source is not recognizably JPEG 2000.
+
+    Examples
+    --------
+    >>> info = glymur.probe(glymur.data.nemo())
+    >>> info.shape
+    (1456, 2592, 3)
+    >>> info.tile_grid, info.progression, info.colourspace
+    ((1, 1), 'LRCP', 'sRGB')
+    """
+    with _stream.open_source(source) as fptr:
+        signature = fptr.read(12)
+        if signature[:4] == b"\xff\x4f\xff\x51":
+            fptr.seek(0)
+            return _probe_codestream(fptr, "j2k", None, None)
+        if signature != b"\x00\x00\x00\x0cjP  \r\n\x87\n":
+            msg = "The source is neither a JP2 file nor a raw codestream."
+            raise InvalidJp2kError(msg)
+
+        header = {}
+        for box_id, offset, end in _boxes(fptr, 12, None):
+            if box_id == b"jp2h":
+                header = _read_jp2_header(fptr, offset, end)
+            elif box_id == b"jp2c":
+                fptr.seek(offset)
+                return _probe_codestream(
+                    fptr, "jp2", header.get("ihdr"), header.get("colr")
+                )
+
+    raise InvalidJp2kError("No codestream box was found.")
+
+
+def _boxes(fptr, start, stop):
+    """Iterate over the boxes in a range of the file, reading only their
+    headers.
+
+    Parameters
+    ----------
+    fptr : file
+        Open file object.
+    start : int
+        Offset of the first box.
+    stop : int or None
+        Offset of the end of the last box, or None for the end of the file.
+
+    Yields
+    ------
+    bytes, int, int
+        The box ID, and the offsets of the box contents and of the box end.
+    """
+    pos = start
+    while stop is None or pos + 8 <= stop:
+        fptr.seek(pos)
+        read_buffer = fptr.read(8)
+        if len(read_buffer) < 8:
+            return
+        box_length, box_id = struct.unpack(">I4s", read_buffer)
+
+        if box_length == 0:
+            # The box lasts until the end of the file.
+            offset = pos + 8
+            end = _stream.file_size(fptr) if stop is None else stop
+        elif box_length == 1:
+            (box_length,) = struct.unpack(">Q", fptr.read(8))
+            offset, end = pos + 16, pos + box_length
+        else:
+            offset, end = pos + 8, pos + box_length
+
+        if end < offset:
+            msg = f"Invalid box length {box_length} at byte offset {pos}."
+            raise InvalidJp2kError(msg)
+
+        yield box_id, offset, end
+        pos = end
+
+
+def _read_jp2_header(fptr, start, stop):
+    """Read what is needed from the boxes inside the JP2 header box.
+
+    Returns
+    -------
+    dict
+        The height, width, and number of components from the image header
+        box under 'ihdr', and the colourspace under 'colr'.  The number of
+        components is that of the palette, if there is one.
+    """
+    header = {}
+    num_palette_columns = None
+
+    for box_id, offset, end in _boxes(fptr, start, stop):
+        fptr.seek(offset)
+        if box_id == b"ihdr":
+            header["ihdr"] = struct.unpack(">IIH", fptr.read(10))
+        elif box_id == b"colr" and "colr" not in header:
+            # Only the first colour specification box counts.
+            read_buffer = fptr.read(7)
+            method = read_buffer[0]
+            if method == ENUMERATED_COLORSPACE and len(read_buffer) == 7:
+                (colorspace,) = struct.unpack_from(">I", read_buffer, 3)
+                header["colr"] = _COLORSPACE_MAP_DISPLAY.get(
+                    colorspace, str(colorspace)
+                )
+            else:
+                header["colr"] = _COLORSPACE_METHODS.get(method, str(method))
+        elif box_id == b"pclr":
+            num_palette_columns = fptr.read(3)[2]
+
+    if "ihdr" in header and num_palette_columns is not None:
+        height, width, num_components = header["ihdr"]
+        if num_components == 1:
+            header["ihdr"] = height, width, num_palette_columns
+
+    return header
+
+
+def _probe_codestream(fptr, codec, ihdr, colourspace):
+    """Read the main header of a codestream up to the COD segment.
+
+    Parameters
+    ----------
+    fptr : file
+        Open file object positioned at the SOC marker.
+    codec : str
+        Either 'jp2' or 'j2k'.
+    ihdr : tuple or None
+        Height, width, and number of components from the image header box.
+    colourspace : str or None
+        From the colour specification box.
+
+    Returns
+    -------
+    ProbeResult
+    """
+    siz = cod = None
+    while siz is None or cod is None:
+        read_buffer = fptr.read(4)
+        if len(read_buffer) < 4:
+            break
+        marker, length = struct.unpack(">HH", read_buffer)
+        if marker == _SOC:
+            # No segment follows.
+            fptr.seek(-2, 1)
+            continue
+        if marker == _SOT or marker < 0xFF00 or length < 2:
+            break
+
+        segment = fptr.read(length - 2)
+        if marker == _SIZ:
+            siz = segment
+        elif marker == _COD:
+            cod = segment
+
+    if siz is None or cod is None:
+        msg = "The SIZ or COD segment is missing from the main header."
+        raise InvalidJp2kError(msg)
+
+    # SIZ:  Rsiz, Xsiz, Ysiz, XOsiz, YOsiz, XTsiz, YTsiz, XTOsiz, YTOsiz,
+    # Csiz, and then Ssiz, XRsiz, YRsiz for each component.
+    xsiz, ysiz, _, _, xtsiz, ytsiz, xtosiz, ytosiz, csiz = (
+        struct.unpack_from(">IIIIIIIIH", siz, 2)
+    )
+    ssiz = siz[36::3][:csiz]
+
+    if xtsiz == 0 or ytsiz == 0:
+        msg = f"Invalid tile size of {ytsiz} x {xtsiz} in the SIZ segment."
+        raise InvalidJp2kError(msg)
+
+    if ihdr is None:
+        height, width, num_components = ysiz, xsiz, csiz
+    else:
+        height, width, num_components = ihdr
+    if num_components == 1:
+        shape = (height, width)
+    else:
+        shape = (height, width, num_components)
+
+    if len(set(ssiz)) == 1:
+        bitdepth, signed = (ssiz[0] & 0x7F) + 1, ssiz[0] & 0x80
+        if bitdepth <= 8:
+            dtype = np.int8 if signed else np.uint8
+        else:
+            dtype = np.int16 if signed else np.uint16
+    else:
+        dtype = None
+
+    # COD:  Scod, then SGcod (progression order, layers, MCT), then SPcod
+    # starting with the number of decomposition levels.
+    prog_order, layers, _, num_res = struct.unpack_from(">BHBB", cod, 1)
+
+    tile_grid = (
+        math.ceil((ysiz - ytosiz) / ytsiz),
+        math.ceil((xsiz - xtosiz) / xtsiz),
+    )
+
+    return ProbeResult(
+        codec=codec,
+        shape=shape,
+        dtype=dtype,
+        num_res=num_res,
+        tile_size=(ytsiz, xtsiz),
+        tile_grid=tile_grid,
+        progression=_PROGRESSION_ORDER_DISPLAY.get(prog_order, prog_order),
+        layers=layers,
+        colourspace=colourspace,
+    )
@@ -0,0 +1,331 @@
+"""OpenJPEG streams backed by python objects instead of filesystem paths.
+
+OpenJPEG's own file streams only accept a path.  The streams here supply the
+library with read/write, skip, and seek callbacks that operate on a seekable
+python file object instead, so that images can be decoded from bytes,
+memoryviews, mmaps, or any seekable file object (and encoded into writable
+ones such as io.BytesIO) without going through a temporary file.
+"""
+
+# Standard library imports
+import contextlib
+import ctypes
+import io
+import mmap
+import os
+import pathlib
+
+# Local imports
+from .lib import openjp2 as opj2
+
+
+class _MemoryFile(io.RawIOBase):
+    """Read-only file object over a buffer.
+
+    The buffer is never copied, reads are served directly from a memoryview
+    of it.
+    """
+
+    def __init__(self, buffer):
+        super().__init__()
+        self.source = buffer
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        b = memoryview(b).cast("B")
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == os.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence}).")
+
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}.")
+
+        self._pos = pos
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        # The view must be released or else the underlying object (e.g. an
+        # mmap) cannot be closed.
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+def is_path(source):
+    """Is the source a filesystem path rather than an in-memory object?"""
+    return isinstance(source, (str, os.PathLike))
+
+
+def as_file(source):
+    """Turn a source of JPEG 2000 data into a seekable file object.
+
+    Parameters
+    ----------
+    source : bytes, bytearray, memoryview, mmap, or file object
+        The JPEG 2000 data.  File objects must be binary and seekable.
+
+    Returns
+    -------
+    file object
+        Either the source itself or a read-only file object viewing the
+        source's memory.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        return _MemoryFile(source)
+
+    if hasattr(source, "read") and hasattr(source, "seek"):
+        if hasattr(source, "seekable") and not source.seekable():
+            msg = "JPEG 2000 data can only be read from seekable objects."
+            raise ValueError(msg)
+        return source
+
+    msg = (
+        f"Cannot read JPEG 2000 data from a {type(source).__name__} object.  "
+        f"Supply a path, a bytes-like object, or a seekable file object."
+    )
+    raise TypeError(msg)
+
+
+@contextlib.contextmanager
+def open_source(source):
+    """Open a source of JPEG 2000 data for reading.
+
+    Parameters
+    ----------
+    source : path, bytes, bytearray, memoryview, mmap, or file object
+        The JPEG 2000 data.
+
+    Yields
+    ------
+    file object
+        Seekable file object positioned at the start of the data.  File
+        objects supplied by the caller are not closed afterwards.
+    """
+    if is_path(source):
+        with open(source, "rb") as fptr:
+            yield fptr
+        return
+
+    fptr = as_file(source)
+    fptr.seek(0)
+    try:
+        yield fptr
+    finally:
+        if fptr is not source:
+            fptr.close()
+
+
+def as_output_file(target):
+    """Validate a file object as a target for writing JPEG 2000 data.
+
+    Parameters
+    ----------
+    target : file object
+        Must be binary, readable, writable, and seekable, e.g. io.BytesIO or
+        a file opened with mode "w+b".  Read access is needed because the
+        newly written data is parsed afterwards.
+
+    Returns
+    -------
+    file object
+        The target itself.
+    """
+    if not all(hasattr(target, attr) for attr in ("read", "write", "seek")):
+        msg = (
+            f"Cannot write JPEG 2000 data to a {type(target).__name__} "
+            f"object.  Supply a path or a writable file object such as "
+            f"io.BytesIO."
+        )
+        raise TypeError(msg)
+
+    for attr in ("readable", "writable", "seekable"):
+        if hasattr(target, attr) and not getattr(target, attr)():
+            msg = (
+                "JPEG 2000 data can only be written to file objects that are "
+                "readable, writable, and seekable."
+            )
+            raise ValueError(msg)
+
+    return target
+
+
+def source_size(source):
+    """Determine the size in bytes of a source of JPEG 2000 data."""
+    with open_source(source) as fptr:
+        return file_size(fptr)
+
+
+def file_size(fptr):
+    """Determine the size of a file object without disturbing its position."""
+    pos = fptr.tell()
+    size = fptr.seek(0, os.SEEK_END)
+    fptr.seek(pos)
+    return size
+
+
+def file_name(fptr):
+    """Path of a file object if it is backed by a named file, else None."""
+    name = getattr(fptr, "name", None)
+    if isinstance(name, str) and pathlib.Path(name).is_file():
+        return name
+    return None
+
+
+class InputStream(object):
+    """OpenJPEG input stream reading from a seekable file object.
+
+    The stream keeps track of its own position and seeks the file object
+    before every read, so other consumers of the same file object (e.g. the
+    box parser) cannot disturb it.  If the file object is shared between
+    threads, supply a lock to make each seek and read atomic.
+
+    Attributes
+    ----------
+    fptr : file object
+        The source of the data.
+    length : int
+        Length of the data in bytes.
+    stream : STREAM_TYPE_P
+        The OpenJPEG stream.  It is destroyed by the close method.
+    """
+
+    def __init__(
+        self, fptr, buffer_size=opj2.J2K_STREAM_CHUNK_SIZE, lock=None
+    ):
+        self.fptr = fptr
+        self._lock = contextlib.nullcontext() if lock is None else lock
+        with self._lock:
+            self.length = file_size(fptr)
+        self._pos = 0
+
+        # The callbacks must live as long as the OpenJPEG stream does.
+        self._read_fn = opj2.STREAM_READ_FN(self._read)
+        self._skip_fn = opj2.STREAM_SKIP_FN(self._skip)
+        self._seek_fn = opj2.STREAM_SEEK_FN(self._seek)
+
+        self.stream = opj2.stream_create(buffer_size, True)
+        opj2.stream_set_read_function(self.stream, self._read_fn)
+        opj2.stream_set_skip_function(self.stream, self._skip_fn)
+        opj2.stream_set_seek_function(self.stream, self._seek_fn)
+        opj2.stream_set_user_data_length(self.stream, self.length)
+
+    def close(self):
+        """Destroy the OpenJPEG stream."""
+        if self.stream is not None:
+            opj2.stream_destroy(self.stream)
+            self.stream = None
+
+    def _read(self, buffer, nbytes, _):
+        """Read callback, fill the library's buffer from the file object."""
+        try:
+            if self._pos >= self.length:
+                return opj2.STREAM_EOF
+            with self._lock:
+                self.fptr.seek(self._pos)
+                if hasattr(self.fptr, "readinto"):
+                    view = (ctypes.c_ubyte * nbytes).from_address(buffer)
+                    n = self.fptr.readinto(view)
+                else:
+                    data = self.fptr.read(nbytes)
+                    n = len(data)
+                    ctypes.memmove(buffer, data, n)
+        except Exception:
+            return opj2.STREAM_EOF
+
+        if not n:
+            return opj2.STREAM_EOF
+
+        self._pos += n
+        return n
+
+    def _skip(self, nbytes, _):
+        """Skip callback, move relative to the current position."""
+        if self._pos + nbytes < 0:
+            return -1
+        self._pos += nbytes
+        return nbytes
+
+    def _seek(self, offset, _):
+        """Seek callback, move to an absolute position."""
+        if offset < 0:
+            return opj2.FALSE
+        self._pos = offset
+        return opj2.TRUE
+
+
+class OutputStream(object):
+    """OpenJPEG output stream writing to a seekable file object.
+
+    Attributes
+    ----------
+    fptr : file object
+        The destination of the data.
+    stream : STREAM_TYPE_P
+        The OpenJPEG stream.  It is destroyed by the close method.
+    """
+
+    def __init__(self, fptr, buffer_size=opj2.J2K_STREAM_CHUNK_SIZE):
+        self.fptr = fptr
+
+        # The callbacks must live as long as the OpenJPEG stream does.
+        self._write_fn = opj2.STREAM_WRITE_FN(self._write)
+        self._skip_fn = opj2.STREAM_SKIP_FN(self._skip)
+        self._seek_fn = opj2.STREAM_SEEK_FN(self._seek)
+
+        self.stream = opj2.stream_create(buffer_size, False)
+        opj2.stream_set_write_function(self.stream, self._write_fn)
+        opj2.stream_set_skip_function(self.stream, self._skip_fn)
+        opj2.stream_set_seek_function(self.stream, self._seek_fn)
+
+    def close(self):
+        """Destroy the OpenJPEG stream."""
+        if self.stream is not None:
+            opj2.stream_destroy(self.stream)
+            self.stream = None
+
+    def _write(self, buffer, nbytes, _):
+        """Write callback, copy the library's buffer into the file object."""
+        try:
+            view = (ctypes.c_ubyte * nbytes).from_address(buffer)
+            n = self.fptr.write(view)
+        except Exception:
+            return opj2.STREAM_EOF
+
+        return nbytes if n is None else n
+
+    def _skip(self, nbytes, _):
+        """Skip callback, move relative to the current position."""
+        try:
+            self.fptr.seek(nbytes, os.SEEK_CUR)
+        except Exception:
+            return -1
+        return nbytes
+
+    def _seek(self, offset, _):
+        """Seek callback, move to an absolute position."""
+        try:
+            self.fptr.seek(offset)
+        except Exception:
+            return opj2.FALSE
+        return opj2.TRUE
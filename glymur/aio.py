@@ -0,0 +1,87 @@
+"""Run blocking glymur operations from asyncio coroutines.
+
+Decoding, encoding, and parsing JPEG 2000 files all block, so the coroutines
+Jp2kr.aread, Jp2k.awrite, and glymur.aopen hand them off to a thread pool
+shared by the whole library.  The size of the pool is the async.max_workers
+option; operations beyond that number are queued until a thread frees up.
+Coroutines run under different values of the option, e.g. within
+option_context, each share a pool of their own size.
+
+Cancelling a coroutine that is still queued removes its operation from the
+queue.  An operation that has already started cannot be interrupted, so it
+runs to completion in its thread and its result is discarded.
+"""
+
+# Standard library imports
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import threading
+
+# Local imports
+from .options import get_option
+
+
+_lock = threading.Lock()
+
+# The thread pools, keyed by the async.max_workers option.
+_executors = {}
+
+
+def get_executor():
+    """Return the thread pool used by the coroutines.
+
+    There is one pool for each value of the async.max_workers option, so
+    that the option is a limit on all the operations run under it, however
+    often the option changes.
+
+    Returns
+    -------
+    concurrent.futures.ThreadPoolExecutor
+    """
+    max_workers = get_option("async.max_workers")
+    with _lock:
+        executor = _executors.get(max_workers)
+        if executor is None:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="glymur-async"
+            )
+            _executors[max_workers] = executor
+        return executor
+
+
+def shutdown(wait=True):
+    """Shut down the thread pools used by the coroutines.
+
+    A new pool is started the next time one is needed.
+
+    Parameters
+    ----------
+    wait : bool, optional
+        If true, wait for the queued operations to finish.
+    """
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+async def run(func, *args, **kwargs):
+    """Call a blocking function in the thread pool and await its result.
+
+    The function sees the options of the caller, see option_context.
+
+    Parameters
+    ----------
+    func : callable
+        The function to call.
+    args, kwargs
+        Its arguments.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(context.run, func, *args, **kwargs)
+    )
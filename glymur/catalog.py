@@ -0,0 +1,480 @@
+"""Catalogue the header metadata of many JPEG 2000 files.
+
+Directories are walked for JPEG 2000 files, whose header metadata is
+extracted in a pool of worker processes and written to an SQLite database or
+a CSV file as it comes in, one row per file.  Only the box headers, the
+image header and colour specification boxes, the main header of the
+codestream, and the header of the first tile-part are read, so files are
+catalogued without decoding or fully parsing them.
+
+Rows are written in batches, so an interrupted run loses at most one batch.
+Running again with the same output resumes it:  files already catalogued
+with the same size and modification time are skipped, and files that have
+changed since are catalogued again.  This also makes incremental updates of
+a growing archive cheap, e.g.
+
+    jp2catalog --output archive.db /data/archive
+
+The same is available from python through the catalog function.
+"""
+
+# Standard library imports
+import collections
+import concurrent.futures
+import csv
+import itertools
+import os
+import pathlib
+import sqlite3
+import struct
+import threading
+import warnings
+from uuid import UUID
+
+# Local imports
+from .codestream import (
+    Codestream, _PROGRESSION_ORDER_DISPLAY, _WAVELET_XFORM_DISPLAY
+)
+from .jp2box import _EXIF_UUID, _GEOTIFF_UUID, _XMP_UUID
+from ._probe import _boxes, probe
+
+
+# File extensions of JPEG 2000 files.
+SUFFIXES = (".jp2", ".jpx", ".jpf", ".jph", ".j2k", ".j2c", ".jhc")
+
+# The columns of the catalogue, with their SQLite types.
+COLUMNS = collections.OrderedDict([
+    ("path", "TEXT PRIMARY KEY"),
+    ("size", "INTEGER"),
+    ("mtime_ns", "INTEGER"),
+    ("error", "TEXT"),
+    ("warnings", "TEXT"),
+    ("codec", "TEXT"),
+    ("boxes", "TEXT"),
+    ("height", "INTEGER"),
+    ("width", "INTEGER"),
+    ("num_components", "INTEGER"),
+    ("dtype", "TEXT"),
+    ("colourspace", "TEXT"),
+    ("rsiz", "INTEGER"),
+    ("bitdepth", "TEXT"),
+    ("signed", "TEXT"),
+    ("subsampling", "TEXT"),
+    ("tile_height", "INTEGER"),
+    ("tile_width", "INTEGER"),
+    ("tile_rows", "INTEGER"),
+    ("tile_cols", "INTEGER"),
+    ("num_tiles", "INTEGER"),
+    ("num_tile_parts", "INTEGER"),
+    ("num_res", "INTEGER"),
+    ("layers", "INTEGER"),
+    ("progression", "TEXT"),
+    ("code_block_size", "TEXT"),
+    ("xform", "TEXT"),
+    ("mct", "INTEGER"),
+    ("sop", "INTEGER"),
+    ("eph", "INTEGER"),
+    ("has_tlm", "INTEGER"),
+    ("has_plm", "INTEGER"),
+    ("has_ppm", "INTEGER"),
+    ("has_plt", "INTEGER"),
+    ("has_xmp", "INTEGER"),
+    ("has_exif", "INTEGER"),
+    ("has_geotiff", "INTEGER"),
+])
+
+CatalogSummary = collections.namedtuple(
+    "CatalogSummary", ["catalogued", "skipped", "failed"]
+)
+CatalogSummary.__doc__ = """Outcome of a catalog run.
+
+Attributes
+----------
+catalogued : int
+    Number of files whose metadata was written.
+skipped : int
+    Number of files skipped because they had not changed.
+failed : int
+    Number of catalogued files whose metadata could not be read.  Their rows
+    record the error.
+"""
+
+_SOT = 0xFF90
+_SOD = 0xFF93
+_PLT = 0xFF58
+
+# The warnings issued by the thread extracting the metadata of a file.
+_recorded = threading.local()
+
+
+def catalog(
+    paths, output, format=None, workers=None, force=False, batch_size=256
+):
+    """Catalogue the header metadata of JPEG 2000 files.
+
+    Parameters
+    ----------
+    paths : iterable of path
+        Files, or directories to walk for files with JPEG 2000 extensions.
+    output : path
+        The SQLite database or CSV file to write.  It is created if need be,
+        otherwise it is updated.
+    format : str, optional
+        Either 'sqlite' or 'csv'.  By default this follows from the
+        extension of the output, '.csv' meaning CSV and anything else
+        SQLite.
+    workers : int, optional
+        Number of worker processes, by default the number of CPUs.  With a
+        single worker, the files are read in this process.
+    force : bool, optional
+        If true, catalogue files even if they have not changed.
+    batch_size : int, optional
+        Number of rows written at a time.
+
+    Returns
+    -------
+    CatalogSummary
+
+    Examples
+    --------
+    >>> import tempfile, pathlib
+    >>> from glymur.catalog import catalog
+    >>> with tempfile.TemporaryDirectory() as d:
+    ...     db = pathlib.Path(d) / 'catalog.db'
+    ...     catalog([glymur.data.nemo()], db, workers=1)
+    CatalogSummary(catalogued=1, skipped=0, failed=0)
+    """
+    output = pathlib.Path(output)
+    if format is None:
+        format = "csv" if output.suffix.lower() == ".csv" else "sqlite"
+    if format == "csv":
+        writer = _CSVWriter(output)
+    elif format == "sqlite":
+        writer = _SQLiteWriter(output)
+    else:
+        raise ValueError(f"Invalid catalog format ({format}).")
+
+    catalogued = skipped = failed = 0
+    with writer, warnings.catch_warnings():
+        # The worker processes record warnings from the start.
+        _record_warnings()
+
+        known = {} if force else writer.known()
+
+        def pending():
+            nonlocal skipped
+            for path in iter_files(paths):
+                try:
+                    st = path.stat()
+                except OSError:
+                    # Let the error be recorded.
+                    yield path
+                    continue
+                if known.get(str(path)) == (st.st_size, st.st_mtime_ns):
+                    skipped += 1
+                else:
+                    yield path
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers == 1:
+            executor = None
+            extract_all = map
+        else:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                workers, initializer=_record_warnings
+            )
+            chunksize = max(1, batch_size // (4 * workers))
+
+            def extract_all(func, batch):
+                return executor.map(func, batch, chunksize=chunksize)
+
+        try:
+            todo = pending()
+            while batch := list(itertools.islice(todo, batch_size)):
+                rows = list(extract_all(extract, batch))
+                writer.write(rows)
+                catalogued += len(rows)
+                failed += sum(row["error"] is not None for row in rows)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    return CatalogSummary(catalogued, skipped, failed)
+
+
+def iter_files(paths):
+    """Iterate over JPEG 2000 files.
+
+    Parameters
+    ----------
+    paths : iterable of path
+        Files, which are passed through whatever their extension, or
+        directories, which are walked in sorted order for files with JPEG
+        2000 extensions.
+
+    Yields
+    ------
+    pathlib.Path
+    """
+    for path in paths:
+        path = pathlib.Path(path)
+        if not path.is_dir():
+            yield path
+            continue
+
+        for root, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if os.path.splitext(filename)[1].lower() in SUFFIXES:
+                    yield pathlib.Path(root) / filename
+
+
+def extract(path):
+    """Extract the header metadata of a JPEG 2000 file.
+
+    Parameters
+    ----------
+    path : path
+        The file.
+
+    Returns
+    -------
+    dict
+        The row of the catalogue, keyed by the names in COLUMNS.  Boolean
+        values are stored as integers, lists of values (e.g. bitdepth) as
+        comma-separated text.  If the metadata could not be read, the error
+        column says why and the metadata columns are None.  Warnings are
+        recorded in the warnings column when run by catalog, and are
+        otherwise issued as usual.
+    """
+    path = pathlib.Path(path)
+    row = dict.fromkeys(COLUMNS)
+    row["path"] = str(path)
+
+    _recorded.messages = messages = []
+    try:
+        st = path.stat()
+        row["size"], row["mtime_ns"] = st.st_size, st.st_mtime_ns
+        with open(path, "rb") as fptr:
+            row.update(_extract(fptr))
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        _recorded.messages = None
+
+    if len(messages) > 0:
+        row["warnings"] = "\n".join(str(message) for message in messages)
+
+    return row
+
+
+def _record_warnings():
+    """Record warnings issued by extract in the row of the file instead of
+    showing them.
+
+    This changes the warnings filters of the whole process, so it is done
+    just once in each worker process, and by catalog within
+    catch_warnings, never by extract itself.
+    """
+    warnings.simplefilter("always")
+    showwarning = warnings.showwarning
+
+    def record(message, category, filename, lineno, file=None, line=None):
+        messages = getattr(_recorded, "messages", None)
+        if messages is None:
+            showwarning(message, category, filename, lineno, file, line)
+        else:
+            messages.append(message)
+
+    warnings.showwarning = record
+
+
+def _extract(fptr):
+    """Extract the metadata columns from an open file."""
+    info = probe(fptr)
+    row = {
+        "codec": info.codec,
+        "height": info.shape[0],
+        "width": info.shape[1],
+        "num_components": 1 if len(info.shape) == 2 else info.shape[2],
+        "dtype": None if info.dtype is None else info.dtype.__name__,
+        "colourspace": info.colourspace,
+        "has_xmp": 0,
+        "has_exif": 0,
+        "has_geotiff": 0,
+    }
+
+    if info.codec == "j2k":
+        row["boxes"] = ""
+        offset, length = 0, fptr.seek(0, os.SEEK_END)
+    else:
+        box_ids = []
+        offset = None
+        for box_id, start, end in _boxes(fptr, 0, None):
+            box_ids.append(box_id.decode("latin-1"))
+            if box_id == b"jp2c" and offset is None:
+                offset, length = start, end - start
+            elif box_id == b"uuid":
+                fptr.seek(start)
+                the_uuid = UUID(bytes=fptr.read(16))
+                row["has_xmp"] |= the_uuid == _XMP_UUID
+                row["has_exif"] |= the_uuid == _EXIF_UUID
+                row["has_geotiff"] |= the_uuid == _GEOTIFF_UUID
+        row["boxes"] = ",".join(box_ids)
+
+    fptr.seek(offset)
+    codestream = Codestream(fptr, length, header_only=True)
+    markers = {segment.marker_id for segment in codestream.segment}
+
+    siz = codestream.segment[1]
+    cod = next(seg for seg in codestream.segment if seg.marker_id == "COD")
+
+    tile_rows = -(-(siz.ysiz - siz.ytosiz) // siz.ytsiz)
+    tile_cols = -(-(siz.xsiz - siz.xtosiz) // siz.xtsiz)
+    tile_index = codestream.tile_index
+
+    plt = codestream._sot_offset is not None and _PLT in _tile_part_markers(
+        fptr, codestream._sot_offset
+    )
+
+    row.update({
+        "rsiz": siz.rsiz,
+        "bitdepth": ",".join(str(x) for x in siz.bitdepth),
+        "signed": ",".join(str(int(x)) for x in siz.signed),
+        "subsampling": ",".join(
+            f"{y}x{x}" for y, x in zip(siz.yrsiz, siz.xrsiz)
+        ),
+        "tile_height": siz.ytsiz,
+        "tile_width": siz.xtsiz,
+        "tile_rows": tile_rows,
+        "tile_cols": tile_cols,
+        "num_tiles": tile_rows * tile_cols,
+        "num_tile_parts": None if tile_index is None else len(tile_index),
+        "num_res": cod.num_res,
+        "layers": cod.layers,
+        "progression": _PROGRESSION_ORDER_DISPLAY.get(
+            cod.prog_order, str(cod.prog_order)
+        ),
+        "code_block_size": "{}x{}".format(*cod.code_block_size),
+        "xform": _WAVELET_XFORM_DISPLAY.get(cod.xform, str(cod.xform)),
+        "mct": cod.mct,
+        "sop": int((cod.scod & 2) > 0),
+        "eph": int((cod.scod & 4) > 0),
+        "has_tlm": int("TLM" in markers),
+        "has_plm": int("PLM" in markers),
+        "has_ppm": int("PPM" in markers),
+        "has_plt": int(plt),
+    })
+    for key in ("has_xmp", "has_exif", "has_geotiff"):
+        row[key] = int(row[key])
+
+    return row
+
+
+def _tile_part_markers(fptr, offset):
+    """Markers in the header of the tile-part starting at the offset."""
+    markers = set()
+
+    fptr.seek(offset)
+    read_buffer = fptr.read(4)
+    if len(read_buffer) < 4:
+        return markers
+    marker, length = struct.unpack(">HH", read_buffer)
+    if marker != _SOT:
+        return markers
+
+    pos = offset + 2 + length
+    while True:
+        fptr.seek(pos)
+        read_buffer = fptr.read(4)
+        if len(read_buffer) < 4:
+            break
+        marker, length = struct.unpack(">HH", read_buffer)
+        if marker == _SOD or marker < 0xFF00:
+            break
+        markers.add(marker)
+        pos += 2 + length
+
+    return markers
+
+
+class _SQLiteWriter(object):
+    """Writes the catalogue to the files table of an SQLite database."""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+
+    def __enter__(self):
+        self._conn = sqlite3.connect(self.path)
+        columns = ", ".join(f"{k} {v}" for k, v in COLUMNS.items())
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS files ({columns})")
+        self._conn.commit()
+        return self
+
+    def __exit__(self, *exc):
+        self._conn.close()
+
+    def known(self):
+        """Size and modification time of each catalogued file."""
+        cursor = self._conn.execute("SELECT path, size, mtime_ns FROM files")
+        return {path: (size, mtime) for path, size, mtime in cursor}
+
+    def write(self, rows):
+        columns = ", ".join(COLUMNS)
+        placeholders = ", ".join("?" * len(COLUMNS))
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO files ({columns}) "
+            f"VALUES ({placeholders})",
+            [tuple(row[k] for k in COLUMNS) for row in rows],
+        )
+        self._conn.commit()
+
+
+class _CSVWriter(object):
+    """Appends the catalogue to a CSV file.
+
+    Files catalogued again because they changed get a new row, and the last
+    row for a path is the current one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._writer = None
+        self._known = {}
+
+    def __enter__(self):
+        if self.path.exists() and self.path.stat().st_size > 0:
+            with open(self.path, newline="") as f:
+                reader = csv.DictReader(f)
+                if reader.fieldnames != list(COLUMNS):
+                    msg = (
+                        f"{self.path} is not a catalog, or was written by a "
+                        f"different version of glymur."
+                    )
+                    raise ValueError(msg)
+                for row in reader:
+                    self._known[row["path"]] = (
+                        int(row["size"] or -1), int(row["mtime_ns"] or -1)
+                    )
+            self._file = open(self.path, "a", newline="")
+            self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+        else:
+            self._file = open(self.path, "w", newline="")
+            self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+            self._writer.writeheader()
+        return self
+
+    def __exit__(self, *exc):
+        self._file.close()
+
+    def known(self):
+        """Size and modification time of each catalogued file."""
+        return dict(self._known)
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
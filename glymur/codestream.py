@@ -5,9 +5,17 @@ codestreams.
 """
 
 # standard library imports
+import array
+import collections.abc
+import contextlib
+import itertools
+import mmap
+import os
 import struct
 import sys
+import threading
 import warnings
+import weakref
 
 # 3rd party library imports
 import numpy as np
@@ -22,6 +30,7 @@ from .core import (
     WAVELET_XFORM_9X7_IRREVERSIBLE,
     WAVELET_XFORM_5X3_REVERSIBLE,
 )
+from . import _stream
 from .lib import openjp2 as opj2
 
 
@@ -132,12 +141,15 @@ class Codestream(object):
 
     Attributes
     ----------
-    segment : iterable
-        list of marker segments
+    segment : sequence
+        The marker segments.  Past the main header of a fully parsed
+        codestream, a Segment object is only made when it is accessed.
     offset : int
         Offset of the codestream from start of the file in bytes.
     length : int
         Length of the codestream in bytes.
+    tile_index : ndarray or None
+        Where each tile-part is in the file, see the property.
 
     References
     ----------
@@ -152,7 +164,7 @@ class Codestream(object):
     _csiz = -1  # Number of components in the image.
     _parse_tpart_flag = False  # Do we parse the bit stream for SOP / EPH?
 
-    def __init__(self, fptr, length, header_only=True):
+    def __init__(self, fptr, length, header_only=True, lazy=True):
         """
         Parameters
         ----------
@@ -162,7 +174,11 @@ class Codestream(object):
             Length of the codestream in bytes.
         header_only : bool, optional
             If True, only marker segments in the main header are parsed.
-            Supplying False may impose a large performance penalty.
+        lazy : bool, optional
+            If True, the tile-parts of a fully parsed codestream are only
+            scanned for the positions of their marker segments, see
+            _scan_tile_parts.  Otherwise every marker segment is parsed
+            right away, which is much slower for large tiled images.
         """
         # Map each of the known markers to a method that processes them.
         # Consult table A-1 in ISO/IEC FCD15444-1 for the definitive list.
@@ -235,9 +251,14 @@ class Codestream(object):
         self.offset = fptr.tell()
         self.length = length
         self.header_only = header_only
+        self.lazy = lazy
 
         self.segment = []
 
+        # Offset of the first SOT marker, where the tile-parts begin.
+        self._sot_offset = None
+        self._tile_index = None
+
         self._parse(fptr)
 
     def _parse(self, fptr):
@@ -277,9 +298,15 @@ class Codestream(object):
 
             self._offset = fptr.tell() - 2
 
-            if self._marker_id == 0xFF90 and self.header_only:
-                # Start-of-tile (SOT) means that we are out of the main header
-                # and there is no need to go further.
+            if self._marker_id == 0xFF90 and self._sot_offset is None:
+                self._sot_offset = self._offset
+
+            if self._marker_id == 0xFF90 and (self.header_only or self.lazy):
+                # Start-of-tile (SOT) means that we are out of the main header.
+                # Either there is no need to go further, or the tile-parts
+                # are scanned rather than parsed.
+                if not self.header_only:
+                    self._scan_tile_parts(fptr)
                 break
 
             try:
@@ -289,6 +316,14 @@ class Codestream(object):
 
             self.segment.append(segment)
 
+            if self._marker_id == 0xFF90:
+                # Need to keep easy access to tile offsets and lengths for
+                # when we encounter start-of-data marker segments.
+                self._tile_offset.append(segment.offset)
+                self._tile_length.append(
+                    self._tile_part_length(segment.offset, segment.psot)
+                )
+
             if self._marker_id == 0xFFD9:
                 # end of codestream, should break.
                 break
@@ -364,6 +399,287 @@ class Codestream(object):
             except IndexError:
                 continue
 
+    def _scan_tile_parts(self, fptr):
+        """Scan the tile-parts, beginning with the SOT marker just read.
+
+        The codestream is memory-mapped where possible and walked by jumping
+        from one SOT marker to the next with the help of Psot.  Only the
+        marker, offset, and length of each marker segment are recorded, along
+        with a copy of the segments in the tile-part headers.  They become
+        Segment objects when accessed, see _SegmentList.
+        """
+        # Some tile-part segments cannot be parsed without the number of
+        # components, which the next codestream to be parsed would change,
+        # so keep it with this codestream, see _make_segment.
+        self._csiz = self._csiz
+        parse_sop_eph = self._parse_tpart_flag
+
+        markers, offsets, lengths, starts = (
+            array.array(typecode) for typecode in "HQIQ"
+        )
+        data = bytearray()
+
+        with _map_codestream(fptr, self.offset, self.length) as (buf, base):
+            end = min(self.offset + self.length, base + len(buf))
+            pos = self._offset
+            tile_end = None
+
+            while True:
+
+                if pos + 2 > end:
+                    msg = (
+                        f"Unable to read an expected marker in the codestream "
+                        f"at byte offset {pos}."
+                    )
+                    raise J2KParseError(msg)
+
+                (marker,) = struct.unpack_from(">H", buf, pos - base)
+                if marker < 0xFF00:
+                    msg = (
+                        f"Invalid codestream marker at byte offset {pos}.  It "
+                        f"must be must be greater than 0xff00, but "
+                        f"found 0x{marker:04x} instead.  Codestream "
+                        f"parsing will cease."
+                    )
+                    raise ValueError(msg)
+
+                if marker in (0xFF93, 0xFFD9) or 0xFF30 <= marker <= 0xFF3F:
+                    # No segment follows these markers.
+                    length = 0
+                    nbytes = 2
+                else:
+                    (length,) = struct.unpack_from(">H", buf, pos + 2 - base)
+                    nbytes = 2 + max(length, 2)
+                    if pos + nbytes > end:
+                        msg = (
+                            f"The marker segment at byte offset {pos} extends "
+                            f"past the end of the codestream."
+                        )
+                        raise J2KParseError(msg)
+
+                markers.append(marker)
+                offsets.append(pos)
+                lengths.append(length)
+                starts.append(len(data))
+                data += buf[pos - base:pos - base + nbytes]
+
+                if marker == 0xFFD9:
+                    break
+
+                if marker == 0xFF90:
+                    (psot,) = struct.unpack_from(">I", buf, pos + 6 - base)
+                    tile_end = pos + self._tile_part_length(pos, psot)
+                    pos += nbytes
+                    continue
+
+                if marker != 0xFF93:
+                    pos += nbytes
+                    continue
+
+                # Skip past the tile-part bit stream, but first find any SOP
+                # and EPH segments in it.
+                if tile_end is None or tile_end <= pos:
+                    msg = (
+                        f"The SOD marker at byte offset {pos} does not belong "
+                        f"to a valid tile-part."
+                    )
+                    raise J2KParseError(msg)
+
+                if parse_sop_eph:
+                    idx, sop, segments = _find_sop_eph(
+                        buf, pos + 2 - base, min(tile_end, end) - base
+                    )
+                    sizes = np.where(sop, 6, 2)
+                    markers.frombytes(
+                        np.where(sop, 0xFF91, 0xFF92).astype(np.uint16)
+                    )
+                    offsets.frombytes((idx + pos + 2).astype(np.uint64))
+                    lengths.frombytes(np.where(sop, 4, 0).astype(np.uint32))
+                    starts.frombytes(
+                        (len(data) + np.cumsum(sizes) - sizes).astype(
+                            np.uint64
+                        )
+                    )
+                    data += segments
+
+                pos, tile_end = tile_end, None
+
+        table = np.empty(len(markers), dtype=_SEGMENT_DTYPE)
+        table["marker"] = markers
+        table["offset"] = offsets
+        table["length"] = lengths
+        table["start"] = starts
+
+        self.segment = _SegmentList(self, self.segment, table, bytes(data))
+
+    @property
+    def tile_index(self):
+        """Where each tile-part of the codestream is in the file.
+
+        The index is built from the TLM segments of the main header if there
+        are any.  Otherwise it is built from the SOT segments of a fully
+        parsed codestream.  The tile-parts of a codestream parsed for its main
+        header only must be scanned first, see Jp2kr.tile_index.
+
+        Returns
+        -------
+        ndarray or None
+            Structured array with a row for each tile-part, in codestream
+            order, or None if the tile-parts have not been scanned.  The
+            fields are
+
+                tile : index of the tile
+                tile_part : index of the tile-part within the tile
+                offset : offset of the SOT marker from the start of the file
+                length : length of the tile-part in bytes
+                num_tile_parts : number of tile-parts of the tile
+        """
+        if self._tile_index is None:
+            self._tile_index = self._tile_index_from_tlm()
+        if self._tile_index is None and not self.header_only:
+            if isinstance(self.segment, _SegmentList):
+                records = self.segment._sot_records()
+            else:
+                records = [
+                    (seg.offset, seg.isot, seg.psot, seg.tpsot, seg.tnsot)
+                    for seg in self.segment
+                    if seg.marker_id == "SOT"
+                ]
+            self._tile_index = self._tile_index_from_sot(records)
+        return self._tile_index
+
+    def _tile_index_from_tlm(self):
+        """Build the tile-part index from the TLM segments.
+
+        Returns
+        -------
+        ndarray or None
+            None if there are no TLM segments, or if they do not fit the
+            codestream.
+        """
+        main_header = itertools.takewhile(
+            lambda seg: seg.marker_id != "SOT", self.segment
+        )
+        tlms = [seg for seg in main_header if seg.marker_id == "TLM"]
+        if len(tlms) == 0 or self._sot_offset is None:
+            return None
+        tlms.sort(key=lambda seg: seg.ztlm)
+
+        lengths = np.concatenate([seg.ptlm for seg in tlms]).astype(np.int64)
+
+        # Without Ttlm, there is one tile-part per tile, in order.
+        implicit = [seg.ttlm.ndim == 0 for seg in tlms]
+        if all(implicit):
+            tiles = np.arange(lengths.size)
+        elif any(implicit):
+            return None
+        else:
+            tiles = np.concatenate([seg.ttlm for seg in tlms])
+
+        end = self.offset + self.length
+        if np.any(lengths <= 0) or self._sot_offset + lengths.sum() > end:
+            return None
+
+        offsets = self._sot_offset + np.cumsum(lengths) - lengths
+        return _make_tile_index(tiles, offsets, lengths)
+
+    def _tile_index_from_sot(self, records):
+        """Build the tile-part index from SOT segment parameters.
+
+        Parameters
+        ----------
+        records : list
+            Offset, Isot, Psot, TPsot, and TNsot of each SOT segment.
+        """
+        records = np.array(records, dtype=np.int64).reshape(-1, 5)
+        offsets, tiles, psot, tpsot, tnsot = records.T
+
+        # A Psot of zero means that the tile-part lasts until the EOC.
+        eoc = self.offset + self.length - 2
+        lengths = np.where(psot == 0, eoc - offsets, psot)
+
+        return _make_tile_index(tiles, offsets, lengths, tpsot, tnsot)
+
+    def _scan_tile_index(self, fptr):
+        """Build the tile-part index by jumping from one SOT marker to the
+        next, reading nothing but the SOT segments.
+
+        The scan stops at the first marker that is not an SOT marker, which
+        is usually the EOC marker, or else at the end of the file.
+
+        Parameters
+        ----------
+        fptr : file
+            Open file object.
+
+        Returns
+        -------
+        ndarray
+            The tile-part index.
+        """
+        records = []
+        pos = self._sot_offset
+        end = self.offset + self.length
+
+        while pos is not None and pos + 12 <= end:
+            fptr.seek(pos)
+            read_buffer = fptr.read(12)
+            if len(read_buffer) < 12:
+                break
+            marker, _, isot, psot, tpsot, tnsot = struct.unpack(
+                ">HHHIBB", read_buffer
+            )
+            if marker != 0xFF90:
+                break
+
+            records.append((pos, isot, psot, tpsot, tnsot))
+            if psot == 0:
+                break
+            pos += psot
+
+        self._tile_index = self._tile_index_from_sot(records)
+        return self._tile_index
+
+    def _make_segment(self, marker, offset, buffer):
+        """Parse a marker segment recorded by _scan_tile_parts.
+
+        Parameters
+        ----------
+        marker : int
+            The marker.
+        offset : int
+            Offset of the marker in bytes from the beginning of the file.
+        buffer : bytes
+            The marker and its segment.
+
+        Returns
+        -------
+        Segment
+        """
+        if marker == 0xFF91:
+            (nsop,) = struct.unpack_from(">H", buffer, 4)
+            return SOPsegment(nsop, 4, offset)
+        elif marker == 0xFF92:
+            return EPHsegment(0, offset)
+
+        fptr = _SegmentFile(buffer, offset)
+        fptr.seek(offset + 2)
+        self._marker_id = marker
+        self._offset = offset
+
+        if marker in (0xFF5D, 0xFF5E):
+            # The QCC and RGN parsers are class methods, so they must be
+            # told the number of components of this codestream rather than
+            # that of the codestream most recently parsed.
+            return self.parse_marker_segment_fcn[marker](
+                fptr, csiz=self._csiz
+            )
+
+        try:
+            return self.parse_marker_segment_fcn[marker](fptr)
+        except KeyError:
+            return self._parse_reserved_segment(fptr)
+
     def __str__(self):
         msg = "Codestream:\n"
         for segment in self.segment:
@@ -551,20 +867,7 @@ class Codestream(object):
 
         numbytes = length - 3
         read_buffer = fptr.read(numbytes)
-        iplt = np.frombuffer(read_buffer, dtype=np.uint8)
-
-        packet_len = []
-        plen = 0
-        for byte in iplt:
-            plen |= byte & 0x7F
-            if byte & 0x80:
-                # Continue by or-ing in the next byte.
-                plen <<= 7
-            else:
-                packet_len.append(plen)
-                plen = 0
-
-        iplt = packet_len
+        iplt = _parse_packet_lengths(read_buffer)
 
         return PLTsegment(zplt, iplt, length, offset)
 
@@ -647,32 +950,38 @@ class Codestream(object):
         return PPTsegment(zppt, ippt, length, offset)
 
     @classmethod
-    def _parse_qcc_segment(cls, fptr):
+    def _parse_qcc_segment(cls, fptr, csiz=None):
         """Parse the QCC segment.
 
         Parameters
         ----------
         fptr : file object
             The file to parse.
+        csiz : int, optional
+            Number of components in the image, by default that of the
+            codestream most recently parsed.
 
         Returns
         -------
         QCCSegment
             The current QCC segment.
         """
+        if csiz is None:
+            csiz = cls._csiz
+
         offset = fptr.tell() - 2
 
         read_buffer = fptr.read(2)
         (length,) = struct.unpack(">H", read_buffer)
 
         read_buffer = fptr.read(length - 2)
-        fmt = ">HB" if cls._csiz > 256 else ">BB"
-        mantissa_exponent_offset = 3 if cls._csiz > 256 else 2
+        fmt = ">HB" if csiz > 256 else ">BB"
+        mantissa_exponent_offset = 3 if csiz > 256 else 2
         cqcc, sqcc = struct.unpack_from(fmt, read_buffer)
-        if cqcc >= cls._csiz:
+        if cqcc >= csiz:
             msg = (
                 "Invalid QCC component number ({cqcc}), "
-                "the actual number of components is only {cls._csiz}."
+                "the actual number of components is only {csiz}."
             )
             warnings.warn(msg, UserWarning)
 
@@ -702,26 +1011,32 @@ class Codestream(object):
         return QCDsegment(sqcd, spqcd, length, offset)
 
     @classmethod
-    def _parse_rgn_segment(cls, fptr):
+    def _parse_rgn_segment(cls, fptr, csiz=None):
         """Parse the RGN segment.
 
         Parameters
         ----------
         fptr : file
             Open file object.
+        csiz : int, optional
+            Number of components in the image, by default that of the
+            codestream most recently parsed.
 
         Returns
         -------
         RGNSegment
             The current RGN segment.
         """
+        if csiz is None:
+            csiz = cls._csiz
+
         offset = fptr.tell() - 2
 
         read_buffer = fptr.read(2)
         (length,) = struct.unpack(">H", read_buffer)
 
-        nbytes = 3 if cls._csiz < 257 else 4
-        fmt = ">BBB" if cls._csiz < 257 else ">HBB"
+        nbytes = 3 if csiz < 257 else 4
+        fmt = ">BBB" if csiz < 257 else ">HBB"
         read_buffer = fptr.read(nbytes)
         data = struct.unpack(fmt, read_buffer)
 
@@ -897,19 +1212,14 @@ class Codestream(object):
         tpsot = data[3]
         tnsot = data[4]
 
-        segment = SOTsegment(isot, psot, tpsot, tnsot, length, offset)
+        return SOTsegment(isot, psot, tpsot, tnsot, length, offset)
 
-        # Need to keep easy access to tile offsets and lengths for when
-        # we encounter start-of-data marker segments.
-
-        self._tile_offset.append(segment.offset)
-        if segment.psot == 0:
-            tile_part_length = self.offset + self.length - segment.offset - 2
-        else:
-            tile_part_length = segment.psot
-        self._tile_length.append(tile_part_length)
-
-        return segment
+    def _tile_part_length(self, offset, psot):
+        """Length of a tile-part, given the offset and Psot of its SOT."""
+        if psot == 0:
+            # The tile-part lasts until the EOC marker.
+            return self.offset + self.length - offset - 2
+        return psot
 
     def _parse_tlm_segment(self, fptr):
         """Parse the TLM segment.
@@ -1444,8 +1754,8 @@ class PLTsegment(Segment):
         two bytes constituting the marker.
     zplt : int
         Index of this segment relative to other PLT segments.
-    iplt : list
-        Packet lengths.
+    iplt : ndarray
+        Packet lengths, as unsigned integers.
 
     References
     ----------
@@ -1457,13 +1767,16 @@ class PLTsegment(Segment):
     def __init__(self, zplt, iplt, length, offset):
         super().__init__(marker_id="PLT")
         self.zplt = zplt
-        self.iplt = iplt
+        self.iplt = _compact(np.asarray(iplt, dtype=np.uint64))
         self.length = length
         self.offset = offset
 
     def __str__(self):
         msg = Segment.__str__(self)
-        msg += f"\n    Index:  {self.zplt}" f"\n    Iplt:  {self.iplt}"
+        msg += (
+            f"\n    Index:  {self.zplt}"
+            f"\n    Iplt:  {self.iplt.tolist()}"
+        )
 
         return msg
 
@@ -2045,6 +2358,288 @@ class TLMsegment(Segment):
         return msg
 
 
+# How the segments of the tile-parts are recorded by a lazy parse.  The
+# start is the position of the segment's bytes in the copy kept of them.
+_SEGMENT_DTYPE = np.dtype(
+    [
+        ("marker", np.uint16),
+        ("offset", np.uint64),
+        ("length", np.uint32),
+        ("start", np.uint64),
+    ]
+)
+
+
+class _SegmentList(collections.abc.Sequence):
+    """The marker segments of a lazily parsed codestream.
+
+    The main header segments are Segment objects from the outset, the others
+    are rows of a structured array until accessed.  The same Segment object
+    is returned for as long as a reference to it is kept.
+    """
+
+    def __init__(self, codestream, header, table, data):
+        """
+        Parameters
+        ----------
+        codestream : Codestream
+            Parses the segments.
+        header : list
+            Segments of the main header.
+        table : ndarray
+            Structured array of the remaining segments, see _SEGMENT_DTYPE.
+        data : bytes
+            The remaining segments, including their markers.
+        """
+        self._codestream = codestream
+        self._header = header
+        self._table = table
+        self._data = data
+        self._cache = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_cache"], state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._header) + len(self._table)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[idx] for idx in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+
+        if index < len(self._header):
+            return self._header[index]
+
+        with self._lock:
+            segment = self._cache.get(index)
+            if segment is None:
+                row = index - len(self._header)
+                start = int(self._table["start"][row])
+                if row + 1 < len(self._table):
+                    stop = int(self._table["start"][row + 1])
+                else:
+                    stop = len(self._data)
+                segment = self._codestream._make_segment(
+                    int(self._table["marker"][row]),
+                    int(self._table["offset"][row]),
+                    self._data[start:stop],
+                )
+                self._cache[index] = segment
+            return segment
+
+    def _sot_records(self):
+        """Offset, Isot, Psot, TPsot, and TNsot of each SOT segment."""
+        rows = self._table[self._table["marker"] == 0xFF90]
+        return [
+            (int(offset),)
+            + struct.unpack_from(">HIBB", self._data, int(start) + 4)
+            for offset, start in zip(rows["offset"], rows["start"])
+        ]
+
+
+class _SegmentFile(_stream._MemoryFile):
+    """Read-only file object over the bytes of a single marker segment.
+
+    Positions are those of the segment within the original file.
+    """
+
+    def __init__(self, buffer, offset):
+        super().__init__(buffer)
+        self._base = offset
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_SET:
+            offset -= self._base
+        return super().seek(offset, whence) + self._base
+
+    def tell(self):
+        return super().tell() + self._base
+
+
+@contextlib.contextmanager
+def _map_codestream(fptr, offset, length):
+    """Make a codestream available as a buffer without reading it, if
+    possible.
+
+    Files are memory-mapped, and in-memory sources are used as they are.
+    Other file objects are read into memory.
+
+    Parameters
+    ----------
+    fptr : file
+        Open file object.
+    offset, length : int
+        Where the codestream is in the file.
+
+    Yields
+    ------
+    buffer, int
+        The buffer, and the offset in the file of its first byte.
+    """
+    if isinstance(fptr, _stream._MemoryFile):
+        view = memoryview(fptr.source).cast("B")
+        try:
+            yield view, 0
+        finally:
+            view.release()
+        return
+
+    try:
+        mapped = mmap.mmap(fptr.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        # In-memory file objects have no file descriptor, and empty files
+        # cannot be mapped.
+        fptr.seek(offset)
+        yield fptr.read(length), offset
+        return
+
+    with mapped:
+        yield mapped, 0
+
+
+def _find_sop_eph(buffer, start, stop):
+    """Find the SOP and EPH markers in a tile-part bit stream.
+
+    Parameters
+    ----------
+    buffer : buffer
+        The codestream.
+    start, stop : int
+        Where the bit stream is in the buffer.
+
+    Returns
+    -------
+    tuple
+        Offsets of the markers relative to the start of the bit stream,
+        whether each is an SOP marker rather than an EPH marker, and the
+        bytes of all of the marker segments.
+    """
+    packet = np.frombuffer(
+        buffer, dtype=np.uint8, count=max(stop - start, 0), offset=start
+    )
+
+    idx = np.flatnonzero(packet[:-1] == 0xFF)
+    following = packet[idx + 1]
+    sop = (following == 0x91) & (idx < packet.size - 5)
+    keep = sop | (following == 0x92)
+    idx, sop = idx[keep], sop[keep]
+
+    # An SOP marker segment is six bytes long, an EPH marker two.
+    sizes = np.where(sop, 6, 2)
+    first = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    within = np.arange(sizes.sum()) - first
+    segments = packet[np.repeat(idx, sizes) + within].tobytes()
+
+    return idx, sop, segments
+
+
+_TILE_INDEX_DTYPE = np.dtype(
+    [
+        ("tile", np.uint16),
+        ("tile_part", np.uint16),
+        ("offset", np.uint64),
+        ("length", np.uint64),
+        ("num_tile_parts", np.uint16),
+    ]
+)
+
+
+def _make_tile_index(
+    tiles, offsets, lengths, tile_parts=None, num_tile_parts=None
+):
+    """Make the structured array of the tile-part index.
+
+    Parameters
+    ----------
+    tiles, offsets, lengths : array-like
+        Tile index, offset, and length of each tile-part.
+    tile_parts, num_tile_parts : array-like, optional
+        Tile-part index and number of tile-parts, as given by TPsot and
+        TNsot.  Unless given, or where TNsot is zero, they are counted.
+    """
+    tiles = np.asarray(tiles, dtype=np.intp)
+
+    # Count the tile-parts of each tile in the order they appear.
+    order = np.argsort(tiles, kind="stable")
+    first = np.searchsorted(tiles[order], tiles[order])
+    counted = np.empty_like(tiles)
+    counted[order] = np.arange(tiles.size) - first
+    counts = np.bincount(tiles)[tiles]
+
+    if tile_parts is None:
+        tile_parts = counted
+    if num_tile_parts is None:
+        num_tile_parts = counts
+    else:
+        num_tile_parts = np.asarray(num_tile_parts)
+        num_tile_parts = np.where(num_tile_parts == 0, counts, num_tile_parts)
+
+    index = np.empty(tiles.size, dtype=_TILE_INDEX_DTYPE)
+    index["tile"] = tiles
+    index["tile_part"] = tile_parts
+    index["offset"] = offsets
+    index["length"] = lengths
+    index["num_tile_parts"] = num_tile_parts
+    return index
+
+
+def _parse_packet_lengths(read_buffer):
+    """Decode the packet lengths of a PLT segment.
+
+    Each length is stored in 7-bit groups, most significant first, with the
+    high bit set on every byte but the last.  Any trailing bytes that do not
+    complete a length are ignored.
+
+    Parameters
+    ----------
+    read_buffer : bytes
+        The Iplt parameters.
+
+    Returns
+    -------
+    ndarray
+        The packet lengths.
+    """
+    data = np.frombuffer(read_buffer, dtype=np.uint8)
+
+    # The last byte of each length.
+    ends = np.flatnonzero(data < 0x80)
+    if ends.size == 0:
+        return np.zeros(0, dtype=np.uint32)
+    data = data[:ends[-1] + 1]
+
+    starts = np.zeros_like(ends)
+    starts[1:] = ends[:-1] + 1
+
+    # Shift each group into place.  The groups do not overlap, so adding
+    # them up is the same as or-ing them together.
+    nbytes = ends - starts + 1
+    shift = 7 * (np.repeat(ends, nbytes) - np.arange(data.size))
+    groups = (data & 0x7F).astype(np.uint64) << shift.astype(np.uint64)
+
+    return _compact(np.add.reduceat(groups, starts))
+
+
+def _compact(lengths):
+    """Store packet lengths in 32 bits unless they need more."""
+    if lengths.size == 0 or lengths.max() <= np.iinfo(np.uint32).max:
+        return lengths.astype(np.uint32)
+    return lengths
+
+
 def _parse_precinct_size(spcod):
     """Compute precinct size from SPcod or SPcoc."""
     spcod = np.frombuffer(spcod, dtype=np.uint8)
@@ -7,7 +7,8 @@ import warnings
 
 # Local imports ...
 from . import Jp2k, set_option, lib
-from . import tiff, jpeg
+from . import catalog, tiff, jpeg
+from .tileserver import TileServer
 
 
 def main():
@@ -359,3 +360,112 @@ def tiff2jp2():
 
     with tiff.Tiff2Jp2k(tiffpath, jp2kpath, **kwargs) as j:
         j.run()
+
+
+def tileserver():
+    """Entry point for console script jp2tileserver."""
+
+    kwargs = {
+        'description': 'Serve XYZ and Deep Zoom tiles of JPEG 2000 images.',
+        'formatter_class': argparse.ArgumentDefaultsHelpFormatter,
+    }
+    parser = argparse.ArgumentParser(**kwargs)
+
+    help = 'Address to listen on.'
+    parser.add_argument('--host', default='127.0.0.1', help=help)
+
+    help = 'Port to listen on.'
+    parser.add_argument('--port', type=int, default=8000, help=help)
+
+    help = 'Height and width of the tiles.'
+    parser.add_argument('--tile-size', type=int, default=256, help=help)
+
+    help = 'Tile format.'
+    parser.add_argument(
+        '--format', choices=['png', 'jpg'], default='png', help=help
+    )
+
+    help = 'Size in bytes of the in-memory tile cache of each image.'
+    parser.add_argument(
+        '--memory-bytes', type=int, default=2 ** 26, help=help
+    )
+
+    help = 'Directory in which to cache tiles on disk.'
+    parser.add_argument('--cache-dir', type=pathlib.Path, help=help)
+
+    help = 'Log each request.'
+    parser.add_argument('--verbose', action='store_true', help=help)
+
+    help = 'JPEG 2000 images, served under the names of their stems.'
+    parser.add_argument('filenames', nargs='+', type=pathlib.Path, help=help)
+
+    args = parser.parse_args()
+
+    sources = {path.stem: path for path in args.filenames}
+    server = TileServer(
+        sources,
+        host=args.host,
+        port=args.port,
+        verbose=args.verbose,
+        tile_size=args.tile_size,
+        format=args.format,
+        memory_bytes=args.memory_bytes,
+        cache_dir=args.cache_dir,
+    )
+
+    host, port = server.server_address[:2]
+    print(f'Serving {", ".join(sources)} on http://{host}:{port}/')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def jp2catalog():
+    """Entry point for console script jp2catalog."""
+
+    kwargs = {
+        'description': (
+            'Catalogue the header metadata of JPEG 2000 files in an SQLite '
+            'database or a CSV file.  Files already catalogued are skipped '
+            'unless they have changed.'
+        ),
+        'formatter_class': argparse.ArgumentDefaultsHelpFormatter,
+    }
+    parser = argparse.ArgumentParser(**kwargs)
+
+    help = (
+        'SQLite database or CSV file to create or update.  Files ending in '
+        '.csv are CSV unless --format says otherwise.'
+    )
+    parser.add_argument(
+        '-o', '--output', type=pathlib.Path, default='catalog.db', help=help
+    )
+
+    help = 'Format of the output.'
+    parser.add_argument('--format', choices=['sqlite', 'csv'], help=help)
+
+    help = 'Number of worker processes, by default the number of CPUs.'
+    parser.add_argument('--workers', type=int, help=help)
+
+    help = 'Catalogue files again even if they have not changed.'
+    parser.add_argument('--force', action='store_true', help=help)
+
+    help = 'JPEG 2000 files, or directories to search for them.'
+    parser.add_argument('paths', nargs='+', type=pathlib.Path, help=help)
+
+    args = parser.parse_args()
+
+    summary = catalog.catalog(
+        args.paths,
+        args.output,
+        format=args.format,
+        workers=args.workers,
+        force=args.force,
+    )
+    print(
+        f'{summary.catalogued} files catalogued ({summary.failed} failed), '
+        f'{summary.skipped} unchanged files skipped.'
+    )
@@ -15,11 +15,11 @@ References
 from fractions import Fraction
 import io
 from numbers import Number
-import os
 import pprint
 import struct
 import sys
 import textwrap
+import types
 from typing import Tuple
 from uuid import UUID
 import warnings
@@ -52,7 +52,7 @@ from .core import (
     VENDOR_COLOR_METHOD,
 )
 from .lib._tiff import tiff_header, BadTiffTagDatatype
-from . import get_option
+from . import get_option, _stream
 from ._iccprofile import _ICCProfile
 
 
@@ -119,6 +119,23 @@ class Jp2kBox(object):
         )
         return msg
 
+    def __getstate__(self):
+        # XML trees cannot be pickled, so they are serialized instead.
+        state = self.__dict__.copy()
+        xml_keys = []
+        for key, value in self.__dict__.items():
+            if isinstance(value, ET._ElementTree):
+                state[key] = ET.tostring(value, encoding="utf-8")
+                xml_keys.append(key)
+        if xml_keys:
+            state["_xml_keys"] = xml_keys
+        return state
+
+    def __setstate__(self, state):
+        for key in state.pop("_xml_keys", []):
+            state[key] = ET.parse(io.BytesIO(state[key]))
+        self.__dict__.update(state)
+
     def _dispatch_validation_error(self, msg, writing=False):
         """Issue either a warning or an error depending on circumstance.
 
@@ -237,7 +254,7 @@ class Jp2kBox(object):
         list
             List of top-level boxes in the JPEG 2000 file.
         """
-        self._filename = fptr.name
+        self._filename = _stream.file_name(fptr)
 
         superbox = []
 
@@ -259,7 +276,7 @@ class Jp2kBox(object):
             if box_length == 0:
                 # The length of the box is presumed to last until the end of
                 # the file.  Compute the effective length of the box.
-                num_bytes = os.path.getsize(fptr.name) - fptr.tell() + 8
+                num_bytes = _stream.file_size(fptr) - fptr.tell() + 8
 
             elif box_length == 1:
                 # The length of the box is in the XL field, a 64-bit value.
@@ -1070,8 +1087,10 @@ class ContiguousCodestreamBox(Jp2kBox):
         self.offset = offset
         self.main_header_offset = main_header_offset
 
-        # The filename can be set if lazy loading is desired.
+        # The filename (or in-memory source) can be set if lazy loading is
+        # desired.
         self._filename = None
+        self._source = None
 
     @property
     def codestream(self):
@@ -1080,8 +1099,9 @@ class ContiguousCodestreamBox(Jp2kBox):
         else:
             header_only = True
         if self._codestream is None:
-            if self._filename is not None:
-                with open(self._filename, "rb") as fptr:
+            source = self._filename or self._source
+            if source is not None:
+                with _stream.open_source(source) as fptr:
                     fptr.seek(self.main_header_offset)
                     self._codestream = Codestream(
                         fptr,
@@ -1141,7 +1161,13 @@ class ContiguousCodestreamBox(Jp2kBox):
             length=length,
             offset=offset,
         )
-        box._filename = fptr.name
+        box._filename = _stream.file_name(fptr)
+        if box._filename is None:
+            # Not backed by a named file, so hold on to the in-memory data.
+            if isinstance(fptr, _stream._MemoryFile):
+                box._source = fptr.source
+            else:
+                box._source = fptr
         return box
 
 
@@ -1914,6 +1940,7 @@ class AssociationBox(Jp2kBox):
             and self.box[1].box[0].box_id == "lbl "
             and self.box[1].box[0].label == "gml.root-instance"
             and self.box[1].box[1].box_id == "xml "
+            and self._filename is not None
         ):
             options = gdal.InfoOptions(showColorTable=False)
             txt = gdal.Info(self._filename, options=options)
@@ -3595,6 +3622,18 @@ class UUIDBox(Jp2kBox):
             # Such as when Exif byte order is unrecognized.
             warnings.warn(str(error))
 
+    def __getstate__(self):
+        # Only the name of the file is needed, see __str__.
+        state = super().__getstate__()
+        if "_fptr" in state:
+            state["_fptr"] = _stream.file_name(state["_fptr"])
+        return state
+
+    def __setstate__(self, state):
+        if "_fptr" in state:
+            state["_fptr"] = types.SimpleNamespace(name=state["_fptr"])
+        super().__setstate__(state)
+
     def _parse_raw_data(self):
         """Private function for parsing UUID payloads if possible."""
         if self.uuid == _XMP_UUID:
@@ -3679,9 +3718,14 @@ class UUIDBox(Jp2kBox):
 
         elif self.uuid == _GEOTIFF_UUID:
 
-            options = gdal.InfoOptions(showColorTable=False)
-            gdal_txt = gdal.Info(self._fptr.name, options=options)
-            gdal_txt = textwrap.indent(gdal_txt, " " * 4).rstrip()
+            filename = _stream.file_name(self._fptr)
+            if filename is None:
+                # GDAL needs a file, so in-memory data gets no geo metadata.
+                gdal_txt = "    Not available for in-memory data."
+            else:
+                options = gdal.InfoOptions(showColorTable=False)
+                gdal_txt = gdal.Info(filename, options=options)
+                gdal_txt = textwrap.indent(gdal_txt, " " * 4).rstrip()
 
             # now append the raw IFD
             s = io.StringIO()
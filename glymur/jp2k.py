@@ -10,12 +10,14 @@ License:  MIT
 # Standard library imports...
 from __future__ import annotations
 from collections import Counter
-from contextlib import ExitStack
+from contextlib import ExitStack, nullcontext
 import ctypes
+import io
+import os
 import pathlib
 import shutil
 import struct
-from typing import List, Tuple
+from typing import BinaryIO, List, Tuple
 from uuid import UUID
 import warnings
 
@@ -24,7 +26,8 @@ import numpy as np
 
 # Local imports...
 import glymur
-from . import core, version, get_option
+from . import aio, core, version, _stream, threads
+from .options import get_option, option_context
 from .jp2kr import Jp2kr
 from .jp2box import (
     ColourSpecificationBox,
@@ -43,8 +46,12 @@ class Jp2k(Jp2kr):
 
     Parameters
     ----------
-    filename : str or path
-        The path to JPEG 2000 file.
+    filename : str, path, or file object
+        The path to JPEG 2000 file.  When writing, this may instead be a
+        readable, writable, and seekable binary file object such as
+        io.BytesIO, in which case nothing touches the filesystem.  A raw
+        codestream is written if the file object has a name ending in
+        ".j2k", ".j2c", or ".jpc", otherwise a JP2 file is written.
     data : np.ndarray, optional
         Image data to be written to file.
     shape : Tuple[int, int, ...], optional
@@ -113,7 +120,7 @@ class Jp2k(Jp2kr):
 
     def __init__(
         self,
-        filename: str | pathlib.Path,
+        filename: str | pathlib.Path | BinaryIO,
         data: np.ndarray | None = None,
         capture_resolution: Tuple[int, int] | None = None,
         cbsize: Tuple[int, int] | None = None,
@@ -144,10 +151,15 @@ class Jp2k(Jp2kr):
         except FileNotFoundError:
             # must assume we are writing
             pass
+        except InvalidJp2kError:
+            if _stream.is_path(filename) or _stream.source_size(filename) > 0:
+                raise
+            # An empty file object, so again we must be writing.
 
-        # In case of pathlib.Paths...
-        self.filename = str(filename)
-        self.path = pathlib.Path(self.filename)
+        if _stream.is_path(filename):
+            # In case of pathlib.Paths...
+            self.filename = str(filename)
+            self.path = pathlib.Path(self.filename)
 
         self._capture_resolution = capture_resolution
         self._cbsize = cbsize
@@ -184,7 +196,15 @@ class Jp2k(Jp2kr):
         if not hasattr(self, "_codec_format"):
             # Only set codec format if the superclass has not done so, i.e.
             # we are writing instead of reading.
-            if self.filename[-4:].endswith((".jp2", ".JP2", ".jpx", "JPX")):
+            if self._source is not None:
+                name = getattr(self._source, "name", None)
+                if isinstance(name, str) and name.lower().endswith(
+                    (".j2k", ".j2c", ".jpc")
+                ):
+                    self._codec_format = opj2.CODEC_J2K
+                else:
+                    self._codec_format = opj2.CODEC_JP2
+            elif self.filename[-4:].endswith((".jp2", ".JP2", ".jpx", "JPX")):
                 self._codec_format = opj2.CODEC_JP2
             else:
                 self._codec_format = opj2.CODEC_J2K
@@ -203,6 +223,8 @@ class Jp2k(Jp2kr):
             self[:] = data
 
     def __repr__(self):
+        if self._source is not None:
+            return f"glymur.Jp2k(<{type(self._source).__name__}>)"
         msg = f"glymur.Jp2k('{self.path}')"
         return msg
 
@@ -253,9 +275,17 @@ class Jp2k(Jp2kr):
         rbox = glymur.jp2box.ResolutionBox(extra_boxes)
         jp2h.box.append(rbox)
 
-        temp_filename = self.filename + ".tmp"
-        self.wrap(temp_filename, boxes=self.box)
-        shutil.move(temp_filename, self.filename)
+        if self._source is None:
+            temp_filename = self.filename + ".tmp"
+            self.wrap(temp_filename, boxes=self.box)
+            shutil.move(temp_filename, self.filename)
+        else:
+            b = io.BytesIO()
+            self.wrap(b, boxes=self.box)
+            ofile = _stream.as_output_file(self._source)
+            ofile.seek(0)
+            ofile.truncate()
+            ofile.write(b.getbuffer())
         self._parse(force=True)
 
     def _validate_kwargs(self):
@@ -417,7 +447,7 @@ class Jp2k(Jp2kr):
         """
         cparams = opj2.set_default_encoder_parameters()
 
-        outfile = self.filename.encode()
+        outfile = b"" if self.filename is None else self.filename.encode()
         num_pad_bytes = opj2.PATH_LEN - len(outfile)
         outfile += b"0" * num_pad_bytes
         cparams.outfile = outfile
@@ -692,14 +722,7 @@ class Jp2k(Jp2kr):
             codec = opj2.create_compress(self._cparams.codec_fmt)
             stack.callback(opj2.destroy_codec, codec)
 
-            if self._verbose:
-                info_handler = opj2._INFO_CALLBACK
-            else:
-                info_handler = None
-
-            opj2.set_info_handler(codec, info_handler)
-            opj2.set_warning_handler(codec, opj2._WARNING_CALLBACK)
-            opj2.set_error_handler(codec, opj2._ERROR_CALLBACK)
+            opj2.add_message_handlers(codec, verbose=self._verbose)
 
             opj2.setup_encoder(codec, self._cparams, image)
 
@@ -709,25 +732,99 @@ class Jp2k(Jp2kr):
             if self._tlm:
                 opj2.encoder_set_extra_options(codec, tlm=self._tlm)
 
-            strm = opj2.stream_create_default_file_stream(self.filename, False)
+            strm = self._create_output_stream(stack)
 
-            num_threads = get_option("lib.num_threads")
-            if version.openjpeg_version >= "2.4.0":
-                opj2.codec_set_threads(codec, num_threads)
-            elif num_threads > 1:
-                msg = (
-                    f"Threaded encoding is not supported in library versions "
-                    f"prior to 2.4.0.  Your version is "
-                    f"{version.openjpeg_version}."
-                )
-                warnings.warn(msg, UserWarning)
-
-            stack.callback(opj2.stream_destroy, strm)
+            self._set_encoder_threads(codec, img_array.shape, stack)
 
             opj2.start_compress(codec, image, strm)
             opj2.encode(codec, strm)
             opj2.end_compress(codec, strm)
 
+    def _set_encoder_threads(self, codec, shape, stack):
+        """Give the encoder threads according to the lib.num_threads option.
+
+        Parameters
+        ----------
+        codec : CODEC_TYPE
+            The compressor, already set up.
+        shape : tuple
+            Shape of the image data, or of a tile if writing tiles.
+        stack : ExitStack
+            Destroys the codec when closed.
+        """
+        if version.openjpeg_version >= "2.4.0":
+            num_threads = threads.num_threads(
+                "encode", self._encode_codeblocks(shape), stack
+            )
+            opj2.codec_set_threads(codec, num_threads)
+        elif get_option("lib.num_threads") not in (1, "auto"):
+            msg = (
+                f"Threaded encoding is not supported in library versions "
+                f"prior to 2.4.0.  Your version is "
+                f"{version.openjpeg_version}."
+            )
+            warnings.warn(msg, UserWarning)
+
+    def _encode_codeblocks(self, shape):
+        """Estimate the code-blocks per tile that an encode processes, see
+        glymur.threads.
+        """
+        if self._cparams.tile_size_on:
+            height = min(shape[0], self._cparams.cp_tdy)
+            width = min(shape[1], self._cparams.cp_tdx)
+        else:
+            height, width = shape[0], shape[1]
+
+        # OpenJPEG's default code-blocks are 64x64.
+        code_block_size = (
+            self._cparams.cblockh_init or 64,
+            self._cparams.cblockw_init or 64,
+        )
+        ncomps = shape[2] if len(shape) == 3 else 1
+
+        return threads.count_codeblocks(height, width, code_block_size, ncomps)
+
+    def _create_output_stream(self, stack):
+        """Create an OpenJPEG output stream for the JPEG 2000 data.
+
+        Parameters
+        ----------
+        stack : ExitStack
+            The stream is destroyed when the stack is closed.
+
+        Returns
+        -------
+        STREAM_TYPE_P
+            The OpenJPEG stream.
+        """
+        if self._source is None:
+            stream = opj2.stream_create_default_file_stream(
+                self.filename, False
+            )
+            stack.callback(opj2.stream_destroy, stream)
+            return stream
+
+        # Start from scratch, same as when writing to a path.
+        ofile = _stream.as_output_file(self._source)
+        ofile.seek(0)
+        ofile.truncate()
+
+        output_stream = _stream.OutputStream(ofile)
+        stack.callback(output_stream.close)
+        return output_stream.stream
+
+    def _open_for_update(self):
+        """Open the JPEG 2000 data for reading and writing.
+
+        Returns
+        -------
+        context manager
+            Yields a seekable file object.
+        """
+        if self._source is None:
+            return self.path.open("r+b")
+        return nullcontext(_stream.as_output_file(self._source))
+
     def append(self, box):
         """
         Append a metadata box to the JP2 file.  This will not result in a
@@ -798,23 +895,22 @@ class Jp2k(Jp2kr):
             )
             raise RuntimeError(msg)
 
-        # Check the last box.  If the length field is zero, then rewrite
-        # the length field to reflect the true length of the box.
-        with self.path.open("rb") as ifile:
+        with self._open_for_update() as ofile:
+
+            # Check the last box.  If the length field is zero, then rewrite
+            # the length field to reflect the true length of the box.
             offset = self.box[-1].offset
-            ifile.seek(offset)
-            read_buffer = ifile.read(4)
+            ofile.seek(offset)
+            read_buffer = ofile.read(4)
             (box_length,) = struct.unpack(">I", read_buffer)
             if box_length == 0:
-                # Reopen the file in write mode and rewrite the length field.
-                true_box_length = self.path.stat().st_size - offset
-                with self.path.open("r+b") as ofile:
-                    ofile.seek(offset)
-                    write_buffer = struct.pack(">I", true_box_length)
-                    ofile.write(write_buffer)
-
-        # Can now safely append the box.
-        with self.path.open("ab") as ofile:
+                true_box_length = _stream.file_size(ofile) - offset
+                ofile.seek(offset)
+                write_buffer = struct.pack(">I", true_box_length)
+                ofile.write(write_buffer)
+
+            # Can now safely append the box.
+            ofile.seek(0, os.SEEK_END)
             box.write(ofile)
 
         self._parse(force=True)
@@ -832,8 +928,9 @@ class Jp2k(Jp2kr):
 
         Parameters
         ----------
-        filename : str
-            JP2 file to be created from a raw codestream.
+        filename : str or file object
+            JP2 file to be created from a raw codestream.  This may also be
+            a writable file object such as io.BytesIO.
         boxes : list
             JP2 box definitions to define the JP2 file format.  If not
             provided, a default ""jacket" is assumed, consisting of JP2
@@ -866,7 +963,15 @@ class Jp2k(Jp2kr):
 
         self._validate_jp2_box_sequence(boxes)
 
-        with open(filename, "wb") as ofile:
+        if _stream.is_path(filename):
+            context = open(filename, "wb")
+        else:
+            ofile = _stream.as_output_file(filename)
+            ofile.seek(0)
+            ofile.truncate()
+            context = nullcontext(ofile)
+
+        with context as ofile:
             for box in boxes:
                 if box.box_id != "jp2c":
                     box.write(ofile)
@@ -886,7 +991,7 @@ class Jp2k(Jp2kr):
             # of myself out to file.
             ofile.write(struct.pack(">I", self.length + 8))
             ofile.write(b"jp2c")
-            with open(self.filename, "rb") as ifile:
+            with self._open() as ifile:
                 ofile.write(ifile.read())
             return
 
@@ -906,7 +1011,7 @@ class Jp2k(Jp2kr):
             offset = jp2c[0].offset
 
         # Ready to write the codestream.
-        with open(self.filename, "rb") as ifile:
+        with self._open() as ifile:
             ifile.seek(offset)
 
             # Verify that the specified codestream is right.
@@ -918,7 +1023,7 @@ class Jp2k(Jp2kr):
             if L == 0:
                 # The length of the box is presumed to last until the end of
                 # the file.  Compute the effective length of the box.
-                L = self.path.stat().st_size - ifile.tell() + 8
+                L = _stream.file_size(ifile) - ifile.tell() + 8
 
             elif L == 1:
                 # The length of the box is in the XL field, a 64-bit value.
@@ -985,6 +1090,36 @@ class Jp2k(Jp2kr):
             msg = "Partial write operations are currently not allowed."
             raise ValueError(msg)
 
+    async def awrite(self, data, options=None):
+        """Write an entire image without blocking the event loop.
+
+        This is the equivalent of jp2[:] = data, encoded in the thread pool
+        shared by glymur's coroutines (see the async.max_workers option).
+        If the coroutine is cancelled before encoding starts, nothing is
+        written, but once started the image is always written in full.
+
+        Parameters
+        ----------
+        data : ndarray
+            Image data to be encoded.
+        options : dict, optional
+            Options that apply to this write only, such as lib.num_threads,
+            see option_context.
+
+        Examples
+        --------
+        >>> import asyncio, skimage.data
+        >>> jp2 = glymur.Jp2k('moon.jp2', numres=4)
+        >>> asyncio.run(jp2.awrite(skimage.data.moon()))
+        >>> jp2.shape
+        (512, 512)
+        """
+        def write():
+            with option_context(options):
+                self[:] = data
+
+        await aio.run(write)
+
     def _remove_ellipsis(self, index, numrows, numcols, numbands):
         """resolve the first ellipsis in the index
 
@@ -1490,17 +1625,13 @@ class _TileWriter(object):
         except glymur.lib.openjp2.OpenJPEGLibraryError as e:
             # properly dispose of these resources
             opj2.end_compress(self.codec, self.stream)
-            opj2.stream_destroy(self.stream)
-            opj2.image_destroy(self.image)
-            opj2.destroy_codec(self.codec)
+            self._stack.close()
             raise e
 
         if self.tile_index == self.number_of_tiles - 1:
             # properly dispose of these resources
             opj2.end_compress(self.codec, self.stream)
-            opj2.stream_destroy(self.stream)
-            opj2.image_destroy(self.image)
-            opj2.destroy_codec(self.codec)
+            self._stack.close()
 
     def setup_first_tile(self, img_array):
         """Only do these things for the first tile."""
@@ -1508,20 +1639,19 @@ class _TileWriter(object):
         self.jp2k._populate_cparams(img_array)
         self.jp2k._populate_comptparms(img_array)
 
-        self.codec = opj2.create_compress(self.jp2k._cparams.codec_fmt)
+        # The codec, image, and stream are released in reverse order once
+        # the last tile is written.
+        self._stack = ExitStack()
 
-        if self.jp2k.verbose:
-            info_handler = opj2._INFO_CALLBACK
-        else:
-            info_handler = None
+        self.codec = opj2.create_compress(self.jp2k._cparams.codec_fmt)
+        self._stack.callback(opj2.destroy_codec, self.codec)
 
-        opj2.set_info_handler(self.codec, info_handler)
-        opj2.set_warning_handler(self.codec, opj2._WARNING_CALLBACK)
-        opj2.set_error_handler(self.codec, opj2._ERROR_CALLBACK)
+        opj2.add_message_handlers(self.codec, verbose=self.jp2k.verbose)
 
         self.image = opj2.image_tile_create(
             self.jp2k._comptparms, self.jp2k._colorspace
         )
+        self._stack.callback(opj2.image_destroy, self.image)
 
         self.jp2k._populate_image_struct(
             self.image,
@@ -1537,25 +1667,73 @@ class _TileWriter(object):
         if self.jp2k._plt:
             opj2.encoder_set_extra_options(self.codec, plt=self.jp2k._plt)
 
-        self.stream = opj2.stream_create_default_file_stream(
-            self.jp2k.filename,
-            False
-        )
+        self.stream = self.jp2k._create_output_stream(self._stack)
 
-        num_threads = get_option("lib.num_threads")
-        if version.openjpeg_version >= "2.4.0":
-            opj2.codec_set_threads(self.codec, num_threads)
-        elif num_threads > 1:
-            msg = (
-                f"Threaded encoding is not supported in library versions "
-                f"prior to 2.4.0.  Your version is "
-                f"{version.openjpeg_version}."
-            )
-            warnings.warn(msg, UserWarning)
+        self.jp2k._set_encoder_threads(
+            self.codec, img_array.shape, self._stack
+        )
 
         opj2.start_compress(self.codec, self.image, self.stream)
 
 
+def encode(data: np.ndarray, **kwargs) -> bytes:
+    """Encode an image as JPEG 2000 without going through the filesystem.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        Image data to be encoded.
+    kwargs : dict
+        Any keyword arguments accepted by Jp2k, e.g. cratios, numres,
+        tilesize.
+
+    Returns
+    -------
+    bytes
+        The JP2 file.
+
+    Examples
+    --------
+    >>> import skimage.data
+    >>> b = glymur.encode(skimage.data.moon(), cratios=[20])
+    >>> glymur.Jp2kr(b).shape
+    (512, 512)
+    """
+    b = io.BytesIO()
+    Jp2k(b, data=data, **kwargs)
+    return b.getvalue()
+
+
+async def aopen(filename, **kwargs) -> Jp2kr:
+    """Open a JPEG 2000 image for reading without blocking the event loop.
+
+    The file is parsed in the thread pool shared by glymur's coroutines
+    (see the async.max_workers option).
+
+    Parameters
+    ----------
+    filename : str, Path, bytes-like, or file object
+        The JPEG 2000 file or data.
+    kwargs : dict
+        Any keyword arguments accepted by Jp2kr, e.g. verbose.
+
+    Returns
+    -------
+    Jp2kr
+        The image, ready to be read with aread.
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> async def main():
+    ...     jp2 = await glymur.aopen(glymur.data.nemo())
+    ...     return await jp2.aread(rlevel=2)
+    >>> asyncio.run(main()).shape
+    (364, 648, 3)
+    """
+    return await aio.run(Jp2kr, filename, **kwargs)
+
+
 def _set_planar_pixel_order(img):
     """Reorder the image pixels so that plane-0 comes first, then plane-1, etc.
     This is a requirement for using opj_write_tile.
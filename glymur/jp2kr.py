@@ -9,12 +9,17 @@ License:  MIT
 
 # Standard library imports...
 from __future__ import annotations
+import concurrent.futures
 from contextlib import ExitStack
+import contextvars
 import ctypes
+import math
 import pathlib
 import re
 import struct
 import sys
+import threading
+from typing import BinaryIO
 import warnings
 
 # Third party library imports
@@ -22,7 +27,11 @@ import numpy as np
 
 # Local imports...
 from .codestream import Codestream
-from . import core, version, get_option
+from . import (
+    aio, core, version, _stream, lazy, metadatacache, packets, remote,
+    threads, tilecache
+)
+from .options import get_option, option_context
 from .jp2box import Jp2kBox, FileTypeBox, InvalidJp2kError, InvalidJp2kWarning
 from .lib import openjp2 as opj2
 
@@ -73,24 +82,37 @@ class Jp2kr(Jp2kBox):
 
     def __init__(
         self,
-        filename: str | pathlib.Path,
+        filename: str | pathlib.Path | bytes | BinaryIO,
         verbose: bool = False,
         **kwargs
     ):
         """
         Parameters
         ----------
-        filename : str or Path
-            Interpreted as a path to a JPEG 2000 file.
+        filename : str, Path, bytes-like, or file object
+            Interpreted as a path to a JPEG 2000 file.  The JPEG 2000 data
+            may also be supplied directly as a bytes, bytearray, memoryview,
+            or mmap object, or as any seekable binary file object such as
+            io.BytesIO.  In that case the filename and path attributes are
+            None.  In-memory data is never copied.
         verbose : bool
             If true, print informational messages produced by the OpenJPEG
             library.
         """
         super().__init__()
 
-        # In case of pathlib.Paths...
-        self.filename = str(filename)
-        self.path = pathlib.Path(self.filename)
+        if _stream.is_path(filename):
+            # In case of pathlib.Paths...
+            self.filename = str(filename)
+            self.path = pathlib.Path(self.filename)
+            self._source = None
+        else:
+            self.filename = None
+            self.path = None
+            self._source = filename
+
+            # Fail early if we cannot read from it.
+            _stream.as_file(filename)
 
         # Setup some default attributes
         self.box = []
@@ -101,11 +123,17 @@ class Jp2kr(Jp2kBox):
         self._layer = 0
         self._ndim = None
         self._parse_count = 0
+        self._pyramid = None
         self._verbose = verbose
         self._tilesize_r = None
 
-        if not self.path.exists():
+        # Serializes access to a file object shared by concurrent decodes.
+        self._lock = threading.Lock()
+
+        if self._source is None and not self.path.exists():
             raise FileNotFoundError(f"{self.filename} does not exist.")
+        elif self._source is not None and _stream.source_size(filename) == 0:
+            raise InvalidJp2kError(f"{self._name} contains no data.")
 
         self._parse()
         self._initialize_shape()
@@ -232,6 +260,11 @@ class Jp2kr(Jp2kBox):
     @layer.setter
     def layer(self, layer):
         # Set to the indicated value so long as it is valid.
+        self._validate_layer(layer)
+        self._layer = layer
+
+    def _validate_layer(self, layer):
+        """Raise ValueError unless the layer number is valid."""
         cod = next(
             filter(lambda x: x.marker_id == "COD", self.codestream.segment),
             None
@@ -240,8 +273,6 @@ class Jp2kr(Jp2kBox):
             msg = f"Invalid layer number, must be in range [0, {cod.layers})."
             raise ValueError(msg)
 
-        self._layer = layer
-
     @property
     def dtype(self):
         """Datatype of the image.
@@ -309,8 +340,125 @@ class Jp2kr(Jp2kBox):
         """
         if self._codestream is None:
             self._codestream = self.get_codestream(header_only=True)
+            metadatacache._cache.store(self)
         return self._codestream
 
+    @property
+    def tile_index(self):
+        """Where each tile-part of the codestream is in the file.
+
+        The index comes from the TLM segments of the main header if there are
+        any, otherwise from a scan that jumps from one SOT marker to the next.
+        Either way it is cached along with the codestream.
+
+        Returns
+        -------
+        ndarray
+            Structured array with a row for each tile-part, in codestream
+            order, with fields tile, tile_part, offset, length, and
+            num_tile_parts.  The offsets are those of the SOT markers from the
+            start of the file, the lengths include the tile-part headers.
+
+        Examples
+        --------
+        >>> jp = glymur.Jp2kr(glymur.data.nemo())
+        >>> index = jp.tile_index
+        >>> index['offset']
+        array([198], dtype=uint64)
+        >>> index['length']
+        array([1132173], dtype=uint64)
+        """
+        codestream = self.codestream
+        if codestream.tile_index is None:
+            with self._open() as fptr:
+                codestream._scan_tile_index(fptr)
+        return codestream.tile_index
+
+    def byte_ranges(self, area=None, rlevel=0, layer=None, components=None):
+        """Compute which bytes of the file are needed to read part of the
+        image.
+
+        These are the main header of the codestream and, for each tile
+        overlapping the area, the tile-part headers and those packets that
+        contribute to the area at the given resolution, number of layers,
+        and components.  Packets can only be told apart if the tile-parts
+        have PLT segments, otherwise whole tile-parts are included.  The
+        boxes of a JP2 file are not included.
+
+        Parameters
+        ----------
+        area : tuple, optional
+            Specifies the area to read, (first_row, first_col, last_row,
+            last_col), as for read.  By default, the whole image.
+        rlevel : int, optional
+            Factor by which to reduce the output resolution, as for read.
+            Use -1 for the lowest resolution.
+        layer : int, optional
+            Number of quality layers to decode, as for the layer property,
+            which is the default.  Zero means all of them.
+        components : list, optional
+            Indices of the components to decode.  By default, all of them.
+
+        Returns
+        -------
+        list
+            Pairs of offset and length in bytes, sorted by offset, with
+            adjacent ranges merged.
+
+        Examples
+        --------
+        >>> jp = glymur.Jp2kr(glymur.data.nemo())
+        >>> jp.byte_ranges(area=(0, 0, 256, 256))
+        [(85, 1132286)]
+        """
+        siz = self.codestream.segment[1]
+        cod = next(
+            filter(lambda x: x.marker_id == "COD", self.codestream.segment),
+            None
+        )
+
+        if rlevel == -1:
+            rlevel = cod.num_res
+        elif rlevel < -1 or rlevel > cod.num_res:
+            msg = (
+                f"rlevel must be in the range [-1, {cod.num_res}] "
+                "for this image."
+            )
+            raise ValueError(msg)
+
+        if layer is None:
+            layer = self.layer
+        else:
+            self._validate_layer(layer)
+
+        if area is not None and (
+            area[0] < 0 or area[1] < 0 or area[2] <= 0 or area[3] <= 0
+        ):
+            msg = (
+                f"The upper left corner coordinates must be nonnegative "
+                f"and the lower right corner coordinates must be positive."
+                f"  The specified upper left and lower right coordinates "
+                f"are ({area[0]}, {area[1]}) and ({area[2]}, {area[3]})."
+            )
+            raise ValueError(msg)
+
+        if components is not None:
+            if np.isscalar(components):
+                components = [components]
+            if any(c < 0 or c >= siz.Csiz for c in components):
+                msg = (
+                    f"{components} has at least one invalid component, "
+                    f"components must be in the range [0, {siz.Csiz})."
+                )
+                raise ValueError(msg)
+
+        tile_index = self.tile_index
+        with self._open() as fptr:
+            return packets.plan(
+                fptr, self.codestream, tile_index, area=area, rlevel=rlevel,
+                layers=layer, components=components
+            )
+
     @property
     def tilesize(self):
         """Height and width of the image tiles.
@@ -376,15 +524,21 @@ class Jp2kr(Jp2kBox):
         self._shape = shape
 
     def __repr__(self):
+        if self._source is not None:
+            return f"glymur.Jp2kr(<{type(self._source).__name__}>)"
         msg = f"glymur.Jp2kr('{self.path}')"
         return msg
 
     def __str__(self):
-        metadata = [f"File:  {self.path.name}"]
+        metadata = [f"File:  {self._name}"]
         if len(self.box) > 0:
             for box in self.box:
                 metadata.append(str(box))
-        elif self._codestream is None and not self.path.exists():
+        elif (
+            self._codestream is None
+            and self._source is None
+            and not self.path.exists()
+        ):
             # No codestream either.  Empty file?  We are done.
             return metadata[0]
         else:
@@ -392,6 +546,60 @@ class Jp2kr(Jp2kBox):
             metadata.append(str(self.codestream))
         return "\n".join(metadata)
 
+    @property
+    def _name(self):
+        """Name by which the JPEG 2000 data is identified in messages."""
+        if self._source is None:
+            return self.path.name
+        return f"<{type(self._source).__name__}>"
+
+    def _open(self):
+        """Open the JPEG 2000 data for reading.
+
+        Returns
+        -------
+        context manager
+            Yields a seekable file object positioned at the start of the data.
+        """
+        if self._source is None:
+            return self.path.open("rb")
+        return _stream.open_source(self._source)
+
+    def _create_stream(self, stack):
+        """Create an OpenJPEG input stream for the JPEG 2000 data.
+
+        Parameters
+        ----------
+        stack : ExitStack
+            The stream is destroyed when the stack is closed.
+
+        Returns
+        -------
+        STREAM_TYPE_P
+            The OpenJPEG stream.
+        """
+        if self._source is None:
+            stream = opj2.stream_create_default_file_stream(
+                self.filename, True
+            )
+            stack.callback(opj2.stream_destroy, stream)
+            return stream
+
+        # Each stream gets its own file object if at all possible so that
+        # concurrent decodes of in-memory data do not interfere.
+        fptr = stack.enter_context(_stream.open_source(self._source))
+        if isinstance(fptr, remote.RemoteFile):
+            # Read no more than a block at a time, so that skipping over
+            # tiles that are not decoded does not fetch them.
+            buffer_size = fptr.block_size
+        else:
+            buffer_size = opj2.J2K_STREAM_CHUNK_SIZE
+        input_stream = _stream.InputStream(
+            fptr, buffer_size=buffer_size, lock=self._lock
+        )
+        stack.callback(input_stream.close)
+        return input_stream.stream
+
     def parse(self, force=False):
         """
         .. deprecated:: 0.15.0
@@ -418,9 +626,17 @@ class Jp2kr(Jp2kBox):
             # don't parse more than once if we can help it
             return
 
-        self.length = self.path.stat().st_size
+        if force:
+            # The file may have been rewritten, so any codestream parsed
+            # earlier is stale and must not be cached along with the boxes.
+            self._codestream = None
+        elif metadatacache._cache.restore(self):
+            self._parse_count += 1
+            return
+
+        with self._open() as fptr:
 
-        with self.path.open("rb") as fptr:
+            self.length = _stream.file_size(fptr)
 
             # Make sure we have a JPEG2000 file.  It could be either JP2 or
             # J2C.  Check for J2C first, single box in that case.
@@ -450,7 +666,7 @@ class Jp2kr(Jp2kBox):
                 or box_id != b"jP  "
                 or signature != (13, 10, 135, 10)
             ):
-                msg = f"{self.filename} is not a JPEG 2000 file."
+                msg = f"{self._name} is not a JPEG 2000 file."
                 raise InvalidJp2kError(msg)
 
             # Back up and start again, we know we have a superbox (box of
@@ -460,6 +676,7 @@ class Jp2kr(Jp2kBox):
             self._validate()
 
         self._parse_count += 1
+        metadatacache._cache.store(self)
 
     def _validate(self):
         """Validate the JPEG 2000 outermost superbox.  These checks must be
@@ -468,7 +685,7 @@ class Jp2kr(Jp2kBox):
         # A JP2 file must contain certain boxes.  The 2nd box must be a file
         # type box.
         if not isinstance(self.box[1], FileTypeBox):
-            msg = f"{self.filename} does not contain a valid File Type box."
+            msg = f"{self._name} does not contain a valid File Type box."
             raise InvalidJp2kError(msg)
 
         ftyp = self.box[1]
@@ -547,6 +764,25 @@ class Jp2kr(Jp2kBox):
 
     def __getitem__(self, pargs):
         """Slicing protocol."""
+        return self._slice(pargs, self._read)
+
+    def _slice(self, pargs, read):
+        """Resolve numpy-style slicing arguments into a read request.
+
+        Parameters
+        ----------
+        pargs : int, slice, Ellipsis, or tuple
+            Slicing arguments as supplied to __getitem__.
+        read : callable
+            Performs the actual decoding, invoked with area and rlevel keyword
+            arguments, and with the components to decode if only some of
+            them are needed.
+
+        Returns
+        -------
+        ndarray
+            The image data.
+        """
         if len(self.shape) == 2:
             numrows, numcols = self.shape
             numbands = 1
@@ -558,11 +794,11 @@ class Jp2kr(Jp2kBox):
             # This retrieves a single row.
             row = pargs
             area = (row, 0, row + 1, numcols)
-            return self._read(area=area).squeeze()
+            return read(area=area).squeeze()
 
         if pargs is Ellipsis:
             # Case of jp2[...]
-            return self._read()
+            return read()
 
         if isinstance(pargs, slice):
             if (
@@ -571,7 +807,7 @@ class Jp2kr(Jp2kBox):
                 and pargs.step is None
             ):
                 # Case of jp2[:]
-                return self._read()
+                return read()
 
             # Corner case of jp2[x] where x is a slice object with non-null
             # members.  Just augment it with an ellipsis and let the code
@@ -583,7 +819,7 @@ class Jp2kr(Jp2kBox):
 
             # Run once again because it is possible that there's another
             # Ellipsis object in the 2nd or 3rd position.
-            return self.__getitem__(newindex)
+            return self._slice(newindex, read)
 
         if isinstance(pargs, tuple) and any(isinstance(x, int) for x in pargs):
             # Replace the first such integer argument, replace it with a slice.
@@ -596,7 +832,7 @@ class Jp2kr(Jp2kBox):
 
             # Invoke array-based slicing again, as there may be additional
             # integer argument remaining.
-            data = self.__getitem__(newindex)
+            data = self._slice(newindex, read)
 
             # Reduce dimensionality in the scalar dimension.
             return np.squeeze(data, axis=idx)
@@ -635,26 +871,112 @@ class Jp2kr(Jp2kBox):
             numrows if rows.stop is None else rows.stop,
             numcols if cols.stop is None else cols.stop,
         )
-        data = self._read(area=area, rlevel=rlevel)
         if len(pargs) == 2:
-            return data
+            return read(area=area, rlevel=rlevel)
+
+        # Ok, 3 arguments in pargs.  Decode only the components needed for
+        # the bands if at all possible.
+        restricted = self._band_components(bands)
+        if restricted is None:
+            data = read(area=area, rlevel=rlevel)
+            return data[:, :, bands]
+
+        components, index = restricted
+        data = read(area=area, rlevel=rlevel, components=components)
+
+        if data.ndim == 2:
+            data = data[:, :, np.newaxis]
+        if index != list(range(len(components))):
+            data = data[:, :, index]
+        return data
+
+    def _band_components(self, bands):
+        """Determine the codestream components to decode for an index into
+        the bands of the image.
+
+        Parameters
+        ----------
+        bands : slice or list-like
+            Index into the third dimension of the image.
+
+        Returns
+        -------
+        tuple or None
+            The components to decode in ascending order and, for each band
+            requested, the position of its component among them.  None if
+            all of the components must be decoded.
+        """
+        if self._decoded_components is not None:
+            nbands = len(self._decoded_components)
+        elif len(self.shape) == 3:
+            nbands = self.shape[2]
+        else:
+            return None
+
+        try:
+            index = np.arange(nbands)[bands]
+        except (IndexError, TypeError, ValueError):
+            # Let the full decode report the error.
+            return None
+
+        if index.ndim != 1 or index.size == 0:
+            return None
+        if index.tolist() == list(range(nbands)):
+            return None
+
+        # The channel transformations of the JP2 header are not applied when
+        # the components are restricted, so the bands would no longer match
+        # the components.
+        jp2h = next(filter(lambda x: x.box_id == "jp2h", self.box), None)
+        if jp2h is not None and not self.ignore_pclr_cmap_cdef:
+            for box in jp2h.box:
+                if box.box_id in ("pclr", "cmap"):
+                    return None
+                if box.box_id == "cdef" and any(
+                    asoc not in (0, 65535) and asoc - 1 != idx
+                    for idx, asoc in zip(box.index, box.association)
+                ):
+                    return None
+
+        if self._decoded_components is not None:
+            components = [self._decoded_components[i] for i in index]
+        else:
+            components = index.tolist()
+
+        # Nor is the multiple component transformation.
+        if not self._can_restrict_components(components):
+            return None
+
+        unique = sorted(set(components))
+        return unique, [unique.index(c) for c in components]
+
+    def _can_restrict_components(self, components):
+        """Can these components be decoded by themselves?
 
-        # Ok, 3 arguments in pargs.
-        return data[:, :, bands]
+        The multiple component transformation combines the first three
+        components and is not applied when the components are restricted,
+        so either all of them or none of them must be decoded.
+        """
+        cod = next(
+            filter(lambda x: x.marker_id == "COD", self.codestream.segment),
+            None
+        )
+        return not (cod.mct and 0 < len({0, 1, 2} & set(components)) < 3)
 
-    def _subsampling_sanity_check(self):
-        """Check for differing subsample factors."""
-        if self._decoded_components is None:
+    def _subsampling_sanity_check(self, components=None):
+        """Check for differing subsample factors among the components to be
+        decoded, by default those of the decoded_components property.
+        """
+        components = self._components(components)
+        if components is None:
             dxs = np.array(self.codestream.segment[1].xrsiz)
             dys = np.array(self.codestream.segment[1].yrsiz)
         else:
             dxs = np.array([
-                self.codestream.segment[1].xrsiz[i]
-                for i in self._decoded_components
+                self.codestream.segment[1].xrsiz[i] for i in components
             ])
             dys = np.array([
-                self.codestream.segment[1].yrsiz[i]
-                for i in self._decoded_components
+                self.codestream.segment[1].yrsiz[i] for i in components
             ])
 
         if np.any(dxs - dxs[0]) or np.any(dys - dys[0]):
@@ -666,13 +988,25 @@ class Jp2kr(Jp2kBox):
             )
             raise RuntimeError(msg)
 
-    def _read(self, rlevel=0, layer=None, area=None, tile=None, verbose=False):
+    def _read(
+        self,
+        rlevel=0,
+        layer=None,
+        area=None,
+        tile=None,
+        verbose=False,
+        out=None,
+        planar=False,
+        workers=None,
+        components=None,
+    ):
         """Read a JPEG 2000 image using libopenjp2.
 
         Parameters
         ----------
         layer : int, optional
-            Number of quality layer to decode.
+            Number of quality layer to decode, overriding the layer property
+            for this read only.
         rlevel : int, optional
             Factor by which to rlevel output resolution.  Use -1 to get the
             lowest resolution thumbnail.
@@ -683,6 +1017,15 @@ class Jp2kr(Jp2kBox):
             Number of tile to decode.
         verbose : bool, optional
             Print informational messages produced by the OpenJPEG library.
+        out : ndarray, optional
+            Destination for the image data, see _extract_image.
+        planar : bool, optional
+            If true, the bands make up the first dimension of the image.
+        workers : int or concurrent.futures.Executor, optional
+            Decodes tiles missing from the tile cache, see the read method.
+        components : list, optional
+            The components to decode, overriding the decoded_components
+            property for this read only.
 
         Returns
         -------
@@ -702,171 +1045,1555 @@ class Jp2kr(Jp2kBox):
             )
             raise RuntimeError(msg)
 
-        self._subsampling_sanity_check()
-        self._populate_dparams(rlevel, tile=tile, area=area)
-        image = self._read_openjp2()
-        return image
-
-    def _read_openjp2(self):
-        """Read a JPEG 2000 image using libopenjp2.
-
-        Returns
-        -------
-        ndarray or lst
-            Either the image as an ndarray or a list of ndarrays, each item
-            corresponding to one band.
-        """
-        with ExitStack() as stack:
-            filename = self.filename
-            stream = opj2.stream_create_default_file_stream(filename, True)
-            stack.callback(opj2.stream_destroy, stream)
-            codec = opj2.create_decompress(self._codec_format)
-            stack.callback(opj2.destroy_codec, codec)
-
-            opj2.set_error_handler(codec, opj2._ERROR_CALLBACK)
-            opj2.set_warning_handler(codec, opj2._WARNING_CALLBACK)
-
-            if self._verbose:
-                opj2.set_info_handler(codec, opj2._INFO_CALLBACK)
-            else:
-                opj2.set_info_handler(codec, None)
-
-            opj2.setup_decoder(codec, self._dparams)
-            if version.openjpeg_version >= "2.2.0":
-                opj2.codec_set_threads(codec, get_option("lib.num_threads"))
+        self._subsampling_sanity_check(components)
+        dparams = self._populate_dparams(rlevel, tile=tile, area=area)
 
-            raw_image = opj2.read_header(stream, codec)
-            stack.callback(opj2.image_destroy, raw_image)
-
-            if self._decoded_components is not None:
-                opj2.set_decoded_components(codec, self._decoded_components)
+        if layer is None or layer == self.layer:
+            layer = None
+        else:
+            self._validate_layer(layer)
+            dparams.cp_layer = layer
+
+        if (
+            tile is None
+            and layer is None
+            and self._can_use_tile_cache(area, dparams.cp_reduce, components)
+        ):
+            return self._read_cached(
+                dparams.cp_reduce, area, out, planar, workers, components
+            )
 
-            if self._dparams.nb_tile_to_decode:
-                opj2.get_decoded_tile(
-                    codec, stream, raw_image, self._dparams.tile_index
-                )
-            else:
-                opj2.set_decode_area(
-                    codec,
-                    raw_image,
-                    self._dparams.DA_x0,
-                    self._dparams.DA_y0,
-                    self._dparams.DA_x1,
-                    self._dparams.DA_y1,
-                )
-                opj2.decode(codec, stream, raw_image)
+        # Pass the parameters along rather than relying on the attributes, as
+        # other threads may be reading the same image.
+        image = self._read_openjp2(
+            out=out, planar=planar, dparams=dparams, components=components
+        )
+        return image
 
-            opj2.end_decompress(codec, stream)
+    def read(
+        self,
+        rlevel=0,
+        area=None,
+        tile=None,
+        out=None,
+        planar=False,
+        workers=None,
+        options=None,
+    ):
+        """Read a JPEG 2000 image, optionally into a preallocated array.
 
-            image = self._extract_image(raw_image)
+        Numpy-style slicing is usually more convenient, but this method can
+        decode into an array supplied by the caller (such as a memory-mapped
+        array).  Each component is then converted straight from the buffer
+        decoded by OpenJPEG into its destination without any intermediate
+        copies.
 
-        return image
+        Large reads of tiled images can also be decoded in parallel.  The
+        requested area is split along tile boundaries and each piece is
+        decoded by its own codec.  This complements the lib.num_threads
+        option, which only parallelizes code-block decoding within a codec.
 
-    def _populate_dparams(self, rlevel, tile=None, area=None):
-        """Populate decompression structure with appropriate input parameters.
+        If the cache.max_bytes option is set, images read from files are
+        assembled from whole tiles held in a cache shared by all images,
+        and only the missing tiles are decoded.  Images whose tiles are too
+        large to fit in the cache are decoded as usual.
 
         Parameters
         ----------
-        rlevel : int
-            Factor by which to rlevel output resolution.
-        area : tuple
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+        area : tuple, optional
             Specifies decoding image area,
             (first_row, first_col, last_row, last_col)
-        tile : int
+        tile : int, optional
             Number of tile to decode.
-        """
-        dparam = opj2.set_default_decoder_parameters()
-
-        infile = self.filename.encode()
-        nelts = opj2.PATH_LEN - len(infile)
-        infile += b"0" * nelts
-        dparam.infile = infile
-
-        # Return raw codestream components instead of "interpolating" the
-        # colormap?
-        dparam.flags |= 1 if self.ignore_pclr_cmap_cdef else 0
+        out : ndarray, optional
+            Destination for the image data.  It must have exactly the shape
+            of the result, but may have any datatype that the image samples
+            can be cast to.
+        planar : bool, optional
+            If true, return the image with shape (bands, rows, cols) instead
+            of (rows, cols, bands).  This avoids interleaving the bands.
+        workers : int or concurrent.futures.Executor, optional
+            Decode the tiles with a pool of this many threads, each piece
+            being decoded directly into the output.  An executor may be
+            supplied instead, such as a ProcessPoolExecutor, in which case the
+            pieces are decoded by the executor and then copied into the
+            output.  Process pools require that the image be read from a
+            path or from picklable in-memory data.  Images with a palette
+            are always decoded with a single codec.
+        options : dict, optional
+            Options that apply to this read only, such as lib.num_threads,
+            see option_context.
 
-        dparam.decod_format = self._codec_format
-        dparam.cp_layer = self.layer
+        Returns
+        -------
+        ndarray
+            The image data, which is out if it was provided.
 
-        # Must check the specified rlevel against the maximum.
-        if rlevel != 0:
-            # Must check the specified rlevel against the maximum.
-            cod_seg = next(
-                filter(
-                    lambda x: x.marker_id == "COD", self.codestream.segment
-                ),
-                None
-            )
-            max_rlevel = cod_seg.num_res
-            if rlevel == -1:
-                # -1 is shorthand for the largest rlevel
-                rlevel = max_rlevel
-            elif rlevel < -1 or rlevel > max_rlevel:
-                msg = (
-                    f"rlevel must be in the range [-1, {max_rlevel}] "
-                    "for this image."
+        Examples
+        --------
+        >>> import numpy as np
+        >>> jp2 = glymur.Jp2kr(glymur.data.nemo())
+        >>> out = np.empty((3, 728, 1296), dtype=np.uint8)
+        >>> image = jp2.read(rlevel=1, out=out, planar=True)
+        >>> image is out
+        True
+        """
+        if options:
+            with option_context(options):
+                return self.read(
+                    rlevel=rlevel,
+                    area=area,
+                    tile=tile,
+                    out=out,
+                    planar=planar,
+                    workers=workers,
                 )
-                raise ValueError(msg)
-
-        dparam.cp_reduce = rlevel
 
-        if area is not None:
-            if area[0] < 0 or area[1] < 0 or area[2] <= 0 or area[3] <= 0:
-                msg = (
-                    f"The upper left corner coordinates must be nonnegative "
-                    f"and the lower right corner coordinates must be positive."
-                    f"  The specified upper left and lower right coordinates "
-                    f"are ({area[0]}, {area[1]}) and ({area[2]}, {area[3]})."
+        if workers is not None and tile is None and not tilecache.enabled():
+            pieces = self._split_along_tiles(area)
+            if len(pieces) > 1 and self._can_decode_in_pieces():
+                return self._read_pieces(
+                    pieces, rlevel, area, out, planar, workers
                 )
-                raise ValueError(msg)
-            dparam.DA_y0 = area[0]
-            dparam.DA_x0 = area[1]
-            dparam.DA_y1 = area[2]
-            dparam.DA_x1 = area[3]
-
-        if tile is not None:
-            dparam.tile_index = tile
-            dparam.nb_tile_to_decode = 1
 
-        self._dparams = dparam
+        return self._read(
+            rlevel=rlevel,
+            area=area,
+            tile=tile,
+            out=out,
+            planar=planar,
+            workers=workers,
+        )
 
-    def read_bands(
-        self,
-        rlevel=0,
-        layer=0,
-        area=None,
-        tile=None,
-        verbose=False,
-        ignore_pclr_cmap_cdef=False,
-    ):
-        """Read a JPEG 2000 image.
+    async def aread(self, area=None, rlevel=0, layer=None, options=None):
+        """Read a JPEG 2000 image without blocking the event loop.
 
-        The only time you should ever use this method is when the image has
-        different subsampling factors across components.  Otherwise you should
-        use numpy-style slicing.
+        The image is decoded in the thread pool shared by glymur's
+        coroutines, whose size is set by the async.max_workers option, so
+        many images or areas may be read concurrently.  If the coroutine is
+        cancelled before decoding starts, the image is not decoded at all.
 
         Parameters
         ----------
-        layer : int, optional
-            Number of quality layer to decode.
-        rlevel : int, optional
-            Factor by which to rlevel output resolution.
         area : tuple, optional
             Specifies decoding image area,
             (first_row, first_col, last_row, last_col)
-        tile : int, optional
-            Number of tile to decode.
-        ignore_pclr_cmap_cdef : bool
-            Whether or not to ignore the pclr, cmap, or cdef boxes during any
-            color transformation.  Defaults to False.
-        verbose : bool, optional
-            Print informational messages produced by the OpenJPEG library.
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+        layer : int, optional
+            Number of quality layer to decode.  Defaults to the layer
+            property, which is left unchanged.
+        options : dict, optional
+            Options that apply to this read only, such as lib.num_threads,
+            see option_context.
 
         Returns
         -------
-        list
-            List of the individual image components.
+        ndarray
+            The image data.
+
+        Examples
+        --------
+        >>> import asyncio
+        >>> jp2 = glymur.Jp2kr(glymur.data.nemo())
+        >>> areas = [(0, 0, 256, 256), (256, 256, 512, 512)]
+        >>> async def main():
+        ...     tasks = [jp2.aread(area=area) for area in areas]
+        ...     return await asyncio.gather(*tasks)
+        >>> [image.shape for image in asyncio.run(main())]
+        [(256, 256, 3), (256, 256, 3)]
+        """
+        def read():
+            with option_context(options):
+                return self._read(rlevel=rlevel, layer=layer, area=area)
+
+        return await aio.run(read)
+
+    def _split_along_tiles(self, area):
+        """Split a decode area along tile boundaries.
+
+        Parameters
+        ----------
+        area : tuple or None
+            (first_row, first_col, last_row, last_col) on the reference grid,
+            or None for the entire image.
+
+        Returns
+        -------
+        list
+            The areas of the pieces, in row-major order.  If the area cannot
+            be split, a list of the area itself.
+        """
+        siz = self.codestream.segment[1]
+        if area is None:
+            area = (siz.yosiz, siz.xosiz, siz.ysiz, siz.xsiz)
+
+        y0, x0, y1, x1 = area
+        if y0 < siz.yosiz or x0 < siz.xosiz or y1 > siz.ysiz or x1 > siz.xsiz:
+            # Let the regular path sort out any error.
+            return [area]
+
+        def boundaries(start, stop, origin, size):
+            first = (start - origin) // size + 1
+            interior = range(origin + first * size, stop, size)
+            return [start, *interior, stop]
+
+        rows = boundaries(y0, y1, siz.ytosiz, siz.ytsiz)
+        cols = boundaries(x0, x1, siz.xtosiz, siz.xtsiz)
+
+        return [
+            (r0, c0, r1, c1)
+            for r0, r1 in zip(rows[:-1], rows[1:])
+            for c0, c1 in zip(cols[:-1], cols[1:])
+        ]
+
+    def _can_decode_in_pieces(self):
+        """Can the output of a piecewise decode be laid out in advance?
+
+        Palettes change the number of bands and the datatype of the output,
+        and unequal components are returned as a list instead of an array.
+        """
+        jp2h = next(filter(lambda x: x.box_id == "jp2h", self.box), None)
+        if (
+            jp2h is not None
+            and not self.ignore_pclr_cmap_cdef
+            and any(box.box_id == "pclr" for box in jp2h.box)
+        ):
+            return False
+
+        try:
+            self.dtype
+        except TypeError:
+            return False
+
+        return True
+
+    def _read_pieces(self, pieces, rlevel, area, out, planar, workers):
+        """Decode an image piece by piece, each piece with its own codec.
+
+        Parameters
+        ----------
+        pieces : list
+            Areas on the reference grid that make up the full area.
+        rlevel, area, out, planar, workers
+            See the read method.
+
+        Returns
+        -------
+        ndarray
+            The image data.
+        """
+        if re.match("0|1|2.[012]", version.openjpeg_version):
+            msg = (
+                f"You must have a version of OpenJPEG at least as high as "
+                f"2.3.0 before you can read JPEG2000 images with glymur.  "
+                f"Your version is {version.openjpeg_version}"
+            )
+            raise RuntimeError(msg)
+
+        self._subsampling_sanity_check()
+
+        # Validates the arguments and resolves an rlevel of -1.
+        rlevel = self._populate_dparams(rlevel, area=area).cp_reduce
+
+        ncomponents, dx, dy = self._component_layout()
+
+        # Maps each piece to its place in the output.
+        y0, x0 = pieces[0][:2]
+        origin_row = _reduce_coordinate(y0, dy, rlevel)
+        origin_col = _reduce_coordinate(x0, dx, rlevel)
+        slices = [
+            (
+                slice(
+                    _reduce_coordinate(r0, dy, rlevel) - origin_row,
+                    _reduce_coordinate(r1, dy, rlevel) - origin_row,
+                ),
+                slice(
+                    _reduce_coordinate(c0, dx, rlevel) - origin_col,
+                    _reduce_coordinate(c1, dx, rlevel) - origin_col,
+                ),
+            )
+            for r0, c0, r1, c1 in pieces
+        ]
+        nrows, ncols = slices[-1][0].stop, slices[-1][1].stop
+
+        # Slivers along the edges of tiles may vanish at lower resolutions.
+        nonempty = [
+            (piece, (rows, cols))
+            for piece, (rows, cols) in zip(pieces, slices)
+            if rows.stop > rows.start and cols.stop > cols.start
+        ]
+
+        if ncomponents == 1:
+            shape = (nrows, ncols)
+        elif planar:
+            shape = (ncomponents, nrows, ncols)
+        else:
+            shape = (nrows, ncols, ncomponents)
+
+        if out is None:
+            image = np.empty(shape, dtype=self.dtype)
+        else:
+            image = self._validate_out(out, shape)
+
+        if not nonempty:
+            # The whole area vanishes at this resolution.
+            return image
+        pieces, slices = zip(*nonempty)
+
+        def view(rows, cols):
+            if planar and ncomponents > 1:
+                return image[:, rows, cols]
+            return image[rows, cols]
+
+        if isinstance(workers, concurrent.futures.Executor):
+            executor = workers
+            stack = ExitStack()
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(workers)
+            stack = executor
+
+        with stack:
+            if isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+                # The pieces come back by value.
+                futures = {
+                    self._submit_piece(executor, piece, rlevel, planar): s
+                    for piece, s in zip(pieces, slices)
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    view(*futures[future])[...] = future.result()
+            else:
+                # The threads see the options of the caller.
+                futures = [
+                    executor.submit(
+                        contextvars.copy_context().run,
+                        self._read_piece,
+                        piece,
+                        rlevel,
+                        view(*s),
+                        planar,
+                    )
+                    for piece, s in zip(pieces, slices)
+                ]
+                for future in futures:
+                    future.result()
+
+        return image
+
+    def _read_piece(
+        self, area, rlevel, out=None, planar=False, components=None
+    ):
+        """Decode one piece of a piecewise decode, into its place in the
+        output if given.  Safe to call concurrently.
+        """
+        dparams = self._populate_dparams(rlevel, area=area)
+        return self._read_openjp2(
+            out=out, planar=planar, dparams=dparams, components=components
+        )
+
+    def _submit_piece(
+        self, executor, area, rlevel, planar=False, components=None
+    ):
+        """Submit the decode of one piece to an executor.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Resolves to the image data of the piece.
+        """
+        if not isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+            return executor.submit(
+                contextvars.copy_context().run,
+                self._read_piece,
+                area,
+                rlevel,
+                None,
+                planar,
+                components,
+            )
+
+        if self._source is None:
+            source = self.filename
+        else:
+            source = self._source
+        return executor.submit(
+            _read_piece,
+            source,
+            area,
+            rlevel=rlevel,
+            layer=self.layer,
+            decoded_components=self._components(components),
+            ignore_pclr_cmap_cdef=self.ignore_pclr_cmap_cdef,
+            planar=planar,
+        )
+
+    def _components(self, components):
+        """The components to decode, those of the decoded_components
+        property unless given.
+        """
+        if components is None:
+            return self._decoded_components
+        return components
+
+    def _component_layout(self, components=None):
+        """Number of components decoded and the subsampling factors common
+        to them, (ncomponents, dx, dy).
+        """
+        siz = self.codestream.segment[1]
+        components = self._components(components)
+        if components is None:
+            components = range(len(siz.xrsiz))
+        return (
+            len(components),
+            siz.xrsiz[components[0]],
+            siz.yrsiz[components[0]],
+        )
+
+    def read_windows(self, areas, rlevel=0, workers=None):
+        """Read many windows of an image, decoding shared data only once.
+
+        Slicing the image once per window sets up a new codec each time and
+        decodes every tile that the window touches, even if a neighbouring
+        window has just decoded the same tiles.  Here the windows are first
+        clipped to the tiles they intersect, and within each tile the
+        overlapping and nearby pieces are coalesced into regions.  Each
+        region is decoded once and the windows are copied out of them.
+
+        Parameters
+        ----------
+        areas : iterable of tuple
+            The windows, each (first_row, first_col, last_row, last_col) as
+            with the area argument of the read method.
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+        workers : int or concurrent.futures.Executor, optional
+            Decode the regions with a pool of this many threads, or with the
+            executor supplied, as with the read method.  By default the
+            regions are decoded one after the other.
+
+        Returns
+        -------
+        list
+            The image data of the windows, in the order given.
+
+        Examples
+        --------
+        >>> jp2 = glymur.Jp2kr(glymur.data.nemo())
+        >>> areas = [(0, 0, 256, 256), (128, 128, 384, 384)]
+        >>> [chip.shape for chip in jp2.read_windows(areas)]
+        [(256, 256, 3), (256, 256, 3)]
+        """
+        areas = [tuple(area) for area in areas]
+        if not self._can_decode_in_pieces():
+            return [self.read(rlevel=rlevel, area=area) for area in areas]
+
+        if re.match("0|1|2.[012]", version.openjpeg_version):
+            msg = (
+                f"You must have at least version 2.3.0 of OpenJPEG in order "
+                f"to decode windows of an image.  Your version is "
+                f"{version.openjpeg_version}"
+            )
+            raise RuntimeError(msg)
+
+        self._subsampling_sanity_check()
+
+        # Validates the arguments and resolves an rlevel of -1.
+        rlevel = self._populate_dparams(rlevel).cp_reduce
+
+        siz = self.codestream.segment[1]
+        for y0, x0, y1, x1 in areas:
+            if not (
+                siz.yosiz <= y0 < y1 <= siz.ysiz
+                and siz.xosiz <= x0 < x1 <= siz.xsiz
+            ):
+                msg = (
+                    f"The window {(y0, x0, y1, x1)} does not lie within the "
+                    f"image."
+                )
+                raise ValueError(msg)
+
+        return self._read_windows(areas, rlevel, workers)
+
+    def _read_windows(self, areas, rlevel, workers):
+        """Read windows that are known to be valid, see read_windows.
+
+        Parameters
+        ----------
+        areas : list
+            Windows on the reference grid.
+        rlevel : int
+            Resolution level, already resolved.
+        workers : int or concurrent.futures.Executor
+            See the read method.
+
+        Returns
+        -------
+        list
+            The image data of the windows.
+        """
+        if tilecache.enabled() and self.path is not None:
+            regions = self._tile_regions(areas)
+            cached = True
+        else:
+            regions = self._coalesce_windows(areas)
+            cached = False
+
+        ncomponents, dx, dy = self._component_layout()
+        images = []
+        for area in areas:
+            r0, c0, r1, c1 = _reduce_area(area, dx, dy, rlevel)
+            if ncomponents == 1:
+                shape = (r1 - r0, c1 - c0)
+            else:
+                shape = (r1 - r0, c1 - c0, ncomponents)
+            images.append(np.empty(shape, dtype=self.dtype))
+
+        self._fill_windows(areas, images, regions, rlevel, workers, cached)
+        return images
+
+    def _fill_windows(
+        self, areas, images, regions, rlevel, workers, cached,
+        components=None,
+    ):
+        """Decode regions of the image and copy the windows out of them.
+
+        Parameters
+        ----------
+        areas : list
+            Windows on the reference grid.
+        images : list
+            Destinations of the windows, with the bands last.
+        regions : list
+            Areas on the reference grid that together cover the windows.
+        rlevel : int
+            Resolution level, already resolved.
+        workers : int or concurrent.futures.Executor
+            See the read method.
+        cached : bool
+            If true, the regions are tiles to be looked up in the tile cache.
+        components : list, optional
+            The components to decode, by default those of the
+            decoded_components property.
+        """
+        ncomponents, dx, dy = self._component_layout(components)
+        windows = [_reduce_area(area, dx, dy, rlevel) for area in areas]
+
+        # Slivers along the edges of tiles may vanish at lower resolutions.
+        regions = [
+            region for region in regions
+            if _is_nonempty(_reduce_area(region, dx, dy, rlevel))
+        ]
+
+        for region, image in self._decode_regions(
+            regions, rlevel, workers, cached, components
+        ):
+            top, left, bottom, right = _reduce_area(region, dx, dy, rlevel)
+            for (r0, c0, r1, c1), window in zip(windows, images):
+                y0, y1 = max(r0, top), min(r1, bottom)
+                x0, x1 = max(c0, left), min(c1, right)
+                if y0 < y1 and x0 < x1:
+                    window[y0 - r0:y1 - r0, x0 - c0:x1 - c0] = (
+                        image[y0 - top:y1 - top, x0 - left:x1 - left]
+                    )
+
+    def _can_use_tile_cache(self, area, rlevel, components=None):
+        """Can a read of this area be served from the tile cache?"""
+        if (
+            not tilecache.enabled()
+            or self.path is None
+            or not self._can_decode_in_pieces()
+        ):
+            return False
+
+        siz = self.codestream.segment[1]
+        if area is None:
+            area = (siz.yosiz, siz.xosiz, siz.ysiz, siz.xsiz)
+        y0, x0, y1, x1 = area
+        if not (
+            siz.yosiz <= y0 < y1 <= siz.ysiz
+            and siz.xosiz <= x0 < x1 <= siz.xsiz
+        ):
+            # Let the regular path sort out any error.
+            return False
+
+        ncomponents, dx, dy = self._component_layout(components)
+        if not _is_nonempty(_reduce_area(area, dx, dy, rlevel)):
+            return False
+
+        # A tile too large for the cache would be decoded in full by every
+        # read and then thrown away, so decode just the area instead.
+        height = -(-min(siz.ytsiz, siz.ysiz - siz.yosiz) // (dy << rlevel))
+        width = -(-min(siz.xtsiz, siz.xsiz - siz.xosiz) // (dx << rlevel))
+        nbytes = height * width * ncomponents * self.dtype.itemsize
+        return nbytes <= get_option("cache.max_bytes")
+
+    def _read_cached(
+        self, rlevel, area, out, planar, workers, components=None
+    ):
+        """Assemble an image area from cached tiles, decoding and caching
+        those that are missing.
+
+        Parameters
+        ----------
+        rlevel : int
+            Resolution level, already resolved.
+        area, out, planar, workers
+            See the read method.
+        components : list, optional
+            The components to decode, by default those of the
+            decoded_components property.
+
+        Returns
+        -------
+        ndarray
+            The image data.
+        """
+        if area is None:
+            siz = self.codestream.segment[1]
+            area = (siz.yosiz, siz.xosiz, siz.ysiz, siz.xsiz)
+
+        ncomponents, dx, dy = self._component_layout(components)
+        r0, c0, r1, c1 = _reduce_area(area, dx, dy, rlevel)
+        if ncomponents == 1:
+            shape = (r1 - r0, c1 - c0)
+        elif planar:
+            shape = (ncomponents, r1 - r0, c1 - c0)
+        else:
+            shape = (r1 - r0, c1 - c0, ncomponents)
+
+        if out is None:
+            image = np.empty(shape, dtype=self.dtype)
+        else:
+            image = self._validate_out(out, shape)
+
+        if planar and ncomponents > 1:
+            window = np.moveaxis(image, 0, -1)
+        else:
+            window = image
+
+        regions = self._tile_regions([area])
+        self._fill_windows(
+            [area], [window], regions, rlevel, workers, True, components
+        )
+        return image
+
+    def _tile_regions(self, areas):
+        """The areas of the tiles intersecting any of the given areas,
+        clipped to the image.
+        """
+        siz = self.codestream.segment[1]
+
+        regions = set()
+        for area in areas:
+            for y0, x0, _, _ in self._split_along_tiles(area):
+                ty = (y0 - siz.ytosiz) // siz.ytsiz
+                tx = (x0 - siz.xtosiz) // siz.xtsiz
+                regions.add((
+                    max(siz.ytosiz + ty * siz.ytsiz, siz.yosiz),
+                    max(siz.xtosiz + tx * siz.xtsiz, siz.xosiz),
+                    min(siz.ytosiz + (ty + 1) * siz.ytsiz, siz.ysiz),
+                    min(siz.xtosiz + (tx + 1) * siz.xtsiz, siz.xsiz),
+                ))
+
+        return sorted(regions)
+
+    def _tile_cache_key(self, identity, region, rlevel, components=None):
+        """Key of a tile in the tile cache.
+
+        Parameters
+        ----------
+        identity : tuple
+            Identifies the version of the file, see _file_identity.
+        region : tuple
+            Area of the tile on the reference grid.
+        rlevel : int
+            Resolution level, already resolved.
+        components : list, optional
+            The components decoded, by default those of the
+            decoded_components property.
+        """
+        siz = self.codestream.segment[1]
+        num_tiles_x = -(-(siz.xsiz - siz.xtosiz) // siz.xtsiz)
+        ty = (region[0] - siz.ytosiz) // siz.ytsiz
+        tx = (region[1] - siz.xtosiz) // siz.xtsiz
+
+        components = self._components(components)
+        if components is not None:
+            components = tuple(components)
+
+        return (
+            identity,
+            ty * num_tiles_x + tx,
+            rlevel,
+            self.layer,
+            components,
+            self.ignore_pclr_cmap_cdef,
+        )
+
+    def _file_identity(self):
+        """Identify the file by its path, modification time and size, so
+        that tiles cached from a file that has since changed are not used.
+        """
+        st = self.path.stat()
+        return (str(self.path.resolve()), st.st_mtime_ns, st.st_size)
+
+    def _coalesce_windows(self, areas):
+        """Clip windows to the tiles they intersect and coalesce the pieces
+        within each tile into regions to be decoded.
+
+        Parameters
+        ----------
+        areas : list
+            Windows on the reference grid.
+
+        Returns
+        -------
+        list
+            Areas on the reference grid, none of which crosses a tile
+            boundary, that together cover the windows.
+        """
+        siz = self.codestream.segment[1]
+
+        tiles = {}
+        for area in areas:
+            for piece in self._split_along_tiles(area):
+                tile = (
+                    (piece[0] - siz.ytosiz) // siz.ytsiz,
+                    (piece[1] - siz.xtosiz) // siz.xtsiz,
+                )
+                tiles.setdefault(tile, []).append(piece)
+
+        return [
+            region
+            for pieces in tiles.values()
+            for region in _coalesce(pieces)
+        ]
+
+    def _decode_regions(
+        self, regions, rlevel, workers, cached=False, components=None
+    ):
+        """Decode regions of the image, possibly concurrently.
+
+        Parameters
+        ----------
+        regions : list
+            Areas on the reference grid.
+        rlevel : int
+            Resolution level, already resolved.
+        workers : int or concurrent.futures.Executor
+            See the read method.
+        cached : bool, optional
+            If true, the regions are tiles.  Those found in the tile cache are
+            not decoded, the others are added to it.
+        components : list, optional
+            The components to decode, by default those of the
+            decoded_components property.
+
+        Yields
+        ------
+        tuple
+            The region and its image data, in order of completion.
+        """
+        if cached:
+            identity = self._file_identity()
+            keys = {
+                region: self._tile_cache_key(
+                    identity, region, rlevel, components
+                )
+                for region in regions
+            }
+            missing = []
+            for region in regions:
+                image = tilecache._cache.get(keys[region])
+                if image is None:
+                    missing.append(region)
+                else:
+                    yield region, image
+            for region, image in self._decode_regions(
+                missing, rlevel, workers, components=components
+            ):
+                tilecache._cache.put(keys[region], image)
+                yield region, image
+            return
+
+        if workers is None:
+            for region in regions:
+                yield region, self._read_piece(
+                    region, rlevel, components=components
+                )
+            return
+
+        if isinstance(workers, concurrent.futures.Executor):
+            executor = workers
+            stack = ExitStack()
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(workers)
+            stack = executor
+
+        with stack:
+            futures = {
+                self._submit_piece(
+                    executor, region, rlevel, components=components
+                ): region
+                for region in regions
+            }
+            for future in concurrent.futures.as_completed(futures):
+                yield futures[future], future.result()
+
+    def _read_openjp2(
+        self, out=None, planar=False, dparams=None, components=None
+    ):
+        """Read a JPEG 2000 image using libopenjp2.
+
+        Parameters
+        ----------
+        out : ndarray or list, optional
+            Destination for the image data, see _extract_image.
+        planar : bool, optional
+            If true, the bands make up the first dimension of the image.
+        dparams : DecompressionParametersType, optional
+            Decompression parameters, defaults to those most recently
+            populated.
+        components : list, optional
+            The components to decode, by default those of the
+            decoded_components property.
+
+        Returns
+        -------
+        ndarray or lst
+            Either the image as an ndarray or a list of ndarrays, each item
+            corresponding to one band.
+        """
+        if dparams is None:
+            dparams = self._dparams
+        components = self._components(components)
+
+        with ExitStack() as stack:
+            stream = self._create_stream(stack)
+            codec = self._create_decompressor(dparams, stack, components)
+
+            raw_image = opj2.read_header(stream, codec)
+            stack.callback(opj2.image_destroy, raw_image)
+
+            if components is not None:
+                opj2.set_decoded_components(codec, components)
+
+            if dparams.nb_tile_to_decode:
+                opj2.get_decoded_tile(
+                    codec, stream, raw_image, dparams.tile_index
+                )
+            else:
+                opj2.set_decode_area(
+                    codec,
+                    raw_image,
+                    dparams.DA_x0,
+                    dparams.DA_y0,
+                    dparams.DA_x1,
+                    dparams.DA_y1,
+                )
+                opj2.decode(codec, stream, raw_image)
+
+            opj2.end_decompress(codec, stream)
+
+            image = self._extract_image(raw_image, out=out, planar=planar)
+
+        return image
+
+    def _create_decompressor(self, dparams, stack, components=None):
+        """Create a decompression codec set up with the given parameters.
+
+        Parameters
+        ----------
+        dparams : DecompressionParametersType
+            Decompression parameters, see _populate_dparams.
+        stack : ExitStack
+            Destroys the codec when closed.
+        components : list, optional
+            The components to be decoded, by default those of the
+            decoded_components property.
+
+        Returns
+        -------
+        codec : CODEC_TYPE
+        """
+        codec = opj2.create_decompress(self._codec_format)
+        stack.callback(opj2.destroy_codec, codec)
+
+        opj2.add_message_handlers(codec, verbose=self._verbose)
+        opj2.setup_decoder(codec, dparams)
+        if version.openjpeg_version >= "2.2.0":
+            num_threads = threads.num_threads(
+                "decode", self._decode_codeblocks(dparams, components), stack
+            )
+            opj2.codec_set_threads(codec, num_threads)
+
+        return codec
+
+    def _decode_codeblocks(self, dparams, components=None):
+        """Estimate the code-blocks per tile that a decode processes, see
+        glymur.threads.
+        """
+        siz = self.codestream.segment[1]
+        cod = next(
+            filter(lambda x: x.marker_id == "COD", self.codestream.segment),
+            None
+        )
+
+        if dparams.DA_x1 > dparams.DA_x0 and dparams.DA_y1 > dparams.DA_y0:
+            height = dparams.DA_y1 - dparams.DA_y0
+            width = dparams.DA_x1 - dparams.DA_x0
+        else:
+            height = siz.ysiz - siz.yosiz
+            width = siz.xsiz - siz.xosiz
+
+        # Tiles are decoded one after the other.
+        factor = 2 ** dparams.cp_reduce
+        height = math.ceil(min(height, siz.ytsiz) / factor)
+        width = math.ceil(min(width, siz.xtsiz) / factor)
+
+        components = self._components(components)
+        if components is None:
+            ncomps = siz.Csiz
+        else:
+            ncomps = len(components)
+
+        return threads.count_codeblocks(
+            height, width, cod.code_block_size, ncomps
+        )
+
+    def _num_tiles(self):
+        """Number of tiles in the image according to the SIZ segment."""
+        siz = self.codestream.segment[1]
+        num_tile_cols = -(-(siz.xsiz - siz.xtosiz) // siz.xtsiz)
+        num_tile_rows = -(-(siz.ysiz - siz.ytosiz) // siz.ytsiz)
+        return num_tile_rows * num_tile_cols
+
+    def session(self):
+        """Return an object that decodes successive reads with one codec.
+
+        Every ordinary read creates a new file stream and a new codec and
+        parses the main header all over again.  Within a session the stream,
+        the codec, and the parsed header are kept alive so that each
+        additional read only sets a new decode area.  This makes many small
+        window reads of the same image far cheaper.
+
+        The codec must be recreated whenever the resolution level, the
+        quality layer, or the decoded components change, and OpenJPEG only
+        permits repeated decodes of images consisting of a single tile.
+        The session takes care of this automatically.
+
+        A session should not be shared between threads.
+
+        Examples
+        --------
+        >>> jp2 = glymur.Jp2kr(glymur.data.nemo())
+        >>> with jp2.session() as s:
+        ...     a = s[0:64, 0:64]
+        ...     b = s[512:576, 1024:1088]
+        >>> b.shape
+        (64, 64, 3)
+        """
+        return _DecodeSession(self)
+
+    def iter_tiles(self, rlevel=0, components=None):
+        """Iterate over the tiles of the image, decoding each exactly once.
+
+        The tiles are decoded sequentially in the order in which they appear
+        in the codestream, all with a single codec.  Only a single tile is
+        held in memory at any one time, so this is the most economical way of
+        processing every pixel of a very large tiled image.  If only some of
+        the components are wanted, each tile is instead decoded by a codec
+        of its own that decodes just those components.
+
+        Palettes, component mappings, and channel definitions are not applied
+        to the tiles, i.e. it is as if ignore_pclr_cmap_cdef were True.
+
+        Parameters
+        ----------
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+        components : list-like, optional
+            Indices of the image bands to yield.  If not provided, the
+            decoded_components property is respected.  Should the MCT be in
+            use, some but not all of the first three components cannot be
+            decoded by themselves, so all of the components are decoded.
+
+        Yields
+        ------
+        tile_index : int
+            Index of the tile in the codestream.
+        area : tuple
+            (first_row, first_col, last_row, last_col) of the tile in the
+            image at the requested resolution level.
+        image : ndarray
+            The tile image data.
+
+        Examples
+        --------
+        >>> import skimage.data
+        >>> jp2 = glymur.Jp2k(
+        ...     'astronaut.jp2', data=skimage.data.astronaut(),
+        ...     tilesize=(256, 256)
+        ... )
+        >>> for tile_index, area, image in jp2.iter_tiles(rlevel=1):
+        ...     print(tile_index, area, image.shape)
+        0 (0, 0, 128, 128) (128, 128, 3)
+        1 (0, 128, 128, 256) (128, 128, 3)
+        2 (128, 0, 256, 128) (128, 128, 3)
+        3 (128, 128, 256, 256) (128, 128, 3)
+        """
+        if re.match("0|1|2.[012]", version.openjpeg_version):
+            msg = (
+                f"You must have a version of OpenJPEG at least as high as "
+                f"2.3.0 before you can read JPEG2000 images with glymur.  "
+                f"Your version is {version.openjpeg_version}"
+            )
+            raise RuntimeError(msg)
+
+        if components is None:
+            components = self._decoded_components
+
+        # Check everything up front rather than when iteration starts.
+        dparams = self._populate_dparams(rlevel)
+        self._subsampling_sanity_check(components)
+
+        if components is not None:
+            components = [int(c) for c in components]
+            nbands = len(self.codestream.segment[1].xrsiz)
+            if (
+                set(components) != set(range(nbands))
+                and self._can_restrict_components(components)
+            ):
+                return self._iter_tiles_restricted(
+                    dparams.cp_reduce, components
+                )
+
+        return self._iter_tiles(dparams, components)
+
+    def _iter_tiles_restricted(self, rlevel, components):
+        """Decode each tile in turn, decoding only some of the components,
+        see iter_tiles.
+
+        OpenJPEG only restricts the components when decoding a whole tile
+        into the image, so each tile gets a codec of its own.
+
+        Parameters
+        ----------
+        rlevel : int
+            Resolution level, already resolved.
+        components : list
+            Indices of the image bands to yield.
+        """
+        siz = self.codestream.segment[1]
+        unique = sorted(set(components))
+        index = [unique.index(c) for c in components]
+        _, dx, dy = self._component_layout(unique)
+
+        origin_row = _reduce_coordinate(siz.yosiz, dy, rlevel)
+        origin_col = _reduce_coordinate(siz.xosiz, dx, rlevel)
+        num_tiles_x = -(-(siz.xsiz - siz.xtosiz) // siz.xtsiz)
+
+        # The tiles in the order in which they first appear.
+        tiles = dict.fromkeys(int(tile) for tile in self.tile_index["tile"])
+        for tile_index in tiles:
+            ty, tx = divmod(tile_index, num_tiles_x)
+            y0 = max(siz.ytosiz + ty * siz.ytsiz, siz.yosiz)
+            x0 = max(siz.xtosiz + tx * siz.xtsiz, siz.xosiz)
+            y1 = min(siz.ytosiz + (ty + 1) * siz.ytsiz, siz.ysiz)
+            x1 = min(siz.xtosiz + (tx + 1) * siz.xtsiz, siz.xsiz)
+            area = (
+                _reduce_coordinate(y0, dy, rlevel) - origin_row,
+                _reduce_coordinate(x0, dx, rlevel) - origin_col,
+                _reduce_coordinate(y1, dy, rlevel) - origin_row,
+                _reduce_coordinate(x1, dx, rlevel) - origin_col,
+            )
+
+            dparams = self._populate_dparams(rlevel, tile=tile_index)
+            image = self._read_openjp2(dparams=dparams, components=unique)
+            if index != list(range(len(unique))):
+                image = np.atleast_3d(image)[:, :, index]
+
+            yield tile_index, area, image
+
+    def _iter_tiles(self, dparams, components):
+        """Decode each tile in turn, see iter_tiles.
+
+        Parameters
+        ----------
+        dparams : DecompressionParametersType
+            Decompression parameters, see _populate_dparams.
+        components : list-like or None
+            Indices of the image bands to yield.
+        """
+        siz = self.codestream.segment[1]
+        rlevel = dparams.cp_reduce
+
+        with ExitStack() as stack:
+            stream = self._create_stream(stack)
+            codec = self._create_decompressor(dparams, stack)
+
+            raw_image = opj2.read_header(stream, codec)
+            stack.callback(opj2.image_destroy, raw_image)
+
+            # The bands are assumed to all be the same, which was verified
+            # by the subsampling sanity check.
+            component = raw_image.contents.comps[0]
+            dtype = self._component2dtype(component)
+            dx, dy = component.dx, component.dy
+            ncomps = raw_image.contents.numcomps
+
+            # The tile data is decoded into a scratch buffer that is reused
+            # from tile to tile.
+            buffer = np.empty(0, dtype=np.uint8)
+
+            while True:
+                tile_index, data_size, x0, y0, x1, y1, _, go_on = (
+                    opj2.read_tile_header(codec, stream)
+                )
+                if not go_on:
+                    break
+
+                if data_size > buffer.size:
+                    buffer = np.empty(data_size, dtype=np.uint8)
+                opj2.decode_tile_data(
+                    codec, tile_index, buffer, data_size, stream
+                )
+
+                origin_row = _reduce_coordinate(siz.yosiz, dy, rlevel)
+                origin_col = _reduce_coordinate(siz.xosiz, dx, rlevel)
+                area = (
+                    _reduce_coordinate(y0, dy, rlevel) - origin_row,
+                    _reduce_coordinate(x0, dx, rlevel) - origin_col,
+                    _reduce_coordinate(y1, dy, rlevel) - origin_row,
+                    _reduce_coordinate(x1, dx, rlevel) - origin_col,
+                )
+                nrows, ncols = area[2] - area[0], area[3] - area[1]
+
+                # The tile data is planar.
+                bands = buffer[:data_size].view(dtype)
+                bands = bands.reshape(ncomps, nrows, ncols)
+                if components is not None:
+                    bands = bands[list(components)]
+
+                if bands.shape[0] == 1:
+                    image = bands[0].copy()
+                else:
+                    image = np.empty((nrows, ncols, bands.shape[0]), dtype)
+                    np.copyto(image, np.moveaxis(bands, 0, -1))
+
+                yield tile_index, area, image
+
+            opj2.end_decompress(codec, stream)
+
+    def iter_layers(self, area=None, rlevel=0):
+        """Iterate over successively refined versions of the image, one for
+        each number of quality layers.
+
+        The first image, decoded from just the first quality layer, takes
+        only a fraction of the time of a full quality read, so it may be
+        displayed right away and then replaced by each refinement as it
+        arrives.  The last image is decoded from all of the quality layers.
+
+        OpenJPEG fixes the number of quality layers to decode when the codec
+        is set up, and it cannot resume decoding packets where a previous
+        decode left off, so each refinement is decoded by a codec of its
+        own.
+
+        Parameters
+        ----------
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+
+        Yields
+        ------
+        layers : int
+            Number of quality layers decoded, from 1 up to the number of
+            layers in the image.
+        image : ndarray
+            The image data.
+
+        Examples
+        --------
+        >>> import skimage.data
+        >>> jp2 = glymur.Jp2k(
+        ...     'astronaut.jp2', data=skimage.data.astronaut(),
+        ...     cratios=[100, 20, 1]
+        ... )
+        >>> for layers, image in jp2.iter_layers(rlevel=1):
+        ...     print(layers, image.shape)
+        1 (256, 256, 3)
+        2 (256, 256, 3)
+        3 (256, 256, 3)
+        """
+        if re.match("0|1|2.[012]", version.openjpeg_version):
+            msg = (
+                f"You must have a version of OpenJPEG at least as high as "
+                f"2.3.0 before you can read JPEG2000 images with glymur.  "
+                f"Your version is {version.openjpeg_version}"
+            )
+            raise RuntimeError(msg)
+
+        # Check everything up front rather than when iteration starts.
+        self._subsampling_sanity_check()
+        self._populate_dparams(rlevel, area=area)
+
+        cod = next(
+            filter(lambda x: x.marker_id == "COD", self.codestream.segment),
+            None
+        )
+        return self._iter_layers(area, rlevel, cod.layers)
+
+    def _iter_layers(self, area, rlevel, num_layers):
+        """Decode the image with ever more quality layers, see iter_layers.
+        """
+        for layers in range(1, num_layers + 1):
+            dparams = self._populate_dparams(rlevel, area=area)
+
+            # Zero decodes every layer.
+            dparams.cp_layer = 0 if layers == num_layers else layers
+
+            yield layers, self._read_openjp2(dparams=dparams)
+
+    def to_lazy_array(self, rlevel=0, chunks="tiles"):
+        """Return an array that decodes the image only as it is needed.
+
+        The chunks of the array are aligned with the tiles of the image, so
+        each chunk is decoded from its own tiles alone.  If dask is
+        installed, a dask array is returned, and slicing and reductions are
+        only evaluated upon compute, chunk by chunk and in parallel.
+        Otherwise a glymur.lazy.LazyArray is returned, which decodes just the
+        area covered by each slicing operation.
+
+        Parameters
+        ----------
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+        chunks : 'tiles' or tuple, optional
+            Either one chunk per tile, or the approximate (rows, cols) of the
+            chunks at the requested resolution, which are rounded to whole
+            numbers of tiles.
+
+        Returns
+        -------
+        dask.array.Array or glymur.lazy.LazyArray
+
+        Examples
+        --------
+        >>> import skimage.data
+        >>> jp2 = glymur.Jp2k(
+        ...     'astronaut.jp2', data=skimage.data.astronaut(),
+        ...     tilesize=(256, 256)
+        ... )
+        >>> a = jp2.to_lazy_array(rlevel=1)
+        >>> a.chunks
+        ((128, 128), (128, 128), (3,))
+        >>> a[:64, :64].shape
+        (64, 64, 3)
+        """
+        if re.match("0|1|2.[012]", version.openjpeg_version):
+            msg = (
+                f"You must have at least version 2.3.0 of OpenJPEG in order "
+                f"to decode windows of an image.  Your version is "
+                f"{version.openjpeg_version}"
+            )
+            raise RuntimeError(msg)
+
+        if not self._can_decode_in_pieces():
+            msg = (
+                f"{self._name} cannot be read lazily, as its components "
+                f"differ in datatype or it has a palette."
+            )
+            raise RuntimeError(msg)
+
+        self._subsampling_sanity_check()
+
+        # Validates the arguments and resolves an rlevel of -1.
+        rlevel = self._populate_dparams(rlevel).cp_reduce
+
+        if chunks != "tiles" and (
+            not isinstance(chunks, tuple)
+            or len(chunks) != 2
+            or any(not isinstance(x, int) or x < 1 for x in chunks)
+        ):
+            msg = (
+                f"chunks must be 'tiles' or a tuple of two positive "
+                f"integers, not {chunks!r}."
+            )
+            raise ValueError(msg)
+
+        rows, cols = self._chunk_edges(rlevel, chunks)
+        array = lazy.LazyArray(self, rlevel, rows, cols)
+        if lazy._HAVE_DASK:
+            return array.to_dask()
+        return array
+
+    def pyramid(self):
+        """Return the resolution levels of the image.
+
+        Each level is a lazy view of the image at one resolution, from the
+        full resolution image down to the lowest resolution thumbnail.
+        Slicing a level decodes just that area at that resolution, so no
+        coordinate arithmetic is needed to serve a window of a level.  The
+        geometry of every level, including its tile grid, is worked out
+        once and reused by every subsequent read.
+
+        Returns
+        -------
+        tuple of glymur.lazy.PyramidLevel
+            The levels, indexed by resolution level.
+
+        Examples
+        --------
+        >>> jp2 = glymur.Jp2kr(glymur.data.nemo())
+        >>> [level.shape for level in jp2.pyramid()]  # doctest: +ELLIPSIS
+        [(1456, 2592, 3), (728, 1296, 3), (364, 648, 3), ..., (46, 81, 3)]
+        >>> jp2.pyramid()[2][100:164, 200:264].shape
+        (64, 64, 3)
+        """
+        # The levels depend on the bands to be decoded.
+        key = (
+            None if self._decoded_components is None
+            else tuple(self._decoded_components),
+            self.ignore_pclr_cmap_cdef,
+        )
+
+        if self._pyramid is None or self._pyramid[0] != key:
+            if re.match("0|1|2.[012]", version.openjpeg_version):
+                msg = (
+                    f"You must have at least version 2.3.0 of OpenJPEG in "
+                    f"order to decode windows of an image.  Your version is "
+                    f"{version.openjpeg_version}"
+                )
+                raise RuntimeError(msg)
+
+            if not self._can_decode_in_pieces():
+                msg = (
+                    f"{self._name} cannot be read lazily, as its components "
+                    f"differ in datatype or it has a palette."
+                )
+                raise RuntimeError(msg)
+
+            self._subsampling_sanity_check()
+
+            cod = next(
+                filter(
+                    lambda x: x.marker_id == "COD", self.codestream.segment
+                ),
+                None
+            )
+
+            # The precinct sizes run from the lowest resolution up, with a
+            # single maximal size if none were specified.
+            if cod.precinct_size.ndim == 1:
+                sizes = [cod.precinct_size] * (cod.num_res + 1)
+            else:
+                sizes = cod.precinct_size[::-1]
+
+            levels = []
+            for rlevel in range(cod.num_res + 1):
+                rows, cols = self._chunk_edges(rlevel, "tiles")
+                width, height = sizes[rlevel]
+                levels.append(
+                    lazy.PyramidLevel(
+                        self, rlevel, rows, cols, (int(height), int(width))
+                    )
+                )
+            self._pyramid = key, tuple(levels)
+
+        return self._pyramid[1]
+
+    def _chunk_edges(self, rlevel, chunks):
+        """Chunk boundaries of a lazy array, see to_lazy_array.
+
+        Returns
+        -------
+        tuple
+            The row and column boundaries of the chunks at the resolution
+            level, each starting at zero.
+        """
+        siz = self.codestream.segment[1]
+        _, dx, dy = self._component_layout()
+
+        def edges(start, stop, origin, size, d, length):
+            first = (start - origin) // size + 1
+            lst = [start, *range(origin + first * size, stop, size), stop]
+
+            # Slivers along the edges of tiles may vanish at lower
+            # resolutions.
+            lst = sorted(set(_reduce_coordinate(x, d, rlevel) for x in lst))
+
+            if length is not None:
+                step = max(1, round(length / (size / d / 2 ** rlevel)))
+                lst = lst[:-1:step] + lst[-1:]
+
+            return [x - lst[0] for x in lst]
+
+        if chunks == "tiles":
+            chunks = (None, None)
+
+        return (
+            edges(siz.yosiz, siz.ysiz, siz.ytosiz, siz.ytsiz, dy, chunks[0]),
+            edges(siz.xosiz, siz.xsiz, siz.xtosiz, siz.xtsiz, dx, chunks[1]),
+        )
+
+    def _window_area(self, window, rlevel):
+        """The smallest area on the reference grid that reduces to a window
+        of the image at a resolution level.
+
+        Parameters
+        ----------
+        window : tuple
+            (first_row, first_col, last_row, last_col) of the image at the
+            resolution level, counting from zero.
+        rlevel : int
+            Resolution level, already resolved.
+        """
+        siz = self.codestream.segment[1]
+        _, dx, dy = self._component_layout()
+        sy, sx = dy * 2 ** rlevel, dx * 2 ** rlevel
+
+        origin_row = _reduce_coordinate(siz.yosiz, dy, rlevel)
+        origin_col = _reduce_coordinate(siz.xosiz, dx, rlevel)
+
+        r0, c0, r1, c1 = window
+        return (
+            max((origin_row + r0) * sy, siz.yosiz),
+            max((origin_col + c0) * sx, siz.xosiz),
+            min((origin_row + r1) * sy, siz.ysiz),
+            min((origin_col + c1) * sx, siz.xsiz),
+        )
+
+    def _populate_dparams(self, rlevel, tile=None, area=None):
+        """Populate decompression structure with appropriate input parameters.
+
+        Parameters
+        ----------
+        rlevel : int
+            Factor by which to rlevel output resolution.
+        area : tuple
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        tile : int
+            Number of tile to decode.
+
+        Returns
+        -------
+        DecompressionParametersType
+            The decompression parameters, also retained as an attribute.
+        """
+        dparam = opj2.set_default_decoder_parameters()
+
+        infile = b"" if self.filename is None else self.filename.encode()
+        nelts = opj2.PATH_LEN - len(infile)
+        infile += b"0" * nelts
+        dparam.infile = infile
+
+        # Return raw codestream components instead of "interpolating" the
+        # colormap?
+        dparam.flags |= 1 if self.ignore_pclr_cmap_cdef else 0
+
+        dparam.decod_format = self._codec_format
+        dparam.cp_layer = self.layer
+
+        # Must check the specified rlevel against the maximum.
+        if rlevel != 0:
+            # Must check the specified rlevel against the maximum.
+            cod_seg = next(
+                filter(
+                    lambda x: x.marker_id == "COD", self.codestream.segment
+                ),
+                None
+            )
+            max_rlevel = cod_seg.num_res
+            if rlevel == -1:
+                # -1 is shorthand for the largest rlevel
+                rlevel = max_rlevel
+            elif rlevel < -1 or rlevel > max_rlevel:
+                msg = (
+                    f"rlevel must be in the range [-1, {max_rlevel}] "
+                    "for this image."
+                )
+                raise ValueError(msg)
+
+        dparam.cp_reduce = rlevel
+
+        if area is not None:
+            if area[0] < 0 or area[1] < 0 or area[2] <= 0 or area[3] <= 0:
+                msg = (
+                    f"The upper left corner coordinates must be nonnegative "
+                    f"and the lower right corner coordinates must be positive."
+                    f"  The specified upper left and lower right coordinates "
+                    f"are ({area[0]}, {area[1]}) and ({area[2]}, {area[3]})."
+                )
+                raise ValueError(msg)
+            dparam.DA_y0 = area[0]
+            dparam.DA_x0 = area[1]
+            dparam.DA_y1 = area[2]
+            dparam.DA_x1 = area[3]
+
+        if tile is not None:
+            dparam.tile_index = tile
+            dparam.nb_tile_to_decode = 1
+
+        self._dparams = dparam
+        return dparam
+
+    def read_bands(
+        self,
+        rlevel=0,
+        layer=0,
+        area=None,
+        tile=None,
+        verbose=False,
+        ignore_pclr_cmap_cdef=False,
+        out=None,
+        planar=False,
+    ):
+        """Read a JPEG 2000 image.
+
+        The only time you should ever use this method is when the image has
+        different subsampling factors across components.  Otherwise you should
+        use numpy-style slicing or the read method.
+
+        Parameters
+        ----------
+        layer : int, optional
+            Number of quality layer to decode.
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        tile : int, optional
+            Number of tile to decode.
+        ignore_pclr_cmap_cdef : bool
+            Whether or not to ignore the pclr, cmap, or cdef boxes during any
+            color transformation.  Defaults to False.
+        verbose : bool, optional
+            Print informational messages produced by the OpenJPEG library.
+        out : ndarray or list of ndarrays, optional
+            Destination for the image data.  If the components all have the
+            same size, this is a single array as with the read method,
+            otherwise a list with one array for each component.
+        planar : bool, optional
+            If the components all have the same size, return them with shape
+            (bands, rows, cols) instead of (rows, cols, bands).
+
+        Returns
+        -------
+        list
+            List of the individual image components.
 
         See also
         --------
@@ -889,16 +2616,23 @@ class Jp2kr(Jp2kBox):
         self.ignore_pclr_cmap_cdef = ignore_pclr_cmap_cdef
         self.layer = layer
         self._populate_dparams(rlevel, tile=tile, area=area)
-        lst = self._read_openjp2()
+        lst = self._read_openjp2(out=out, planar=planar)
         return lst
 
-    def _extract_image(self, raw_image):
+    def _extract_image(self, raw_image, out=None, planar=False):
         """Extract unequally-sized image bands.
 
         Parameters
         ----------
         raw_image : reference to openjpeg ImageType instance
             The image structure initialized with image characteristics.
+        out : ndarray or list, optional
+            Preallocated destination for the image data.  An ndarray if the
+            components are equally-sized, otherwise a list of ndarrays.  The
+            datatype may differ from that of the image.
+        planar : bool, optional
+            If true and the components are equally-sized, the image has
+            shape (bands, rows, cols) instead of (rows, cols, bands).
 
         Returns
         -------
@@ -923,37 +2657,93 @@ class Jp2kr(Jp2kBox):
         )
 
         if is_cube:
-            image = np.zeros((nrows[0], ncols[0], ncomps), dtypes[0])
+            if ncomps == 1:
+                shape = (nrows[0], ncols[0])
+            elif planar:
+                shape = (ncomps, nrows[0], ncols[0])
+            else:
+                shape = (nrows[0], ncols[0], ncomps)
+
+            if out is None:
+                image = np.empty(shape, dtypes[0])
+            else:
+                image = self._validate_out(out, shape)
+
+            # Views into the image, one for each band.
+            if ncomps == 1:
+                bands = [image]
+            elif planar:
+                bands = list(image)
+            else:
+                bands = [image[:, :, k] for k in range(ncomps)]
+
+        elif out is None:
+            image = [
+                np.empty((r, c), d) for r, c, d in zip(nrows, ncols, dtypes)
+            ]
+            bands = image
+
         else:
-            image = []
+            if isinstance(out, np.ndarray) or len(out) != ncomps:
+                msg = (
+                    f"The image components differ in size, so out must be a "
+                    f"list of {ncomps} arrays."
+                )
+                raise ValueError(msg)
+            image = [
+                self._validate_out(x, (r, c))
+                for x, r, c in zip(out, nrows, ncols)
+            ]
+            bands = image
 
         for k in range(raw_image.contents.numcomps):
             component = raw_image.contents.comps[k]
 
             self._validate_nonzero_image_size(nrows[k], ncols[k], k)
 
+            # Wrap the OpenJPEG buffer without going through its ctypes
+            # format string, which older versions of numpy warn about.
+            # Suppressing that warning would mean toggling the filters of
+            # every thread.
             addr = ctypes.addressof(component.data.contents)
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
+            nelts = ncols[k] * nrows[k]
+            buffer = (ctypes.c_int32 * nelts).from_address(addr)
+            band_i32 = np.frombuffer(buffer, dtype=np.int32).reshape(
+                nrows[k], ncols[k]
+            )
 
-                band_i32 = np.ctypeslib.as_array(
-                    (ctypes.c_int32 * nrows[k] * ncols[k]).from_address(addr)
-                )
-                band = np.reshape(
-                    band_i32.astype(dtypes[k]), (nrows[k], ncols[k])
-                )
+            # Convert straight from the OpenJPEG buffer into the destination.
+            np.copyto(bands[k], band_i32, casting="unsafe")
 
-                if is_cube:
-                    image[:, :, k] = band
-                else:
-                    image.append(band)
+        return image
 
-        if is_cube and image.shape[2] == 1:
-            # The third dimension has just a single layer.  Make the image
-            # data 2D instead of 3D.
-            image.shape = image.shape[0:2]
+    def _validate_out(self, out, shape):
+        """Verify that a caller-supplied destination fits the image.
 
-        return image
+        Parameters
+        ----------
+        out : ndarray
+            Destination for image data.
+        shape : tuple
+            Shape of the decoded image data.
+
+        Returns
+        -------
+        ndarray
+            The destination.
+        """
+        if not isinstance(out, np.ndarray):
+            msg = f"out must be a numpy array, not {type(out).__name__}."
+            raise TypeError(msg)
+
+        if out.shape != shape:
+            msg = (
+                f"The shape of out {out.shape} does not match the shape of "
+                f"the decoded image {shape}."
+            )
+            raise ValueError(msg)
+
+        return out
 
     def _component2dtype(self, component):
         """Determine the appropriate numpy datatype for an OpenJPEG component.
@@ -1023,7 +2813,7 @@ class Jp2kr(Jp2kBox):
         >>> print(codestream.segment[-1])
         EOC marker segment @ (1132371, 0)
         """
-        with self.path.open("rb") as fptr:
+        with self._open() as fptr:
 
             # if it's just a raw codestream file, it's easy
             if self._codec_format == opj2.CODEC_J2K:
@@ -1039,7 +2829,7 @@ class Jp2kr(Jp2kBox):
             if box_length == 0:
                 # The length of the box is presumed to last until the end
                 # of the file.  Compute the effective length of the box.
-                box_length = self.path.stat().st_size - fptr.tell() + 8
+                box_length = _stream.file_size(fptr) - fptr.tell() + 8
             elif box_length == 1:
                 # Seek past the XL field.
                 read_buffer = fptr.read(8)
@@ -1074,3 +2864,210 @@ class Jp2kr(Jp2kBox):
                 f"{nrows} x {ncols}"
             )
             raise InvalidJp2kError(msg)
+
+
+def _reduce_coordinate(x, d, rlevel):
+    """Map a reference grid coordinate onto a component with subsampling
+    factor d at resolution level rlevel.
+    """
+    return -(-(-(-x // d)) // 2 ** rlevel)
+
+
+def _reduce_area(area, dx, dy, rlevel):
+    """Map an area on the reference grid onto a component with subsampling
+    factors dx and dy at resolution level rlevel.
+    """
+    y0, x0, y1, x1 = area
+    return (
+        _reduce_coordinate(y0, dy, rlevel),
+        _reduce_coordinate(x0, dx, rlevel),
+        _reduce_coordinate(y1, dy, rlevel),
+        _reduce_coordinate(x1, dx, rlevel),
+    )
+
+
+def _is_nonempty(area):
+    y0, x0, y1, x1 = area
+    return y1 > y0 and x1 > x0
+
+
+# Regions are coalesced as long as their bounding box is at most this much
+# larger than the regions themselves.  Some waste is worthwhile, as every
+# decode has to set up a codec and parse the headers.
+_COALESCE_SLACK = 1.25
+
+
+def _coalesce(boxes):
+    """Greedily merge boxes, (y0, x0, y1, x1), that are close enough for
+    their bounding box to be decoded instead.
+    """
+    def size(box):
+        return (box[2] - box[0]) * (box[3] - box[1])
+
+    merged = []
+    for box in sorted(set(boxes)):
+        i = 0
+        while i < len(merged):
+            other = merged[i]
+            union = (
+                min(box[0], other[0]),
+                min(box[1], other[1]),
+                max(box[2], other[2]),
+                max(box[3], other[3]),
+            )
+            if size(union) <= _COALESCE_SLACK * (size(box) + size(other)):
+                # The union may now reach boxes that were passed over.
+                del merged[i]
+                box = union
+                i = 0
+            else:
+                i += 1
+        merged.append(box)
+
+    return merged
+
+
+def _read_piece(source, area, rlevel, layer, decoded_components,
+                ignore_pclr_cmap_cdef, planar):
+    """Decode one piece of a piecewise decode in another process."""
+    jp2 = Jp2kr(source)
+    jp2.layer = layer
+    jp2.decoded_components = decoded_components
+    jp2.ignore_pclr_cmap_cdef = ignore_pclr_cmap_cdef
+    return jp2.read(rlevel=rlevel, area=area, planar=planar)
+
+
+class _DecodeSession(object):
+    """Decodes successive image areas with a single open codec.
+
+    Attributes
+    ----------
+    jp2k : glymur.Jp2kr
+        Object wrapping the JPEG2000 file.
+    """
+
+    def __init__(self, jp2k):
+        self.jp2k = jp2k
+
+        self._stack = None
+        self._codec = None
+        self._stream = None
+        self._raw_image = None
+
+        # The decoding parameters that the current codec was set up with.
+        self._key = None
+
+        # Has the current codec already decoded an area?
+        self._decoded = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getitem__(self, pargs):
+        """Slicing protocol."""
+        return self.jp2k._slice(pargs, self._read)
+
+    def close(self):
+        """Release the stream, the codec, and the decoded image."""
+        if self._stack is not None:
+            self._stack.close()
+        self._stack = None
+        self._codec = None
+        self._stream = None
+        self._raw_image = None
+        self._key = None
+        self._decoded = False
+
+    def _open(self, dparams, components, key):
+        """Create the stream and codec and parse the main header."""
+        self.close()
+
+        stack = ExitStack()
+        try:
+            stream = self.jp2k._create_stream(stack)
+
+            codec = self.jp2k._create_decompressor(dparams, stack, components)
+
+            raw_image = opj2.read_header(stream, codec)
+            stack.callback(opj2.image_destroy, raw_image)
+
+            if components is not None:
+                opj2.set_decoded_components(codec, components)
+        except Exception:
+            stack.close()
+            raise
+
+        self._stack = stack
+        self._stream = stream
+        self._codec = codec
+        self._raw_image = raw_image
+        self._key = key
+
+    def _read(self, rlevel=0, area=None, components=None):
+        """Decode an image area, reusing the codec if at all possible.
+
+        Parameters
+        ----------
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        components : list, optional
+            The components to decode, by default those of the
+            decoded_components property.
+
+        Returns
+        -------
+        ndarray
+            The image data.
+        """
+        if re.match("0|1|2.[012]", version.openjpeg_version):
+            msg = (
+                f"You must have a version of OpenJPEG at least as high as "
+                f"2.3.0 before you can read JPEG2000 images with glymur.  "
+                f"Your version is {version.openjpeg_version}"
+            )
+            raise RuntimeError(msg)
+
+        components = self.jp2k._components(components)
+        self.jp2k._subsampling_sanity_check(components)
+        dparams = self.jp2k._populate_dparams(rlevel, area=area)
+
+        key = (
+            dparams.cp_reduce,
+            dparams.cp_layer,
+            dparams.flags,
+            None if components is None else tuple(components),
+        )
+
+        # OpenJPEG can only decode an area again if the image has just one
+        # tile.
+        if (
+            key != self._key
+            or (self._decoded and self.jp2k._num_tiles() > 1)
+        ):
+            self._open(dparams, components, key)
+
+        try:
+            opj2.set_decode_area(
+                self._codec,
+                self._raw_image,
+                dparams.DA_x0,
+                dparams.DA_y0,
+                dparams.DA_x1,
+                dparams.DA_y1,
+            )
+            opj2.decode(self._codec, self._stream, self._raw_image)
+        except Exception:
+            # The codec state is unknown at this point, so start over next
+            # time.
+            self.close()
+            raise
+
+        self._decoded = True
+
+        return self.jp2k._extract_image(self._raw_image)
@@ -11,7 +11,7 @@ from PIL import Image
 
 # local imports
 from .jp2k import Jp2k
-from .options import set_option
+from .options import option_context
 from ._core_converter import _2JP2Converter
 
 
@@ -57,8 +57,10 @@ class JPEG2JP2(_2JP2Converter):
         # This is never set for JPEG
         self.exclude_tags = None
 
+        # Applied to this conversion only, rather than to the whole process.
+        self.options = {}
         if num_threads > 1:
-            set_option("lib.num_threads", num_threads)
+            self.options["lib.num_threads"] = num_threads
 
     def __enter__(self):
         """The JPEG2JP2 object must be used with a context manager."""
@@ -69,7 +71,8 @@ class JPEG2JP2(_2JP2Converter):
 
     def run(self):
 
-        self.copy_image()
+        with option_context(self.options):
+            self.copy_image()
         self.copy_metadata()
 
     def copy_metadata(self):
@@ -0,0 +1,315 @@
+"""Lazy, chunked access to JPEG 2000 images.
+
+The chunks of a lazy array follow the tile grid of the codestream, so that
+each chunk is decoded from its own tiles and no tile is shared between
+chunks.  If dask is installed, Jp2kr.to_lazy_array returns a dask array and
+slicing, reductions, and the like are only evaluated upon request, in
+parallel.  Otherwise it returns a LazyArray, which decodes only the area
+needed by each slicing operation.
+"""
+
+# Standard library imports
+import math
+
+# Third party library imports
+try:
+    import dask.array as da
+
+    _HAVE_DASK = True
+except (ImportError, ModuleNotFoundError):  # pragma: no cover
+    _HAVE_DASK = False
+import numpy as np
+
+
+class LazyArray(object):
+    """Array-like view of a JPEG 2000 image that decodes on demand.  Use
+    Jp2kr.to_lazy_array to create one.
+
+    Only basic indexing of the rows and columns is supported, i.e. integers
+    and slices.  Any index of the bands is applied after decoding.
+
+    Attributes
+    ----------
+    jp2 : glymur.Jp2kr
+        The image.
+    rlevel : int
+        Resolution level of the view.
+    shape : tuple
+        Shape of the image at the resolution level.
+    dtype : numpy.dtype
+        Datatype of the image.
+    chunks : tuple
+        The sizes of the chunks along each dimension, as with dask.
+
+    Examples
+    --------
+    >>> jp2 = glymur.Jp2kr(glymur.data.nemo())
+    >>> a = jp2.to_lazy_array(rlevel=1)
+    >>> a.shape
+    (728, 1296, 3)
+    >>> a[100:200, 100:300].shape
+    (100, 200, 3)
+    """
+
+    def __init__(self, jp2, rlevel, rows, cols):
+        """
+        Parameters
+        ----------
+        jp2 : glymur.Jp2kr
+            The image.
+        rlevel : int
+            Resolution level, already resolved.
+        rows, cols : list
+            Chunk boundaries along the rows and columns, starting at zero and
+            ending with the number of rows or columns.
+        """
+        self.jp2 = jp2
+        self.rlevel = rlevel
+
+        ncomponents, _, _ = jp2._component_layout()
+
+        shape = (rows[-1], cols[-1])
+        chunks = (np.diff(rows), np.diff(cols))
+        if ncomponents > 1:
+            shape += (ncomponents,)
+            chunks += ((ncomponents,),)
+
+        self.shape = shape
+        self.chunks = tuple(tuple(int(x) for x in c) for c in chunks)
+        self.dtype = np.dtype(jp2.dtype)
+
+    def __repr__(self):
+        return (
+            f"LazyArray({self.jp2!r}, rlevel={self.rlevel}, "
+            f"shape={self.shape}, dtype={self.dtype})"
+        )
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        image = self[...]
+        if dtype is not None:
+            image = image.astype(dtype, copy=False)
+        return image
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return math.prod(self.shape)
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    @property
+    def numblocks(self):
+        return tuple(len(c) for c in self.chunks)
+
+    def __getitem__(self, key):
+        key = _normalize_key(key, self.ndim)
+
+        rows, squeeze_rows = _as_range(key[0], self.shape[0])
+        cols, squeeze_cols = _as_range(key[1], self.shape[1])
+
+        if len(rows) == 0 or len(cols) == 0:
+            shape = (len(rows), len(cols)) + self.shape[2:]
+            image = np.empty(shape, dtype=self.dtype)
+        else:
+            r0, r1 = min(rows), max(rows) + 1
+            c0, c1 = min(cols), max(cols) + 1
+            image = self._read(r0, c0, r1, c1)
+            image = image[_local_slice(rows, r0), _local_slice(cols, c0)]
+
+        if squeeze_rows and squeeze_cols:
+            image = image[0, 0]
+        elif squeeze_rows:
+            image = image[0]
+        elif squeeze_cols:
+            image = image[:, 0]
+
+        if self.ndim > 2:
+            image = image[(Ellipsis, key[2])]
+
+        return image
+
+    def _read(self, r0, c0, r1, c1):
+        """Decode rows r0:r1 and columns c0:c1 of the image at the resolution
+        level.
+        """
+        area = self.jp2._window_area((r0, c0, r1, c1), self.rlevel)
+
+        # The image was checked when the array was created.
+        return self.jp2._read_windows([area], self.rlevel, None)[0]
+
+    def to_dask(self):
+        """Wrap the lazy array in a dask array with the same chunks.
+
+        Returns
+        -------
+        dask.array.Array
+        """
+        if not _HAVE_DASK:
+            msg = "dask must be installed in order to create a dask array."
+            raise RuntimeError(msg)
+
+        meta = np.empty((0,) * self.ndim, dtype=self.dtype)
+        return da.from_array(
+            self,
+            chunks=self.chunks,
+            name=False,
+            asarray=False,
+            fancy=False,
+            lock=False,
+            meta=meta,
+        )
+
+
+class PyramidLevel(LazyArray):
+    """One resolution level of a JPEG 2000 image, see Jp2kr.pyramid.
+
+    Slicing a level decodes just the area needed directly at the level's
+    resolution, so there is no coordinate arithmetic to be done by the
+    caller.  The chunks are the tiles of the image at this resolution.
+
+    Attributes
+    ----------
+    scale : int
+        Factor by which the level is reduced from the full resolution image.
+    tile_grid : tuple
+        Number of rows and columns of tiles.
+    precinct_size : tuple
+        Height and width of the precincts at this resolution.
+
+    Examples
+    --------
+    >>> import skimage.data
+    >>> jp2 = glymur.Jp2k(
+    ...     'astronaut.jp2', data=skimage.data.astronaut(),
+    ...     tilesize=(256, 256)
+    ... )
+    >>> level = jp2.pyramid()[1]
+    >>> level.shape, level.tile_grid
+    ((256, 256, 3), (2, 2))
+    >>> level.tile(1, 0).shape
+    (128, 128, 3)
+    """
+
+    def __init__(self, jp2, rlevel, rows, cols, precinct_size):
+        """
+        Parameters
+        ----------
+        jp2, rlevel, rows, cols
+            See LazyArray.
+        precinct_size : tuple
+            Height and width of the precincts at this resolution.
+        """
+        super().__init__(jp2, rlevel, rows, cols)
+
+        self.scale = 2 ** rlevel
+        self.tile_grid = self.numblocks[:2]
+        self.precinct_size = precinct_size
+
+        self._rows = rows
+        self._cols = cols
+
+    def __repr__(self):
+        return (
+            f"PyramidLevel({self.jp2!r}, rlevel={self.rlevel}, "
+            f"shape={self.shape}, tile_grid={self.tile_grid})"
+        )
+
+    def tile_area(self, row, col):
+        """Area of a tile at this resolution.
+
+        Parameters
+        ----------
+        row, col : int
+            Position of the tile in the tile grid.
+
+        Returns
+        -------
+        tuple
+            (first_row, first_col, last_row, last_col)
+        """
+        nrows, ncols = self.tile_grid
+        if not (0 <= row < nrows and 0 <= col < ncols):
+            msg = (
+                f"Tile ({row}, {col}) lies outside the tile grid of "
+                f"{nrows} x {ncols} tiles."
+            )
+            raise IndexError(msg)
+
+        return (
+            self._rows[row], self._cols[col],
+            self._rows[row + 1], self._cols[col + 1],
+        )
+
+    def tile(self, row, col):
+        """Decode a tile at this resolution.
+
+        Parameters
+        ----------
+        row, col : int
+            Position of the tile in the tile grid.
+
+        Returns
+        -------
+        ndarray
+            The tile image data.
+        """
+        r0, c0, r1, c1 = self.tile_area(row, col)
+        return self._read(r0, c0, r1, c1)
+
+
+def _normalize_key(key, ndim):
+    """Expand an index into a tuple with one item per dimension."""
+    if not isinstance(key, tuple):
+        key = (key,)
+
+    if any(x is Ellipsis for x in key):
+        i = key.index(Ellipsis)
+        fill = (slice(None),) * (ndim - len(key) + 1)
+        key = key[:i] + fill + key[i + 1:]
+
+    if len(key) > ndim:
+        msg = (
+            f"Too many indices for an array of {ndim} dimensions, "
+            f"{len(key)} were given."
+        )
+        raise IndexError(msg)
+
+    return key + (slice(None),) * (ndim - len(key))
+
+
+def _as_range(index, n):
+    """Resolve an index of the rows or columns into a range, and whether
+    the dimension is to be dropped.
+    """
+    if isinstance(index, slice):
+        return range(*index.indices(n)), False
+
+    try:
+        i = int(index)
+    except TypeError:
+        msg = (
+            f"Only integers and slices may index the rows and columns of a "
+            f"lazy array, not {index!r}."
+        )
+        raise IndexError(msg)
+
+    if i < -n or i >= n:
+        msg = f"Index {i} is out of bounds for an axis of size {n}."
+        raise IndexError(msg)
+    i %= n
+    return range(i, i + 1), True
+
+
+def _local_slice(r, offset):
+    """Slice that selects range r out of data starting at offset."""
+    start = r.start - offset
+    stop = r.stop - offset
+    return slice(start, stop if stop >= 0 else None, r.step)
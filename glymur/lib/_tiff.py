@@ -3,9 +3,9 @@ from collections import OrderedDict
 import ctypes
 from enum import IntEnum
 import os
-import queue
 import re
 import struct
+import threading
 import warnings
 
 # 3rd party library imports
@@ -14,8 +14,9 @@ import numpy as np
 # Local imports
 from ..config import glymur_config
 
-# The error messages queue
-EQ = queue.Queue()
+# The error messages reported by libtiff.  Its handlers are called in the
+# thread that called into the library, so each thread keeps its own messages.
+_ERRORS = threading.local()
 
 loader = ctypes.windll.LoadLibrary if os.name == "nt" else ctypes.CDLL
 _LIBTIFF = glymur_config("tiff")
@@ -153,7 +154,9 @@ def _handle_error(module, fmt, ap):
     error_str = buffer.value.decode("utf-8")
 
     message = f"{module}: {error_str}"
-    EQ.put(message)
+    if not hasattr(_ERRORS, "messages"):
+        _ERRORS.messages = []
+    _ERRORS.messages.append(message)
     return None
 
 
@@ -186,18 +189,37 @@ _ERROR_HANDLER = _WFUNCTYPE(_handle_error)
 _WARNING_HANDLER = _WFUNCTYPE(_handle_warning)
 
 
+# The handlers of libtiff are global, so they are installed when the first
+# thread starts calling into the library and restored when the last one is
+# done, rather than being swapped back and forth by each thread.
+_HANDLERS_LOCK = threading.Lock()
+_HANDLERS_USERS = 0
+_OLD_HANDLERS = (None, None)
+
+
 def _set_error_warning_handlers():
     """Setup default python error and warning handlers."""
-    old_warning_handler = setWarningHandler()
-    old_error_handler = setErrorHandler()
+    global _HANDLERS_USERS, _OLD_HANDLERS
 
-    return old_error_handler, old_warning_handler
+    with _HANDLERS_LOCK:
+        if _HANDLERS_USERS == 0:
+            old_warning_handler = setWarningHandler()
+            old_error_handler = setErrorHandler()
+            _OLD_HANDLERS = (old_error_handler, old_warning_handler)
+        _HANDLERS_USERS += 1
+
+        return _OLD_HANDLERS
 
 
 def _reset_error_warning_handlers(old_error_handler, old_warning_handler):
     """Restore previous error and warning handlers."""
-    setWarningHandler(old_warning_handler)
-    setErrorHandler(old_error_handler)
+    global _HANDLERS_USERS
+
+    with _HANDLERS_LOCK:
+        _HANDLERS_USERS -= 1
+        if _HANDLERS_USERS == 0:
+            setWarningHandler(old_warning_handler)
+            setErrorHandler(old_error_handler)
 
 
 def close(fp):
@@ -624,10 +646,10 @@ def check_error(status):
     for error status in each wrapping function and an exception will always be
     appropriately raised.
     """
-    msg = ""
-    while not EQ.empty():
-        msg = EQ.get()
-        raise LibTIFFError(msg)
+    messages = getattr(_ERRORS, "messages", [])
+    if messages:
+        _ERRORS.messages = []
+        raise LibTIFFError(messages[0])
 
     if status == 0:
         raise RuntimeError("failed")
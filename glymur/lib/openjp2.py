@@ -3,8 +3,8 @@
 
 # Standard library imports
 import ctypes
-import queue
 import textwrap
+import threading
 import warnings
 
 # 3rd party library imports
@@ -35,7 +35,14 @@ def version():
 
 _MAJOR, _MINOR, _PATCH = [int(x) for x in version().split(".")]
 
-ERROR_MSG_LST = queue.Queue()
+# Messages reported by each codec, keyed by the codec's address, which is
+# also the user data passed to the handlers.  See add_message_handlers.
+_CODEC_MESSAGES = {}
+_CODEC_MESSAGES_LOCK = threading.Lock()
+
+# Errors reported by codecs whose handlers were given no user data.  The
+# handlers are then called in the thread that called into the library.
+_THREAD_MESSAGES = threading.local()
 
 # Map certain atomic OpenJPEG datatypes to the ctypes equivalents.
 BOOL_TYPE = ctypes.c_int32
@@ -44,6 +51,25 @@ PROG_ORDER_TYPE = ctypes.c_int32
 CINEMA_MODE_TYPE = ctypes.c_int32
 RSIZ_CAPABILITIES_TYPE = ctypes.c_int32
 STREAM_TYPE_P = ctypes.c_void_p
+OFF_TYPE = ctypes.c_int64
+SIZE_TYPE = ctypes.c_size_t
+
+# Signatures of the user-supplied stream functions.
+STREAM_READ_FN = ctypes.CFUNCTYPE(
+    SIZE_TYPE, ctypes.c_void_p, SIZE_TYPE, ctypes.c_void_p
+)
+STREAM_WRITE_FN = ctypes.CFUNCTYPE(
+    SIZE_TYPE, ctypes.c_void_p, SIZE_TYPE, ctypes.c_void_p
+)
+STREAM_SKIP_FN = ctypes.CFUNCTYPE(OFF_TYPE, OFF_TYPE, ctypes.c_void_p)
+STREAM_SEEK_FN = ctypes.CFUNCTYPE(BOOL_TYPE, OFF_TYPE, ctypes.c_void_p)
+
+# Value returned by the read and write stream functions upon failure or
+# end-of-stream, i.e. (OPJ_SIZE_T)-1.
+STREAM_EOF = SIZE_TYPE(-1).value
+
+# Default size of a stream's internal buffer.
+J2K_STREAM_CHUNK_SIZE = 0x100000
 
 PATH_LEN = 4096
 J2K_MAXRLVLS = 33
@@ -495,20 +521,88 @@ class ImageComptParmType(ctypes.Structure):
         return msg
 
 
-def check_error(status):
-    """Set a generic function as the restype attribute of all OpenJPEG
-    functions that return a BOOL_TYPE value.  This way we do not have to check
-    for error status in each wrapping function and an exception will always be
-    appropriately raised.
+class _CodecMessages(object):
+    """Errors and warnings reported by a single codec.
+
+    OpenJPEG may report them from its own worker threads, so they are held
+    here until the thread that called into the library collects them.
     """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._errors = []
+        self._warnings = []
+
+    def error(self, msg):
+        with self._lock:
+            self._errors.append(msg)
+
+    def warning(self, msg):
+        with self._lock:
+            self._warnings.append(msg)
+
+    def collect(self):
+        """Return and forget the errors and warnings reported so far."""
+        with self._lock:
+            errors, self._errors = self._errors, []
+            warnings_, self._warnings = self._warnings, []
+        return errors, warnings_
+
+
+def check_error(status, codec=None):
+    """Check the status returned by an OpenJPEG function that returns a
+    BOOL_TYPE value, raising an exception with the messages reported by the
+    library if the function failed.
+
+    Parameters
+    ----------
+    status : int
+        The value returned by the library, 1 for success.
+    codec : CODEC_TYPE, optional
+        The codec passed to the library.  Only its own messages are
+        collected if it has message handlers, see add_message_handlers.
+        Any warnings are issued in the calling thread.
+    """
+    with _CODEC_MESSAGES_LOCK:
+        messages = _CODEC_MESSAGES.get(codec)
+
+    if messages is None:
+        errors = getattr(_THREAD_MESSAGES, "errors", [])
+        _THREAD_MESSAGES.errors = []
+    else:
+        errors, warnings_ = messages.collect()
+        for msg in warnings_:
+            warnings.warn(msg, UserWarning)
+
     if status != 1:
-        lst = []
-        while ERROR_MSG_LST.qsize() > 0:
-            lst.append(ERROR_MSG_LST.get())
-        msg = "\n".join(lst)
+        msg = "\n".join(errors)
         raise OpenJPEGLibraryError(msg)
 
 
+def add_message_handlers(codec, verbose=False):
+    """Route the errors, warnings, and informational messages of a codec to
+    that codec alone.
+
+    The codec itself is the user data passed to each handler, so several
+    codecs can be used in different threads at the same time without their
+    messages being mixed up.  The messages are forgotten when the codec is
+    destroyed with destroy_codec.
+
+    Parameters
+    ----------
+    codec : CODEC_TYPE
+        Codec initialized by create_compress or create_decompress.
+    verbose : bool, optional
+        If true, print the informational messages of the codec.
+    """
+    with _CODEC_MESSAGES_LOCK:
+        _CODEC_MESSAGES[codec] = _CodecMessages()
+
+    set_error_handler(codec, _ERROR_CALLBACK, codec)
+    set_warning_handler(codec, _WARNING_CALLBACK, codec)
+    set_info_handler(codec, _INFO_CALLBACK if verbose else None, codec)
+
+
 def create_compress(codec_format):
     """Creates a J2K/JP2 compress structure.
 
@@ -548,8 +642,9 @@ def codec_set_threads(codec, num_threads):
         If the OpenJPEG library routine opj_decode fails.
     """
     OPENJP2.opj_codec_set_threads.argtypes = [CODEC_TYPE, ctypes.c_int32]
-    OPENJP2.opj_codec_set_threads.restype = check_error
-    OPENJP2.opj_codec_set_threads(codec, num_threads)
+    OPENJP2.opj_codec_set_threads.restype = BOOL_TYPE
+    status = OPENJP2.opj_codec_set_threads(codec, num_threads)
+    check_error(status, codec)
 
 
 def decode(codec, stream, image):
@@ -576,9 +671,10 @@ def decode(codec, stream, image):
         STREAM_TYPE_P,
         ctypes.POINTER(ImageType)
     ]
-    OPENJP2.opj_decode.restype = check_error
+    OPENJP2.opj_decode.restype = BOOL_TYPE
 
-    OPENJP2.opj_decode(codec, stream, image)
+    status = OPENJP2.opj_decode(codec, stream, image)
+    check_error(status, codec)
 
 
 def decode_tile_data(codec, tidx, data, data_size, stream):
@@ -611,12 +707,13 @@ def decode_tile_data(codec, tidx, data, data_size, stream):
         ctypes.c_uint32,
         STREAM_TYPE_P,
     ]
-    OPENJP2.opj_decode_tile_data.restype = check_error
+    OPENJP2.opj_decode_tile_data.restype = BOOL_TYPE
 
     datap = data.ctypes.data_as(ctypes.POINTER(ctypes.c_uint8))
-    OPENJP2.opj_decode_tile_data(
+    status = OPENJP2.opj_decode_tile_data(
         codec, ctypes.c_uint32(tidx), datap, ctypes.c_uint32(data_size), stream
     )
+    check_error(status, codec)
 
 
 def create_decompress(codec_format):
@@ -654,6 +751,9 @@ def destroy_codec(codec):
     OPENJP2.opj_destroy_codec.restype = ctypes.c_void_p
     OPENJP2.opj_destroy_codec(codec)
 
+    with _CODEC_MESSAGES_LOCK:
+        _CODEC_MESSAGES.pop(codec, None)
+
 
 def encode(codec, stream):
     """Wraps openjp2 library function opj_encode.
@@ -673,9 +773,10 @@ def encode(codec, stream):
         If the OpenJPEG library routine opj_encode fails.
     """
     OPENJP2.opj_encode.argtypes = [CODEC_TYPE, STREAM_TYPE_P]
-    OPENJP2.opj_encode.restype = check_error
+    OPENJP2.opj_encode.restype = BOOL_TYPE
 
-    OPENJP2.opj_encode(codec, stream)
+    status = OPENJP2.opj_encode(codec, stream)
+    check_error(status, codec)
 
 
 def get_decoded_tile(codec, stream, imagep, tile_index):
@@ -705,9 +806,10 @@ def get_decoded_tile(codec, stream, imagep, tile_index):
         ctypes.POINTER(ImageType),
         ctypes.c_uint32,
     ]
-    OPENJP2.opj_get_decoded_tile.restype = check_error
+    OPENJP2.opj_get_decoded_tile.restype = BOOL_TYPE
 
-    OPENJP2.opj_get_decoded_tile(codec, stream, imagep, tile_index)
+    status = OPENJP2.opj_get_decoded_tile(codec, stream, imagep, tile_index)
+    check_error(status, codec)
 
 
 def end_compress(codec, stream):
@@ -728,8 +830,9 @@ def end_compress(codec, stream):
         If the OpenJPEG library routine opj_end_compress fails.
     """
     OPENJP2.opj_end_compress.argtypes = [CODEC_TYPE, STREAM_TYPE_P]
-    OPENJP2.opj_end_compress.restype = check_error
-    OPENJP2.opj_end_compress(codec, stream)
+    OPENJP2.opj_end_compress.restype = BOOL_TYPE
+    status = OPENJP2.opj_end_compress(codec, stream)
+    check_error(status, codec)
 
 
 def end_decompress(codec, stream):
@@ -750,8 +853,9 @@ def end_decompress(codec, stream):
         If the OpenJPEG library routine opj_end_decompress fails.
     """
     OPENJP2.opj_end_decompress.argtypes = [CODEC_TYPE, STREAM_TYPE_P]
-    OPENJP2.opj_end_decompress.restype = check_error
-    OPENJP2.opj_end_decompress(codec, stream)
+    OPENJP2.opj_end_decompress.restype = BOOL_TYPE
+    status = OPENJP2.opj_end_decompress(codec, stream)
+    check_error(status, codec)
 
 
 def get_num_cpus():
@@ -871,7 +975,7 @@ def encoder_set_extra_options(codec, plt=False, tlm=False):
     """
     ARGTYPES = [CODEC_TYPE, ctypes.POINTER(ctypes.c_char_p)]
     OPENJP2.opj_encoder_set_extra_options.argtypes = ARGTYPES
-    OPENJP2.opj_encoder_set_extra_options.restype = check_error
+    OPENJP2.opj_encoder_set_extra_options.restype = BOOL_TYPE
 
     # Send the library a null terminated array of char instructions.  As of
     # version 2.4.0, there is only a single instruction possible.  As of 2.5.0,
@@ -883,7 +987,8 @@ def encoder_set_extra_options(codec, plt=False, tlm=False):
     if version() >= "2.5.0":
         arr[1] = "TLM=YES".encode("utf-8") if tlm else "TLM=NO".encode("utf-8")
 
-    OPENJP2.opj_encoder_set_extra_options(codec, arr)
+    status = OPENJP2.opj_encoder_set_extra_options(codec, arr)
+    check_error(status, codec)
 
 
 def read_header(stream, codec):
@@ -914,10 +1019,11 @@ def read_header(stream, codec):
         ctypes.POINTER(ctypes.POINTER(ImageType))
     ]
     OPENJP2.opj_read_header.argtypes = ARGTYPES
-    OPENJP2.opj_read_header.restype = check_error
+    OPENJP2.opj_read_header.restype = BOOL_TYPE
 
     imagep = ctypes.POINTER(ImageType)()
-    OPENJP2.opj_read_header(stream, codec, ctypes.byref(imagep))
+    status = OPENJP2.opj_read_header(stream, codec, ctypes.byref(imagep))
+    check_error(status, codec)
     return imagep
 
 
@@ -966,7 +1072,7 @@ def read_tile_header(codec, stream):
         ctypes.POINTER(BOOL_TYPE),
     ]
     OPENJP2.opj_read_tile_header.argtypes = ARGTYPES
-    OPENJP2.opj_read_tile_header.restype = check_error
+    OPENJP2.opj_read_tile_header.restype = BOOL_TYPE
 
     tile_index = ctypes.c_uint32()
     data_size = ctypes.c_uint32()
@@ -976,7 +1082,7 @@ def read_tile_header(codec, stream):
     row1 = ctypes.c_int32()
     ncomps = ctypes.c_uint32()
     go_on = BOOL_TYPE()
-    OPENJP2.opj_read_tile_header(
+    status = OPENJP2.opj_read_tile_header(
         codec,
         stream,
         ctypes.byref(tile_index),
@@ -988,6 +1094,7 @@ def read_tile_header(codec, stream):
         ctypes.byref(ncomps),
         ctypes.byref(go_on),
     )
+    check_error(status, codec)
     go_on = bool(go_on.value)
     return (
         tile_index.value,
@@ -1031,9 +1138,9 @@ def set_decode_area(codec, image, start_x=0, start_y=0, end_x=0, end_y=0):
         ctypes.c_int32,
         ctypes.c_int32,
     ]
-    OPENJP2.opj_set_decode_area.restype = check_error
+    OPENJP2.opj_set_decode_area.restype = BOOL_TYPE
 
-    OPENJP2.opj_set_decode_area(
+    status = OPENJP2.opj_set_decode_area(
         codec,
         image,
         ctypes.c_int32(start_x),
@@ -1041,6 +1148,7 @@ def set_decode_area(codec, image, start_x=0, start_y=0, end_x=0, end_y=0):
         ctypes.c_int32(end_x),
         ctypes.c_int32(end_y),
     )
+    check_error(status, codec)
 
 
 def set_decoded_components(codec, comp_indices):
@@ -1069,7 +1177,7 @@ def set_decoded_components(codec, comp_indices):
         ctypes.POINTER(ctypes.c_uint32),
         ctypes.c_int32,
     ]
-    OPENJP2.opj_set_decoded_components.restype = check_error
+    OPENJP2.opj_set_decoded_components.restype = BOOL_TYPE
 
     ncomps = len(comp_indices)
     indices_p = comp_indices.ctypes.data_as(ctypes.POINTER(ctypes.c_uint32))
@@ -1077,12 +1185,13 @@ def set_decoded_components(codec, comp_indices):
     # This is always False (0) for now.
     apply_color_xforms = ctypes.c_int32(0)
 
-    OPENJP2.opj_set_decoded_components(
+    status = OPENJP2.opj_set_decoded_components(
         codec,
         ncomps,
         indices_p,
         apply_color_xforms
     )
+    check_error(status, codec)
 
 
 def set_default_decoder_parameters():
@@ -1167,8 +1276,9 @@ def set_error_handler(codec, handler, data=None):
         ctypes.c_void_p,
         ctypes.c_void_p,
     ]
-    OPENJP2.opj_set_error_handler.restype = check_error
-    OPENJP2.opj_set_error_handler(codec, handler, data)
+    OPENJP2.opj_set_error_handler.restype = BOOL_TYPE
+    status = OPENJP2.opj_set_error_handler(codec, handler, data)
+    check_error(status, codec)
 
 
 def set_info_handler(codec, handler, data=None):
@@ -1195,8 +1305,9 @@ def set_info_handler(codec, handler, data=None):
         ctypes.c_void_p,
         ctypes.c_void_p,
     ]
-    OPENJP2.opj_set_info_handler.restype = check_error
-    OPENJP2.opj_set_info_handler(codec, handler, data)
+    OPENJP2.opj_set_info_handler.restype = BOOL_TYPE
+    status = OPENJP2.opj_set_info_handler(codec, handler, data)
+    check_error(status, codec)
 
 
 def set_warning_handler(codec, handler, data=None):
@@ -1223,9 +1334,10 @@ def set_warning_handler(codec, handler, data=None):
         ctypes.c_void_p,
         ctypes.c_void_p,
     ]
-    OPENJP2.opj_set_warning_handler.restype = check_error
+    OPENJP2.opj_set_warning_handler.restype = BOOL_TYPE
 
-    OPENJP2.opj_set_warning_handler(codec, handler, data)
+    status = OPENJP2.opj_set_warning_handler(codec, handler, data)
+    check_error(status, codec)
 
 
 def setup_decoder(codec, dparams):
@@ -1247,9 +1359,10 @@ def setup_decoder(codec, dparams):
     """
     ARGTYPES = [CODEC_TYPE, ctypes.POINTER(DecompressionParametersType)]
     OPENJP2.opj_setup_decoder.argtypes = ARGTYPES
-    OPENJP2.opj_setup_decoder.restype = check_error
+    OPENJP2.opj_setup_decoder.restype = BOOL_TYPE
 
-    OPENJP2.opj_setup_decoder(codec, ctypes.byref(dparams))
+    status = OPENJP2.opj_setup_decoder(codec, ctypes.byref(dparams))
+    check_error(status, codec)
 
 
 def setup_encoder(codec, cparams, image):
@@ -1278,8 +1391,9 @@ def setup_encoder(codec, cparams, image):
         ctypes.POINTER(ImageType),
     ]
     OPENJP2.opj_setup_encoder.argtypes = ARGTYPES
-    OPENJP2.opj_setup_encoder.restype = check_error
-    OPENJP2.opj_setup_encoder(codec, ctypes.byref(cparams), image)
+    OPENJP2.opj_setup_encoder.restype = BOOL_TYPE
+    status = OPENJP2.opj_setup_encoder(codec, ctypes.byref(cparams), image)
+    check_error(status, codec)
 
 
 def start_compress(codec, image, stream):
@@ -1306,9 +1420,35 @@ def start_compress(codec, image, stream):
         ctypes.POINTER(ImageType),
         STREAM_TYPE_P,
     ]
-    OPENJP2.opj_start_compress.restype = check_error
+    OPENJP2.opj_start_compress.restype = BOOL_TYPE
+
+    status = OPENJP2.opj_start_compress(codec, image, stream)
+    check_error(status, codec)
+
 
-    OPENJP2.opj_start_compress(codec, image, stream)
+def stream_create(buffer_size=J2K_STREAM_CHUNK_SIZE, isa_read_stream=True):
+    """Wraps openjp2 library function opj_stream_create.
+
+    Creates an abstract stream.  The read, write, skip, and seek functions
+    must be supplied by the caller.
+
+    Parameters
+    ----------
+    buffer_size : int, optional
+        Size of the internal buffer of the stream.
+    isa_read_stream:  bool, optional
+        True (read) or False (write)
+
+    Returns
+    -------
+    stream : stream_t
+        An OpenJPEG stream.
+    """
+    OPENJP2.opj_stream_create.argtypes = [SIZE_TYPE, BOOL_TYPE]
+    OPENJP2.opj_stream_create.restype = STREAM_TYPE_P
+    read_stream = 1 if isa_read_stream else 0
+    stream = OPENJP2.opj_stream_create(buffer_size, read_stream)
+    return stream
 
 
 def stream_create_default_file_stream(fname, isa_read_stream):
@@ -1355,6 +1495,98 @@ def stream_destroy(stream):
     OPENJP2.opj_stream_destroy(stream)
 
 
+def stream_set_read_function(stream, function):
+    """Wraps openjp2 library function opj_stream_set_read_function.
+
+    Sets the given function to be used as a read function.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream to modify.
+    function : STREAM_READ_FN
+        The function to use as a read function.
+    """
+    ARGTYPES = [STREAM_TYPE_P, STREAM_READ_FN]
+    OPENJP2.opj_stream_set_read_function.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_read_function.restype = ctypes.c_void_p
+    OPENJP2.opj_stream_set_read_function(stream, function)
+
+
+def stream_set_seek_function(stream, function):
+    """Wraps openjp2 library function opj_stream_set_seek_function.
+
+    Sets the given function to be used as a seek function, i.e. to position
+    the stream at an absolute offset.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream to modify.
+    function : STREAM_SEEK_FN
+        The function to use as a seek function.
+    """
+    ARGTYPES = [STREAM_TYPE_P, STREAM_SEEK_FN]
+    OPENJP2.opj_stream_set_seek_function.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_seek_function.restype = ctypes.c_void_p
+    OPENJP2.opj_stream_set_seek_function(stream, function)
+
+
+def stream_set_skip_function(stream, function):
+    """Wraps openjp2 library function opj_stream_set_skip_function.
+
+    Sets the given function to be used as a skip function, i.e. to position
+    the stream relative to the current offset.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream to modify.
+    function : STREAM_SKIP_FN
+        The function to use as a skip function.
+    """
+    ARGTYPES = [STREAM_TYPE_P, STREAM_SKIP_FN]
+    OPENJP2.opj_stream_set_skip_function.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_skip_function.restype = ctypes.c_void_p
+    OPENJP2.opj_stream_set_skip_function(stream, function)
+
+
+def stream_set_user_data_length(stream, length):
+    """Wraps openjp2 library function opj_stream_set_user_data_length.
+
+    Sets the length of the user data for the stream.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream to modify.
+    length : int
+        Length of the user data in bytes.
+    """
+    ARGTYPES = [STREAM_TYPE_P, ctypes.c_uint64]
+    OPENJP2.opj_stream_set_user_data_length.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_user_data_length.restype = ctypes.c_void_p
+    OPENJP2.opj_stream_set_user_data_length(stream, length)
+
+
+def stream_set_write_function(stream, function):
+    """Wraps openjp2 library function opj_stream_set_write_function.
+
+    Sets the given function to be used as a write function.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream to modify.
+    function : STREAM_WRITE_FN
+        The function to use as a write function.
+    """
+    ARGTYPES = [STREAM_TYPE_P, STREAM_WRITE_FN]
+    OPENJP2.opj_stream_set_write_function.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_write_function.restype = ctypes.c_void_p
+    OPENJP2.opj_stream_set_write_function(stream, function)
+
+
 def write_tile(codec, tile_index, data, *pargs):
     """Wraps openjp2 library function opj_write_tile.
 
@@ -1393,21 +1625,30 @@ def write_tile(codec, tile_index, data, *pargs):
         ctypes.c_uint32,
         STREAM_TYPE_P,
     ]
-    OPENJP2.opj_write_tile.restype = check_error
+    OPENJP2.opj_write_tile.restype = BOOL_TYPE
 
     datap = data.ctypes.data_as(ctypes.POINTER(ctypes.c_uint8))
-    OPENJP2.opj_write_tile(
+    status = OPENJP2.opj_write_tile(
         codec,
         ctypes.c_uint32(int(tile_index)),
         datap,
         ctypes.c_uint32(int(data_size)),
         stream,
     )
+    check_error(status, codec)
 
 
-def set_error_message(msg):
+def set_error_message(msg, codec=None):
     """The openjpeg error handler has recorded an error message."""
-    ERROR_MSG_LST.put(msg)
+    with _CODEC_MESSAGES_LOCK:
+        messages = _CODEC_MESSAGES.get(codec)
+
+    if messages is None:
+        if not hasattr(_THREAD_MESSAGES, "errors"):
+            _THREAD_MESSAGES.errors = []
+        _THREAD_MESSAGES.errors.append(msg)
+    else:
+        messages.error(msg)
 
 
 # Setup the default callback handlers.  See the callback functions subsection
@@ -1416,10 +1657,10 @@ def set_error_message(msg):
 _CMPFUNC = ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_char_p, ctypes.c_void_p)
 
 
-def _default_error_handler(msg, _):
+def _default_error_handler(msg, codec):
     """Default error handler callback for libopenjp2."""
     msg = "OpenJPEG library error:  {0}".format(msg.decode("utf-8").rstrip())
-    set_error_message(msg)
+    set_error_message(msg, codec)
 
 
 def _default_info_handler(msg, _):
@@ -1427,11 +1668,19 @@ def _default_info_handler(msg, _):
     print("[INFO] {0}".format(msg.decode("utf-8").rstrip()))
 
 
-def _default_warning_handler(library_msg, _):
+def _default_warning_handler(library_msg, codec):
     """Default warning handler callback."""
     library_msg = library_msg.decode("utf-8").rstrip()
     msg = "OpenJPEG library warning:  {0}".format(library_msg)
-    warnings.warn(msg, UserWarning)
+
+    with _CODEC_MESSAGES_LOCK:
+        messages = _CODEC_MESSAGES.get(codec)
+
+    if messages is None:
+        warnings.warn(msg, UserWarning)
+    else:
+        # Issued by check_error in the thread using the codec.
+        messages.warning(msg)
 
 
 _ERROR_CALLBACK = _CMPFUNC(_default_error_handler)
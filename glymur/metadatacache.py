@@ -0,0 +1,262 @@
+"""Cache of the parsed metadata of images read from files.
+
+The cache is disabled by default.  With the cache.metadata option set to
+'memory', the box tree and codestream header of each file opened by Jp2kr
+are kept, serialized, in memory, and opening the file again restores them
+instead of parsing the file.  With 'disk', they are also written to the
+metadata directory of the configuration directory, so that other processes
+benefit too.
+
+Entries are keyed by the resolved path of the file and hold its size and
+modification time, and are thrown away once either changes.  The entries on
+disk are pickles, so the metadata directory should be no more writable than
+the configuration directory itself.
+"""
+
+# Standard library imports
+import collections
+import hashlib
+import os
+import pathlib
+import pickle
+import tempfile
+import threading
+import zlib
+
+# Local imports
+from . import config, version
+from .options import get_option
+
+
+MetadataCacheInfo = collections.namedtuple(
+    "MetadataCacheInfo", ["hits", "misses", "entries", "directory"]
+)
+
+# Number of entries kept in memory.
+_MAX_ENTRIES = 1024
+
+
+def dumps(obj):
+    """Serialize parsed metadata, e.g. a list of boxes or a Codestream.
+
+    Parameters
+    ----------
+    obj : object
+        The metadata.
+
+    Returns
+    -------
+    bytes
+        Compressed pickle of the metadata.
+
+    Examples
+    --------
+    >>> from glymur.metadatacache import dumps, loads
+    >>> jp2 = glymur.Jp2kr(glymur.data.nemo())
+    >>> boxes = loads(dumps(jp2.box))
+    >>> [box.box_id for box in boxes]
+    ['jP  ', 'ftyp', 'jp2h', 'jp2c']
+    """
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    return zlib.compress(data, 1)
+
+
+def loads(data):
+    """Restore metadata serialized by dumps.
+
+    Parameters
+    ----------
+    data : bytes
+        Output of dumps.
+
+    Returns
+    -------
+    object
+    """
+    return pickle.loads(zlib.decompress(data))
+
+
+def directory():
+    """Directory of the entries kept on disk."""
+    return pathlib.Path(config.get_configdir()) / "metadata"
+
+
+class _MetadataCache(object):
+    """Thread-safe LRU cache of serialized metadata, optionally backed by
+    files in a directory.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def restore(self, jp2):
+        """Restore the metadata of a Jp2kr object from the cache.
+
+        Returns
+        -------
+        bool
+            True if the metadata was restored.
+        """
+        mode = get_option("cache.metadata")
+        if mode is None or jp2.path is None:
+            return False
+
+        key, stamp = _key(jp2.path)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+
+        if data is None and mode == "disk":
+            data = _read_entry(key)
+
+        entry = None if data is None else _unpack(data, stamp)
+        with self._lock:
+            if entry is None:
+                self._entries.pop(key, None)
+                self._misses += 1
+                return False
+            self._hits += 1
+
+        jp2._codec_format = entry["codec_format"]
+        jp2.length = entry["length"]
+        jp2.box = entry["box"]
+        if entry["codestream"] is not None:
+            jp2._codestream = entry["codestream"]
+        return True
+
+    def store(self, jp2):
+        """Cache the metadata of a Jp2kr object."""
+        mode = get_option("cache.metadata")
+        if mode is None or jp2.path is None:
+            return
+
+        key, stamp = _key(jp2.path)
+        entry = {
+            "version": version.version,
+            "stamp": stamp,
+            "codec_format": jp2._codec_format,
+            "length": jp2.length,
+            "box": jp2.box,
+            "codestream": jp2._codestream,
+        }
+        data = dumps(entry)
+
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > _MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+        if mode == "disk":
+            _write_entry(key, data)
+
+    def info(self):
+        with self._lock:
+            return MetadataCacheInfo(
+                self._hits, self._misses, len(self._entries), directory()
+            )
+
+    def clear(self, disk):
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+        if disk and directory().is_dir():
+            for path in directory().glob("*.pickle"):
+                path.unlink(missing_ok=True)
+
+
+def _key(path):
+    """Key of the file in the cache, and its current size and modification
+    time.
+    """
+    path = pathlib.Path(path).resolve()
+    st = path.stat()
+    key = hashlib.sha256(str(path).encode("utf-8")).hexdigest()
+    return key, (str(path), st.st_size, st.st_mtime_ns)
+
+
+def _unpack(data, stamp):
+    """The entry, or None if it is for another version of glymur or the
+    file has changed since.
+    """
+    try:
+        entry = loads(data)
+    except Exception:
+        return None
+    if entry["version"] != version.version or entry["stamp"] != stamp:
+        return None
+    return entry
+
+
+def _read_entry(key):
+    try:
+        return (directory() / f"{key}.pickle").read_bytes()
+    except OSError:
+        return None
+
+
+def _write_entry(key, data):
+    """Write an entry atomically, so that concurrent readers never see a
+    partial one.  Failure to write just means no entry on disk.
+    """
+    try:
+        directory().mkdir(parents=True, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=directory(), suffix=".tmp")
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp, directory() / f"{key}.pickle")
+    except OSError:
+        pathlib.Path(temp).unlink(missing_ok=True)
+
+
+_cache = _MetadataCache()
+
+
+def metadata_cache_info():
+    """Report statistics of the metadata cache.
+
+    Returns
+    -------
+    MetadataCacheInfo
+        Named tuple of hits, misses, the number of entries in memory, and the
+        directory of the entries on disk.
+
+    Examples
+    --------
+    >>> glymur.set_option('cache.metadata', 'memory')
+    >>> jp2 = glymur.Jp2kr(glymur.data.nemo())
+    >>> jp2 = glymur.Jp2kr(glymur.data.nemo())
+    >>> glymur.metadata_cache_info().hits
+    1
+    >>> glymur.metadata_cache_clear()
+    >>> glymur.reset_option('all')
+
+    See also
+    --------
+    metadata_cache_clear
+    """
+    return _cache.info()
+
+
+def metadata_cache_clear(disk=False):
+    """Empty the metadata cache and reset its statistics.
+
+    Parameters
+    ----------
+    disk : bool, optional
+        If true, also remove the entries on disk.
+
+    See also
+    --------
+    metadata_cache_info
+    """
+    _cache.clear(disk)
@@ -1,7 +1,11 @@
 """Manage glymur configuration settings."""
 
 # Standard library imports
+import contextlib
+import contextvars
 import copy
+import numbers
+import types
 import warnings
 
 # Local imports
@@ -10,6 +14,9 @@ from .lib import openjp2 as opj2
 
 
 _original_options = {
+    "async.max_workers": None,
+    "cache.max_bytes": 0,
+    "cache.metadata": None,
     "lib.num_threads": 1,
     "parse.full_codestream": False,
     "print.xml": True,
@@ -18,12 +25,21 @@ _original_options = {
 }
 _options = copy.deepcopy(_original_options)
 
+# Options set by option_context, which take precedence over _options within
+# the current thread or asyncio task.
+_context_options = contextvars.ContextVar(
+    "glymur_options", default=types.MappingProxyType({})
+)
+
 
 def set_option(key, value):
     """Set the value of the specified option.
 
     Available options:
 
+        async.max_workers
+        cache.max_bytes
+        cache.metadata
         parse.full_codestream
         print.xml
         print.codestream
@@ -39,9 +55,28 @@ def set_option(key, value):
 
     Option Descriptions
     -------------------
-    lib.num_threads : int
+    async.max_workers : int or None
+        Number of threads that run the coroutines aread and awrite.  Reads
+        and writes beyond this number wait their turn.  None lets Python
+        choose, as with concurrent.futures.ThreadPoolExecutor.
+        [default: None]
+    cache.max_bytes : int
+        Size in bytes of the cache of decoded tiles shared by all images read
+        from files.  Reads are assembled from cached tiles where possible.
+        Zero disables the cache. [default: 0]
+    cache.metadata : str or None
+        Where to cache the parsed boxes and codestream header of images read
+        from files, so that opening them again does not parse them again.
+        Either 'memory', or 'disk' to also keep them in the metadata
+        directory of the configuration directory.  Entries are invalidated
+        when the size or modification time of a file changes.  None disables
+        the cache. [default: None]
+    lib.num_threads : int or 'auto'
         Set the number of threads used to decode an image.  This option is only
-        available with OpenJPEG 2.2.0 or higher.
+        available with OpenJPEG 2.2.0 or higher.  With 'auto', each decode or
+        encode gets as many threads as its tiles can keep busy, out of the
+        cores not already in use by other decodes and encodes, see
+        glymur.thread_info. [default: 1]
     parse.full_codestream : bool
         When False, only the codestream header is parsed for metadata.  This
         can results in faster JP2/JPX parsing.  When True, the entire
@@ -65,12 +100,42 @@ def set_option(key, value):
 
     See also
     --------
-    get_option
+    get_option, option_context
     """
+    _validate_option(key, value)
+    _options[key] = value
+
+
+def _validate_option(key, value):
+    """Raise an exception unless the option may be set to the value."""
     if key not in _options.keys():
         raise KeyError(f"{key} not valid.")
 
-    if key == "lib.num_threads":
+    if key == "async.max_workers" and value is not None:
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            msg = f"{key} must be None or a positive integer, not {value!r}."
+            raise ValueError(msg)
+
+    if key == "cache.max_bytes":
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            msg = f"{key} must be a non-negative integer, not {value!r}."
+            raise ValueError(msg)
+
+    if key == "cache.metadata" and value not in (None, "memory", "disk"):
+        msg = f"{key} must be None, 'memory', or 'disk', not {value!r}."
+        raise ValueError(msg)
+
+    if key == "lib.num_threads" and value == "auto":
+        # Falls back to a single thread if need be.
+        pass
+    elif key == "lib.num_threads":
+        if (
+            isinstance(value, bool)
+            or not isinstance(value, numbers.Integral)
+            or value < 1
+        ):
+            msg = f"{key} must be 'auto' or a positive integer, not {value!r}."
+            raise ValueError(msg)
         if version.openjpeg_version < "2.2.0":
             msg = (
                 f"Thread support is not available on versions of OpenJPEG "
@@ -82,7 +147,53 @@ def set_option(key, value):
             msg = "The OpenJPEG library is not configured with thread support."
             raise RuntimeError(msg)
 
-    _options[key] = value
+
+@contextlib.contextmanager
+def option_context(options=None, /, **kwargs):
+    """Set options temporarily, for the current thread or asyncio task only.
+
+    Other threads and tasks keep seeing the options as they were, so each
+    can tune glymur for its own job, e.g. the number of threads used by
+    OpenJPEG.  Within the context these options take precedence over those
+    set with set_option.  Contexts may be nested.
+
+    Threads started by glymur on behalf of a call made within the context,
+    such as those decoding tiles in parallel, see the same options.
+    Processes do not.
+
+    Parameters
+    ----------
+    options : dict, optional
+        Maps option names to their values.  As the names contain periods,
+        this is usually more convenient than keyword arguments.
+    kwargs :
+        More options.
+
+    Examples
+    --------
+    >>> jp2 = glymur.Jp2k(glymur.data.nemo())
+    >>> with glymur.option_context({'print.short': True}):
+    ...     print(jp2.box[0])
+    JPEG 2000 Signature Box (jP  ) @ (0, 12)
+    >>> glymur.get_option('print.short')
+    False
+
+    See also
+    --------
+    set_option
+    """
+    options = {} if options is None else dict(options)
+    options.update(kwargs)
+    for key, value in options.items():
+        _validate_option(key, value)
+
+    context = dict(_context_options.get())
+    context.update(options)
+    token = _context_options.set(types.MappingProxyType(context))
+    try:
+        yield
+    finally:
+        _context_options.reset(token)
 
 
 def get_option(key):
@@ -90,6 +201,9 @@ def get_option(key):
 
     Available options:
 
+        async.max_workers
+        cache.max_bytes
+        cache.metadata
         parse.full_codestream
         print.xml
         print.codestream
@@ -106,8 +220,11 @@ def get_option(key):
 
     See also
     --------
-    set_option
+    set_option, option_context
     """
+    context = _context_options.get()
+    if key in context:
+        return context[key]
     return _options[key]
 
 
@@ -118,6 +235,9 @@ def reset_option(key):
 
     Available options:
 
+        async.max_workers
+        cache.max_bytes
+        cache.metadata
         parse.full_codestream
         print.xml
         print.codestream
@@ -0,0 +1,390 @@
+"""Plan which bytes of a codestream are needed to decode part of an image.
+
+A tile-part consists of a header followed by packets, each of which holds
+the contribution of one quality layer to one precinct of one resolution of
+one component.  Given the packet lengths from PLT segments, the packets are
+put in the order of the progression and only those that a window, reduced
+resolution, number of layers, and set of components need are kept.
+
+Without usable packet lengths, whole tile-parts are planned instead.  That
+is the case for tiles whose tile-parts lack PLT segments or whose packet
+lengths do not add up, and for codestreams with progression order changes
+or coding styles that differ from one tile to another.  PPM and PPT segments
+hold packet headers rather than packet lengths, so they do not help, but
+they are in the main and tile-part headers that are always planned.
+"""
+
+# Standard library imports
+import collections
+import itertools
+import math
+import struct
+
+# 3rd party library imports
+import numpy as np
+
+# Local imports
+from .codestream import _parse_packet_lengths
+from .core import (
+    LRCP,
+    RLCP,
+    RPCL,
+    PCRL,
+    CPRL,
+    WAVELET_XFORM_9X7_IRREVERSIBLE,
+)
+
+
+TilePart = collections.namedtuple(
+    "TilePart", ["offset", "length", "header_length", "packet_lengths"]
+)
+TilePart.__doc__ = """A tile-part as far as planning is concerned.
+
+Attributes
+----------
+offset : int
+    Offset of the SOT marker from the start of the file.
+length : int
+    Length of the tile-part, including its header.
+header_length : int
+    Length of the header, through the SOD marker.
+packet_lengths : ndarray or None
+    Lengths of the packets from the PLT segments, or None if they cannot be
+    used.
+"""
+
+# Marker segments in a tile-part header that change how the packets of the
+# tile are laid out.
+_RECODING_MARKERS = {0xFF52, 0xFF53, 0xFF5F}
+
+# Sort keys for the packets in each progression order, least significant
+# first as for np.lexsort.
+_PROGRESSION_KEYS = {
+    LRCP: ("precinct", "component", "resolution", "layer"),
+    RLCP: ("precinct", "component", "layer", "resolution"),
+    RPCL: ("layer", "component", "x", "y", "resolution"),
+    PCRL: ("layer", "resolution", "component", "x", "y"),
+    CPRL: ("layer", "resolution", "x", "y", "component"),
+}
+
+
+def read_tile_part(fptr, offset, length):
+    """Read the header of a tile-part for its packet lengths.
+
+    Parameters
+    ----------
+    fptr : file
+        Open file object.
+    offset, length : int
+        Where the tile-part is, see Codestream.tile_index.
+
+    Returns
+    -------
+    TilePart
+    """
+    end = offset + length
+    pos = offset + 12
+    plts = []
+    usable = True
+
+    while True:
+        fptr.seek(pos)
+        read_buffer = fptr.read(4)
+        if len(read_buffer) < 2 or pos + 2 > end:
+            # No SOD marker, so the tile-part cannot be split up.
+            return TilePart(offset, length, length, None)
+
+        (marker,) = struct.unpack_from(">H", read_buffer)
+        if marker == 0xFF93:
+            header_length = pos + 2 - offset
+            break
+        if len(read_buffer) < 4:
+            return TilePart(offset, length, length, None)
+
+        (segment_length,) = struct.unpack_from(">H", read_buffer, 2)
+        if marker == 0xFF58:
+            read_buffer = fptr.read(segment_length - 2)
+            zplt, iplt = read_buffer[0], read_buffer[1:]
+            plts.append((zplt, _parse_packet_lengths(iplt)))
+        elif marker in _RECODING_MARKERS:
+            usable = False
+
+        pos += 2 + max(segment_length, 2)
+
+    if not usable or len(plts) == 0:
+        return TilePart(offset, length, header_length, None)
+
+    plts.sort(key=lambda item: item[0])
+    lengths = np.concatenate([item[1] for item in plts]).astype(np.int64)
+    if lengths.sum() != length - header_length:
+        return TilePart(offset, length, header_length, None)
+
+    return TilePart(offset, length, header_length, lengths)
+
+
+def plan(
+    fptr, codestream, tile_index, area=None, rlevel=0, layers=0,
+    components=None
+):
+    """Compute the byte ranges needed to decode part of an image.
+
+    Parameters
+    ----------
+    fptr : file
+        Open file object, for reading the tile-part headers.
+    codestream : Codestream
+        The codestream, parsed at least for its main header.
+    tile_index : ndarray
+        Where the tile-parts are, see Codestream.tile_index.
+    area : tuple, optional
+        Window on the reference grid, (first_row, first_col, last_row,
+        last_col).  By default, the whole image.
+    rlevel : int, optional
+        Number of resolutions to discard, already checked against the
+        number of decomposition levels.
+    layers : int, optional
+        Number of quality layers to decode, or zero for all of them.
+    components : list, optional
+        Components to decode.  By default, all of them.
+
+    Returns
+    -------
+    list
+        Coalesced (offset, length) pairs, sorted by offset.
+    """
+    siz = codestream.segment[1]
+    main_header = list(
+        itertools.takewhile(
+            lambda seg: seg.marker_id != "SOT", codestream.segment
+        )
+    )
+    cod = next(seg for seg in main_header if seg.marker_id == "COD")
+
+    num_layers = cod.layers
+    if layers == 0 or layers > num_layers:
+        layers = num_layers
+    if components is None:
+        components = range(siz.Csiz)
+
+    starts = [codestream.offset]
+    stops = [codestream._sot_offset or codestream.offset]
+
+    everything = (
+        area is None
+        and rlevel == 0
+        and layers == num_layers
+        and set(components) == set(range(siz.Csiz))
+    )
+    split = not everything and not any(
+        seg.marker_id == "POD" for seg in main_header
+    )
+    coding = _component_coding(main_header, cod, siz.Csiz)
+    margin = 16 if cod.xform == WAVELET_XFORM_9X7_IRREVERSIBLE else 8
+
+    for tile in _tiles(siz, area):
+        rows = tile_index[tile_index["tile"] == tile]
+        if len(rows) == 0:
+            continue
+
+        tile_parts = [
+            read_tile_part(fptr, int(row["offset"]), int(row["length"]))
+            if split
+            else TilePart(int(row["offset"]), int(row["length"]), None, None)
+            for row in rows
+        ]
+
+        packets = None
+        if all(tp.packet_lengths is not None for tp in tile_parts):
+            packets = _needed_packets(
+                _tile_bounds(siz, tile), siz, coding, cod.prog_order,
+                num_layers, area, rlevel, layers, components, margin
+            )
+        lengths = [tp.packet_lengths for tp in tile_parts]
+        if packets is None or len(packets) != sum(map(len, lengths)):
+            # Fall back to the whole tile-parts.
+            for tp in tile_parts:
+                starts.append(tp.offset)
+                stops.append(tp.offset + tp.length)
+            continue
+
+        # The packets follow one another across the tile-parts.
+        offsets = np.concatenate([
+            tp.offset + tp.header_length + np.cumsum(plen) - plen
+            for tp, plen in zip(tile_parts, lengths)
+        ])
+        lengths = np.concatenate(lengths)
+
+        for tp in tile_parts:
+            starts.append(tp.offset)
+            stops.append(tp.offset + tp.header_length)
+        starts.extend(offsets[packets].tolist())
+        stops.extend((offsets + lengths)[packets].tolist())
+
+    return coalesce(starts, stops)
+
+
+def coalesce(starts, stops):
+    """Merge byte ranges that overlap or touch.
+
+    Parameters
+    ----------
+    starts, stops : array-like
+        First and one past the last byte of each range.
+
+    Returns
+    -------
+    list
+        (offset, length) pairs, sorted by offset.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    stops = np.asarray(stops, dtype=np.int64)
+    keep = stops > starts
+    starts, stops = starts[keep], stops[keep]
+    if starts.size == 0:
+        return []
+
+    order = np.argsort(starts, kind="stable")
+    starts = starts[order]
+    stops = np.maximum.accumulate(stops[order])
+
+    breaks = np.flatnonzero(starts[1:] > stops[:-1]) + 1
+    first = np.concatenate(([0], breaks))
+    last = np.concatenate((breaks - 1, [starts.size - 1]))
+    return [
+        (int(start), int(stop - start))
+        for start, stop in zip(starts[first], stops[last])
+    ]
+
+
+def _component_coding(main_header, cod, num_components):
+    """Number of decomposition levels and precinct exponents (PPx, PPy) of
+    each resolution, for each component.
+    """
+    cocs = {seg.ccoc: seg for seg in main_header if seg.marker_id == "COC"}
+    coding = []
+    for c in range(num_components):
+        if c in cocs:
+            num_levels = int(cocs[c].spcoc[0])
+            precinct_size = cocs[c].precinct_size
+        else:
+            num_levels = cod.num_res
+            precinct_size = cod.precinct_size
+
+        # Sizes are (width, height), lowest resolution first.
+        precinct_size = np.atleast_2d(precinct_size)
+        exponents = [
+            tuple(
+                int(math.log2(x))
+                for x in precinct_size[min(r, len(precinct_size) - 1)]
+            )
+            for r in range(num_levels + 1)
+        ]
+        coding.append((num_levels, exponents))
+    return coding
+
+
+def _tiles(siz, area):
+    """Indices of the tiles that overlap a window on the reference grid."""
+    num_cols = -(-(siz.xsiz - siz.xtosiz) // siz.xtsiz)
+    num_rows = -(-(siz.ysiz - siz.ytosiz) // siz.ytsiz)
+    if area is None:
+        return range(num_rows * num_cols)
+
+    y0, x0, y1, x1 = area
+    col0 = max((x0 - siz.xtosiz) // siz.xtsiz, 0)
+    col1 = min((x1 - 1 - siz.xtosiz) // siz.xtsiz + 1, num_cols)
+    row0 = max((y0 - siz.ytosiz) // siz.ytsiz, 0)
+    row1 = min((y1 - 1 - siz.ytosiz) // siz.ytsiz + 1, num_rows)
+    return [
+        row * num_cols + col
+        for row in range(row0, row1)
+        for col in range(col0, col1)
+    ]
+
+
+def _tile_bounds(siz, tile):
+    """Bounds (x0, y0, x1, y1) of a tile on the reference grid."""
+    num_cols = -(-(siz.xsiz - siz.xtosiz) // siz.xtsiz)
+    row, col = divmod(tile, num_cols)
+    x0 = max(siz.xtosiz + col * siz.xtsiz, siz.xosiz)
+    y0 = max(siz.ytosiz + row * siz.ytsiz, siz.yosiz)
+    x1 = min(siz.xtosiz + (col + 1) * siz.xtsiz, siz.xsiz)
+    y1 = min(siz.ytosiz + (row + 1) * siz.ytsiz, siz.ysiz)
+    return x0, y0, x1, y1
+
+
+def _needed_packets(
+    bounds, siz, coding, progression, num_layers, area, rlevel, layers,
+    components, margin
+):
+    """Which packets of a tile are needed, in progression order.
+
+    Returns
+    -------
+    ndarray or None
+        Boolean mask over the packets of the tile, or None if the
+        progression order is unknown.
+    """
+    if progression not in _PROGRESSION_KEYS:
+        return None
+
+    tx0, ty0, tx1, ty1 = bounds
+    columns = collections.defaultdict(list)
+
+    for c, (num_levels, exponents) in enumerate(coding):
+        dx, dy = siz.xrsiz[c], siz.yrsiz[c]
+        tcx0, tcx1 = -(-tx0 // dx), -(-tx1 // dx)
+        tcy0, tcy1 = -(-ty0 // dy), -(-ty1 // dy)
+
+        for r, (ppx, ppy) in enumerate(exponents):
+            level = num_levels - r
+            trx0, trx1 = -(-tcx0 // 2**level), -(-tcx1 // 2**level)
+            try0, try1 = -(-tcy0 // 2**level), -(-tcy1 // 2**level)
+            if trx1 <= trx0 or try1 <= try0:
+                # No precincts, so no packets.
+                continue
+
+            # Precincts on the grid of the resolution, in raster order.
+            px0, py0 = trx0 >> ppx, try0 >> ppy
+            pw = -(-trx1 // 2**ppx) - px0
+            ph = -(-try1 // 2**ppy) - py0
+            py, px = np.divmod(np.arange(pw * ph), pw)
+            px, py = px + px0, py + py0
+
+            # Where the position-driven progressions reach each precinct.
+            x = np.maximum(tx0, (px << (ppx + level)) * dx)
+            y = np.maximum(ty0, (py << (ppy + level)) * dy)
+
+            needed = np.full(px.shape, c in components and level >= rlevel)
+            if area is not None:
+                # The window on the grid of the resolution, widened by the
+                # reach of the wavelet filters.
+                ay0, ax0, ay1, ax1 = area
+                ax0 = (-(-ax0 // dx) >> level) - margin
+                ay0 = (-(-ay0 // dy) >> level) - margin
+                ax1 = -(-(-(-ax1 // dx)) >> level) + margin
+                ay1 = -(-(-(-ay1 // dy)) >> level) + margin
+                needed &= (px << ppx < ax1) & ((px + 1) << ppx > ax0)
+                needed &= (py << ppy < ay1) & ((py + 1) << ppy > ay0)
+
+            # One packet per layer.
+            n = px.size
+            columns["layer"].append(np.repeat(np.arange(num_layers), n))
+            columns["resolution"].append(np.full(n * num_layers, r))
+            columns["component"].append(np.full(n * num_layers, c))
+            columns["precinct"].append(np.tile(np.arange(n), num_layers))
+            columns["x"].append(np.tile(x, num_layers))
+            columns["y"].append(np.tile(y, num_layers))
+            columns["needed"].append(
+                np.tile(needed, num_layers)
+                & (np.repeat(np.arange(num_layers), n) < layers)
+            )
+
+    if len(columns) == 0:
+        return np.zeros(0, dtype=bool)
+
+    columns = {key: np.concatenate(value) for key, value in columns.items()}
+    order = np.lexsort(
+        [columns[key] for key in _PROGRESSION_KEYS[progression]]
+    )
+    return columns["needed"][order]
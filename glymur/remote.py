@@ -0,0 +1,334 @@
+"""Read JPEG 2000 files over HTTP with range requests.
+
+A RemoteFile is a read-only, seekable file object whose bytes are fetched on
+demand, a block at a time, and kept in a least-recently-used cache.  Jp2kr
+accepts it like any other file object, so parsing the boxes and the main
+header of the codestream only fetches the blocks that they occupy, and
+OpenJPEG decodes through stream callbacks that fetch only the blocks it
+reads.  Tiles outside of a decoded area are skipped over without being
+fetched.
+
+    >>> f = glymur.remote.open_url('https://example.com/image.jp2')
+    >>> jp2 = glymur.Jp2kr(f)  # doctest: +SKIP
+
+The fetching is pluggable.  Anything with a fetch method taking the first
+and one past the last byte wanted, and with a size attribute that may be None
+until the first fetch, can be used in place of HTTPRangeFetcher, e.g. to read
+from object storage with its own client library.
+"""
+
+# Standard library imports
+import collections
+import io
+import os
+import threading
+import urllib.error
+import urllib.request
+
+
+class HTTPRangeFetcher(object):
+    """Fetch byte ranges of a resource with HTTP range requests.
+
+    Attributes
+    ----------
+    url : str
+        The resource.
+    headers : dict
+        Extra request headers, e.g. for authorization.
+    timeout : float or None
+        Timeout of each request in seconds.
+    size : int or None
+        Size of the resource in bytes, known after the first fetch.
+    """
+
+    def __init__(self, url, headers=None, timeout=None):
+        self.url = url
+        self.headers = {} if headers is None else dict(headers)
+        self.timeout = timeout
+        self.size = None
+
+    def __repr__(self):
+        return f"HTTPRangeFetcher({self.url!r})"
+
+    def fetch(self, start, stop):
+        """Fetch the bytes from start up to but not including stop.
+
+        Parameters
+        ----------
+        start, stop : int
+            The range of bytes.
+
+        Returns
+        -------
+        bytes
+            The bytes, fewer than asked for past the end of the resource.
+
+        Raises
+        ------
+        OSError
+            If the server does not honor range requests.
+        """
+        headers = dict(self.headers)
+        headers["Range"] = f"bytes={start}-{stop - 1}"
+        request = urllib.request.Request(self.url, headers=headers)
+
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            if e.code != 416:
+                raise
+            # The range starts past the end of the resource.
+            self._set_size(e.headers.get("Content-Range"))
+            return b""
+
+        with response:
+            if response.status != 206:
+                msg = (
+                    f"{self.url} does not support range requests, the "
+                    f"server responded with status {response.status}."
+                )
+                raise OSError(msg)
+            self._set_size(response.headers.get("Content-Range"))
+            return response.read()
+
+    def _set_size(self, content_range):
+        """Take the size of the resource from a Content-Range header, which
+        looks like "bytes 0-99/1234" or "bytes */1234".
+        """
+        if content_range is None:
+            return
+        total = content_range.rpartition("/")[2].strip()
+        if total.isdigit():
+            self.size = int(total)
+
+
+class RemoteFile(io.RawIOBase):
+    """Read-only file object whose bytes are fetched on demand.
+
+    Reads are served from a cache of fixed-size blocks.  Blocks missing from
+    the cache are fetched, consecutive ones with a single request.  When a
+    read continues where the previous one left off, some blocks beyond it
+    are fetched along with it.
+
+    Attributes
+    ----------
+    fetcher : object
+        Fetches the bytes, see HTTPRangeFetcher.
+    block_size : int
+        Size of the blocks in bytes.
+    requests : int
+        Number of fetches so far.
+    bytes_fetched : int
+        Number of bytes fetched so far.
+    """
+
+    def __init__(
+        self, fetcher, block_size=65536, cache_size=32 * 2**20, read_ahead=4
+    ):
+        """
+        Parameters
+        ----------
+        fetcher : object
+            Fetches the bytes, see HTTPRangeFetcher.
+        block_size : int, optional
+            Size of the blocks in bytes.
+        cache_size : int, optional
+            Size of the block cache in bytes.
+        read_ahead : int, optional
+            Number of blocks to fetch beyond a read that continues the
+            previous one.
+        """
+        super().__init__()
+        if block_size < 1:
+            raise ValueError("The block size must be positive.")
+        self.fetcher = fetcher
+        self.block_size = block_size
+        self.read_ahead = read_ahead
+        self.requests = 0
+        self.bytes_fetched = 0
+
+        self._max_blocks = max(1, cache_size // block_size)
+        self._blocks = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._pos = 0
+        self._last_stop = None
+
+    def __repr__(self):
+        return f"RemoteFile({self.fetcher!r})"
+
+    @property
+    def name(self):
+        return getattr(self.fetcher, "url", None)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def size(self):
+        """Size of the remote file in bytes.
+
+        Unless the fetcher already knows, the first block is fetched, which
+        is usually wanted anyway.
+        """
+        if self.fetcher.size is None:
+            with self._lock:
+                self._get_blocks(0, 0)
+            if self.fetcher.size is None:
+                raise OSError(f"Could not determine the size of {self.name}.")
+        return self.fetcher.size
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == os.SEEK_END:
+            pos = self.size() + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence}).")
+
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}.")
+
+        self._pos = pos
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def readinto(self, b):
+        b = memoryview(b).cast("B")
+        nbytes = max(0, min(len(b), self.size() - self._pos))
+        if nbytes == 0:
+            return 0
+
+        start, stop = self._pos, self._pos + nbytes
+        with self._lock:
+            blocks = self._get_blocks(
+                start // self.block_size,
+                (stop - 1) // self.block_size,
+                sequential=start == self._last_stop,
+            )
+            self._last_stop = stop
+
+        # Copy out of the blocks, the first and last of them partially.
+        n = 0
+        for index, block in blocks:
+            block_start = index * self.block_size
+            lo = max(start, block_start) - block_start
+            hi = min(stop, block_start + len(block)) - block_start
+            if hi <= lo:
+                break
+            b[n:n + hi - lo] = block[lo:hi]
+            n += hi - lo
+
+        self._pos += n
+        return n
+
+    def cache_clear(self):
+        """Drop all of the cached blocks."""
+        with self._lock:
+            self._blocks.clear()
+
+    def _get_blocks(self, first, last, sequential=False):
+        """Get a run of blocks, fetching those that are not cached.
+
+        Parameters
+        ----------
+        first, last : int
+            Indices of the first and last blocks.
+        sequential : bool, optional
+            If true, also fetch the read-ahead blocks.
+
+        Returns
+        -------
+        list
+            Index and contents of each block.
+        """
+        found = {}
+        missing = []
+        for index in range(first, last + 1):
+            block = self._blocks.get(index)
+            if block is None:
+                missing.append(index)
+            else:
+                self._blocks.move_to_end(index)
+                found[index] = block
+
+        # Group the missing blocks into runs of consecutive blocks.
+        runs = []
+        for index in missing:
+            if runs and runs[-1][1] == index - 1:
+                runs[-1][1] = index
+            else:
+                runs.append([index, index])
+
+        if runs and sequential and self.read_ahead > 0:
+            runs[-1][1] += self.read_ahead
+            if self.fetcher.size is not None:
+                num_blocks = -(-self.fetcher.size // self.block_size)
+                runs[-1][1] = max(
+                    runs[-1][0], min(runs[-1][1], num_blocks - 1)
+                )
+
+        for lo, hi in runs:
+            data = self.fetcher.fetch(
+                lo * self.block_size, (hi + 1) * self.block_size
+            )
+            self.requests += 1
+            self.bytes_fetched += len(data)
+            for index in range(lo, hi + 1):
+                offset = (index - lo) * self.block_size
+                block = data[offset:offset + self.block_size]
+                if len(block) == 0:
+                    break
+                found[index] = block
+                self._blocks[index] = block
+
+        while len(self._blocks) > self._max_blocks:
+            self._blocks.popitem(last=False)
+
+        return [
+            (index, found[index])
+            for index in range(first, last + 1)
+            if index in found
+        ]
+
+
+def open_url(
+    url, headers=None, timeout=None, block_size=65536, cache_size=32 * 2**20,
+    read_ahead=4
+):
+    """Open a JPEG 2000 file served over HTTP for reading.
+
+    The server must honor range requests.
+
+    Parameters
+    ----------
+    url : str
+        Where the file is.
+    headers : dict, optional
+        Extra request headers, e.g. for authorization.
+    timeout : float, optional
+        Timeout of each request in seconds.
+    block_size, cache_size, read_ahead : int, optional
+        See RemoteFile.
+
+    Returns
+    -------
+    RemoteFile
+        To be passed to Jp2kr.
+
+    Examples
+    --------
+    >>> f = glymur.remote.open_url('https://example.com/image.jp2')
+    >>> jp2 = glymur.Jp2kr(f)  # doctest: +SKIP
+    >>> image = jp2[:256, :256]  # doctest: +SKIP
+    """
+    fetcher = HTTPRangeFetcher(url, headers=headers, timeout=timeout)
+    return RemoteFile(
+        fetcher, block_size=block_size, cache_size=cache_size,
+        read_ahead=read_ahead
+    )
@@ -0,0 +1,168 @@
+"""Number of threads used by OpenJPEG for each codec.
+
+With the lib.num_threads option set to 'auto', each decode or encode is
+given as many threads as it can keep busy, judging by the number of
+code-blocks within a tile, which OpenJPEG processes in parallel.  It is
+given no more than the cores left over by the other codecs in use at the
+time, though, so that concurrent reads and writes do not oversubscribe the
+machine.  The cores are those this process may run on.  A codec holds on to
+its threads until it is destroyed.
+
+The most recent decisions are kept for inspection, see thread_info.
+"""
+
+# Standard library imports
+import collections
+import math
+import os
+import threading
+
+# Local imports
+from .lib import openjp2 as opj2
+from .options import get_option
+
+
+ThreadDecision = collections.namedtuple(
+    "ThreadDecision", ["operation", "codeblocks", "available", "num_threads"]
+)
+ThreadDecision.__doc__ = """How many threads a codec was given.
+
+Attributes
+----------
+operation : str
+    Either 'decode' or 'encode'.
+codeblocks : int
+    Estimated number of code-blocks per tile, over all components.
+available : int
+    Cores not in use by other codecs at the time.
+num_threads : int
+    Threads given to the codec.
+"""
+
+ThreadInfo = collections.namedtuple(
+    "ThreadInfo", ["cores", "in_use", "decisions"]
+)
+
+
+def available_cores():
+    """Number of cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # Not available on macOS or Windows.
+        return os.cpu_count() or 1
+
+
+def count_codeblocks(height, width, code_block_size, ncomps):
+    """Number of code-blocks covering an area of a tile.
+
+    The subbands of all resolutions together cover about the same area as
+    the tile itself, so this is a good estimate of the code-blocks that
+    OpenJPEG can process in parallel.
+
+    Parameters
+    ----------
+    height, width : int
+        Dimensions of the area at the resolution being decoded.
+    code_block_size : tuple
+        Height and width of the code-blocks.
+    ncomps : int
+        Number of components.
+    """
+    cbh, cbw = code_block_size
+    return ncomps * math.ceil(height / cbh) * math.ceil(width / cbw)
+
+
+class _ThreadBudget(object):
+    """Thread-safe count of the threads given to codecs still in use."""
+
+    def __init__(self, history=64):
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._decisions = collections.deque(maxlen=history)
+
+    def acquire(self, operation, codeblocks):
+        """Decide how many threads a new codec gets, and count them."""
+        cores = available_cores()
+        with self._lock:
+            available = max(1, cores - self._in_use)
+            num_threads = max(1, min(codeblocks, available))
+            self._in_use += num_threads
+            self._decisions.append(
+                ThreadDecision(operation, codeblocks, available, num_threads)
+            )
+        return num_threads
+
+    def release(self, num_threads):
+        with self._lock:
+            self._in_use -= num_threads
+
+    def info(self):
+        with self._lock:
+            return ThreadInfo(
+                available_cores(), self._in_use, tuple(self._decisions)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._decisions.clear()
+
+
+_budget = _ThreadBudget()
+
+
+def num_threads(operation, codeblocks, stack):
+    """Number of threads to give a new codec, according to the
+    lib.num_threads option.
+
+    Parameters
+    ----------
+    operation : str
+        Either 'decode' or 'encode'.
+    codeblocks : int
+        Estimated number of code-blocks per tile, see count_codeblocks.
+    stack : contextlib.ExitStack
+        Destroys the codec.  The threads are handed back along with it.
+
+    Returns
+    -------
+    int
+    """
+    requested = get_option("lib.num_threads")
+    if requested != "auto":
+        # Could be a numpy integer.
+        return int(requested)
+
+    if not opj2.has_thread_support():
+        return 1
+
+    n = _budget.acquire(operation, codeblocks)
+    stack.callback(_budget.release, n)
+    return n
+
+
+def thread_info():
+    """Report how threads are shared out when lib.num_threads is 'auto'.
+
+    Returns
+    -------
+    ThreadInfo
+        Named tuple of the number of cores available to the process, the
+        number of threads held by codecs currently in use, and the most
+        recent decisions as ThreadDecision named tuples, oldest first.
+
+    Examples
+    --------
+    >>> glymur.set_option('lib.num_threads', 'auto')
+    >>> image = glymur.Jp2k(glymur.data.nemo())[:]
+    >>> glymur.thread_info().decisions[-1]  # doctest: +SKIP
+    ThreadDecision(operation='decode', codeblocks=2187, available=8,
+    num_threads=8)
+    >>> glymur.reset_option('all')
+    """
+    return _budget.info()
+
+
+def thread_info_clear():
+    """Forget the decisions reported by thread_info."""
+    _budget.clear()
@@ -11,7 +11,7 @@ import warnings
 import numpy as np
 
 # local imports
-from glymur import Jp2k, set_option
+from glymur import Jp2k, option_context
 from glymur.core import SRGB
 from ._core_converter import _2JP2Converter
 from .lib import _tiff as libtiff
@@ -132,8 +132,10 @@ class Tiff2Jp2k(_2JP2Converter):
 
         self.setup_logging(verbosity)
 
+        # Applied to this conversion only, rather than to the whole process.
+        self.options = {}
         if num_threads > 1:
-            set_option("lib.num_threads", num_threads)
+            self.options["lib.num_threads"] = num_threads
 
     def _process_exclude_tags(self, exclude_tags):
         """The list of tags to exclude may be mixed type (str or integer).
@@ -197,7 +199,8 @@ class Tiff2Jp2k(_2JP2Converter):
     def run(self):
 
         self.get_main_ifd()
-        self.copy_image()
+        with option_context(self.options):
+            self.copy_image()
         self.append_extra_jp2_boxes()
         self.rewrap_jp2()
 
@@ -0,0 +1,131 @@
+"""Cache of decoded tiles shared by all Jp2kr objects.
+
+The cache is disabled by default.  Give it a budget with the cache.max_bytes
+option and reads of images on disk will be assembled from cached tiles,
+decoding only those tiles that are missing.  The least recently used tiles
+are evicted once the budget is exceeded.
+"""
+
+# Standard library imports
+import collections
+import threading
+
+# Local imports
+from .options import get_option
+
+
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "max_bytes", "current_bytes"]
+)
+
+
+class _TileCache(object):
+    """Thread-safe LRU cache of decoded tiles, bounded by their size in
+    bytes.
+
+    Two threads missing the same tile at the same time will both decode it,
+    the second one to finish replacing the first in the cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiles = collections.OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        """Return the cached tile or None."""
+        max_bytes = get_option("cache.max_bytes")
+        with self._lock:
+            self._evict(max_bytes)
+            image = self._tiles.get(key)
+            if image is None:
+                self._misses += 1
+                return None
+            self._tiles.move_to_end(key)
+            self._hits += 1
+            return image
+
+    def put(self, key, image):
+        """Cache a tile, evicting the least recently used tiles as needed.
+
+        The image is made read-only, as it may be shared.
+        """
+        max_bytes = get_option("cache.max_bytes")
+        if image.nbytes > max_bytes:
+            return
+
+        image.setflags(write=False)
+        with self._lock:
+            old = self._tiles.pop(key, None)
+            if old is not None:
+                self._nbytes -= old.nbytes
+            self._tiles[key] = image
+            self._nbytes += image.nbytes
+            self._evict(max_bytes)
+
+    def _evict(self, max_bytes):
+        while self._nbytes > max_bytes:
+            _, image = self._tiles.popitem(last=False)
+            self._nbytes -= image.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._tiles.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                get_option("cache.max_bytes"),
+                self._nbytes,
+            )
+
+
+_cache = _TileCache()
+
+
+def enabled():
+    """Is the cache configured to hold anything?"""
+    return get_option("cache.max_bytes") > 0
+
+
+def cache_info():
+    """Report statistics of the decoded tile cache.
+
+    Returns
+    -------
+    CacheInfo
+        Named tuple of hits, misses, max_bytes and current_bytes.
+
+    Examples
+    --------
+    >>> glymur.set_option('cache.max_bytes', 2 ** 28)
+    >>> jp2 = glymur.Jp2kr(glymur.data.nemo())
+    >>> thumbnail = jp2[::2, ::2]
+    >>> thumbnail = jp2[::2, ::2]
+    >>> glymur.cache_info().hits
+    1
+    >>> glymur.cache_clear()
+    >>> glymur.reset_option('all')
+
+    See also
+    --------
+    cache_clear
+    """
+    return _cache.info()
+
+
+def cache_clear():
+    """Empty the decoded tile cache and reset its statistics.
+
+    See also
+    --------
+    cache_info
+    """
+    _cache.clear()
@@ -0,0 +1,661 @@
+"""Serve web map tiles rendered from JPEG 2000 images.
+
+Tiles are addressed either XYZ style, where zoom level 0 is a single tile
+covering the whole image, or Deep Zoom style, where level 0 is a single
+pixel.  In both cases each zoom level halves the resolution of the next one
+up.  Zoom levels are mapped onto the resolution levels of the JPEG 2000
+codestream, so that tiles are decoded directly at the right resolution, and
+only those zoom levels below the lowest resolution available in the
+codestream are reduced further after decoding.
+
+Encoded tiles are kept in a cache in memory and, optionally, in a cache
+directory on disk.  A small HTTP server built on the standard library serves
+the tiles of one or more images, e.g.
+
+    jp2tileserver --port 8000 image.jp2
+
+after which http://localhost:8000/image/0/0/0.png is the XYZ tile covering
+the whole image and http://localhost:8000/image.dzi is the Deep Zoom
+descriptor.
+"""
+
+# Standard library imports
+import collections
+import concurrent.futures
+import contextvars
+import hashlib
+import http.server
+import io
+import os
+import pathlib
+import re
+import tempfile
+import threading
+import urllib.parse
+
+# Third party library imports
+import numpy as np
+from PIL import Image
+
+# Local imports
+from .jp2kr import Jp2kr
+
+
+# File extensions of the supported tile formats, with the Pillow format
+# names and the MIME types.
+_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "jpg": ("JPEG", "image/jpeg"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+
+
+class TileSource(object):
+    """Renders fixed-size, encoded tiles of a JPEG 2000 image.
+
+    Tiles along the right and bottom edges of the image are cropped rather
+    than padded.  TileSource objects may be used by many threads at once.
+
+    Attributes
+    ----------
+    jp2 : glymur.Jp2kr
+        The image.
+    tile_size : int
+        Height and width of the tiles.
+    format : str
+        File extension of the tile format, 'png' or 'jpg'.
+    max_zoom : int
+        The XYZ zoom level at which the tiles have the full resolution of the
+        image.
+    max_level : int
+        The Deep Zoom level at which the tiles have the full resolution of
+        the image.
+
+    Examples
+    --------
+    >>> from glymur.tileserver import TileSource
+    >>> source = TileSource(glymur.data.nemo())
+    >>> source.max_zoom
+    4
+    >>> png = source.xyz_tile(0, 0, 0)
+    """
+
+    def __init__(
+        self,
+        filename,
+        tile_size=256,
+        format="png",
+        quality=90,
+        memory_bytes=2 ** 26,
+        cache_dir=None,
+    ):
+        """
+        Parameters
+        ----------
+        filename : str, Path, bytes-like, or file object
+            The JPEG 2000 image, see Jp2kr.
+        tile_size : int, optional
+            Height and width of the tiles.
+        format : {'png', 'jpg'}, optional
+            Tile format.
+        quality : int, optional
+            JPEG quality of the tiles.
+        memory_bytes : int, optional
+            Size in bytes of the in-memory cache of encoded tiles.  Zero
+            disables it.
+        cache_dir : str or Path, optional
+            Directory in which to cache encoded tiles on disk.  Tiles of an
+            image are kept apart from those of other images and of earlier
+            versions of the same image.
+        """
+        if format.lower() not in _FORMATS:
+            msg = (
+                f"Tile format must be one of {', '.join(_FORMATS)}, not "
+                f"{format!r}."
+            )
+            raise ValueError(msg)
+
+        self.jp2 = Jp2kr(filename)
+        self.tile_size = tile_size
+        self.format = "jpg" if format.lower() == "jpeg" else format.lower()
+        self.quality = quality
+
+        self._levels = self.jp2.pyramid()
+
+        height, width = self.jp2.shape[:2]
+        self.max_zoom = _halvings(max(height, width), tile_size)
+        self.max_level = _halvings(max(height, width), 1)
+
+        self._memory = _ByteCache(memory_bytes)
+        if cache_dir is None:
+            self._cache_dir = None
+        else:
+            self._cache_dir = pathlib.Path(cache_dir) / self._identity()
+
+        # Decode sessions only pay off when the codec may decode again,
+        # i.e. when the image consists of a single tile.
+        if self.jp2._num_tiles() == 1:
+            self._sessions = _SessionPool(self.jp2)
+        else:
+            self._sessions = None
+
+        # Tiles being rendered, so that concurrent requests for the same
+        # tile render it only once.
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def __repr__(self):
+        return (
+            f"TileSource({self.jp2!r}, tile_size={self.tile_size}, "
+            f"format={self.format!r})"
+        )
+
+    def close(self):
+        """Release any decode sessions."""
+        if self._sessions is not None:
+            self._sessions.close()
+
+    @property
+    def media_type(self):
+        """MIME type of the tiles."""
+        return _FORMATS[self.format][1]
+
+    def xyz_tile(self, z, x, y):
+        """Return an encoded XYZ tile.
+
+        Parameters
+        ----------
+        z : int
+            Zoom level, from 0 up to max_zoom.
+        x, y : int
+            Column and row of the tile.
+
+        Returns
+        -------
+        bytes
+            The tile in the format of the source.
+
+        Raises
+        ------
+        IndexError
+            If there is no such tile.
+        """
+        if not 0 <= z <= self.max_zoom:
+            msg = f"Zoom level {z} must lie in the range [0, {self.max_zoom}]."
+            raise IndexError(msg)
+        return self._tile(self.max_zoom - z, x, y)
+
+    def dzi_tile(self, level, x, y):
+        """Return an encoded Deep Zoom tile.
+
+        Parameters
+        ----------
+        level : int
+            Deep Zoom level, from 0 up to max_level.
+        x, y : int
+            Column and row of the tile.
+
+        Returns
+        -------
+        bytes
+            The tile in the format of the source.
+
+        Raises
+        ------
+        IndexError
+            If there is no such tile.
+        """
+        if not 0 <= level <= self.max_level:
+            msg = (
+                f"Deep Zoom level {level} must lie in the range "
+                f"[0, {self.max_level}]."
+            )
+            raise IndexError(msg)
+        return self._tile(self.max_level - level, x, y)
+
+    def dzi(self):
+        """Return the Deep Zoom image descriptor.
+
+        Returns
+        -------
+        str
+            The XML descriptor.
+        """
+        height, width = self.jp2.shape[:2]
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" '
+            f'Format="{self.format}" Overlap="0" '
+            f'TileSize="{self.tile_size}">'
+            f'<Size Width="{width}" Height="{height}"/>'
+            '</Image>\n'
+        )
+
+    def prefetch(self, tiles, workers=None):
+        """Render XYZ tiles into the caches, in parallel.
+
+        Parameters
+        ----------
+        tiles : iterable of tuple
+            The (z, x, y) of each tile.
+        workers : int, optional
+            Number of threads, by default as many as concurrent.futures
+            chooses for a thread pool.
+        """
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run, self.xyz_tile, *t
+                )
+                for t in tiles
+            ]
+            for future in futures:
+                future.result()
+
+    def grid(self, z):
+        """Number of columns and rows of XYZ tiles at a zoom level."""
+        height, width = self._shape(self.max_zoom - z)
+        return -(-width // self.tile_size), -(-height // self.tile_size)
+
+    def _shape(self, halvings):
+        """Height and width of the image halved this many times."""
+        height, width = self.jp2.shape[:2]
+        return -(-height // 2 ** halvings), -(-width // 2 ** halvings)
+
+    def _tile(self, halvings, x, y):
+        """Return an encoded tile from the image halved this many times,
+        rendering it if it is not in the caches.
+        """
+        height, width = self._shape(halvings)
+        if not (
+            0 <= x < -(-width // self.tile_size)
+            and 0 <= y < -(-height // self.tile_size)
+        ):
+            msg = (
+                f"Tile ({x}, {y}) lies outside the image at this zoom level."
+            )
+            raise IndexError(msg)
+
+        key = (halvings, x, y)
+        data = self._memory.get(key)
+        if data is not None:
+            return data
+
+        with self._lock:
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = concurrent.futures.Future()
+                self._pending[key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            data = self._read_disk(key)
+            if data is None:
+                data = self._encode(self._render(halvings, x, y))
+                self._write_disk(key, data)
+            self._memory.put(key, data)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(data)
+        finally:
+            with self._lock:
+                del self._pending[key]
+
+        return data
+
+    def _render(self, halvings, x, y):
+        """Decode a tile from the image halved this many times.
+
+        Returns
+        -------
+        ndarray
+            The tile image data.
+        """
+        # Halve the resolution by decoding at a lower resolution level as
+        # far as possible, then reduce the rest of the way.
+        rlevel = min(halvings, len(self._levels) - 1)
+        factor = 2 ** (halvings - rlevel)
+        level = self._levels[rlevel]
+
+        span = self.tile_size * factor
+        window = (
+            y * span,
+            x * span,
+            min((y + 1) * span, level.shape[0]),
+            min((x + 1) * span, level.shape[1]),
+        )
+
+        if self._sessions is None:
+            r0, c0, r1, c1 = window
+            image = level[r0:r1, c0:c1]
+        else:
+            image = self._sessions.read(rlevel, window)
+
+        if factor > 1:
+            image = _reduce(image, factor)
+
+        return image
+
+    def _encode(self, image):
+        """Encode tile image data in the format of the source."""
+        siz = self.jp2.codestream.segment[1]
+        bitdepth, signed = siz.bitdepth[0], siz.signed[0]
+
+        # Tiles have eight bits per sample.
+        if signed or bitdepth != 8:
+            image = image.astype(np.int32)
+            if signed:
+                image += 2 ** (bitdepth - 1)
+            if bitdepth > 8:
+                image >>= bitdepth - 8
+            else:
+                image <<= 8 - bitdepth
+            image = image.astype(np.uint8)
+
+        if image.ndim == 3 and image.shape[2] == 1:
+            image = image[:, :, 0]
+        elif image.ndim == 3 and image.shape[2] > 4:
+            image = image[:, :, :3]
+
+        img = Image.fromarray(np.ascontiguousarray(image))
+
+        pil_format = _FORMATS[self.format][0]
+        kwargs = {}
+        if pil_format == "JPEG":
+            # There is no alpha in JPEG.
+            if img.mode == "LA":
+                img = img.convert("L")
+            elif img.mode == "RGBA":
+                img = img.convert("RGB")
+            kwargs["quality"] = self.quality
+
+        b = io.BytesIO()
+        img.save(b, format=pil_format, **kwargs)
+        return b.getvalue()
+
+    def _identity(self):
+        """Name of the subdirectory of the disk cache for this image."""
+        if self.jp2.path is None:
+            msg = "A disk cache may only be used with images read from files."
+            raise ValueError(msg)
+
+        st = self.jp2.path.stat()
+        s = (
+            f"{self.jp2.path.resolve()}:{st.st_mtime_ns}:{st.st_size}:"
+            f"{self.tile_size}:{self.format}:{self.quality}"
+        )
+        digest = hashlib.sha1(s.encode()).hexdigest()[:16]
+        return f"{self.jp2.path.stem}-{digest}"
+
+    def _disk_path(self, key):
+        halvings, x, y = key
+        return self._cache_dir / str(halvings) / f"{x}_{y}.{self.format}"
+
+    def _read_disk(self, key):
+        """Return an encoded tile from the disk cache, or None."""
+        if self._cache_dir is None:
+            return None
+        try:
+            return self._disk_path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key, data):
+        """Store an encoded tile in the disk cache."""
+        if self._cache_dir is None:
+            return
+
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so that readers never see a
+        # partially written tile.
+        fd, tmpname = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmpname, path)
+        except BaseException:
+            os.unlink(tmpname)
+            raise
+
+
+class _SessionPool(object):
+    """Decode sessions of an image, kept for reuse by any thread."""
+
+    def __init__(self, jp2):
+        self.jp2 = jp2
+        self._lock = threading.Lock()
+        self._idle = collections.defaultdict(list)
+
+    def read(self, rlevel, window):
+        """Decode a window of the image at a resolution level with a
+        session that has already decoded at that resolution level, if there
+        is one.
+        """
+        with self._lock:
+            idle = self._idle[rlevel]
+            session = idle.pop() if idle else self.jp2.session()
+
+        area = self.jp2._window_area(window, rlevel)
+        try:
+            image = session._read(rlevel=rlevel, area=area)
+        except Exception:
+            session.close()
+            raise
+
+        with self._lock:
+            self._idle[rlevel].append(session)
+
+        return image
+
+    def close(self):
+        with self._lock:
+            for sessions in self._idle.values():
+                for session in sessions:
+                    session.close()
+            self._idle.clear()
+
+
+class _ByteCache(object):
+    """Thread-safe LRU cache of bytes, bounded by their total length."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._items = collections.OrderedDict()
+        self._nbytes = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._nbytes -= len(old)
+            self._items[key] = data
+            self._nbytes += len(data)
+            while self._nbytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self._nbytes -= len(old)
+
+
+class TileRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the tiles of the sources of a TileServer.
+
+    The routes are
+
+        /{name}/{z}/{x}/{y}.{ext}           XYZ tiles
+        /{name}.dzi                         Deep Zoom descriptor
+        /{name}_files/{level}/{x}_{y}.{ext} Deep Zoom tiles
+    """
+
+    _XYZ = re.compile(r"^/(?P<name>[^/]+)/(\d+)/(\d+)/(\d+)\.(\w+)$")
+    _DZI = re.compile(r"^/(?P<name>[^/]+)\.dzi$")
+    _DZ_TILE = re.compile(
+        r"^/(?P<name>[^/]+)_files/(\d+)/(\d+)_(\d+)\.(\w+)$"
+    )
+
+    def do_GET(self):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+
+        m = self._DZI.match(path)
+        if m is not None:
+            source = self.server.sources.get(m["name"])
+            if source is None:
+                self.send_error(404)
+                return
+            body = source.dzi().encode()
+            self._send(body, "application/xml")
+            return
+
+        for regex, method in (
+            (self._XYZ, "xyz_tile"),
+            (self._DZ_TILE, "dzi_tile"),
+        ):
+            m = regex.match(path)
+            if m is None:
+                continue
+
+            source = self.server.sources.get(m["name"])
+            if (
+                source is None
+                or _FORMATS.get(m[5]) != _FORMATS[source.format]
+            ):
+                self.send_error(404)
+                return
+
+            z, x, y = int(m[2]), int(m[3]), int(m[4])
+            try:
+                body = getattr(source, method)(z, x, y)
+            except IndexError:
+                self.send_error(404)
+                return
+            self._send(body, source.media_type)
+            return
+
+        self.send_error(404)
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "max-age=3600")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class TileServer(http.server.ThreadingHTTPServer):
+    """HTTP server for the tiles of JPEG 2000 images.
+
+    Each request is handled in a thread of its own, so cold tiles are
+    rendered in parallel.
+
+    Attributes
+    ----------
+    sources : dict
+        The TileSource objects, by the names used in the URLs.
+    verbose : bool
+        If true, log each request.
+
+    Examples
+    --------
+    >>> import threading
+    >>> import urllib.request
+    >>> from glymur.tileserver import TileServer
+    >>> server = TileServer({'nemo': glymur.data.nemo()}, port=0)
+    >>> t = threading.Thread(target=server.serve_forever, daemon=True)
+    >>> t.start()
+    >>> url = f'http://127.0.0.1:{server.server_port}/nemo/0/0/0.png'
+    >>> urllib.request.urlopen(url).headers['Content-Type']
+    'image/png'
+    >>> server.shutdown()
+    >>> server.server_close()
+    """
+
+    daemon_threads = True
+
+    def __init__(self, sources, host="127.0.0.1", port=8000, verbose=False,
+                 **kwargs):
+        """
+        Parameters
+        ----------
+        sources : dict
+            The images by the names used in the URLs, each either a
+            TileSource or anything from which one may be created.
+        host : str, optional
+            Address to listen on.
+        port : int, optional
+            Port to listen on.  Zero picks any free port.
+        verbose : bool, optional
+            If true, log each request.
+        kwargs
+            Passed on to TileSource for sources given as filenames.
+        """
+        self.sources = {
+            name: (
+                source if isinstance(source, TileSource)
+                else TileSource(source, **kwargs)
+            )
+            for name, source in sources.items()
+        }
+        self.verbose = verbose
+        super().__init__((host, port), TileRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        for source in self.sources.values():
+            source.close()
+
+
+def _halvings(length, size):
+    """Number of times length must be halved, rounding up, to be no larger
+    than size.
+    """
+    n = 0
+    while -(-length // 2 ** n) > size:
+        n += 1
+    return n
+
+
+def _reduce(image, factor):
+    """Reduce tile image data by an integer factor, averaging over boxes
+    that are cropped at the edges.
+    """
+    nrows = -(-image.shape[0] // factor)
+    ncols = -(-image.shape[1] // factor)
+
+    # Sum over the boxes, then divide by the number of pixels in each box.
+    sums = np.add.reduceat(
+        np.add.reduceat(
+            image.astype(np.float64), np.arange(0, image.shape[0], factor),
+            axis=0
+        ),
+        np.arange(0, image.shape[1], factor),
+        axis=1
+    )
+    counts = np.outer(
+        np.minimum(factor, image.shape[0] - factor * np.arange(nrows)),
+        np.minimum(factor, image.shape[1] - factor * np.arange(ncols)),
+    )
+    if image.ndim == 3:
+        counts = counts[:, :, np.newaxis]
+
+    return np.round(sums / counts).astype(image.dtype)
@@ -0,0 +1,277 @@
+"""
+Tests for the asyncio coroutines.
+"""
+# standard library imports
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr, aio
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+
+        self.data = skimage.data.astronaut()
+        Jp2k(
+            self.temp_jp2_filename,
+            data=self.data,
+            tilesize=(128, 128),
+            cratios=[50, 10, 1],
+        )
+
+    def tearDown(self):
+        aio.shutdown()
+        glymur.reset_option('all')
+        super().tearDown()
+
+    def test_aread(self):
+        """
+        SCENARIO:  Read several areas concurrently, at several resolutions.
+
+        EXPECTED RESULT:  The images match those read synchronously.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        cases = [
+            {},
+            {'area': (100, 50, 300, 400)},
+            {'area': (0, 0, 128, 128), 'rlevel': 1},
+            {'rlevel': -1},
+        ]
+
+        async def main():
+            return await asyncio.gather(*[j.aread(**kw) for kw in cases])
+
+        for kwargs, actual in zip(cases, asyncio.run(main())):
+            with self.subTest(kwargs=kwargs):
+                np.testing.assert_array_equal(actual, j.read(**kwargs))
+
+    def test_aread_layer(self):
+        """
+        SCENARIO:  Read the image with fewer quality layers.
+
+        EXPECTED RESULT:  The image matches that read after setting the layer
+        property, which aread leaves alone.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+
+        actual = asyncio.run(j.aread(layer=1))
+
+        self.assertEqual(j.layer, 0)
+        j.layer = 1
+        np.testing.assert_array_equal(actual, j.read())
+
+    def test_aread_bad_layer(self):
+        """
+        SCENARIO:  Read the image with a layer that does not exist.
+
+        EXPECTED RESULT:  ValueError
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with self.assertRaises(ValueError):
+            asyncio.run(j.aread(layer=3))
+
+    def test_max_workers(self):
+        """
+        SCENARIO:  Gather many reads with async.max_workers set to 2.
+
+        EXPECTED RESULT:  No more than two reads run at once.
+        """
+        glymur.set_option('async.max_workers', 2)
+        j = Jp2kr(self.temp_jp2_filename)
+
+        lock = threading.Lock()
+        running = []
+        counts = []
+        original = Jp2kr._read
+
+        def _read(self, **kwargs):
+            with lock:
+                running.append(None)
+                counts.append(len(running))
+            try:
+                return original(self, **kwargs)
+            finally:
+                with lock:
+                    running.pop()
+
+        async def main():
+            areas = [(r, 0, r + 64, 64) for r in range(0, 512, 32)]
+            return await asyncio.gather(*[j.aread(area=a) for a in areas])
+
+        with patch.object(Jp2kr, '_read', new=_read):
+            asyncio.run(main())
+
+        self.assertEqual(len(counts), 16)
+        self.assertLessEqual(max(counts), 2)
+
+    def test_cancel_queued(self):
+        """
+        SCENARIO:  With a single worker busy, cancel a read waiting for it.
+
+        EXPECTED RESULT:  The cancelled read is never decoded, and the first
+        read still completes.
+        """
+        glymur.set_option('async.max_workers', 1)
+        j = Jp2kr(self.temp_jp2_filename)
+
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        original = Jp2kr._read
+
+        def _read(self, **kwargs):
+            calls.append(kwargs['area'])
+            started.set()
+            release.wait()
+            return original(self, **kwargs)
+
+        async def main():
+            first = asyncio.create_task(j.aread(area=(0, 0, 64, 64)))
+            await asyncio.get_running_loop().run_in_executor(
+                None, started.wait
+            )
+            second = asyncio.create_task(j.aread(area=(64, 64, 128, 128)))
+            await asyncio.sleep(0)
+            second.cancel()
+            release.set()
+            with self.assertRaises(asyncio.CancelledError):
+                await second
+            return await first
+
+        with patch.object(Jp2kr, '_read', new=_read):
+            image = asyncio.run(main())
+
+        aio.shutdown()
+        self.assertEqual(calls, [(0, 0, 64, 64)])
+        np.testing.assert_array_equal(image, self.data[:64, :64])
+
+    def test_awrite(self):
+        """
+        SCENARIO:  Write an image with awrite.
+
+        EXPECTED RESULT:  The image is written with the keyword arguments
+        given to the constructor.
+        """
+        j = Jp2k(self.temp_j2k_filename, numres=3)
+
+        asyncio.run(j.awrite(self.data))
+
+        j = Jp2kr(self.temp_j2k_filename)
+        np.testing.assert_array_equal(j[:], self.data)
+        self.assertEqual(j.codestream.segment[2].num_res, 2)
+
+    def test_aopen(self):
+        """
+        SCENARIO:  Open and read an image from a coroutine.
+
+        EXPECTED RESULT:  The file is parsed in a worker thread.
+        """
+        threads = []
+        original = Jp2kr._parse
+
+        def _parse(self, *args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return original(self, *args, **kwargs)
+
+        async def main():
+            with patch.object(Jp2kr, '_parse', new=_parse):
+                return await glymur.aopen(self.temp_jp2_filename)
+
+        j = asyncio.run(main())
+
+        self.assertIsInstance(j, Jp2kr)
+        self.assertEqual(j.shape, self.data.shape)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith('glymur-async'))
+
+    def test_executor_follows_option(self):
+        """
+        SCENARIO:  Change the async.max_workers option, then change it back.
+
+        EXPECTED RESULT:  A new thread pool of that size is started, and the
+        first pool is used again once the option is changed back.
+        """
+        glymur.set_option('async.max_workers', 3)
+        first = aio.get_executor()
+        self.assertIs(aio.get_executor(), first)
+        self.assertEqual(first._max_workers, 3)
+
+        glymur.set_option('async.max_workers', 5)
+        second = aio.get_executor()
+        self.assertIsNot(second, first)
+        self.assertEqual(second._max_workers, 5)
+
+        glymur.set_option('async.max_workers', 3)
+        self.assertIs(aio.get_executor(), first)
+
+    def test_limit_across_contexts(self):
+        """
+        SCENARIO:  Gather reads that alternate between option contexts with
+        async.max_workers set to 1 and to 2.
+
+        EXPECTED RESULT:  Each value has a pool of its own, which is not
+        replaced by the other, so no more reads run at once under each value
+        than it allows.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+
+        lock = threading.Lock()
+        running = {1: 0, 2: 0}
+        peaks = {1: 0, 2: 0}
+        original = Jp2kr._read
+
+        def _read(self, **kwargs):
+            n = glymur.get_option('async.max_workers')
+            with lock:
+                running[n] += 1
+                peaks[n] = max(peaks[n], running[n])
+            try:
+                return original(self, **kwargs)
+            finally:
+                with lock:
+                    running[n] -= 1
+
+        async def read(max_workers, area):
+            with glymur.option_context({'async.max_workers': max_workers}):
+                return await j.aread(area=area)
+
+        async def main():
+            areas = [(r, 0, r + 64, 64) for r in range(0, 512, 32)]
+            return await asyncio.gather(*[
+                read(1 + k % 2, area) for k, area in enumerate(areas)
+            ])
+
+        with patch.object(Jp2kr, '_read', new=_read):
+            asyncio.run(main())
+
+        self.assertEqual(peaks[1], 1)
+        self.assertLessEqual(peaks[2], 2)
+
+    def test_bad_max_workers(self):
+        """
+        SCENARIO:  Set async.max_workers to something other than None or a
+        positive integer.
+
+        EXPECTED RESULT:  ValueError
+        """
+        for value in (0, -1, 2.0, True, '4'):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    glymur.set_option('async.max_workers', value)
@@ -0,0 +1,174 @@
+"""
+Tests for decoding only the components needed when slicing bands.
+"""
+# standard library imports
+import unittest
+from unittest.mock import patch
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from glymur.lib import openjp2 as opj2
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+
+        # A 5-band image
+        rgb = skimage.data.astronaut()[:256, :256]
+        self.data = np.concatenate((rgb, rgb[:, :, :2] // 2), axis=2)
+
+    def decoded_components(self, j, key):
+        """Slice the image, returning the result and the components passed
+        to OpenJPEG, if any.
+        """
+        with patch(
+            'glymur.jp2kr.opj2.set_decoded_components',
+            wraps=opj2.set_decoded_components
+        ) as mock:
+            actual = j[key]
+
+        if mock.call_count == 0:
+            return actual, None
+        return actual, np.asarray(mock.call_args.args[1]).tolist()
+
+    def test_without_mct(self):
+        """
+        SCENARIO:  Slice bands in various ways from an image without the
+        MCT.
+
+        EXPECTED RESULT:  Only the components needed are decoded, and the
+        results match those of slicing the image data.
+        """
+        Jp2k(self.temp_j2k_filename, data=self.data, mct=False)
+        j = Jp2kr(self.temp_j2k_filename)
+
+        cases = [
+            (np.s_[:, :, 2], [2]),
+            (np.s_[10:20, 30:40, 0:1], [0]),
+            (np.s_[:, :, 1:4], [1, 2, 3]),
+            (np.s_[:, :, [4, 0, 4]], [0, 4]),
+            (np.s_[::2, ::2, 4], [4]),
+            (np.s_[..., 3], [3]),
+            (np.s_[:, :, :], None),
+            (np.s_[:, :, ::-1], [0, 1, 2, 3, 4]),
+        ]
+        for key, expected_components in cases:
+            with self.subTest(key=key):
+                actual, components = self.decoded_components(j, key)
+                self.assertEqual(components, expected_components)
+                if key[0] == slice(None, None, 2):
+                    expected = j.read(rlevel=1)[:, :, 4]
+                else:
+                    expected = self.data[key]
+                np.testing.assert_array_equal(actual, expected)
+
+        # The property is not disturbed.
+        self.assertIsNone(j.decoded_components)
+
+    def test_with_mct(self):
+        """
+        SCENARIO:  Slice bands from an image with the MCT applied to the
+        first three components.
+
+        EXPECTED RESULT:  Those components are decoded all together, as
+        otherwise the MCT would not be applied.  The other components are
+        decoded by themselves.
+        """
+        Jp2k(self.temp_j2k_filename, data=self.data, mct=True)
+        j = Jp2kr(self.temp_j2k_filename)
+
+        for key, expected_components in [
+            (np.s_[:, :, 0], None),
+            (np.s_[:, :, [1, 4]], None),
+            (np.s_[:, :, 3:], [3, 4]),
+        ]:
+            with self.subTest(key=key):
+                actual, components = self.decoded_components(j, key)
+                self.assertEqual(components, expected_components)
+                np.testing.assert_array_equal(actual, self.data[key])
+
+    def test_with_mct_decoded_components_set(self):
+        """
+        SCENARIO:  Slice a band of an image with the MCT after restricting
+        the decoded components to the first three.
+
+        EXPECTED RESULT:  All three are still decoded, as otherwise the MCT
+        would not be applied.
+        """
+        Jp2k(self.temp_j2k_filename, data=self.data, mct=True)
+        j = Jp2kr(self.temp_j2k_filename)
+        j.decoded_components = [0, 1, 2]
+
+        actual, components = self.decoded_components(j, np.s_[:, :, 0])
+
+        self.assertEqual(components, [0, 1, 2])
+        np.testing.assert_array_equal(actual, self.data[:, :, 0])
+
+    def test_property_untouched_while_decoding(self):
+        """
+        SCENARIO:  Slice a band, checking the decoded_components property
+        while the image is being decoded.
+
+        EXPECTED RESULT:  The property is never changed, so other threads
+        decoding the same image are not affected.
+        """
+        Jp2k(self.temp_j2k_filename, data=self.data, mct=False)
+        j = Jp2kr(self.temp_j2k_filename)
+
+        seen = []
+
+        def set_decoded_components(codec, components):
+            seen.append(j.decoded_components)
+            return opj2.set_decoded_components(codec, components)
+
+        with patch(
+            'glymur.jp2kr.opj2.set_decoded_components',
+            side_effect=set_decoded_components
+        ):
+            actual = j[:, :, 3]
+
+        self.assertEqual(seen, [None])
+        np.testing.assert_array_equal(actual, self.data[:, :, 3])
+
+    def test_decoded_components_set(self):
+        """
+        SCENARIO:  Slice bands after restricting the decoded components.
+
+        EXPECTED RESULT:  The bands index the decoded components.
+        """
+        Jp2k(self.temp_j2k_filename, data=self.data, mct=False)
+        j = Jp2kr(self.temp_j2k_filename)
+        j.decoded_components = [1, 3, 4]
+
+        actual, components = self.decoded_components(j, np.s_[:, :, 1])
+
+        self.assertEqual(components, [3])
+        np.testing.assert_array_equal(actual, self.data[:, :, 3])
+        self.assertEqual(j.decoded_components, [1, 3, 4])
+
+    def test_palette(self):
+        """
+        SCENARIO:  Slice a band of an image with a palette.
+
+        EXPECTED RESULT:  The bands come from the palette, so every
+        component is decoded.
+        """
+        j = Jp2kr(self.jpxfile)
+
+        actual, components = self.decoded_components(j, np.s_[:, :, 1])
+
+        self.assertIsNone(components)
+        np.testing.assert_array_equal(actual, j[:][:, :, 1])
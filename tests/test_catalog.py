@@ -0,0 +1,279 @@
+"""
+Tests for cataloguing the header metadata of many files.
+"""
+# standard library imports
+import concurrent.futures
+import contextlib
+import csv
+import io
+import os
+import shutil
+import sqlite3
+import struct
+import threading
+import unittest
+from unittest.mock import patch
+import warnings
+
+# 3rd party library imports
+import skimage.data
+
+# local imports
+from glymur import Jp2k, catalog as catalog_module, command_line
+from glymur.catalog import COLUMNS, catalog, extract
+from glymur.jp2box import _XMP_UUID
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+
+        # An archive of a JP2 file with an XMP UUID box after the codestream,
+        # a raw codestream, a tiled image with TLM and PLT segments, a file
+        # that is not JPEG 2000, and a file to be ignored.
+        self.archive = self.test_dir_path / 'archive'
+        (self.archive / 'sub').mkdir(parents=True)
+
+        with open(self.jp2file, 'rb') as f:
+            data = f.read()
+        payload = _XMP_UUID.bytes + b'<x:xmpmeta xmlns:x="adobe:ns:meta/"/>'
+        data += struct.pack('>I4s', 8 + len(payload), b'uuid') + payload
+        (self.archive / 'nemo.jp2').write_bytes(data)
+
+        shutil.copy(self.j2kfile, self.archive / 'sub' / 'goodstuff.j2k')
+        Jp2k(
+            self.archive / 'sub' / 'tiled.jp2',
+            data=skimage.data.astronaut(),
+            tilesize=(128, 128),
+            plt=True,
+            tlm=True,
+        )
+        (self.archive / 'bad.jp2').write_bytes(b'not JPEG 2000')
+        (self.archive / 'notes.txt').write_text('not catalogued')
+
+        self.db = self.test_dir_path / 'catalog.db'
+        self.csv = self.test_dir_path / 'catalog.csv'
+
+    def read_db(self):
+        conn = sqlite3.connect(self.db)
+        conn.row_factory = sqlite3.Row
+        with contextlib.closing(conn):
+            rows = conn.execute('SELECT * FROM files').fetchall()
+        return {os.path.basename(row['path']): dict(row) for row in rows}
+
+    def test_sqlite(self):
+        """
+        SCENARIO:  Catalogue a directory tree into an SQLite database.
+
+        EXPECTED RESULT:  One row for each JPEG 2000 file, including the
+        invalid one, with the metadata of each.
+        """
+        summary = catalog([self.archive], self.db, workers=1)
+
+        self.assertEqual(summary, (4, 0, 1))
+
+        rows = self.read_db()
+        self.assertEqual(
+            sorted(rows), ['bad.jp2', 'goodstuff.j2k', 'nemo.jp2', 'tiled.jp2']
+        )
+
+        row = rows['nemo.jp2']
+        self.assertIsNone(row['error'])
+        self.assertEqual(row['codec'], 'jp2')
+        self.assertEqual(row['boxes'], 'jP  ,ftyp,jp2h,jp2c,uuid')
+        self.assertEqual(
+            (row['height'], row['width'], row['num_components']),
+            (1456, 2592, 3)
+        )
+        self.assertEqual(row['dtype'], 'uint8')
+        self.assertEqual(row['colourspace'], 'sRGB')
+        self.assertEqual(row['bitdepth'], '8,8,8')
+        self.assertEqual(row['progression'], 'LRCP')
+        self.assertEqual(row['num_tiles'], 1)
+        self.assertEqual(row['has_xmp'], 1)
+        self.assertEqual(row['has_exif'], 0)
+        self.assertEqual(row['has_tlm'], 0)
+
+        row = rows['goodstuff.j2k']
+        self.assertEqual(row['codec'], 'j2k')
+        self.assertEqual(row['boxes'], '')
+
+        row = rows['tiled.jp2']
+        self.assertEqual((row['tile_rows'], row['tile_cols']), (4, 4))
+        self.assertEqual(row['num_tiles'], 16)
+        self.assertEqual(row['num_tile_parts'], 16)
+        self.assertEqual(row['has_tlm'], 1)
+        self.assertEqual(row['has_plt'], 1)
+
+        row = rows['bad.jp2']
+        self.assertIn('InvalidJp2kError', row['error'])
+        self.assertEqual(row['size'], len(b'not JPEG 2000'))
+
+    def test_incremental(self):
+        """
+        SCENARIO:  Catalogue the archive, change one file and add another,
+        then catalogue the archive again.
+
+        EXPECTED RESULT:  Only the changed and new files are catalogued the
+        second time.
+        """
+        catalog([self.archive], self.db, workers=1)
+
+        path = self.archive / 'nemo.jp2'
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        shutil.copy(self.jp2file, self.archive / 'sub' / 'new.jp2')
+
+        summary = catalog([self.archive], self.db, workers=1)
+
+        self.assertEqual(summary, (2, 3, 0))
+        rows = self.read_db()
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows['nemo.jp2']['mtime_ns'], st.st_mtime_ns + 10**9)
+
+    def test_force(self):
+        """
+        SCENARIO:  Catalogue the archive twice, the second time by force.
+
+        EXPECTED RESULT:  Everything is catalogued again, without duplicate
+        rows.
+        """
+        catalog([self.archive], self.db, workers=1)
+        summary = catalog([self.archive], self.db, workers=1, force=True)
+
+        self.assertEqual(summary.catalogued, 4)
+        self.assertEqual(len(self.read_db()), 4)
+
+    def test_csv(self):
+        """
+        SCENARIO:  Catalogue into a CSV file in small batches, then again
+        after adding a file.
+
+        EXPECTED RESULT:  A header and a row for each file, then a row
+        appended for the new file only.
+        """
+        catalog([self.archive], self.csv, workers=1, batch_size=2)
+        shutil.copy(self.jp2file, self.archive / 'new.jp2')
+        summary = catalog([self.archive], self.csv, workers=1)
+
+        self.assertEqual(summary, (1, 4, 0))
+        with open(self.csv, newline='') as f:
+            reader = csv.DictReader(f)
+            self.assertEqual(reader.fieldnames, list(COLUMNS))
+            rows = list(reader)
+        self.assertEqual(len(rows), 5)
+        self.assertTrue(rows[-1]['path'].endswith('new.jp2'))
+        self.assertEqual(rows[-1]['height'], '1456')
+
+    def test_process_pool(self):
+        """
+        SCENARIO:  Catalogue with a pool of worker processes.
+
+        EXPECTED RESULT:  The rows match those written by a single process.
+        """
+        catalog([self.archive], self.db, workers=2, batch_size=3)
+        actual = self.read_db()
+
+        self.db.unlink()
+        catalog([self.archive], self.db, workers=1)
+        expected = self.read_db()
+
+        self.assertEqual(actual, expected)
+
+    def test_extract(self):
+        """
+        SCENARIO:  Extract the metadata of a single file.
+
+        EXPECTED RESULT:  A value for every column.
+        """
+        row = extract(self.archive / 'sub' / 'tiled.jp2')
+
+        self.assertEqual(list(row), list(COLUMNS))
+        self.assertEqual(row['code_block_size'], '64x64')
+        self.assertEqual(row['xform'], '5-3 reversible')
+
+    def test_warnings(self):
+        """
+        SCENARIO:  Catalogue files whose metadata is extracted by several
+        threads at once, each file issuing a warning of its own.
+
+        EXPECTED RESULT:  Each row records the warning of its own file only,
+        and the warnings are not shown.
+        """
+        original = catalog_module._extract
+        barrier = threading.Barrier(2)
+
+        def _extract(fptr):
+            # Make the threads overlap.
+            barrier.wait(timeout=5)
+            warnings.warn(f'odd {os.path.basename(fptr.name)}')
+            return original(fptr)
+
+        paths = [
+            self.archive / 'nemo.jp2', self.archive / 'sub' / 'tiled.jp2'
+        ]
+        with (
+            patch('glymur.catalog._extract', new=_extract),
+            warnings.catch_warnings(),
+            concurrent.futures.ThreadPoolExecutor(2) as executor,
+        ):
+            catalog_module._record_warnings()
+            rows = list(executor.map(extract, paths))
+
+        self.assertEqual(
+            [row['warnings'] for row in rows],
+            ['odd nemo.jp2', 'odd tiled.jp2'],
+        )
+
+    def test_warnings_catalogued(self):
+        """
+        SCENARIO:  Catalogue a file whose metadata extraction issues a
+        warning.
+
+        EXPECTED RESULT:  The warning is recorded in its row rather than
+        shown, and the warnings filters are restored afterwards.
+        """
+        original = catalog_module._extract
+
+        def _extract(fptr):
+            warnings.warn('odd file')
+            return original(fptr)
+
+        filters = list(warnings.filters)
+        with (
+            patch('glymur.catalog._extract', new=_extract),
+            warnings.catch_warnings(record=True) as shown,
+        ):
+            warnings.simplefilter('always')
+            catalog([self.archive / 'nemo.jp2'], self.db, workers=1)
+
+        self.assertEqual(len(shown), 0)
+        self.assertEqual(self.read_db()['nemo.jp2']['warnings'], 'odd file')
+        self.assertEqual(warnings.filters, filters)
+
+    def test_command_line(self):
+        """
+        SCENARIO:  Run jp2catalog.
+
+        EXPECTED RESULT:  The catalogue is written and a summary printed.
+        """
+        argv = [
+            '', '--output', str(self.csv), '--workers', '1',
+            str(self.archive),
+        ]
+        with (
+            patch('sys.argv', new=argv),
+            patch('sys.stdout', new=io.StringIO()) as stdout,
+        ):
+            command_line.jp2catalog()
+
+        self.assertTrue(self.csv.exists())
+        self.assertEqual(
+            stdout.getvalue(),
+            '4 files catalogued (1 failed), 0 unchanged files skipped.\n'
+        )
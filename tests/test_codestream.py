@@ -10,13 +10,20 @@ import pathlib
 import struct
 import tempfile
 import unittest
+from unittest.mock import patch
 import warnings
 
+# Third party library imports ...
+import numpy as np
+import skimage.data
+
 # Local imports ...
 import glymur
 from glymur import Jp2k, Jp2kr
+from glymur.codestream import Codestream
 from glymur.jp2box import InvalidJp2kError
 from . import fixtures
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
 
 
 class TestSuite(fixtures.TestCommon):
@@ -181,6 +188,39 @@ class TestSuite(fixtures.TestCommon):
         c = Jp2k(path).get_codestream(header_only=False)
         self.assertEqual(c.segment[7].zplt, 0)
         self.assertEqual(len(c.segment[7].iplt), 59)
+        self.assertEqual(c.segment[7].iplt.dtype, np.uint32)
+
+    def test_plt_packet_lengths(self):
+        """
+        SCENARIO:  Decode PLT packet lengths of one to five bytes, followed
+        by an incomplete length.
+
+        EXPECTED RESULT:  The lengths are decoded, the incomplete one is
+        ignored, and lengths too big for 32 bits are kept in 64 bits.
+        """
+        lengths = [0, 127, 128, 16383, 16384, 2 ** 28 - 1, 2 ** 28, 5]
+
+        def encode(n):
+            groups = [n & 0x7F]
+            n >>= 7
+            while n:
+                groups.append(0x80 | (n & 0x7F))
+                n >>= 7
+            return bytes(reversed(groups))
+
+        data = b''.join(encode(n) for n in lengths) + b'\x81\x80'
+
+        actual = glymur.codestream._parse_packet_lengths(data)
+
+        self.assertEqual(actual.dtype, np.uint32)
+        self.assertEqual(actual.tolist(), lengths)
+
+        actual = glymur.codestream._parse_packet_lengths(encode(2 ** 34))
+        self.assertEqual(actual.dtype, np.uint64)
+        self.assertEqual(actual.tolist(), [2 ** 34])
+
+        actual = glymur.codestream._parse_packet_lengths(b'\x81')
+        self.assertEqual(actual.size, 0)
 
     def test_ppm_segment(self):
         """
@@ -315,3 +355,275 @@ class TestCodestreamRepr(unittest.TestCase):
         self.assertEqual(newseg.yrsiz, (1, 1, 1))
         self.assertEqual(newseg.bitdepth, (8, 8, 8))
         self.assertEqual(newseg.signed, (False, False, False))
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+class TestSuiteLazy(fixtures.TestCommon):
+    """Test suite for lazily parsed codestreams."""
+
+    def setUp(self):
+        super().setUp()
+
+        # 16 tiles with PLT segments
+        Jp2k(
+            self.temp_j2k_filename,
+            data=skimage.data.astronaut(),
+            tilesize=(128, 128),
+            plt=True,
+        )
+
+    def parse(self, path, **kwargs):
+        with open(path, 'rb') as f:
+            return Codestream(
+                f, path.stat().st_size, header_only=False, **kwargs
+            )
+
+    def test_same_as_eager_parse(self):
+        """
+        SCENARIO:  Fully parse a multi-tile codestream with PLT segments both
+        lazily and eagerly.
+
+        EXPECTED RESULT:  The segments are the same.
+        """
+        lazy = self.parse(self.temp_j2k_filename)
+        eager = self.parse(self.temp_j2k_filename, lazy=False)
+
+        self.assertIsInstance(eager.segment, list)
+        self.assertNotIsInstance(lazy.segment, list)
+        self.assertEqual(len(lazy.segment), len(eager.segment))
+        self.assertEqual(str(lazy), str(eager))
+        np.testing.assert_array_equal(
+            lazy.segment[-3].iplt, eager.segment[-3].iplt
+        )
+
+    def test_sop_eph(self):
+        """
+        SCENARIO:  Fully parse a codestream with SOP and EPH markers both
+        lazily and eagerly.
+
+        EXPECTED RESULT:  The segments are the same.
+        """
+        Jp2k(
+            self.temp_j2k_filename,
+            data=skimage.data.astronaut(),
+            sop=True,
+            eph=True,
+        )
+        lazy = self.parse(self.temp_j2k_filename)
+        eager = self.parse(self.temp_j2k_filename, lazy=False)
+
+        self.assertEqual(str(lazy), str(eager))
+        self.assertEqual(
+            [seg.nsop for seg in lazy.segment if seg.marker_id == 'SOP'],
+            list(range(18)),
+        )
+
+    def test_segments_made_on_access(self):
+        """
+        SCENARIO:  Fully parse a codestream, then access a segment past the
+        main header twice.
+
+        EXPECTED RESULT:  No tile-part segments are made by the parse.  The
+        segment is made once while a reference to it is kept.
+        """
+        with patch.object(
+            Codestream, '_make_segment', autospec=True,
+            side_effect=Codestream._make_segment
+        ) as mock:
+            c = Jp2kr(self.temp_j2k_filename).get_codestream(
+                header_only=False
+            )
+            self.assertEqual(mock.call_count, 0)
+
+            eoc = c.segment[-1]
+            self.assertIs(c.segment[-1], eoc)
+            self.assertEqual(mock.call_count, 1)
+
+        self.assertEqual(eoc.marker_id, 'EOC')
+        self.assertEqual(
+            eoc.offset, self.temp_j2k_filename.stat().st_size - 2
+        )
+        self.assertEqual(len(c.segment[-3:]), 3)
+        self.assertEqual(c.segment[1].marker_id, 'SIZ')
+        with self.assertRaises(IndexError):
+            c.segment[len(c.segment)]
+
+    def test_in_memory(self):
+        """
+        SCENARIO:  Fully parse a codestream from a bytes object, and from a
+        file object that cannot be memory-mapped.
+
+        EXPECTED RESULT:  The segments are the same as when parsed from the
+        file.
+        """
+        expected = str(self.parse(self.temp_j2k_filename))
+        data = self.temp_j2k_filename.read_bytes()
+
+        for source in [data, BytesIO(data)]:
+            with self.subTest(source=type(source).__name__):
+                c = Jp2kr(source).get_codestream(header_only=False)
+                self.assertEqual(str(c), expected)
+
+    def test_csiz_of_own_codestream(self):
+        """
+        SCENARIO:  Lazily parse a 3-component codestream with QCC and RGN
+        segments in a tile-part header, then parse a 1-component codestream,
+        then access the QCC and RGN segments of the first.
+
+        EXPECTED RESULT:  The segments are parsed with the number of
+        components of their own codestream, so no warning about an invalid
+        component number is issued.
+        """
+        Jp2k(self.temp_j2k_filename, data=skimage.data.astronaut())
+        data = self.temp_j2k_filename.read_bytes()
+
+        # Build QCC and RGN segments for the last component, the QCC from
+        # the QCD segment of the main header.
+        qcd = data.index(b'\xff\x5c')
+        (lqcd,) = struct.unpack_from('>H', data, qcd + 2)
+        qcc = (
+            struct.pack('>HHB', 0xff5d, lqcd + 1, 2)
+            + data[qcd + 4:qcd + 2 + lqcd]
+        )
+        rgn = struct.pack('>HHBBB', 0xff5e, 5, 2, 0, 7)
+
+        # Insert them after the first SOT segment and adjust its Psot.
+        sot = data.index(b'\xff\x90')
+        (psot,) = struct.unpack_from('>I', data, sot + 6)
+        data = (
+            data[:sot + 6]
+            + struct.pack('>I', psot + len(qcc) + len(rgn))
+            + data[sot + 10:sot + 12]
+            + qcc
+            + rgn
+            + data[sot + 12:]
+        )
+        self.temp_j2k_filename.write_bytes(data)
+
+        c = self.parse(self.temp_j2k_filename)
+
+        other = self.test_dir_path / 'other.j2k'
+        Jp2k(other, data=skimage.data.astronaut()[:, :, 0])
+        self.assertEqual(Jp2kr(other).codestream.segment[1].Csiz, 1)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            segments = {
+                seg.marker_id: seg for seg in c.segment
+                if seg.marker_id in ('QCC', 'RGN')
+            }
+
+        self.assertEqual(segments['QCC'].cqcc, 2)
+        self.assertEqual(
+            (segments['RGN'].crgn, segments['RGN'].sprgn), (2, 7)
+        )
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+class TestSuiteTileIndex(fixtures.TestCommon):
+    """Test suite for the tile-part index."""
+
+    def write(self, **kwargs):
+        # 16 tiles
+        Jp2k(
+            self.temp_jp2_filename,
+            data=skimage.data.astronaut(),
+            tilesize=(128, 128),
+            **kwargs
+        )
+        c = Jp2kr(self.temp_jp2_filename).get_codestream(header_only=False)
+        return [seg for seg in c.segment if seg.marker_id == 'SOT']
+
+    def assertIndexMatches(self, index, sots):
+        self.assertEqual(index.dtype, glymur.codestream._TILE_INDEX_DTYPE)
+        self.assertEqual(index['tile'].tolist(), [s.isot for s in sots])
+        self.assertEqual(index['offset'].tolist(), [s.offset for s in sots])
+        self.assertEqual(index['length'].tolist(), [s.psot for s in sots])
+        np.testing.assert_array_equal(index['tile_part'], 0)
+        np.testing.assert_array_equal(index['num_tile_parts'], 1)
+
+    def test_sot_scan(self):
+        """
+        SCENARIO:  Ask twice for the tile-part index of a multi-tile image
+        without TLM segments.
+
+        EXPECTED RESULT:  The index matches the SOT segments.  The
+        tile-parts are scanned just once.
+        """
+        sots = self.write()
+        j = Jp2kr(self.temp_jp2_filename)
+
+        with patch.object(
+            Codestream, '_scan_tile_index', autospec=True,
+            side_effect=Codestream._scan_tile_index
+        ) as mock:
+            index = j.tile_index
+            self.assertIs(j.tile_index, index)
+
+        self.assertEqual(mock.call_count, 1)
+        self.assertIndexMatches(index, sots)
+
+    def test_tlm(self):
+        """
+        SCENARIO:  Ask for the tile-part index of a multi-tile image with TLM
+        segments.
+
+        EXPECTED RESULT:  The index matches the SOT segments, without
+        scanning the tile-parts.
+        """
+        sots = self.write(tlm=True)
+        j = Jp2kr(self.temp_jp2_filename)
+
+        with patch.object(Codestream, '_scan_tile_index') as mock:
+            index = j.tile_index
+
+        mock.assert_not_called()
+        self.assertIndexMatches(index, sots)
+
+    def test_full_parse(self):
+        """
+        SCENARIO:  Ask for the tile-part index of fully parsed codestreams,
+        both lazily and eagerly parsed.
+
+        EXPECTED RESULT:  The index matches the SOT segments.
+        """
+        sots = self.write()
+        j = Jp2kr(self.temp_jp2_filename)
+        jp2c = j.box[-1]
+
+        for lazy in (True, False):
+            with self.subTest(lazy=lazy):
+                with open(self.temp_jp2_filename, 'rb') as f:
+                    f.seek(jp2c.main_header_offset)
+                    c = Codestream(
+                        f, jp2c.length, header_only=False, lazy=lazy
+                    )
+                self.assertIndexMatches(c.tile_index, sots)
+
+    def test_header_only(self):
+        """
+        SCENARIO:  Ask a codestream parsed for its main header only for the
+        tile-part index, without TLM segments.
+
+        EXPECTED RESULT:  None, the tile-parts have not been scanned.
+        """
+        self.write()
+        c = Jp2kr(self.temp_jp2_filename).get_codestream()
+        self.assertIsNone(c.tile_index)
+
+    def test_count_tile_parts(self):
+        """
+        SCENARIO:  Make an index of tile-parts out of order, some of them
+        giving the number of tile-parts and some not.
+
+        EXPECTED RESULT:  The tile-parts are counted in codestream order,
+        and counted where not given.
+        """
+        index = glymur.codestream._make_tile_index(
+            tiles=[0, 1, 0, 1, 2],
+            offsets=[100, 200, 300, 400, 500],
+            lengths=[100] * 5,
+            num_tile_parts=[2, 0, 0, 2, 0],
+        )
+        self.assertEqual(index['tile_part'].tolist(), [0, 0, 1, 1, 0])
+        self.assertEqual(index['num_tile_parts'].tolist(), [2, 2, 2, 2, 1])
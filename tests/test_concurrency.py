@@ -0,0 +1,156 @@
+"""
+Stress tests for decoding and encoding in many threads at once.
+"""
+# standard library imports
+import concurrent.futures
+import threading
+import unittest
+import warnings
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from glymur.lib import openjp2 as opj2
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+
+        astronaut = skimage.data.astronaut()
+        self.images = [np.roll(astronaut, 64 * k, axis=1) for k in range(4)]
+        self.paths = []
+        for k, data in enumerate(self.images):
+            path = self.test_dir_path / f'{k}.jp2'
+            Jp2k(path, data=data, tilesize=(128, 128))
+            self.paths.append(path)
+
+    def tearDown(self):
+        glymur.reset_option('all')
+        super().tearDown()
+
+    def test_readers_with_failures(self):
+        """
+        SCENARIO:  Read many images and areas in many threads at once, with
+        every other read failing in the library.
+
+        EXPECTED RESULT:  The good reads are correct, and each failed read
+        raises with only the messages of its own codec.
+        """
+        if opj2.has_thread_support():
+            glymur.set_option('lib.num_threads', 2)
+
+        def read(k):
+            j = Jp2kr(self.paths[k % 4])
+            if k % 2 == 1:
+                j.decoded_components = [0, 0]
+            r = 16 * (k % 16)
+            return j.read(area=(r, r, r + 200, r + 300))
+
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            futures = [executor.submit(read, k) for k in range(64)]
+
+        for k, future in enumerate(futures):
+            with self.subTest(k=k):
+                if k % 2 == 1:
+                    with self.assertRaises(opj2.OpenJPEGLibraryError) as cm:
+                        future.result()
+                    lines = str(cm.exception).splitlines()
+                    self.assertGreater(len(lines), 0)
+                    for line in lines:
+                        self.assertIn('several times', line)
+                else:
+                    r = 16 * (k % 16)
+                    expected = self.images[k % 4][r:r + 200, r:r + 300]
+                    np.testing.assert_array_equal(future.result(), expected)
+
+    def test_readers_and_writers(self):
+        """
+        SCENARIO:  Write new images while other threads read the existing
+        ones.
+
+        EXPECTED RESULT:  Every image read back matches its data.
+        """
+        def write(k):
+            path = self.test_dir_path / f'new{k}.jp2'
+            data = np.flipud(self.images[k % 4])
+            Jp2k(path, data=data, cratios=[20, 5, 1], numres=4)
+            return path, data
+
+        def read(k):
+            return Jp2kr(self.paths[k % 4])[::2, ::2]
+
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            writes = [executor.submit(write, k) for k in range(16)]
+            reads = [executor.submit(read, k) for k in range(32)]
+
+        for k, future in enumerate(reads):
+            with self.subTest(k=k):
+                expected = Jp2kr(self.paths[k % 4]).read(rlevel=1)
+                np.testing.assert_array_equal(future.result(), expected)
+
+        for future in writes:
+            path, data = future.result()
+            np.testing.assert_array_equal(Jp2kr(path)[:], data)
+
+    def test_messages_routed_by_codec(self):
+        """
+        SCENARIO:  Report errors and warnings for two codecs from other
+        threads, as OpenJPEG's own worker threads would.
+
+        EXPECTED RESULT:  Each codec sees only its own messages, and the
+        warnings are issued in the thread that checks the codec.
+        """
+        codecs = [opj2.create_decompress(opj2.CODEC_JP2) for _ in range(2)]
+        try:
+            for codec in codecs:
+                opj2.add_message_handlers(codec)
+
+            def report(k):
+                opj2._default_error_handler(f'error {k}'.encode(), codecs[k])
+                opj2._default_warning_handler(
+                    f'warning {k}'.encode(), codecs[k]
+                )
+
+            threads = [
+                threading.Thread(target=report, args=(k,)) for k in range(2)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter('always')
+                with self.assertRaises(opj2.OpenJPEGLibraryError) as cm:
+                    opj2.check_error(0, codecs[1])
+
+            self.assertEqual(
+                str(cm.exception), 'OpenJPEG library error:  error 1'
+            )
+            self.assertEqual(len(w), 1)
+            self.assertIn('warning 1', str(w[0].message))
+
+            # The messages of the other codec are still waiting for it.
+            with self.assertRaises(opj2.OpenJPEGLibraryError) as cm:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    opj2.check_error(0, codecs[0])
+            self.assertIn('error 0', str(cm.exception))
+        finally:
+            for codec in codecs:
+                opj2.destroy_codec(codec)
+
+        self.assertNotIn(codecs[0], opj2._CODEC_MESSAGES)
@@ -8,6 +8,7 @@ import importlib
 import os
 import pathlib
 import platform
+import threading
 import unittest
 from unittest.mock import patch
 import warnings
@@ -237,6 +238,56 @@ class TestSuiteOptions(unittest.TestCase):
                 warnings.simplefilter("ignore")
                 glymur.set_printoptions(blah="value-blah")
 
+    def test_option_context(self):
+        """
+        SCENARIO:  Set options within nested contexts.
+
+        EXPECTED RESULT:  The innermost value is seen within each context,
+        and the previous values are restored afterwards.
+        """
+        glymur.set_option("print.short", True)
+        with glymur.option_context({"print.short": False, "print.xml": False}):
+            self.assertFalse(glymur.get_option("print.short"))
+            with glymur.option_context(**{"print.xml": True}):
+                self.assertFalse(glymur.get_option("print.short"))
+                self.assertTrue(glymur.get_option("print.xml"))
+            self.assertFalse(glymur.get_option("print.xml"))
+
+        self.assertTrue(glymur.get_option("print.short"))
+        self.assertTrue(glymur.get_option("print.xml"))
+
+    def test_option_context_other_threads(self):
+        """
+        SCENARIO:  Set an option within a context while another thread reads
+        it.
+
+        EXPECTED RESULT:  The other thread sees the global value.
+        """
+        seen = []
+        with glymur.option_context({"print.short": True}):
+            t = threading.Thread(
+                target=lambda: seen.append(glymur.get_option("print.short"))
+            )
+            t.start()
+            t.join()
+            self.assertTrue(glymur.get_option("print.short"))
+
+        self.assertEqual(seen, [False])
+
+    def test_option_context_bad_option(self):
+        """
+        SCENARIO:  Give option_context an unknown option or a bad value.
+
+        EXPECTED RESULT:  KeyError or ValueError, and no option is changed.
+        """
+        with self.assertRaises(KeyError):
+            with glymur.option_context({"blah": 1}):
+                pass
+        with self.assertRaises(ValueError):
+            with glymur.option_context({"cache.max_bytes": -1}):
+                pass
+        self.assertEqual(glymur.get_option("cache.max_bytes"), 0)
+
 
 @unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
 class TestSuiteConfigFile(TestCommon):
@@ -0,0 +1,97 @@
+"""
+Tests for iterating over quality layers.
+"""
+# standard library imports
+import unittest
+from unittest.mock import patch
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from glymur.lib import openjp2 as opj2
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+
+        self.data = skimage.data.astronaut()
+        Jp2k(self.temp_jp2_filename, data=self.data, cratios=[200, 50, 10, 1])
+
+    def test_refinements(self):
+        """
+        SCENARIO:  Iterate over the quality layers of an image.
+
+        EXPECTED RESULT:  One image per layer, each matching a read with that
+        many layers, and the last one matching the full quality image.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+
+        actual = list(j.iter_layers())
+
+        self.assertEqual([layers for layers, _ in actual], [1, 2, 3, 4])
+        for layers, image in actual[:-1]:
+            with self.subTest(layers=layers):
+                j.layer = layers
+                np.testing.assert_array_equal(image, j[:])
+        np.testing.assert_array_equal(actual[-1][1], self.data)
+
+        # The error shrinks with each layer.
+        errors = [
+            np.abs(image.astype(np.int16) - self.data).mean()
+            for _, image in actual
+        ]
+        self.assertEqual(errors, sorted(errors, reverse=True))
+
+    def test_area_rlevel(self):
+        """
+        SCENARIO:  Iterate over the quality layers of an area of the image
+        at a lower resolution.
+
+        EXPECTED RESULT:  Each image matches the same area read directly.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        area = (64, 128, 256, 384)
+
+        for layers, image in j.iter_layers(area=area, rlevel=1):
+            with self.subTest(layers=layers):
+                j.layer = 0 if layers == 4 else layers
+                np.testing.assert_array_equal(
+                    image, j.read(area=area, rlevel=1)
+                )
+
+    def test_lazy(self):
+        """
+        SCENARIO:  Stop iterating after the first layer.
+
+        EXPECTED RESULT:  Only one decode takes place.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with patch(
+            'glymur.jp2kr.opj2.read_header', wraps=opj2.read_header
+        ) as mock:
+            layers, _ = next(j.iter_layers())
+
+        self.assertEqual(layers, 1)
+        self.assertEqual(mock.call_count, 1)
+
+    def test_bad_rlevel(self):
+        """
+        SCENARIO:  Iterate with an invalid resolution level.
+
+        EXPECTED RESULT:  ValueError, raised right away.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with self.assertRaises(ValueError):
+            j.iter_layers(rlevel=10)
@@ -0,0 +1,249 @@
+"""
+Tests for iterating over the tiles of an image.
+"""
+# standard library imports
+import unittest
+from unittest.mock import patch
+import warnings
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from glymur.lib import openjp2 as opj2
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+
+        # 4x4 tiles, with partial tiles on the right and bottom edges
+        self.data = skimage.data.astronaut()[:500, :450]
+        Jp2k(self.temp_jp2_filename, data=self.data, tilesize=(128, 128))
+
+    def test_tiles(self):
+        """
+        SCENARIO:  Iterate over the tiles of a multi-tile image.
+
+        EXPECTED RESULT:  Each tile is decoded once in a single codec
+        session, the tiles cover the image exactly.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+
+        with patch(
+            'glymur.jp2kr.opj2.read_header', wraps=opj2.read_header
+        ) as mock:
+            tiles = list(j.iter_tiles())
+
+        self.assertEqual(mock.call_count, 1)
+        self.assertEqual([t[0] for t in tiles], list(range(16)))
+        self.assertEqual(tiles[3][1], (0, 384, 128, 450))
+        self.assertEqual(tiles[15][1], (384, 384, 500, 450))
+
+        actual = np.zeros_like(self.data)
+        for _, (r0, c0, r1, c1), image in tiles:
+            actual[r0:r1, c0:c1] = image
+        np.testing.assert_array_equal(actual, self.data)
+
+    def test_rlevel(self):
+        """
+        SCENARIO:  Iterate over the tiles at reduced resolution levels.
+
+        EXPECTED RESULT:  The tiles match the full image read at the same
+        resolution level.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        for rlevel in (1, 2, -1):
+            with self.subTest(rlevel=rlevel):
+                expected = j.read(rlevel=rlevel)
+                for _, (r0, c0, r1, c1), image in j.iter_tiles(rlevel=rlevel):
+                    np.testing.assert_array_equal(
+                        image, expected[r0:r1, c0:c1]
+                    )
+
+    def test_components(self):
+        """
+        SCENARIO:  Iterate over the tiles, restricting the bands.
+
+        EXPECTED RESULT:  Only the requested bands are yielded, a single band
+        results in 2D tiles.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+
+        _, (r0, c0, r1, c1), image = next(j.iter_tiles(components=[2]))
+        np.testing.assert_array_equal(image, self.data[r0:r1, c0:c1, 2])
+
+        _, (r0, c0, r1, c1), image = next(j.iter_tiles(components=[2, 0]))
+        np.testing.assert_array_equal(image, self.data[r0:r1, c0:c1, [2, 0]])
+
+    def test_components_decoded_alone(self):
+        """
+        SCENARIO:  Iterate over the tiles of an image without the MCT,
+        restricting the bands.
+
+        EXPECTED RESULT:  Only the requested components are decoded, the
+        tiles match the full image.
+        """
+        Jp2k(
+            self.temp_jp2_filename,
+            data=self.data,
+            tilesize=(128, 128),
+            mct=False,
+        )
+        j = Jp2kr(self.temp_jp2_filename)
+
+        for components in ([2], [2, 0], [1, 1]):
+            with self.subTest(components=components):
+                with patch(
+                    'glymur.jp2kr.opj2.set_decoded_components',
+                    wraps=opj2.set_decoded_components
+                ) as mock:
+                    tiles = list(j.iter_tiles(rlevel=1, components=components))
+
+                self.assertEqual(mock.call_count, 16)
+                self.assertEqual(
+                    mock.call_args.args[1], sorted(set(components))
+                )
+                self.assertEqual([t[0] for t in tiles], list(range(16)))
+
+                expected = j.read(rlevel=1)[:, :, components]
+                if len(components) == 1:
+                    expected = expected[:, :, 0]
+                for _, (r0, c0, r1, c1), image in tiles:
+                    np.testing.assert_array_equal(
+                        image, expected[r0:r1, c0:c1]
+                    )
+                self.assertEqual((r1, c1), expected.shape[:2])
+
+    def test_components_mct(self):
+        """
+        SCENARIO:  Iterate over the tiles of an image with the MCT, requesting
+        only some of the first three bands.
+
+        EXPECTED RESULT:  All the components are decoded so that the MCT is
+        applied, a single codec decodes every tile.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+
+        with patch(
+            'glymur.jp2kr.opj2.set_decoded_components',
+            wraps=opj2.set_decoded_components
+        ) as mock:
+            tiles = list(j.iter_tiles(components=[0]))
+
+        mock.assert_not_called()
+        for _, (r0, c0, r1, c1), image in tiles:
+            np.testing.assert_array_equal(image, self.data[r0:r1, c0:c1, 0])
+
+    def test_decoded_components(self):
+        """
+        SCENARIO:  Iterate over the tiles with the decoded_components property
+        set.
+
+        EXPECTED RESULT:  Only the decoded components are yielded.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        j.decoded_components = [1]
+
+        _, (r0, c0, r1, c1), image = next(j.iter_tiles())
+        np.testing.assert_array_equal(image, self.data[r0:r1, c0:c1, 1])
+
+    def test_grid_offset(self):
+        """
+        SCENARIO:  Iterate over the tiles of an image whose origin is offset
+        from the reference grid.
+
+        EXPECTED RESULT:  The tile areas are relative to the image.
+        """
+        with warnings.catch_warnings():
+            # The IHDR box does not account for the offset.
+            warnings.simplefilter('ignore')
+            Jp2k(
+                self.temp_jp2_filename,
+                data=self.data,
+                tilesize=(128, 128),
+                grid_offset=(3, 5),
+            )
+            j = Jp2kr(self.temp_jp2_filename)
+
+        for _, (r0, c0, r1, c1), image in j.iter_tiles():
+            np.testing.assert_array_equal(image, self.data[r0:r1, c0:c1])
+
+        self.assertEqual((r1, c1), (500, 450))
+
+    def test_uint16(self):
+        """
+        SCENARIO:  Iterate over the tiles of a 16-bit single band image.
+
+        EXPECTED RESULT:  The tiles are 2D uint16 arrays.
+        """
+        data = np.random.default_rng(0).integers(
+            0, 4096, size=(200, 150), dtype=np.uint16
+        )
+        Jp2k(self.temp_j2k_filename, data=data, tilesize=(64, 64))
+        j = Jp2kr(self.temp_j2k_filename)
+
+        for _, (r0, c0, r1, c1), image in j.iter_tiles():
+            self.assertEqual(image.dtype, np.uint16)
+            np.testing.assert_array_equal(image, data[r0:r1, c0:c1])
+
+    def test_single_tile(self):
+        """
+        SCENARIO:  Iterate over the tiles of a single-tile image.
+
+        EXPECTED RESULT:  The one tile is the whole image.
+        """
+        j = Jp2kr(self.j2kfile)
+        tiles = list(j.iter_tiles(rlevel=1))
+
+        self.assertEqual(len(tiles), 1)
+        self.assertEqual(tiles[0][1], (0, 0, 400, 240))
+        np.testing.assert_array_equal(tiles[0][2], j[::2, ::2])
+
+    def test_in_memory(self):
+        """
+        SCENARIO:  Iterate over the tiles of in-memory data.
+
+        EXPECTED RESULT:  The tiles match the original image.
+        """
+        j = Jp2kr(self.temp_jp2_filename.read_bytes())
+        for _, (r0, c0, r1, c1), image in j.iter_tiles():
+            np.testing.assert_array_equal(image, self.data[r0:r1, c0:c1])
+
+    def test_stop_early(self):
+        """
+        SCENARIO:  Stop iterating over the tiles after the first one.
+
+        EXPECTED RESULT:  The codec is disposed of when the iterator is
+        closed.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with patch(
+            'glymur.jp2kr.opj2.destroy_codec', wraps=opj2.destroy_codec
+        ) as mock:
+            tiles = j.iter_tiles()
+            next(tiles)
+            tiles.close()
+
+        self.assertEqual(mock.call_count, 1)
+
+    def test_invalid_rlevel(self):
+        """
+        SCENARIO:  Request an invalid resolution level.
+
+        EXPECTED RESULT:  ValueError, raised before iteration starts.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with self.assertRaises(ValueError):
+            j.iter_tiles(rlevel=7)
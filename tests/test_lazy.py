@@ -0,0 +1,212 @@
+"""
+Tests for lazy, chunked arrays.
+"""
+# standard library imports
+import unittest
+from unittest.mock import patch
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from glymur.lazy import LazyArray
+from glymur.lib import openjp2 as opj2
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+
+        # 4x4 tiles, with partial tiles on the right and bottom edges
+        self.data = skimage.data.astronaut()[:500, :450]
+        Jp2k(self.temp_jp2_filename, data=self.data, tilesize=(128, 128))
+
+    def lazy_array(self, jp2, **kwargs):
+        """Create a LazyArray whether or not dask is installed."""
+        with patch('glymur.lazy._HAVE_DASK', new=False):
+            return jp2.to_lazy_array(**kwargs)
+
+    def test_chunks_follow_tiles(self):
+        """
+        SCENARIO:  Create lazy arrays at several resolution levels.
+
+        EXPECTED RESULT:  The chunk boundaries are the tile boundaries at
+        that resolution.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+
+        a = self.lazy_array(j)
+        self.assertEqual(a.shape, (500, 450, 3))
+        self.assertEqual(a.dtype, np.uint8)
+        self.assertEqual(
+            a.chunks, ((128, 128, 128, 116), (128, 128, 128, 66), (3,))
+        )
+
+        a = self.lazy_array(j, rlevel=2)
+        self.assertEqual(a.shape, (125, 113, 3))
+        self.assertEqual(a.chunks, ((32, 32, 32, 29), (32, 32, 32, 17), (3,)))
+
+    def test_chunks_multiple_tiles(self):
+        """
+        SCENARIO:  Ask for chunks about twice the size of a tile.
+
+        EXPECTED RESULT:  Each chunk spans two tiles in each direction.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+
+        a = self.lazy_array(j, chunks=(250, 250))
+
+        self.assertEqual(a.chunks, ((256, 244), (256, 194), (3,)))
+
+    def test_invalid_chunks(self):
+        """
+        SCENARIO:  Specify chunks that are neither 'tiles' nor two positive
+        integers.
+
+        EXPECTED RESULT:  ValueError
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        for chunks in ('auto', (256,), (0, 256), (256.0, 256)):
+            with self.subTest(chunks=chunks):
+                with self.assertRaises(ValueError):
+                    j.to_lazy_array(chunks=chunks)
+
+    def test_slicing(self):
+        """
+        SCENARIO:  Slice a lazy array in various ways.
+
+        EXPECTED RESULT:  The results match those of slicing the image data.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        a = self.lazy_array(j)
+
+        for key in [
+            np.s_[:],
+            np.s_[...],
+            np.s_[100:300, 50:400],
+            np.s_[100:300, 50:400, 1],
+            np.s_[100:300:3, 400:50:-2],
+            np.s_[10, 20:30],
+            np.s_[-1, -1],
+            np.s_[5:5, :],
+            np.s_[..., ::-1],
+        ]:
+            with self.subTest(key=key):
+                np.testing.assert_array_equal(a[key], self.data[key])
+
+        np.testing.assert_array_equal(np.asarray(a), self.data)
+
+    def test_slicing_rlevel(self):
+        """
+        SCENARIO:  Slice a lazy array at a lower resolution.
+
+        EXPECTED RESULT:  The results match the same area of the image
+        read at that resolution.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        expected = j.read(rlevel=2)
+
+        a = self.lazy_array(j, rlevel=2)
+        for key in [np.s_[:], np.s_[30:70, 10:100], np.s_[31:33, 112:113]]:
+            with self.subTest(key=key):
+                np.testing.assert_array_equal(a[key], expected[key])
+
+    def test_only_needed_tiles(self):
+        """
+        SCENARIO:  Slice a window lying within a single tile.
+
+        EXPECTED RESULT:  Only that one tile is decoded.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        a = self.lazy_array(j)
+
+        with patch(
+            'glymur.jp2kr.opj2.set_decode_area', wraps=opj2.set_decode_area
+        ) as mock:
+            a[130:140, 260:300]
+
+        self.assertEqual(mock.call_count, 1)
+        _, _, x0, y0, x1, y1 = mock.call_args.args
+        self.assertEqual((y0, x0, y1, x1), (130, 260, 140, 300))
+
+    def test_bad_index(self):
+        """
+        SCENARIO:  Index the rows of a lazy array with a list, or out of
+        bounds.
+
+        EXPECTED RESULT:  IndexError
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        a = self.lazy_array(j)
+
+        for key in (np.s_[[1, 2], :], np.s_[500, 0], np.s_[0, 0, 0, 0]):
+            with self.subTest(key=key):
+                with self.assertRaises(IndexError):
+                    a[key]
+
+    def test_palette(self):
+        """
+        SCENARIO:  Create a lazy array from an image with a palette.
+
+        EXPECTED RESULT:  RuntimeError, as the shape of the image cannot be
+        known without decoding it.
+        """
+        j = Jp2kr(self.jpxfile)
+        with self.assertRaises(RuntimeError):
+            j.to_lazy_array()
+
+    @unittest.skipIf(not glymur.lazy._HAVE_DASK, "Requires dask")
+    def test_dask(self):
+        """
+        SCENARIO:  Create a dask array and compute slices and reductions of
+        it.
+
+        EXPECTED RESULT:  The results match those of the image data, and a
+        slice within a single tile decodes just that tile.
+        """
+        import dask.array as da
+
+        j = Jp2kr(self.temp_jp2_filename)
+        a = j.to_lazy_array()
+
+        self.assertIsInstance(a, da.Array)
+        self.assertEqual(
+            a.chunks, ((128, 128, 128, 116), (128, 128, 128, 66), (3,))
+        )
+        np.testing.assert_array_equal(a.compute(), self.data)
+        np.testing.assert_allclose(
+            a.mean(axis=(0, 1)).compute(), self.data.mean(axis=(0, 1))
+        )
+
+        with patch(
+            'glymur.jp2kr.opj2.set_decode_area', wraps=opj2.set_decode_area
+        ) as mock:
+            actual = a[130:140, 260:300, 0].compute()
+
+        np.testing.assert_array_equal(actual, self.data[130:140, 260:300, 0])
+        self.assertEqual(mock.call_count, 1)
+
+    def test_no_dask(self):
+        """
+        SCENARIO:  Create a lazy array when dask is not installed.
+
+        EXPECTED RESULT:  A LazyArray is returned, and it cannot be turned
+        into a dask array.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with patch('glymur.lazy._HAVE_DASK', new=False):
+            a = j.to_lazy_array()
+            self.assertIsInstance(a, LazyArray)
+            with self.assertRaises(RuntimeError):
+                a.to_dask()
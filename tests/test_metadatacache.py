@@ -0,0 +1,215 @@
+"""
+Tests for the cache of parsed metadata.
+"""
+# standard library imports
+import os
+import shutil
+import unittest
+from unittest.mock import patch
+
+# 3rd party library imports
+
+# local imports
+import glymur
+from glymur import Jp2kr
+from glymur.jp2box import UUIDBox, _XMP_UUID
+from glymur.metadatacache import dumps, loads
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+        glymur.metadata_cache_clear()
+
+        # Keep the entries on disk out of the real configuration directory.
+        config_dir = self.test_dir_path / 'config'
+        patcher = patch.dict(os.environ, {'XDG_CONFIG_HOME': str(config_dir)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        shutil.copy(self.jp2file, self.temp_jp2_filename)
+        shutil.copy(self.j2kfile, self.temp_j2k_filename)
+
+    def tearDown(self):
+        super().tearDown()
+        glymur.metadata_cache_clear()
+        glymur.reset_option('all')
+
+    def test_disabled_by_default(self):
+        """
+        SCENARIO:  Open a file twice without configuring the cache.
+
+        EXPECTED RESULT:  Nothing is cached.
+        """
+        Jp2kr(self.temp_jp2_filename)
+        Jp2kr(self.temp_jp2_filename)
+
+        info = glymur.metadata_cache_info()
+        self.assertEqual(info[:3], (0, 0, 0))
+
+    def test_memory(self):
+        """
+        SCENARIO:  Open a JP2 file and read its codestream header, then open
+        it again with the cache in memory.
+
+        EXPECTED RESULT:  The second time neither the boxes nor the
+        codestream are parsed, yet they are the same.
+        """
+        glymur.set_option('cache.metadata', 'memory')
+        expected = Jp2kr(self.temp_jp2_filename)
+        expected.codestream
+
+        with (
+            patch.object(Jp2kr, 'parse_superbox') as parse_superbox,
+            patch.object(Jp2kr, 'get_codestream') as get_codestream,
+        ):
+            actual = Jp2kr(self.temp_jp2_filename)
+            codestream = actual.codestream
+
+        parse_superbox.assert_not_called()
+        get_codestream.assert_not_called()
+        self.assertEqual(str(actual), str(expected))
+        self.assertEqual(str(codestream), str(expected.codestream))
+        self.assertEqual(actual.shape, expected.shape)
+        self.assertEqual(glymur.metadata_cache_info().hits, 1)
+
+    def test_raw_codestream(self):
+        """
+        SCENARIO:  Open a raw codestream twice with the cache in memory.
+
+        EXPECTED RESULT:  The codestream is only parsed the first time.
+        """
+        glymur.set_option('cache.metadata', 'memory')
+        expected = Jp2kr(self.temp_j2k_filename)
+
+        with patch.object(Jp2kr, 'get_codestream') as get_codestream:
+            actual = Jp2kr(self.temp_j2k_filename)
+
+        get_codestream.assert_not_called()
+        self.assertEqual(actual.shape, expected.shape)
+        self.assertEqual(str(actual.codestream), str(expected.codestream))
+
+    def test_invalidation(self):
+        """
+        SCENARIO:  Open a file, replace it with a different image, and open
+        it again.
+
+        EXPECTED RESULT:  The stale entry is not used.
+        """
+        glymur.set_option('cache.metadata', 'memory')
+        Jp2kr(self.temp_jp2_filename)
+
+        glymur.Jp2k(self.temp_jp2_filename, data=Jp2kr(self.jp2file)[::4, ::4])
+        actual = Jp2kr(self.temp_jp2_filename)
+
+        self.assertEqual(actual.shape, (364, 648, 3))
+        self.assertEqual(glymur.metadata_cache_info().hits, 0)
+
+    def test_reparse_after_rewrite(self):
+        """
+        SCENARIO:  Read the codestream of a file, replace the file with a
+        different image, and force the same object to parse it again.  Then
+        open the file anew.
+
+        EXPECTED RESULT:  The stale codestream is neither kept nor cached,
+        so the new image is described.
+        """
+        glymur.set_option('cache.metadata', 'memory')
+        jp2 = glymur.Jp2k(self.temp_jp2_filename)
+        jp2.codestream
+
+        other = self.test_dir_path / 'other.jp2'
+        glymur.Jp2k(other, data=Jp2kr(self.jp2file)[::4, ::4])
+        shutil.copy(other, self.temp_jp2_filename)
+        jp2.finalize(force_parse=True)
+
+        actual = Jp2kr(self.temp_jp2_filename)
+
+        self.assertEqual(jp2.codestream.segment[1].ysiz, 364)
+        self.assertEqual(actual.codestream.segment[1].ysiz, 364)
+        self.assertEqual(actual.shape, (364, 648, 3))
+
+    def test_disk(self):
+        """
+        SCENARIO:  Open a file with the cache on disk, empty the cache in
+        memory, and open the file again.
+
+        EXPECTED RESULT:  The entry is read from the metadata directory of
+        the configuration directory instead of parsing the file.
+        """
+        glymur.set_option('cache.metadata', 'disk')
+        expected = Jp2kr(self.temp_jp2_filename)
+        glymur.metadata_cache_clear()
+
+        with patch.object(Jp2kr, 'parse_superbox') as parse_superbox:
+            actual = Jp2kr(self.temp_jp2_filename)
+
+        parse_superbox.assert_not_called()
+        self.assertEqual(str(actual), str(expected))
+
+        directory = glymur.metadata_cache_info().directory
+        self.assertEqual(
+            directory, self.test_dir_path / 'config' / 'glymur' / 'metadata'
+        )
+        self.assertEqual(len(list(directory.glob('*.pickle'))), 1)
+
+        glymur.metadata_cache_clear(disk=True)
+        self.assertEqual(len(list(directory.glob('*.pickle'))), 0)
+
+    def test_invalid_option(self):
+        """
+        SCENARIO:  Set the cache.metadata option to an unknown place.
+
+        EXPECTED RESULT:  ValueError
+        """
+        with self.assertRaises(ValueError):
+            glymur.set_option('cache.metadata', 'tmpfs')
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+class TestSuiteSerialization(fixtures.TestCommon):
+
+    def test_xml(self):
+        """
+        SCENARIO:  Serialize the boxes of a JPX file with XML boxes.
+
+        EXPECTED RESULT:  They print the same after being restored.
+        """
+        boxes = Jp2kr(self.jpxfile).box
+
+        actual = loads(dumps(boxes))
+
+        self.assertEqual([str(b) for b in actual], [str(b) for b in boxes])
+
+    def test_xmp(self):
+        """
+        SCENARIO:  Serialize a UUID box with XMP data.
+
+        EXPECTED RESULT:  The XMP data is restored as an XML tree.
+        """
+        raw_data = b'<x:xmpmeta xmlns:x="adobe:ns:meta/"><a>b</a></x:xmpmeta>'
+        box = UUIDBox(the_uuid=_XMP_UUID, raw_data=raw_data)
+
+        actual = loads(dumps(box))
+
+        self.assertEqual(actual.data.getroot().find('a').text, 'b')
+        self.assertEqual(str(actual), str(box))
+
+    def test_full_codestream(self):
+        """
+        SCENARIO:  Serialize a fully parsed codestream.
+
+        EXPECTED RESULT:  It prints the same after being restored.
+        """
+        c = Jp2kr(self.jp2file).get_codestream(header_only=False)
+
+        actual = loads(dumps(c))
+
+        self.assertEqual(str(actual), str(c))
+        self.assertEqual(len(actual.segment), len(c.segment))
@@ -0,0 +1,195 @@
+"""
+Tests for planning the byte ranges needed to read part of an image.
+"""
+# standard library imports
+import unittest
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+from glymur import Jp2k, Jp2kr
+from glymur.packets import coalesce
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+class TestSuite(fixtures.TestCommon):
+
+    def write(self, **kwargs):
+        """
+        Write a 2x2 tiled image with three layers, and return the offset,
+        header length, and packet lengths of the first tile-part.
+        """
+        Jp2k(
+            self.temp_j2k_filename,
+            data=skimage.data.astronaut(),
+            tilesize=(256, 256),
+            cratios=[50, 20, 10],
+            **kwargs
+        )
+        c = Jp2kr(self.temp_j2k_filename).get_codestream(header_only=False)
+
+        sot = next(seg for seg in c.segment if seg.marker_id == 'SOT')
+        sod = next(seg for seg in c.segment if seg.marker_id == 'SOD')
+        iplt = np.concatenate([
+            seg.iplt for seg in c.segment
+            if seg.marker_id == 'PLT' and sot.offset < seg.offset < sod.offset
+        ]) if kwargs.get('plt') else None
+
+        return sot.offset, sod.offset + 2 - sot.offset, iplt
+
+    def test_whole_image(self):
+        """
+        SCENARIO:  Plan to read the whole image.
+
+        EXPECTED RESULT:  Everything up to the EOC marker.
+        """
+        self.write(plt=True)
+        j = Jp2kr(self.temp_j2k_filename)
+
+        actual = j.byte_ranges()
+
+        size = self.temp_j2k_filename.stat().st_size
+        self.assertEqual(actual, [(0, size - 2)])
+
+    def test_no_plt(self):
+        """
+        SCENARIO:  Plan to read a window in the first tile of an image
+        without PLT segments, at the lowest resolution.
+
+        EXPECTED RESULT:  The main header and the whole first tile-part.
+        """
+        sot, _, _ = self.write()
+        j = Jp2kr(self.temp_j2k_filename)
+
+        actual = j.byte_ranges(area=(0, 0, 100, 100), rlevel=-1)
+
+        length = int(j.tile_index['length'][0])
+        self.assertEqual(actual, [(0, sot + length)])
+
+    def test_lowest_resolution(self):
+        """
+        SCENARIO:  Plan to read the first layer of the lowest resolution of
+        a window in the first tile.  The progression is LRCP, with a single
+        precinct per resolution.
+
+        EXPECTED RESULT:  The main header, the tile-part header, and the
+        first three packets, one for each component.
+        """
+        sot, header_length, iplt = self.write(plt=True)
+        j = Jp2kr(self.temp_j2k_filename)
+
+        actual = j.byte_ranges(area=(0, 0, 100, 100), rlevel=-1, layer=1)
+
+        expected = [(0, sot + header_length + int(iplt[:3].sum()))]
+        self.assertEqual(actual, expected)
+
+    def test_first_layer(self):
+        """
+        SCENARIO:  Plan to read the first layer at full resolution.  The
+        progression is LRCP.
+
+        EXPECTED RESULT:  The main header, the tile-part header, and the
+        packets of the first layer, i.e. 6 resolutions of 3 components.
+        """
+        sot, header_length, iplt = self.write(plt=True)
+        j = Jp2kr(self.temp_j2k_filename)
+
+        actual = j.byte_ranges(area=(0, 0, 100, 100), layer=1)
+
+        expected = [(0, sot + header_length + int(iplt[:18].sum()))]
+        self.assertEqual(actual, expected)
+
+    def test_component(self):
+        """
+        SCENARIO:  Plan to read a single component at the lowest resolution.
+
+        EXPECTED RESULT:  The main header and tile-part header, then the
+        second packet on its own.
+        """
+        sot, header_length, iplt = self.write(plt=True)
+        j = Jp2kr(self.temp_j2k_filename)
+
+        actual = j.byte_ranges(
+            area=(0, 0, 100, 100), rlevel=-1, layer=1, components=[1]
+        )
+
+        body = sot + header_length
+        expected = [
+            (0, body),
+            (body + int(iplt[0]), int(iplt[1])),
+        ]
+        self.assertEqual(actual, expected)
+
+    def test_rpcl(self):
+        """
+        SCENARIO:  Plan to read the first layer of the lowest resolution of
+        an image with RPCL progression, i.e. the layers of each component
+        follow one another.
+
+        EXPECTED RESULT:  Every third packet of the lowest resolution.
+        """
+        sot, header_length, iplt = self.write(plt=True, prog='RPCL')
+        j = Jp2kr(self.temp_j2k_filename)
+
+        actual = j.byte_ranges(area=(0, 0, 100, 100), rlevel=-1, layer=1)
+
+        offsets = sot + header_length + np.cumsum(iplt) - iplt
+        expected = [(0, sot + header_length + int(iplt[0]))] + [
+            (int(offsets[k]), int(iplt[k])) for k in (3, 6)
+        ]
+        self.assertEqual(actual, expected)
+
+    def test_other_tiles(self):
+        """
+        SCENARIO:  Plan to read a window in the last tile.
+
+        EXPECTED RESULT:  Nothing from the other tiles.
+        """
+        self.write(plt=True)
+        j = Jp2kr(self.temp_j2k_filename)
+        last = j.tile_index[-1]
+
+        actual = j.byte_ranges(area=(300, 300, 400, 400))
+
+        for offset, length in actual[1:]:
+            self.assertGreaterEqual(offset, last['offset'])
+            self.assertLessEqual(
+                offset + length, last['offset'] + last['length']
+            )
+
+    def test_bad_arguments(self):
+        """
+        SCENARIO:  Plan with an invalid rlevel, layer, or component.
+
+        EXPECTED RESULT:  ValueError
+        """
+        self.write()
+        j = Jp2kr(self.temp_j2k_filename)
+
+        for kwargs in [{'rlevel': 6}, {'layer': 3}, {'components': [3]}]:
+            with self.subTest(**kwargs):
+                with self.assertRaises(ValueError):
+                    j.byte_ranges(**kwargs)
+
+
+class TestSuiteCoalesce(unittest.TestCase):
+
+    def test_coalesce(self):
+        """
+        SCENARIO:  Coalesce ranges that are out of order, overlap, touch,
+        or are empty.
+
+        EXPECTED RESULT:  Overlapping and touching ranges are merged, empty
+        ones are dropped.
+        """
+        starts = [50, 0, 10, 30, 35, 90]
+        stops = [60, 10, 20, 40, 38, 90]
+
+        actual = coalesce(starts, stops)
+
+        self.assertEqual(actual, [(0, 20), (30, 10), (50, 10)])
@@ -0,0 +1,185 @@
+"""
+Tests for decoding the tiles of an image in parallel.
+"""
+# standard library imports
+import concurrent.futures
+import io
+import unittest
+from unittest.mock import patch
+import warnings
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from glymur.lib import openjp2 as opj2
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+
+        # 4x4 tiles, with partial tiles on the right and bottom edges
+        self.data = skimage.data.astronaut()[:500, :450]
+        Jp2k(self.temp_jp2_filename, data=self.data, tilesize=(128, 128))
+
+    def test_whole_image(self):
+        """
+        SCENARIO:  Read an entire multi-tile image with several workers.
+
+        EXPECTED RESULT:  Each tile is decoded by its own codec, the image
+        matches the original.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with patch(
+            'glymur.jp2kr.opj2.read_header', wraps=opj2.read_header
+        ) as mock:
+            actual = j.read(workers=4)
+
+        self.assertEqual(mock.call_count, 16)
+        np.testing.assert_array_equal(actual, self.data)
+
+    def test_area_and_rlevel(self):
+        """
+        SCENARIO:  Read areas not aligned with the tiles at various resolution
+        levels, interleaved and planar.
+
+        EXPECTED RESULT:  The images match those of the single-codec path.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        for rlevel in (0, 1, 3, -1):
+            for planar in (False, True):
+                with self.subTest(rlevel=rlevel, planar=planar):
+                    kwargs = {
+                        'rlevel': rlevel,
+                        'area': (10, 20, 300, 400),
+                        'planar': planar,
+                    }
+                    np.testing.assert_array_equal(
+                        j.read(workers=3, **kwargs), j.read(**kwargs)
+                    )
+
+    def test_out(self):
+        """
+        SCENARIO:  Read with several workers into a preallocated array.
+
+        EXPECTED RESULT:  The output array is returned holding the image.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        out = np.zeros((3, 500, 450), dtype=np.uint8)
+        actual = j.read(out=out, planar=True, workers=2)
+
+        self.assertIs(actual, out)
+        np.testing.assert_array_equal(out, np.moveaxis(self.data, -1, 0))
+
+    def test_grid_offset(self):
+        """
+        SCENARIO:  Read an image whose tiles are offset from the image origin
+        with several workers.
+
+        EXPECTED RESULT:  The edge slivers that vanish at lower resolution
+        levels cause no trouble, the image matches the single-codec path.
+        """
+        with warnings.catch_warnings():
+            # The IHDR box does not account for the offset.
+            warnings.simplefilter('ignore')
+            Jp2k(
+                self.temp_jp2_filename,
+                data=self.data,
+                tilesize=(100, 100),
+                grid_offset=(3, 5),
+            )
+            j = Jp2kr(self.temp_jp2_filename)
+
+        for rlevel in range(4):
+            with self.subTest(rlevel=rlevel):
+                np.testing.assert_array_equal(
+                    j.read(rlevel=rlevel, workers=4), j.read(rlevel=rlevel)
+                )
+
+    def test_decoded_components(self):
+        """
+        SCENARIO:  Read a single component with several workers.
+
+        EXPECTED RESULT:  The image is 2D and matches the single-codec path.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        j.decoded_components = [1]
+
+        actual = j.read(workers=2)
+        self.assertEqual(actual.shape, (500, 450))
+        np.testing.assert_array_equal(actual, j.read())
+
+    def test_shared_file_object(self):
+        """
+        SCENARIO:  Read in parallel from a single BytesIO object.
+
+        EXPECTED RESULT:  The concurrent decodes do not interfere with one
+        another.
+        """
+        b = io.BytesIO(self.temp_jp2_filename.read_bytes())
+        j = Jp2kr(b)
+        np.testing.assert_array_equal(j.read(workers=8), self.data)
+
+    def test_process_pool(self):
+        """
+        SCENARIO:  Read with a process pool.
+
+        EXPECTED RESULT:  The image matches the original.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            actual = j.read(rlevel=1, workers=executor)
+
+        np.testing.assert_array_equal(actual, j.read(rlevel=1))
+
+    def test_single_tile(self):
+        """
+        SCENARIO:  Read a single-tile image with several workers.
+
+        EXPECTED RESULT:  There is nothing to split, so the single-codec path
+        is taken.
+        """
+        j = Jp2kr(self.jp2file)
+        with patch.object(j, '_read_pieces') as mock:
+            actual = j.read(rlevel=1, workers=4)
+
+        mock.assert_not_called()
+        np.testing.assert_array_equal(actual, j[::2, ::2])
+
+    def test_area_vanishes(self):
+        """
+        SCENARIO:  Read a sliver spanning several tiles at a resolution level
+        at which it vanishes.
+
+        EXPECTED RESULT:  An empty image, without decoding anything.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with patch(
+            'glymur.jp2kr.opj2.read_header', wraps=opj2.read_header
+        ) as mock:
+            actual = j.read(rlevel=3, area=(129, 100, 130, 300), workers=2)
+
+        self.assertEqual(actual.shape, (0, 25, 3))
+        self.assertEqual(mock.call_count, 0)
+
+    def test_invalid_rlevel(self):
+        """
+        SCENARIO:  Read with several workers at an invalid resolution level.
+
+        EXPECTED RESULT:  ValueError, same as the single-codec path.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with self.assertRaises(ValueError):
+            j.read(rlevel=7, workers=2)
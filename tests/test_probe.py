@@ -0,0 +1,135 @@
+"""
+Tests for probing the basic properties of an image.
+"""
+# standard library imports
+import pathlib
+import unittest
+
+# 3rd party library imports
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from glymur.jp2box import InvalidJp2kError
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+class TestSuite(fixtures.TestCommon):
+
+    def assertMatchesJp2kr(self, info, path):
+        """The probed properties agree with those of Jp2kr."""
+        j = Jp2kr(path)
+        cod = j.codestream.segment[2]
+
+        self.assertEqual(info.shape, j.shape)
+        self.assertEqual(info.dtype, j.dtype)
+        self.assertEqual(info.num_res, cod.num_res)
+        self.assertEqual(info.layers, cod.layers)
+        self.assertEqual(
+            info.tile_size, tuple(j.codestream.segment[1].xytsiz[::-1])
+        )
+
+    def test_jp2(self):
+        """
+        SCENARIO:  Probe a JP2 file.
+
+        EXPECTED RESULT:  The properties match those of Jp2kr.
+        """
+        path = glymur.data.nemo()
+
+        info = glymur.probe(path)
+
+        self.assertMatchesJp2kr(info, path)
+        self.assertEqual(info.codec, 'jp2')
+        self.assertEqual(info.tile_grid, (1, 1))
+        self.assertEqual(info.progression, 'LRCP')
+        self.assertEqual(info.colourspace, 'sRGB')
+
+    def test_j2k(self):
+        """
+        SCENARIO:  Probe a raw codestream.
+
+        EXPECTED RESULT:  The properties match those of Jp2kr, and there is
+        no colourspace.
+        """
+        path = glymur.data.goodstuff()
+
+        info = glymur.probe(pathlib.Path(path))
+
+        self.assertMatchesJp2kr(info, path)
+        self.assertEqual(info.codec, 'j2k')
+        self.assertIsNone(info.colourspace)
+
+    def test_palette(self):
+        """
+        SCENARIO:  Probe a JPX file with a single component and a palette.
+
+        EXPECTED RESULT:  The shape has the palette's three columns, as with
+        Jp2kr.
+        """
+        info = glymur.probe(glymur.data.jpxfile())
+
+        self.assertEqual(info.shape, (1024, 1024, 3))
+
+    @unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+    def test_coding_parameters(self):
+        """
+        SCENARIO:  Probe a tiled image with several layers and RPCL
+        progression.
+
+        EXPECTED RESULT:  The tile grid, layers, and progression match what
+        was written.
+        """
+        Jp2k(
+            self.temp_jp2_filename,
+            data=skimage.data.astronaut(),
+            tilesize=(128, 192),
+            cratios=[20, 10, 5],
+            prog='RPCL',
+            numres=4,
+        )
+
+        info = glymur.probe(self.temp_jp2_filename)
+
+        self.assertMatchesJp2kr(info, self.temp_jp2_filename)
+        self.assertEqual(info.tile_grid, (4, 3))
+        self.assertEqual(info.layers, 3)
+        self.assertEqual(info.num_res, 3)
+        self.assertEqual(info.progression, 'RPCL')
+
+    def test_trailing_metadata_is_not_read(self):
+        """
+        SCENARIO:  Probe in-memory data with a corrupt XML box after the
+        codestream.
+
+        EXPECTED RESULT:  The probe succeeds, as the box is never read.
+        """
+        with open(glymur.data.nemo(), 'rb') as f:
+            data = f.read() + b'\x00\x00\x00\x20xml <not xml'
+
+        info = glymur.probe(data)
+
+        self.assertEqual(info.shape, (1456, 2592, 3))
+
+    def test_not_jpeg2000(self):
+        """
+        SCENARIO:  Probe something that is not JPEG 2000.
+
+        EXPECTED RESULT:  InvalidJp2kError
+        """
+        with self.assertRaises(InvalidJp2kError):
+            glymur.probe(b'GIF89a' + bytes(100))
+
+    def test_immutable(self):
+        """
+        SCENARIO:  Try to modify the result of a probe.
+
+        EXPECTED RESULT:  AttributeError
+        """
+        info = glymur.probe(glymur.data.nemo())
+
+        with self.assertRaises(AttributeError):
+            info.shape = (1, 1)
@@ -0,0 +1,153 @@
+"""
+Tests for the resolution pyramid.
+"""
+# standard library imports
+import unittest
+from unittest.mock import patch
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from glymur.lib import openjp2 as opj2
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+
+        # 4x4 tiles, with partial tiles on the right and bottom edges
+        self.data = skimage.data.astronaut()[:500, :450]
+        Jp2k(
+            self.temp_jp2_filename,
+            data=self.data,
+            tilesize=(128, 128),
+            numres=4,
+            psizes=[(64, 64), (32, 32)],
+        )
+
+    def test_levels(self):
+        """
+        SCENARIO:  Build the pyramid of a tiled image with precincts.
+
+        EXPECTED RESULT:  One level per resolution, each with the geometry
+        of the image at that resolution.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+
+        levels = j.pyramid()
+
+        self.assertEqual(len(levels), 4)
+        self.assertEqual(
+            [level.shape for level in levels],
+            [(500, 450, 3), (250, 225, 3), (125, 113, 3), (63, 57, 3)]
+        )
+        self.assertEqual([level.scale for level in levels], [1, 2, 4, 8])
+        self.assertEqual(
+            [level.tile_grid for level in levels], [(4, 4)] * 4
+        )
+        self.assertEqual(
+            levels[2].chunks, ((32, 32, 32, 29), (32, 32, 32, 17), (3,))
+        )
+
+        # The precinct sizes are given starting with the highest resolution.
+        self.assertEqual(levels[0].precinct_size, (64, 64))
+        self.assertEqual(levels[1].precinct_size, (32, 32))
+
+    def test_computed_once(self):
+        """
+        SCENARIO:  Ask for the pyramid twice, then change the decoded
+        components.
+
+        EXPECTED RESULT:  The same levels are returned until the components
+        change.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+
+        levels = j.pyramid()
+        self.assertIs(j.pyramid(), levels)
+
+        j.decoded_components = [1]
+        levels = j.pyramid()
+        self.assertEqual(levels[0].shape, (500, 450))
+        np.testing.assert_array_equal(
+            levels[0][:10, :10], self.data[:10, :10, 1]
+        )
+
+    def test_ignore_pclr_cmap_cdef_changed(self):
+        """
+        SCENARIO:  Build the pyramid of an image with a palette while
+        ignoring the palette, then stop ignoring it.
+
+        EXPECTED RESULT:  The pyramid is built anew, which fails because of
+        the palette, rather than the stale levels being returned.
+        """
+        j = Jp2kr(self.jpxfile)
+        j.ignore_pclr_cmap_cdef = True
+        self.assertEqual(j.pyramid()[0].shape, (1024, 1024))
+
+        j.ignore_pclr_cmap_cdef = False
+        with self.assertRaises(RuntimeError):
+            j.pyramid()
+
+    def test_windows(self):
+        """
+        SCENARIO:  Read windows and tiles of each level.
+
+        EXPECTED RESULT:  They match the image read at that resolution.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+
+        for level in j.pyramid():
+            with self.subTest(rlevel=level.rlevel):
+                expected = j.read(rlevel=level.rlevel)
+                np.testing.assert_array_equal(
+                    level[5:40, 7:50], expected[5:40, 7:50]
+                )
+
+                r0, c0, r1, c1 = level.tile_area(3, 3)
+                np.testing.assert_array_equal(
+                    level.tile(3, 3), expected[r0:r1, c0:c1]
+                )
+
+    def test_window_decodes_directly(self):
+        """
+        SCENARIO:  Read a window of a reduced level.
+
+        EXPECTED RESULT:  The decode uses the level's resolution and the
+        corresponding area of the full resolution image.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        level = j.pyramid()[2]
+
+        with patch(
+            'glymur.jp2kr.opj2.set_decode_area', wraps=opj2.set_decode_area
+        ) as mock:
+            level[10:20, 40:60]
+
+        self.assertEqual(mock.call_count, 1)
+        _, _, x0, y0, x1, y1 = mock.call_args.args
+        self.assertEqual((y0, x0, y1, x1), (40, 160, 80, 240))
+
+    def test_bad_tile(self):
+        """
+        SCENARIO:  Ask for a tile outside of the tile grid.
+
+        EXPECTED RESULT:  IndexError
+        """
+        level = Jp2kr(self.temp_jp2_filename).pyramid()[1]
+        for row, col in [(4, 0), (0, -1)]:
+            with self.subTest(row=row, col=col):
+                with self.assertRaises(IndexError):
+                    level.tile(row, col)
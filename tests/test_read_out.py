@@ -0,0 +1,159 @@
+"""
+Tests for reading image data into caller-supplied arrays.
+"""
+# standard library imports
+import importlib.resources as ir
+import unittest
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+
+    def test_read(self):
+        """
+        SCENARIO:  Use the read method without an output array.
+
+        EXPECTED RESULT:  The image matches that of slicing.
+        """
+        j = Jp2kr(self.jp2file)
+        actual = j.read(rlevel=1, area=(100, 200, 500, 1000))
+        expected = j[100:500:2, 200:1000:2]
+        np.testing.assert_array_equal(actual, expected)
+        self.assertEqual(actual.dtype, np.uint8)
+
+    def test_out(self):
+        """
+        SCENARIO:  Read into a preallocated array.
+
+        EXPECTED RESULT:  The output array is returned and holds the image.
+        """
+        j = Jp2kr(self.jp2file)
+        out = np.zeros((728, 1296, 3), dtype=np.uint8)
+        actual = j.read(rlevel=1, out=out)
+
+        self.assertIs(actual, out)
+        np.testing.assert_array_equal(out, j[::2, ::2])
+
+    def test_planar(self):
+        """
+        SCENARIO:  Read with the planar option, with and without an output
+        array.
+
+        EXPECTED RESULT:  The bands make up the first dimension.
+        """
+        j = Jp2kr(self.jp2file)
+        expected = np.moveaxis(j[::2, ::2], -1, 0)
+
+        np.testing.assert_array_equal(j.read(rlevel=1, planar=True), expected)
+
+        out = np.empty((3, 728, 1296), dtype=np.uint8)
+        j.read(rlevel=1, planar=True, out=out)
+        np.testing.assert_array_equal(out, expected)
+
+    def test_memmap(self):
+        """
+        SCENARIO:  Read into a memory-mapped array.
+
+        EXPECTED RESULT:  The image lands in the file backing the array.
+        """
+        j = Jp2kr(self.j2kfile)
+        path = self.test_dir_path / 'image.dat'
+        out = np.memmap(path, dtype=np.uint8, mode='w+', shape=(800, 480, 3))
+        j.read(out=out)
+        out.flush()
+        del out
+
+        actual = np.fromfile(path, dtype=np.uint8).reshape(800, 480, 3)
+        np.testing.assert_array_equal(actual, j[:])
+
+    def test_dtype_conversion(self):
+        """
+        SCENARIO:  Read into an array with a wider datatype than the image.
+
+        EXPECTED RESULT:  The samples are cast to the datatype of the output.
+        """
+        j = Jp2kr(self.j2kfile)
+        out = np.empty((800, 480, 3), dtype=np.float32)
+        j.read(out=out)
+
+        np.testing.assert_array_equal(out, j[:].astype(np.float32))
+
+    def test_single_band(self):
+        """
+        SCENARIO:  Read a single band image into a 2D array.
+
+        EXPECTED RESULT:  The image matches.
+        """
+        data = skimage.data.moon()
+        Jp2k(self.temp_jp2_filename, data=data)
+
+        out = np.empty((512, 512), dtype=np.uint8)
+        Jp2kr(self.temp_jp2_filename).read(out=out, planar=True)
+        np.testing.assert_array_equal(out, data)
+
+    def test_read_bands_out(self):
+        """
+        SCENARIO:  Read an image with unequal subsampling into a list of
+        arrays.
+
+        EXPECTED RESULT:  Each component is read into its own array.
+        """
+        path = ir.files("tests.data.conformance").joinpath("p0_06.j2k")
+        j = Jp2k(path)
+        expected = j.read_bands()
+
+        out = [np.empty(band.shape, dtype=band.dtype) for band in expected]
+        actual = j.read_bands(out=out)
+
+        for a, o, e in zip(actual, out, expected):
+            self.assertIs(a, o)
+            np.testing.assert_array_equal(o, e)
+
+    def test_read_bands_out_not_a_list(self):
+        """
+        SCENARIO:  Read an image with unequal subsampling into a single
+        array.
+
+        EXPECTED RESULT:  ValueError
+        """
+        path = ir.files("tests.data.conformance").joinpath("p0_06.j2k")
+        j = Jp2k(path)
+        with self.assertRaises(ValueError):
+            j.read_bands(out=np.empty((129, 513, 4), dtype=np.uint8))
+
+    def test_out_wrong_shape(self):
+        """
+        SCENARIO:  Read into an array that does not have the proper shape.
+
+        EXPECTED RESULT:  ValueError
+        """
+        j = Jp2kr(self.j2kfile)
+        with self.assertRaises(ValueError):
+            j.read(out=np.empty((480, 800, 3), dtype=np.uint8))
+
+    def test_out_not_an_array(self):
+        """
+        SCENARIO:  Read into something that is not a numpy array.
+
+        EXPECTED RESULT:  TypeError
+        """
+        j = Jp2kr(self.j2kfile)
+        with self.assertRaises(TypeError):
+            j.read(out=bytearray(800 * 480 * 3))
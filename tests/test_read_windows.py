@@ -0,0 +1,198 @@
+"""
+Tests for reading many windows of an image at once.
+"""
+# standard library imports
+import concurrent.futures
+import importlib.resources as ir
+import unittest
+from unittest.mock import patch
+import warnings
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from glymur.lib import openjp2 as opj2
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+
+        # 4x4 tiles, with partial tiles on the right and bottom edges
+        self.data = skimage.data.astronaut()[:500, :450]
+        Jp2k(self.temp_jp2_filename, data=self.data, tilesize=(128, 128))
+
+        # Overlapping chips, some straddling tile boundaries
+        self.areas = [
+            (r, c, r + 64, c + 64)
+            for r in range(0, 400, 48)
+            for c in range(10, 380, 48)
+        ]
+
+    def test_windows(self):
+        """
+        SCENARIO:  Read many overlapping windows of a multi-tile image.
+
+        EXPECTED RESULT:  The windows match the original image, and far fewer
+        decodes are needed than there are windows.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with patch(
+            'glymur.jp2kr.opj2.read_header', wraps=opj2.read_header
+        ) as mock:
+            actual = j.read_windows(self.areas)
+
+        self.assertEqual(len(actual), len(self.areas))
+        self.assertLessEqual(mock.call_count, 16)
+        for (r0, c0, r1, c1), image in zip(self.areas, actual):
+            np.testing.assert_array_equal(image, self.data[r0:r1, c0:c1])
+
+    def test_rlevel(self):
+        """
+        SCENARIO:  Read windows at reduced resolution levels, with and without
+        workers.
+
+        EXPECTED RESULT:  The windows match those read one at a time.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        for rlevel in (1, 3, -1):
+            for workers in (None, 3):
+                with self.subTest(rlevel=rlevel, workers=workers):
+                    actual = j.read_windows(
+                        self.areas, rlevel=rlevel, workers=workers
+                    )
+                    for area, image in zip(self.areas, actual):
+                        np.testing.assert_array_equal(
+                            image, j.read(rlevel=rlevel, area=area)
+                        )
+
+    def test_distant_windows(self):
+        """
+        SCENARIO:  Read two small windows at opposite corners of a single-tile
+        image.
+
+        EXPECTED RESULT:  The windows are not coalesced into one region
+        spanning the whole image.
+        """
+        j = Jp2kr(self.jp2file)
+        areas = [(0, 0, 32, 32), (1400, 2500, 1456, 2592)]
+        with patch.object(
+            j, '_read_piece', wraps=j._read_piece
+        ) as mock:
+            actual = j.read_windows(areas)
+
+        self.assertEqual(
+            sorted(c.args[0] for c in mock.call_args_list), areas
+        )
+        for area, image in zip(areas, actual):
+            np.testing.assert_array_equal(image, j.read(area=area))
+
+    def test_duplicates(self):
+        """
+        SCENARIO:  Request the same window several times.
+
+        EXPECTED RESULT:  Each window gets its own array.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        a, b = j.read_windows([(0, 0, 10, 10), (0, 0, 10, 10)])
+
+        self.assertIsNot(a, b)
+        np.testing.assert_array_equal(a, b)
+
+    def test_grid_offset(self):
+        """
+        SCENARIO:  Read windows of an image whose tiles are offset from the
+        image origin.
+
+        EXPECTED RESULT:  The windows match those read one at a time.
+        """
+        with warnings.catch_warnings():
+            # The IHDR box does not account for the offset.
+            warnings.simplefilter('ignore')
+            Jp2k(
+                self.temp_jp2_filename,
+                data=self.data,
+                tilesize=(100, 100),
+                grid_offset=(3, 5),
+            )
+            j = Jp2kr(self.temp_jp2_filename)
+
+        areas = [(3, 5, 103, 105), (90, 95, 210, 215), (401, 301, 503, 455)]
+        for rlevel in range(4):
+            with self.subTest(rlevel=rlevel):
+                actual = j.read_windows(areas, rlevel=rlevel)
+                for area, image in zip(areas, actual):
+                    np.testing.assert_array_equal(
+                        image, j.read(rlevel=rlevel, area=area)
+                    )
+
+    def test_decoded_components(self):
+        """
+        SCENARIO:  Read windows of a single component.
+
+        EXPECTED RESULT:  The windows are 2D and match those read one at a
+        time.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        j.decoded_components = [1]
+
+        area = (100, 100, 200, 300)
+        (image,) = j.read_windows([area])
+        self.assertEqual(image.shape, (100, 200))
+        np.testing.assert_array_equal(image, j.read(area=area))
+
+    def test_process_pool(self):
+        """
+        SCENARIO:  Read windows with a process pool.
+
+        EXPECTED RESULT:  The windows match the original image.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            actual = j.read_windows(self.areas[:10], workers=executor)
+
+        for (r0, c0, r1, c1), image in zip(self.areas, actual):
+            np.testing.assert_array_equal(image, self.data[r0:r1, c0:c1])
+
+    def test_unequal_subsampling(self):
+        """
+        SCENARIO:  Read windows of an image with unequal subsampling.
+
+        EXPECTED RESULT:  RuntimeError, as with the read method.
+        """
+        path = ir.files("tests.data.conformance").joinpath("p0_06.j2k")
+        j = Jp2kr(path)
+        with self.assertRaises(RuntimeError):
+            j.read_windows([(0, 0, 10, 10)])
+
+    def test_outside_image(self):
+        """
+        SCENARIO:  Request a window that extends past the image.
+
+        EXPECTED RESULT:  ValueError
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with self.assertRaises(ValueError):
+            j.read_windows([(0, 0, 10, 10), (450, 400, 550, 460)])
+
+    def test_empty_window(self):
+        """
+        SCENARIO:  Request a window with no rows.
+
+        EXPECTED RESULT:  ValueError
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        with self.assertRaises(ValueError):
+            j.read_windows([(10, 10, 10, 20)])
@@ -0,0 +1,294 @@
+"""
+Tests for reading over HTTP with range requests.
+"""
+# standard library imports
+import http.server
+import io
+import os
+import threading
+import unittest
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from glymur.remote import HTTPRangeFetcher, RemoteFile, open_url
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+class MemoryFetcher(object):
+    """Fetch byte ranges out of memory, keeping track of them."""
+
+    def __init__(self, data):
+        self.data = data
+        self.size = None
+        self.ranges = []
+
+    def fetch(self, start, stop):
+        self.size = len(self.data)
+        self.ranges.append((start, stop))
+        return self.data[start:stop]
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Serve the server's data, honoring the Range header unless the server
+    is told not to.
+    """
+
+    def do_GET(self):
+        data = self.server.data
+        self.server.requests.append(self.headers.get('Range'))
+
+        spec = self.headers.get('Range')
+        if spec is None or not self.server.ranges:
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        start, _, stop = spec.removeprefix('bytes=').partition('-')
+        start, stop = int(start), min(int(stop) + 1, len(data))
+        if start >= len(data):
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{len(data)}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(206)
+        self.send_header(
+            'Content-Range', f'bytes {start}-{stop - 1}/{len(data)}'
+        )
+        self.send_header('Content-Length', str(stop - start))
+        self.end_headers()
+        self.wfile.write(data[start:stop])
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSuiteRemoteFile(unittest.TestCase):
+
+    def setUp(self):
+        self.data = os.urandom(1000)
+        self.fetcher = MemoryFetcher(self.data)
+
+    def test_read_across_blocks(self):
+        """
+        SCENARIO:  Read a range spanning several blocks, none of which are
+        cached.
+
+        EXPECTED RESULT:  The bytes match, and the blocks are fetched with a
+        single request.
+        """
+        f = RemoteFile(self.fetcher, block_size=100, read_ahead=0)
+
+        f.seek(150)
+        actual = f.read(300)
+
+        self.assertEqual(actual, self.data[150:450])
+        self.assertEqual(self.fetcher.ranges[-1], (100, 500))
+        self.assertEqual(f.tell(), 450)
+
+    def test_cache(self):
+        """
+        SCENARIO:  Read a range, then a range overlapping it.
+
+        EXPECTED RESULT:  Only the blocks not yet cached are fetched.  The
+        first block is fetched up front to learn the size of the file.
+        """
+        f = RemoteFile(self.fetcher, block_size=100, read_ahead=0)
+
+        f.seek(100)
+        f.read(100)
+        f.seek(0)
+        actual = f.read(300)
+
+        self.assertEqual(actual, self.data[:300])
+        self.assertEqual(
+            self.fetcher.ranges, [(0, 100), (100, 200), (200, 300)]
+        )
+        self.assertEqual(f.requests, 3)
+        self.assertEqual(f.bytes_fetched, 300)
+
+    def test_read_ahead(self):
+        """
+        SCENARIO:  Read sequentially.
+
+        EXPECTED RESULT:  The second read fetches blocks beyond it, clipped
+        to the end of the file, so that the third read needs no request.
+        """
+        f = RemoteFile(self.fetcher, block_size=100, read_ahead=20)
+
+        f.read(100)
+        f.read(100)
+        actual = f.read(800)
+
+        self.assertEqual(actual, self.data[200:])
+        self.assertEqual(self.fetcher.ranges, [(0, 100), (100, 1000)])
+
+    def test_eviction(self):
+        """
+        SCENARIO:  Read more than the cache holds.
+
+        EXPECTED RESULT:  The read succeeds, and the least recently used
+        blocks are fetched again.
+        """
+        f = RemoteFile(
+            self.fetcher, block_size=100, cache_size=300, read_ahead=0
+        )
+
+        actual = f.read()
+        f.seek(0)
+        f.read(100)
+
+        self.assertEqual(actual, self.data)
+        self.assertEqual(self.fetcher.ranges[-1], (0, 100))
+
+    def test_seek_end(self):
+        """
+        SCENARIO:  Seek relative to the end before anything has been read,
+        then read past the end.
+
+        EXPECTED RESULT:  The size is learned from the first block, reads
+        stop at the end.
+        """
+        f = RemoteFile(self.fetcher, block_size=100)
+
+        pos = f.seek(-10, os.SEEK_END)
+        actual = f.read(100)
+
+        self.assertEqual(pos, 990)
+        self.assertEqual(actual, self.data[990:])
+        self.assertEqual(f.read(100), b'')
+
+    def test_buffered(self):
+        """
+        SCENARIO:  Wrap the file in an io.BufferedReader.
+
+        EXPECTED RESULT:  Reads match.
+        """
+        f = io.BufferedReader(RemoteFile(self.fetcher, block_size=64))
+
+        f.seek(500)
+
+        self.assertEqual(f.read(10), self.data[500:510])
+
+
+class TestSuiteHTTP(fixtures.TestCommon):
+
+    def serve(self, data, ranges=True):
+        """Serve the data in a background thread and return its URL."""
+        server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), RangeHandler
+        )
+        server.data = data
+        server.ranges = ranges
+        server.requests = []
+
+        t = threading.Thread(target=server.serve_forever, daemon=True)
+        t.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        self.server = server
+        return f'http://127.0.0.1:{server.server_port}/image.jp2'
+
+    def test_fetch(self):
+        """
+        SCENARIO:  Fetch ranges, the second of them past the end.
+
+        EXPECTED RESULT:  The bytes match, and the size is learned from the
+        Content-Range header.
+        """
+        data = os.urandom(1000)
+        fetcher = HTTPRangeFetcher(self.serve(data))
+
+        self.assertEqual(fetcher.fetch(900, 1100), data[900:])
+        self.assertEqual(fetcher.size, 1000)
+        self.assertEqual(fetcher.fetch(2000, 2100), b'')
+        self.assertEqual(self.server.requests[0], 'bytes=900-1099')
+
+    def test_no_range_support(self):
+        """
+        SCENARIO:  The server ignores the Range header.
+
+        EXPECTED RESULT:  OSError, rather than downloading the whole file.
+        """
+        url = self.serve(os.urandom(1000), ranges=False)
+
+        with self.assertRaises(OSError):
+            HTTPRangeFetcher(url).fetch(0, 100)
+
+    @unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+    def test_open(self):
+        """
+        SCENARIO:  Open a JP2 file over HTTP.
+
+        EXPECTED RESULT:  Parsing the boxes and the main header takes no
+        more than two small requests, and the metadata matches that of the
+        local file.
+        """
+        path = glymur.data.nemo()
+        with open(path, 'rb') as f:
+            url = self.serve(f.read())
+
+        f = open_url(url, block_size=4096)
+        j = Jp2kr(f)
+
+        self.assertLessEqual(f.requests, 2)
+        self.assertLessEqual(f.bytes_fetched, 2 * 4096)
+
+        expected = Jp2kr(path)
+        self.assertEqual(j.shape, expected.shape)
+        self.assertEqual(
+            [box.box_id for box in j.box],
+            [box.box_id for box in expected.box]
+        )
+        self.assertEqual(str(j.codestream), str(expected.codestream))
+
+    @unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+    def test_read(self):
+        """
+        SCENARIO:  Read a reduced resolution image over HTTP.
+
+        EXPECTED RESULT:  The image matches the one read locally.
+        """
+        path = glymur.data.nemo()
+        with open(path, 'rb') as f:
+            url = self.serve(f.read())
+
+        actual = Jp2kr(open_url(url))[::4, ::4]
+
+        expected = Jp2kr(path)[::4, ::4]
+        np.testing.assert_array_equal(actual, expected)
+
+    @unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+    def test_read_area(self):
+        """
+        SCENARIO:  Read an area within the first tile of a tiled image over
+        HTTP.
+
+        EXPECTED RESULT:  The image matches, and the tiles outside of the
+        area are skipped over rather than fetched.
+        """
+        Jp2k(
+            self.temp_j2k_filename,
+            data=skimage.data.astronaut(),
+            tilesize=(128, 128),
+        )
+        data = self.temp_j2k_filename.read_bytes()
+        url = self.serve(data)
+
+        f = open_url(url, block_size=4096, read_ahead=0)
+        actual = Jp2kr(f)[:100, :100]
+
+        expected = Jp2kr(self.temp_j2k_filename)[:100, :100]
+        np.testing.assert_array_equal(actual, expected)
+        self.assertLess(f.bytes_fetched, len(data) // 2)
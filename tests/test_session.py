@@ -0,0 +1,134 @@
+"""
+Tests for decoding successive areas within a single codec session.
+"""
+# standard library imports
+import unittest
+from unittest.mock import patch
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from glymur.lib import openjp2 as opj2
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+
+    def test_single_tile_reuses_codec(self):
+        """
+        SCENARIO:  Read several areas of a single-tile image in a session.
+
+        EXPECTED RESULT:  The main header is read only once, and the data
+        matches that of regular slicing.
+        """
+        j = Jp2kr(self.j2kfile)
+        areas = [(0, 0), (100, 200), (700, 400), (33, 17)]
+        expected = [j[r:r + 64, c:c + 64] for r, c in areas]
+
+        with patch(
+            'glymur.jp2kr.opj2.read_header', wraps=opj2.read_header
+        ) as mock:
+            with j.session() as s:
+                actual = [s[r:r + 64, c:c + 64] for r, c in areas]
+
+        self.assertEqual(mock.call_count, 1)
+        for a, e in zip(actual, expected):
+            np.testing.assert_array_equal(a, e)
+
+    def test_rlevel_change(self):
+        """
+        SCENARIO:  Read areas at different resolution levels in a session.
+
+        EXPECTED RESULT:  The codec is recreated for each change in the
+        resolution level, the data matches that of regular slicing.
+        """
+        j = Jp2kr(self.j2kfile)
+
+        with patch(
+            'glymur.jp2kr.opj2.read_header', wraps=opj2.read_header
+        ) as mock:
+            with j.session() as s:
+                a = s[0:128:2, 0:128:2]
+                b = s[128:256:2, 128:256:2]
+                c = s[::4, ::4]
+                d = s[0:32, 0:32]
+
+        self.assertEqual(mock.call_count, 3)
+        np.testing.assert_array_equal(a, j[0:128:2, 0:128:2])
+        np.testing.assert_array_equal(b, j[128:256:2, 128:256:2])
+        np.testing.assert_array_equal(c, j[::4, ::4])
+        np.testing.assert_array_equal(d, j[0:32, 0:32])
+
+    def test_multiple_tiles(self):
+        """
+        SCENARIO:  Read several areas of a multi-tile image in a session.
+
+        EXPECTED RESULT:  The data matches that of regular slicing.
+        """
+        data = skimage.data.astronaut()
+        Jp2k(self.temp_jp2_filename, data=data, tilesize=(128, 128))
+        j = Jp2kr(self.temp_jp2_filename)
+
+        with j.session() as s:
+            a = s[100:300, 100:300]
+            b = s[0:64, 448:512]
+            c = s[5:9, 5:9, 1]
+
+        np.testing.assert_array_equal(a, data[100:300, 100:300])
+        np.testing.assert_array_equal(b, data[0:64, 448:512])
+        np.testing.assert_array_equal(c, data[5:9, 5:9, 1])
+
+    def test_decoded_components(self):
+        """
+        SCENARIO:  Restrict the decoded components, then read in a session.
+
+        EXPECTED RESULT:  Only the requested component is decoded, same as
+        with regular slicing.
+        """
+        j = Jp2kr(self.j2kfile)
+        j.decoded_components = [1]
+        with j.session() as s:
+            actual = s[0:64, 0:64]
+
+        self.assertEqual(actual.shape, (64, 64))
+        np.testing.assert_array_equal(actual, j[0:64, 0:64])
+
+    def test_closed_session_can_be_reused(self):
+        """
+        SCENARIO:  Read from a session after it has been closed.
+
+        EXPECTED RESULT:  The session transparently reopens the codec.
+        """
+        j = Jp2kr(self.j2kfile)
+        s = j.session()
+        s[0:16, 0:16]
+        s.close()
+
+        actual = s[16:32, 16:32]
+        s.close()
+
+        np.testing.assert_array_equal(actual, j[16:32, 16:32])
+
+    def test_invalid_rlevel(self):
+        """
+        SCENARIO:  Request an invalid resolution level in a session.
+
+        EXPECTED RESULT:  ValueError, as with regular slicing.
+        """
+        j = Jp2kr(self.j2kfile)
+        with j.session() as s:
+            with self.assertRaises(ValueError):
+                s[::64, ::64]
@@ -0,0 +1,332 @@
+"""
+Tests for reading and writing JPEG 2000 data with in-memory buffers and file
+objects.
+"""
+# standard library imports
+import io
+import mmap
+import unittest
+
+# 3rd party library imports
+import lxml.etree as ET
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+
+    def test_bytes_like(self):
+        """
+        SCENARIO:  Read a JP2 file supplied as bytes, bytearray, and
+        memoryview objects.
+
+        EXPECTED RESULT:  The image data and metadata match that of reading
+        from the path.
+        """
+        expected = Jp2kr(self.jp2file)
+        with open(self.jp2file, 'rb') as f:
+            b = f.read()
+
+        for source in (b, bytearray(b), memoryview(b)):
+            with self.subTest(source=type(source).__name__):
+                j = Jp2kr(source)
+                self.assertIsNone(j.filename)
+                self.assertEqual(j.shape, expected.shape)
+                self.assertEqual(
+                    [box.box_id for box in j.box],
+                    [box.box_id for box in expected.box]
+                )
+                np.testing.assert_array_equal(
+                    j[::2, ::2], expected[::2, ::2]
+                )
+
+    def test_raw_codestream(self):
+        """
+        SCENARIO:  Read a raw J2K codestream supplied as bytes.
+
+        EXPECTED RESULT:  The image data and codestream match that of reading
+        from the path.
+        """
+        expected = Jp2kr(self.j2kfile)
+        with open(self.j2kfile, 'rb') as f:
+            j = Jp2kr(f.read())
+
+        self.assertEqual(
+            j.codestream.segment[1].xsiz, expected.codestream.segment[1].xsiz
+        )
+        np.testing.assert_array_equal(
+            j[100:200, 50:150], expected[100:200, 50:150]
+        )
+
+    def test_bytesio(self):
+        """
+        SCENARIO:  Read a multi-tile JP2 file from a BytesIO object.
+
+        EXPECTED RESULT:  The image data matches the original, the full
+        codestream can be parsed.
+        """
+        data = skimage.data.astronaut()
+        Jp2k(self.temp_jp2_filename, data=data, tilesize=(128, 128))
+        b = io.BytesIO(self.temp_jp2_filename.read_bytes())
+
+        j = Jp2kr(b)
+
+        np.testing.assert_array_equal(j[:], data)
+        np.testing.assert_array_equal(
+            j[100:300, 200:400], data[100:300, 200:400]
+        )
+
+        c = j.get_codestream(header_only=False)
+        self.assertEqual(
+            sum(seg.marker_id == 'SOT' for seg in c.segment), 16
+        )
+
+    def test_open_file_object(self):
+        """
+        SCENARIO:  Read from an already opened file.
+
+        EXPECTED RESULT:  The image data matches, the file is left open.
+        """
+        expected = Jp2kr(self.jp2file)[::2, ::2]
+        with open(self.jp2file, 'rb') as f:
+            j = Jp2kr(f)
+            actual = j[::2, ::2]
+            self.assertFalse(f.closed)
+
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_mmap(self):
+        """
+        SCENARIO:  Read from a memory map, then close the memory map.
+
+        EXPECTED RESULT:  The image data matches, the memory map can be closed
+        after the reader is done with it.
+        """
+        expected = Jp2kr(self.jp2file)[::2, ::2]
+        with open(self.jp2file, 'rb') as f:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            j = Jp2kr(m)
+            actual = j[::2, ::2]
+            str(j)
+            del j
+            m.close()
+
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_session(self):
+        """
+        SCENARIO:  Read several areas from in-memory data in a session.
+
+        EXPECTED RESULT:  The data matches that of reading from the path.
+        """
+        expected = Jp2kr(self.j2kfile)
+        with open(self.j2kfile, 'rb') as f:
+            j = Jp2kr(f.read())
+
+        with j.session() as s:
+            a = s[0:64, 0:64]
+            b = s[200:300, 100:200]
+
+        np.testing.assert_array_equal(a, expected[0:64, 0:64])
+        np.testing.assert_array_equal(b, expected[200:300, 100:200])
+
+    def test_lazy_codestream(self):
+        """
+        SCENARIO:  Print the contiguous codestream box of in-memory data
+        after the data was initially parsed.
+
+        EXPECTED RESULT:  The codestream is loaded lazily from the buffer.
+        """
+        with open(self.jp2file, 'rb') as f:
+            j = Jp2kr(f.read())
+
+        jp2c = j.box[-1]
+        self.assertIsNone(jp2c._codestream)
+        self.assertEqual(jp2c.codestream.segment[0].marker_id, 'SOC')
+
+    def test_repr(self):
+        """
+        SCENARIO:  Get the repr and str of a reader of in-memory data.
+
+        EXPECTED RESULT:  The type of the source is reported instead of a
+        path.
+        """
+        with open(self.jp2file, 'rb') as f:
+            j = Jp2kr(f.read())
+
+        self.assertEqual(repr(j), 'glymur.Jp2kr(<bytes>)')
+        self.assertTrue(str(j).startswith('File:  <bytes>'))
+
+    def test_not_jpeg2000(self):
+        """
+        SCENARIO:  Read in-memory data that is not JPEG 2000.
+
+        EXPECTED RESULT:  InvalidJp2kError
+        """
+        with self.assertRaises(glymur.jp2box.InvalidJp2kError):
+            Jp2kr(b'\x00' * 64)
+
+    def test_bad_source(self):
+        """
+        SCENARIO:  Supply an object that is neither a path nor readable.
+
+        EXPECTED RESULT:  TypeError
+        """
+        with self.assertRaises(TypeError):
+            Jp2kr(42)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestWrite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+
+    def test_encode(self):
+        """
+        SCENARIO:  Encode an image to bytes.
+
+        EXPECTED RESULT:  The bytes are identical to those written to a file
+        with the same parameters.
+        """
+        data = skimage.data.astronaut()
+        b = glymur.encode(data, cratios=[50, 10, 1], numres=4)
+
+        Jp2k(self.temp_jp2_filename, data=data, cratios=[50, 10, 1], numres=4)
+        self.assertEqual(b, self.temp_jp2_filename.read_bytes())
+
+        j = Jp2kr(b)
+        np.testing.assert_array_equal(j[:], data)
+        self.assertEqual(j.codestream.segment[2].num_res, 3)
+
+    def test_bytesio(self):
+        """
+        SCENARIO:  Write to an empty BytesIO object.
+
+        EXPECTED RESULT:  A JP2 file is written into the BytesIO object, which
+        is then used for reading.
+        """
+        data = skimage.data.moon()
+        b = io.BytesIO()
+        j = Jp2k(b, data=data)
+
+        self.assertEqual(repr(j), 'glymur.Jp2k(<BytesIO>)')
+        self.assertEqual(b.getvalue()[4:8], b'jP  ')
+        self.assertEqual(j.shape, (512, 512))
+        np.testing.assert_array_equal(j[:], data)
+
+    def test_overwrite(self):
+        """
+        SCENARIO:  Write to a BytesIO object that already holds a JPEG 2000
+        image.
+
+        EXPECTED RESULT:  The old image is completely replaced.
+        """
+        data = skimage.data.astronaut()
+        b = io.BytesIO(glymur.encode(data[::-1]))
+        Jp2k(b, data=data)
+
+        np.testing.assert_array_equal(Jp2kr(b.getvalue())[:], data)
+
+    def test_raw_codestream(self):
+        """
+        SCENARIO:  Write to a file object whose name has a J2K suffix.
+
+        EXPECTED RESULT:  A raw codestream is written.
+        """
+        data = skimage.data.moon()
+        with open(self.temp_j2k_filename, 'w+b') as f:
+            j = Jp2k(f, data=data)
+            self.assertEqual(len(j.box), 0)
+
+        self.assertEqual(self.temp_j2k_filename.read_bytes()[:2], b'\xff\x4f')
+
+    def test_tiles(self):
+        """
+        SCENARIO:  Write an image tile-by-tile into a BytesIO object.
+
+        EXPECTED RESULT:  The image matches the original.
+        """
+        data = skimage.data.astronaut()
+        b = io.BytesIO()
+        j = Jp2k(b, shape=data.shape, tilesize=(256, 256))
+        for tw in j.get_tilewriters():
+            r, c = divmod(tw.tile_index, 2)
+            tw[:] = data[r * 256:(r + 1) * 256, c * 256:(c + 1) * 256]
+
+        np.testing.assert_array_equal(Jp2kr(b.getvalue())[:], data)
+        self.assertEqual(j.shape, data.shape)
+
+    def test_resolution_boxes(self):
+        """
+        SCENARIO:  Write to a BytesIO object with capture and display
+        resolution boxes.
+
+        EXPECTED RESULT:  The resolution superbox is written into the
+        BytesIO object.
+        """
+        b = io.BytesIO()
+        j = Jp2k(
+            b,
+            data=skimage.data.moon(),
+            capture_resolution=[1, 2],
+            display_resolution=[3, 4]
+        )
+
+        self.assertEqual(j.box[2].box[2].box_id, 'res ')
+        self.assertEqual(Jp2kr(b.getvalue()).box[2].box[2].box_id, 'res ')
+
+    def test_append(self):
+        """
+        SCENARIO:  Append an XML box to a JP2 file held in a BytesIO object.
+
+        EXPECTED RESULT:  The XML box is the last box.
+        """
+        b = io.BytesIO(glymur.encode(skimage.data.moon()))
+        j = Jp2k(b)
+        xml = ET.ElementTree(ET.fromstring('<data>1</data>'))
+        j.append(glymur.jp2box.XMLBox(xml=xml))
+
+        self.assertEqual(Jp2kr(b.getvalue()).box[-1].box_id, 'xml ')
+
+    def test_wrap(self):
+        """
+        SCENARIO:  Wrap a raw codestream held in memory into a BytesIO
+        object.
+
+        EXPECTED RESULT:  The new JP2 file has the same image.
+        """
+        with open(self.j2kfile, 'rb') as f:
+            j = Jp2k(f.read())
+
+        b = io.BytesIO()
+        jp2 = j.wrap(b)
+
+        self.assertEqual(jp2.box[-1].box_id, 'jp2c')
+        np.testing.assert_array_equal(jp2[::4, ::4], j[::4, ::4])
+
+    def test_immutable_target(self):
+        """
+        SCENARIO:  Write to a bytes object.
+
+        EXPECTED RESULT:  TypeError
+        """
+        with self.assertRaises(TypeError):
+            Jp2k(b'', data=skimage.data.moon())
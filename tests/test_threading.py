@@ -171,3 +171,177 @@ class TestSuite(fixtures.TestCommon):
         actual = j[:]
 
         np.testing.assert_array_equal(actual, expected)
+
+    def num_threads_used(self, func):
+        """Call a function, returning the thread counts given to OpenJPEG."""
+        with patch(
+            'glymur.jp2kr.opj2.codec_set_threads',
+            wraps=glymur.lib.openjp2.codec_set_threads
+        ) as mock:
+            func()
+        return [c.args[1] for c in mock.call_args_list]
+
+    def test_read_options(self):
+        """
+        SCENARIO:  Read with a thread count given for that read only, both
+        with a single codec and with the tiles decoded in parallel.
+
+        EXPECTED RESULT:  Every codec uses the thread count, and the option
+        is unchanged afterwards.
+        """
+        Jp2k(
+            self.temp_jp2_filename,
+            data=skimage.data.astronaut(),
+            tilesize=(256, 256),
+        )
+        j = Jp2k(self.temp_jp2_filename)
+        options = {'lib.num_threads': 3}
+
+        actual = self.num_threads_used(lambda: j.read(options=options))
+        self.assertEqual(actual, [3])
+
+        actual = self.num_threads_used(
+            lambda: j.read(options=options, workers=2)
+        )
+        self.assertEqual(actual, [3, 3, 3, 3])
+
+        self.assertEqual(glymur.get_option('lib.num_threads'), 1)
+
+    def test_converter_options(self):
+        """
+        SCENARIO:  Create a TIFF converter with a thread count.
+
+        EXPECTED RESULT:  The thread count applies to the conversion only,
+        not to the whole process.
+        """
+        path = ir.files('tests.data.tiff').joinpath('basn6a08.tif')
+
+        with glymur.Tiff2Jp2k(
+            path, self.temp_jp2_filename, num_threads=2
+        ) as p:
+            self.assertEqual(glymur.get_option('lib.num_threads'), 1)
+            self.assertEqual(p.options, {'lib.num_threads': 2})
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                p.run()
+
+        self.assertEqual(glymur.get_option('lib.num_threads'), 1)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+@unittest.skipIf(
+    not OPENJPEG_NOT_AVAILABLE
+    and not glymur.lib.openjp2.has_thread_support(),
+    "Requires thread support"
+)
+class TestSuiteAuto(fixtures.TestCommon):
+    """Test automatic thread sizing."""
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+        glymur.threads.thread_info_clear()
+
+        # 4 tiles of 4x4 code-blocks
+        Jp2k(
+            self.temp_jp2_filename,
+            data=skimage.data.astronaut(),
+            tilesize=(256, 256),
+        )
+        glymur.set_option('lib.num_threads', 'auto')
+
+    def tearDown(self):
+        glymur.reset_option('all')
+        super().tearDown()
+
+    def test_decode(self):
+        """
+        SCENARIO:  Read the whole image and a small area of it.
+
+        EXPECTED RESULT:  The threads follow the code-blocks of a tile,
+        limited by the cores, and are handed back afterwards.
+        """
+        j = Jp2k(self.temp_jp2_filename)
+        with patch('glymur.threads.available_cores', return_value=16):
+            j[:]
+            j.read(area=(0, 0, 64, 128))
+            j.read(rlevel=2)
+
+        info = glymur.thread_info()
+        self.assertEqual(info.in_use, 0)
+        self.assertEqual(
+            [(d.operation, d.codeblocks, d.num_threads)
+             for d in info.decisions],
+            [('decode', 48, 16), ('decode', 6, 6), ('decode', 3, 3)]
+        )
+
+    def test_budget_is_shared(self):
+        """
+        SCENARIO:  Read the image while a decode session holds on to its
+        codec.
+
+        EXPECTED RESULT:  The read only gets the cores left over.
+        """
+        j = Jp2k(self.temp_jp2_filename)
+        with patch('glymur.threads.available_cores', return_value=4):
+            with j.session() as s:
+                s[:64, :64]
+                self.assertEqual(glymur.thread_info().in_use, 3)
+                j[:]
+
+        decisions = glymur.thread_info().decisions
+        self.assertEqual(
+            [(d.available, d.num_threads) for d in decisions],
+            [(4, 3), (1, 1)]
+        )
+        self.assertEqual(glymur.thread_info().in_use, 0)
+
+    def test_encode(self):
+        """
+        SCENARIO:  Write an image with automatic thread sizing.
+
+        EXPECTED RESULT:  The decision is recorded as an encode.
+        """
+        with patch('glymur.threads.available_cores', return_value=64):
+            Jp2k(
+                self.temp_j2k_filename,
+                data=skimage.data.moon(),
+                cbsize=(32, 32),
+            )
+
+        decision = glymur.thread_info().decisions[-1]
+        self.assertEqual(decision.operation, 'encode')
+        self.assertEqual(decision.codeblocks, 256)
+        self.assertEqual(decision.num_threads, 64)
+
+    def test_bad_value(self):
+        """
+        SCENARIO:  Set lib.num_threads to something other than 'auto' or a
+        positive integer.
+
+        EXPECTED RESULT:  ValueError
+        """
+        for value in ('many', 0, 2.5):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    glymur.set_option('lib.num_threads', value)
+
+    def test_numpy_integer(self):
+        """
+        SCENARIO:  Set lib.num_threads to a numpy integer, then read.
+
+        EXPECTED RESULT:  The value is accepted, as it was before 'auto' was
+        supported, and OpenJPEG is given a plain int.
+        """
+        glymur.set_option('lib.num_threads', np.int64(2))
+
+        with patch(
+            'glymur.jp2kr.opj2.codec_set_threads',
+            wraps=glymur.lib.openjp2.codec_set_threads
+        ) as mock:
+            glymur.Jp2kr(self.jp2file)[::4, ::4]
+
+        self.assertIs(type(mock.call_args.args[1]), int)
+        self.assertEqual(mock.call_args.args[1], 2)
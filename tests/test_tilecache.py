@@ -0,0 +1,307 @@
+"""
+Tests for the cache of decoded tiles.
+"""
+# standard library imports
+import concurrent.futures
+import io
+import os
+import unittest
+from unittest.mock import patch
+
+# 3rd party library imports
+import numpy as np
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr
+from glymur.lib import openjp2 as opj2
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+# Size of a full 128x128 RGB tile
+TILE_BYTES = 128 * 128 * 3
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+        glymur.cache_clear()
+
+        # 4x4 tiles, with partial tiles on the right and bottom edges
+        self.data = skimage.data.astronaut()[:500, :450]
+        Jp2k(self.temp_jp2_filename, data=self.data, tilesize=(128, 128))
+
+    def tearDown(self):
+        super().tearDown()
+        glymur.cache_clear()
+        glymur.reset_option('all')
+
+    def test_disabled_by_default(self):
+        """
+        SCENARIO:  Read an image twice without configuring the cache.
+
+        EXPECTED RESULT:  Nothing is cached.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        j[:]
+        j[:]
+
+        self.assertEqual(glymur.cache_info(), (0, 0, 0, 0))
+
+    def test_hits(self):
+        """
+        SCENARIO:  Read overlapping areas of an image twice, with the cache
+        enabled.
+
+        EXPECTED RESULT:  The second reads are served from the cache without
+        decoding anything, the images match the original.
+        """
+        glymur.set_option('cache.max_bytes', 2 ** 24)
+        j = Jp2kr(self.temp_jp2_filename)
+
+        np.testing.assert_array_equal(
+            j[100:300, 50:400], self.data[100:300, 50:400]
+        )
+        info = glymur.cache_info()
+        self.assertEqual((info.hits, info.misses), (0, 6))
+        self.assertEqual(info.current_bytes, 6 * TILE_BYTES)
+
+        with patch(
+            'glymur.jp2kr.opj2.read_header', wraps=opj2.read_header
+        ) as mock:
+            np.testing.assert_array_equal(j[:200, :200], self.data[:200, :200])
+            np.testing.assert_array_equal(
+                Jp2kr(self.temp_jp2_filename)[200:250, 300:350],
+                self.data[200:250, 300:350]
+            )
+
+        # Tile 0 was not needed for the first read.
+        self.assertEqual(mock.call_count, 1)
+        info = glymur.cache_info()
+        self.assertEqual((info.hits, info.misses), (4, 7))
+
+    def test_rlevel(self):
+        """
+        SCENARIO:  Read an image at several resolution levels with the cache
+        enabled, with and without workers.
+
+        EXPECTED RESULT:  The images match those read without the cache.
+        """
+        j = Jp2kr(self.temp_jp2_filename)
+        expected = {rlevel: j.read(rlevel=rlevel) for rlevel in (0, 1, 3)}
+
+        glymur.set_option('cache.max_bytes', 2 ** 24)
+        for workers in (None, 2, None):
+            for rlevel in (0, 1, 3):
+                with self.subTest(rlevel=rlevel, workers=workers):
+                    np.testing.assert_array_equal(
+                        j.read(rlevel=rlevel, workers=workers),
+                        expected[rlevel]
+                    )
+
+        self.assertEqual(glymur.cache_info().misses, 48)
+
+    def test_out_and_planar(self):
+        """
+        SCENARIO:  Read from the cache into a preallocated planar array.
+
+        EXPECTED RESULT:  The output array is returned holding the image.
+        """
+        glymur.set_option('cache.max_bytes', 2 ** 24)
+        j = Jp2kr(self.temp_jp2_filename)
+        j[:]
+
+        out = np.zeros((3, 500, 450), dtype=np.uint8)
+        actual = j.read(out=out, planar=True)
+
+        self.assertIs(actual, out)
+        np.testing.assert_array_equal(out, np.moveaxis(self.data, -1, 0))
+        self.assertEqual(glymur.cache_info().hits, 16)
+
+    def test_read_windows(self):
+        """
+        SCENARIO:  Read windows twice with the cache enabled.
+
+        EXPECTED RESULT:  The second time around every tile is a hit.
+        """
+        glymur.set_option('cache.max_bytes', 2 ** 24)
+        j = Jp2kr(self.temp_jp2_filename)
+        areas = [(0, 0, 64, 64), (100, 100, 164, 164), (400, 400, 464, 450)]
+
+        j.read_windows(areas)
+        actual = j.read_windows(areas)
+
+        for (r0, c0, r1, c1), image in zip(areas, actual):
+            np.testing.assert_array_equal(image, self.data[r0:r1, c0:c1])
+        info = glymur.cache_info()
+        self.assertEqual((info.hits, info.misses), (6, 6))
+
+    def test_lru_eviction(self):
+        """
+        SCENARIO:  Read three tiles into a cache with room for two.
+
+        EXPECTED RESULT:  The least recently used tile is evicted, the cache
+        stays within its budget.
+        """
+        glymur.set_option('cache.max_bytes', 2 * TILE_BYTES)
+        j = Jp2kr(self.temp_jp2_filename)
+
+        j[:128, :128]
+        j[:128, 128:256]
+        j[:128, :128]
+        j[:128, 256:384]
+        self.assertEqual(glymur.cache_info().current_bytes, 2 * TILE_BYTES)
+
+        j[:128, :128]
+        self.assertEqual(glymur.cache_info().hits, 2)
+
+        j[:128, 128:256]
+        self.assertEqual(glymur.cache_info().hits, 2)
+
+    def test_shrink_budget(self):
+        """
+        SCENARIO:  Reduce the budget of a populated cache.
+
+        EXPECTED RESULT:  Tiles are evicted to fit the new budget.
+        """
+        glymur.set_option('cache.max_bytes', 2 ** 24)
+        j = Jp2kr(self.temp_jp2_filename)
+        j[:256, :256]
+
+        glymur.set_option('cache.max_bytes', TILE_BYTES)
+        j[:128, :128]
+        self.assertLessEqual(glymur.cache_info().current_bytes, TILE_BYTES)
+
+    def test_tile_larger_than_budget(self):
+        """
+        SCENARIO:  Read a small area of an image whose tiles are larger
+        than the budget of the cache.
+
+        EXPECTED RESULT:  Just the area is decoded, bypassing the cache,
+        rather than decoding whole tiles that cannot be kept.
+        """
+        glymur.set_option('cache.max_bytes', TILE_BYTES - 1)
+        j = Jp2kr(self.temp_jp2_filename)
+
+        with patch(
+            'glymur.jp2kr.opj2.set_decode_area', wraps=opj2.set_decode_area
+        ) as mock:
+            actual = j[10:20, 30:40]
+
+        np.testing.assert_array_equal(actual, self.data[10:20, 30:40])
+        self.assertEqual(mock.call_args.args[2:], (30, 10, 40, 20))
+        info = glymur.cache_info()
+        self.assertEqual((info.hits, info.misses), (0, 0))
+
+    def test_file_changed(self):
+        """
+        SCENARIO:  Overwrite a file after its tiles have been cached.
+
+        EXPECTED RESULT:  The stale tiles are not used.
+        """
+        glymur.set_option('cache.max_bytes', 2 ** 24)
+        Jp2kr(self.temp_jp2_filename)[:]
+
+        data = np.flipud(self.data)
+        Jp2k(self.temp_jp2_filename, data=data, tilesize=(128, 128))
+        st = self.temp_jp2_filename.stat()
+        os.utime(
+            self.temp_jp2_filename, ns=(st.st_atime_ns, st.st_mtime_ns + 10)
+        )
+
+        np.testing.assert_array_equal(Jp2kr(self.temp_jp2_filename)[:], data)
+        self.assertEqual(glymur.cache_info().hits, 0)
+
+    def test_decoding_parameters(self):
+        """
+        SCENARIO:  Read an image with the cache enabled, changing the decoded
+        components and the layer.
+
+        EXPECTED RESULT:  The tiles are cached separately.
+        """
+        Jp2k(
+            self.temp_jp2_filename,
+            data=self.data,
+            tilesize=(128, 128),
+            cratios=[20, 5, 1],
+        )
+        j = Jp2kr(self.temp_jp2_filename)
+        expected_layer = j[:]
+        j.layer = 0
+        expected_layer0 = j[:]
+        j.layer = 2
+        j.decoded_components = [0]
+        expected_band = j[:]
+        j.decoded_components = None
+
+        glymur.set_option('cache.max_bytes', 2 ** 24)
+        np.testing.assert_array_equal(j[:], expected_layer)
+        j.layer = 0
+        np.testing.assert_array_equal(j[:], expected_layer0)
+        j.layer = 2
+        j.decoded_components = [0]
+        np.testing.assert_array_equal(j[:], expected_band)
+
+        self.assertEqual(glymur.cache_info().hits, 0)
+
+    def test_in_memory(self):
+        """
+        SCENARIO:  Read in-memory data with the cache enabled.
+
+        EXPECTED RESULT:  In-memory data has no file identity, so it is not
+        cached.
+        """
+        glymur.set_option('cache.max_bytes', 2 ** 24)
+        j = Jp2kr(io.BytesIO(self.temp_jp2_filename.read_bytes()))
+
+        np.testing.assert_array_equal(j[:], self.data)
+        self.assertEqual(glymur.cache_info(), (0, 0, 2 ** 24, 0))
+
+    def test_concurrent_access(self):
+        """
+        SCENARIO:  Read many areas from several threads into a cache too
+        small to hold every tile.
+
+        EXPECTED RESULT:  The images are correct, every lookup is counted and
+        the cache stays within its budget.
+        """
+        glymur.set_option('cache.max_bytes', 5 * TILE_BYTES)
+        j = Jp2kr(self.temp_jp2_filename)
+
+        rng = np.random.default_rng(0)
+        areas = []
+        for _ in range(64):
+            r, c = rng.integers(0, 400), rng.integers(0, 350)
+            areas.append((r, c, r + 100, c + 100))
+
+        def read(area):
+            return j.read(area=area)
+
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            images = list(executor.map(read, areas))
+
+        for (r0, c0, r1, c1), image in zip(areas, images):
+            np.testing.assert_array_equal(image, self.data[r0:r1, c0:c1])
+
+        info = glymur.cache_info()
+        expected = sum(len(j._tile_regions([area])) for area in areas)
+        self.assertEqual(info.hits + info.misses, expected)
+        self.assertLessEqual(info.current_bytes, 5 * TILE_BYTES)
+
+    def test_invalid_max_bytes(self):
+        """
+        SCENARIO:  Set a negative or non-integer cache budget.
+
+        EXPECTED RESULT:  ValueError
+        """
+        for value in (-1, 1.5, True):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    glymur.set_option('cache.max_bytes', value)
@@ -0,0 +1,334 @@
+"""
+Tests for the tile server.
+"""
+# standard library imports
+import io
+import os
+import threading
+import unittest
+from unittest.mock import patch
+import urllib.error
+import urllib.request
+
+# 3rd party library imports
+import numpy as np
+from PIL import Image
+import skimage.data
+
+# local imports
+import glymur
+from glymur import Jp2k, Jp2kr, command_line
+from glymur.lib import openjp2 as opj2
+from glymur.tileserver import TileServer, TileSource, _reduce
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+from . import fixtures
+
+
+def decode(data):
+    return np.asarray(Image.open(io.BytesIO(data)))
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+class TestSuite(fixtures.TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        glymur.reset_option('all')
+
+        # 600 x 1000 in 4x6 tiles, with only two resolution levels, so the
+        # lower zoom levels must be reduced after decoding
+        data = np.tile(skimage.data.astronaut(), (2, 2, 1))
+        self.data = data[:600, :1000]
+        Jp2k(
+            self.temp_jp2_filename,
+            data=self.data,
+            tilesize=(256, 256),
+            numres=1,
+        )
+
+    def test_zoom_levels(self):
+        """
+        SCENARIO:  Create a tile source for the image.
+
+        EXPECTED RESULT:  The zoom levels and tile grids follow from the
+        image size.
+        """
+        source = TileSource(self.temp_jp2_filename)
+
+        self.assertEqual(source.max_zoom, 2)
+        self.assertEqual(source.max_level, 10)
+        self.assertEqual(
+            [source.grid(z) for z in range(3)], [(1, 1), (2, 2), (4, 3)]
+        )
+
+    def test_full_resolution_tiles(self):
+        """
+        SCENARIO:  Render tiles at the highest zoom level, including a
+        partial tile at the bottom right.
+
+        EXPECTED RESULT:  The tiles match the image data.
+        """
+        source = TileSource(self.temp_jp2_filename)
+
+        np.testing.assert_array_equal(
+            decode(source.xyz_tile(2, 1, 0)), self.data[:256, 256:512]
+        )
+        np.testing.assert_array_equal(
+            decode(source.xyz_tile(2, 3, 2)), self.data[512:, 768:]
+        )
+
+    def test_reduced_tiles(self):
+        """
+        SCENARIO:  Render tiles at zoom levels that are and are not
+        available in the codestream.
+
+        EXPECTED RESULT:  The first are decoded directly at that resolution,
+        the second are reduced from the lowest resolution.
+        """
+        source = TileSource(self.temp_jp2_filename)
+        j = Jp2kr(self.temp_jp2_filename)
+
+        r1 = j.read(rlevel=1)
+        np.testing.assert_array_equal(
+            decode(source.xyz_tile(1, 1, 1)), r1[256:, 256:]
+        )
+
+        np.testing.assert_array_equal(
+            decode(source.xyz_tile(0, 0, 0)), _reduce(r1, 2)
+        )
+        self.assertEqual(decode(source.dzi_tile(0, 0, 0)).shape, (1, 1, 3))
+
+    def test_reduce(self):
+        """
+        SCENARIO:  Reduce an image whose size is not a multiple of the
+        factor.
+
+        EXPECTED RESULT:  Each pixel is the mean of its box, cropped at the
+        edges.
+        """
+        image = np.arange(15, dtype=np.uint8).reshape(3, 5)
+
+        actual = _reduce(image, 2)
+
+        expected = np.array([[3, 5, 7], [11, 12, 14]], dtype=np.uint8)
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_dzi(self):
+        """
+        SCENARIO:  Produce the Deep Zoom descriptor, and a Deep Zoom tile.
+
+        EXPECTED RESULT:  The descriptor gives the image size, and the tiles
+        at the highest Deep Zoom level are full resolution.
+        """
+        source = TileSource(self.temp_jp2_filename, format='jpg')
+
+        dzi = source.dzi()
+        self.assertIn('Format="jpg"', dzi)
+        self.assertIn('<Size Width="1000" Height="600"/>', dzi)
+
+        tile = decode(source.dzi_tile(10, 0, 0))
+        self.assertEqual(tile.shape, (256, 256, 3))
+
+    def test_memory_cache(self):
+        """
+        SCENARIO:  Ask for the same tile twice.
+
+        EXPECTED RESULT:  It is decoded only once.
+        """
+        source = TileSource(self.temp_jp2_filename)
+        with patch(
+            'glymur.jp2kr.opj2.read_header', wraps=opj2.read_header
+        ) as mock:
+            first = source.xyz_tile(2, 1, 1)
+            second = source.xyz_tile(2, 1, 1)
+
+        self.assertEqual(mock.call_count, 1)
+        self.assertEqual(first, second)
+
+    def test_disk_cache(self):
+        """
+        SCENARIO:  Render a tile into a disk cache, then ask a new source
+        for the same tile, then change the image.
+
+        EXPECTED RESULT:  The new source reads the tile from disk without
+        decoding, until the image changes.
+        """
+        cache_dir = self.test_dir_path / 'cache'
+        expected = TileSource(
+            self.temp_jp2_filename, cache_dir=cache_dir
+        ).xyz_tile(2, 1, 1)
+
+        source = TileSource(self.temp_jp2_filename, cache_dir=cache_dir)
+        with patch(
+            'glymur.jp2kr.opj2.read_header', wraps=opj2.read_header
+        ) as mock:
+            actual = source.xyz_tile(2, 1, 1)
+        self.assertEqual(mock.call_count, 0)
+        self.assertEqual(actual, expected)
+
+        Jp2k(
+            self.temp_jp2_filename,
+            data=np.flipud(self.data),
+            tilesize=(256, 256),
+            numres=1,
+        )
+        st = self.temp_jp2_filename.stat()
+        os.utime(
+            self.temp_jp2_filename, ns=(st.st_atime_ns, st.st_mtime_ns + 10)
+        )
+        source = TileSource(self.temp_jp2_filename, cache_dir=cache_dir)
+        np.testing.assert_array_equal(
+            decode(source.xyz_tile(2, 1, 1)),
+            np.flipud(self.data)[256:512, 256:512]
+        )
+
+    def test_single_tile_sessions(self):
+        """
+        SCENARIO:  Render several tiles of an image consisting of a single
+        JPEG 2000 tile.
+
+        EXPECTED RESULT:  The main header is parsed only once, as a single
+        decode session is reused.
+        """
+        Jp2k(self.temp_jp2_filename, data=self.data)
+        source = TileSource(self.temp_jp2_filename)
+
+        with patch(
+            'glymur.jp2kr.opj2.read_header', wraps=opj2.read_header
+        ) as mock:
+            for x in range(4):
+                actual = decode(source.xyz_tile(2, x, 0))
+                np.testing.assert_array_equal(
+                    actual, self.data[:256, 256 * x:256 * (x + 1)]
+                )
+
+        self.assertEqual(mock.call_count, 1)
+
+    def test_prefetch(self):
+        """
+        SCENARIO:  Prefetch every tile of the highest zoom level in
+        parallel.
+
+        EXPECTED RESULT:  The tiles are then served without decoding.
+        """
+        source = TileSource(self.temp_jp2_filename)
+        ncols, nrows = source.grid(2)
+        tiles = [(2, x, y) for x in range(ncols) for y in range(nrows)]
+
+        source.prefetch(tiles, workers=4)
+
+        with patch(
+            'glymur.jp2kr.opj2.read_header', wraps=opj2.read_header
+        ) as mock:
+            for t in tiles:
+                source.xyz_tile(*t)
+        self.assertEqual(mock.call_count, 0)
+
+    def test_concurrent_requests_render_once(self):
+        """
+        SCENARIO:  Ask for the same cold tile from many threads at once.
+
+        EXPECTED RESULT:  The tile is rendered just once.
+        """
+        source = TileSource(self.temp_jp2_filename)
+        barrier = threading.Barrier(8)
+        results = []
+
+        def request():
+            barrier.wait()
+            results.append(source.xyz_tile(2, 2, 1))
+
+        with patch.object(
+            TileSource, '_render', autospec=True,
+            side_effect=TileSource._render
+        ) as mock:
+            threads = [threading.Thread(target=request) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(mock.call_count, 1)
+        self.assertEqual(len(set(results)), 1)
+
+    def test_bad_tiles(self):
+        """
+        SCENARIO:  Ask for tiles outside of the image or the zoom levels.
+
+        EXPECTED RESULT:  IndexError
+        """
+        source = TileSource(self.temp_jp2_filename)
+        for z, x, y in [(3, 0, 0), (-1, 0, 0), (1, 2, 0), (2, 0, -1)]:
+            with self.subTest(z=z, x=x, y=y):
+                with self.assertRaises(IndexError):
+                    source.xyz_tile(z, x, y)
+
+    def test_bad_format(self):
+        """
+        SCENARIO:  Ask for an unsupported tile format.
+
+        EXPECTED RESULT:  ValueError
+        """
+        with self.assertRaises(ValueError):
+            TileSource(self.temp_jp2_filename, format='gif')
+
+    def test_server(self):
+        """
+        SCENARIO:  Request tiles and the descriptor over HTTP.
+
+        EXPECTED RESULT:  They are served with the right content types, and
+        unknown paths are not found.
+        """
+        server = TileServer({'astro': self.temp_jp2_filename}, port=0)
+        t = threading.Thread(target=server.serve_forever, daemon=True)
+        t.start()
+        try:
+            base = f'http://127.0.0.1:{server.server_port}'
+
+            with urllib.request.urlopen(f'{base}/astro/2/0/0.png') as r:
+                self.assertEqual(r.headers['Content-Type'], 'image/png')
+                actual = decode(r.read())
+            np.testing.assert_array_equal(actual, self.data[:256, :256])
+
+            with urllib.request.urlopen(f'{base}/astro.dzi') as r:
+                self.assertEqual(r.headers['Content-Type'], 'application/xml')
+
+            with urllib.request.urlopen(f'{base}/astro_files/9/1_1.png') as r:
+                self.assertEqual(decode(r.read()).shape, (44, 244, 3))
+
+            for path in [
+                '/astro/9/0/0.png',
+                '/astro/2/0/0.jpg',
+                '/other/0/0/0.png',
+                '/other.dzi',
+                '/',
+            ]:
+                with self.subTest(path=path):
+                    with self.assertRaises(urllib.error.HTTPError) as cm:
+                        urllib.request.urlopen(base + path)
+                    self.assertEqual(cm.exception.code, 404)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_command_line(self):
+        """
+        SCENARIO:  Start the server from the command line.
+
+        EXPECTED RESULT:  The image is served under the name of its stem.
+        """
+        new = [
+            '', '--port', '0', '--format', 'jpg', str(self.temp_jp2_filename)
+        ]
+        with (
+            patch('sys.argv', new=new),
+            patch.object(TileServer, 'serve_forever') as serve_forever,
+            patch('sys.stdout', new=io.StringIO()) as stdout,
+        ):
+            command_line.tileserver()
+
+        serve_forever.assert_called_once()
+        self.assertIn('Serving test on', stdout.getvalue())